@@ -2,31 +2,51 @@
 import logging
 
 # Import FastAPI framework components
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 # Import core modules from SignalForge
-from app.core.data_collector import DataCollector
-from app.core.wallet_scanner import WalletScanner
-from app.core.pattern_detector import PatternDetector
-from app.core.signal_generator import SignalGenerator
-from app.core.risk_assessor import RiskAssessor
-from app.core.model_trainer import ModelTrainer
+from app.core.metrics import CONTENT_TYPE, MetricsRegistry
+from app.core.model_trainer import DuplicatePatternError
+from app.core.profiler import Profiler
+from app.core.risk_population import POPULATION_METRICS
+from app.core.rule_engine import RuleCompileError
+from app.core.signal_pipeline import SignalPipeline
+from app.core.tracing import Tracer
 
 # Initialize logger for SignalForge
 logger = logging.getLogger("signalforge")
 
+# Request header opting into profiling (also the response header naming the profile directory)
+PROFILE_HEADER = "X-SignalForge-Profile"
+
 # Request model for wallet-based API calls
 class WalletRequest(BaseModel):
     wallet: str
 
+# Request model for bulk wallet scans and signals
+class WalletBatchRequest(BaseModel):
+    wallets: List[str]
+
 # Request model for training new custom patterns
 class TrainRequest(BaseModel):
     name: str
     description: str
     conditions: Dict[str, Any]
 
+def get_pipeline(request: Request) -> SignalPipeline:
+    """
+    FastAPI dependency returning the pipeline shared by all requests.
+
+    Args:
+        request (Request): Current request
+
+    Returns:
+        SignalPipeline: Pipeline built by register_routes()
+    """
+    return request.app.state.pipeline
+
 def register_routes(app: FastAPI, config: Dict[str, Any], db) -> None:
     """
     Register all available API routes for SignalForge.
@@ -36,6 +56,27 @@ def register_routes(app: FastAPI, config: Dict[str, Any], db) -> None:
         config (dict): Loaded configuration dictionary
         db (Database): Database instance
     """
+    # Built once → pools, caches, history and state are shared by every request
+    app.state.pipeline = SignalPipeline(config, db)
+
+    # Opt-in per-request profiling (?profile=true or the X-SignalForge-Profile header)
+    profiling_config = config.get("profiling") or {}
+    app.state.profiler = Profiler.from_config(profiling_config)
+
+    # Persist the risk population and stop the AI comment worker on shutdown
+    app.router.on_shutdown.append(lambda: app.state.pipeline.close(wait_for_comments=False))
+
+    @app.middleware("http")
+    async def count_in_flight(request: Request, call_next):
+        """
+        Track API requests currently being served.
+        """
+        gauge = MetricsRegistry.shared().api_in_flight
+        gauge.inc()
+        try:
+            return await call_next(request)
+        finally:
+            gauge.dec()
 
     @app.get("/status")
     def status():
@@ -48,80 +89,182 @@ def register_routes(app: FastAPI, config: Dict[str, Any], db) -> None:
         return {"status": "SignalForge API is running."}
 
     @app.post("/scan")
-    def scan_wallet(req: WalletRequest):
+    async def scan_wallet(req: WalletRequest, pipeline: SignalPipeline = Depends(get_pipeline)):
         """
         Scan a wallet without generating a signal.
         Pure analysis only.
 
         Args:
             req (WalletRequest): Wallet address input from user
+            pipeline (SignalPipeline): Shared pipeline
 
         Returns:
             dict: Wallet analysis results
         """
-        # Initialize DataCollector and WalletScanner
-        collector = DataCollector(
-            coingecko_api=config["coingecko_api"],
-            rpc_url=config["rpc_url"]
-        )
-        scanner = WalletScanner(collector)
+        # Perform wallet analysis (on the transport loop, without blocking a worker thread)
+        result = await pipeline.scan_async(req.wallet)
 
-        # Perform wallet analysis
-        result = scanner.analyze_wallet(req.wallet)
+        return result.to_dict()
 
-        return result
+    @app.post("/scan/batch")
+    def scan_wallets(req: WalletBatchRequest, pipeline: SignalPipeline = Depends(get_pipeline)):
+        """
+        Scan many wallets in one call with bounded concurrency.
+        A failing wallet is reported per entry instead of failing the request.
+
+        Args:
+            req (WalletBatchRequest): Wallet addresses input from user
+            pipeline (SignalPipeline): Shared pipeline
+
+        Returns:
+            dict: Results in input order ("index", "wallet", "analysis", "error")
+        """
+        results = sorted(pipeline.scan_many(req.wallets), key=lambda r: r["index"])
+        for result in results:
+            if result["analysis"] is not None:
+                result["analysis"] = result["analysis"].to_dict()
+
+        return {"results": results}
 
     @app.post("/signal")
-    def generate_signal(req: WalletRequest):
+    def generate_signal(req: WalletRequest, request: Request, response: Response, profile: bool = False,
+                        pipeline: SignalPipeline = Depends(get_pipeline)):
         """
         Generate a full signal for a wallet.
         Includes analysis, pattern detection, signal building, and risk score.
+        Patterns / signal / risk are only re-derived when their inputs changed since the last scan.
 
         Args:
             req (WalletRequest): Wallet address input from user
+            request (Request): Current request (X-SignalForge-Profile header)
+            response (Response): Response (X-SignalForge-Profile header with the profile directory)
+            profile (bool): Profile this request (needs profiling.api_enabled)
+            pipeline (SignalPipeline): Shared pipeline
 
         Returns:
-            dict: Final signal object with risk score
+            dict: Final signal object with risk score (ai_comment may still be "pending",
+                  see GET /signal/{wallet})
         """
-        # Initialize required core modules
-        collector = DataCollector(
-            coingecko_api=config["coingecko_api"],
-            rpc_url=config["rpc_url"]
-        )
-        scanner = WalletScanner(collector)
-        detector = PatternDetector(config)
-        generator = SignalGenerator()
-        assessor = RiskAssessor(config)
+        if not (profile or request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes")):
+            signal, _ = pipeline.signal(req.wallet)
+            return signal
+
+        if not profiling_config.get("api_enabled", False):
+            raise HTTPException(status_code=403, detail="Request profiling is disabled (profiling.api_enabled)")
 
-        # Analyze wallet
-        wallet_analysis = scanner.analyze_wallet(req.wallet)
+        with app.state.profiler.profile(f"signal-{req.wallet}") as result:
+            signal, _ = pipeline.signal(req.wallet)
 
-        # Detect patterns based on strategy rules
-        patterns = detector.detect_patterns(wallet_analysis)
+        if result is not None:
+            response.headers[PROFILE_HEADER] = result.directory
 
-        # Generate signal object
-        signal = generator.generate_signal(wallet_analysis, patterns)
+        return signal
 
-        # Calculate risk score and attach to signal
-        risk_score = assessor.calculate_risk_score(wallet_analysis, patterns)
-        signal["risk_score"] = risk_score
+    @app.post("/signal/batch")
+    def generate_signals(req: WalletBatchRequest, pipeline: SignalPipeline = Depends(get_pipeline)):
+        """
+        Generate signals for many wallets in one call.
+        AI comments of the sweep are fetched in batched requests; a failing
+        wallet is reported per entry instead of failing the request.
+
+        Args:
+            req (WalletBatchRequest): Wallet addresses input from user
+            pipeline (SignalPipeline): Shared pipeline
+
+        Returns:
+            dict: Results in input order ("index", "wallet", "signal", "recomputed", "error")
+        """
+        return {"results": sorted(pipeline.signal_many(req.wallets), key=lambda r: r["index"])}
+
+    @app.get("/signal/{wallet}")
+    def get_signal(wallet: str, pipeline: SignalPipeline = Depends(get_pipeline)):
+        """
+        Return the last signal stored for a wallet, including an AI comment
+        that was generated in the background after POST /signal returned.
+
+        Args:
+            wallet (str): Wallet address
+            pipeline (SignalPipeline): Shared pipeline
+
+        Returns:
+            dict: Stored signal object
+        """
+        signal = pipeline.stored_signal(wallet)
+        if signal is None:
+            raise HTTPException(status_code=404, detail=f"No signal stored for wallet {wallet}")
 
         return signal
 
+    @app.get("/risk/population")
+    def risk_population(pipeline: SignalPipeline = Depends(get_pipeline)):
+        """
+        Population-wide risk distribution the percentiles are relative to.
+
+        Args:
+            pipeline (SignalPipeline): Shared pipeline
+
+        Returns:
+            dict: Median / p90 / p99 per tracked metric
+        """
+        population = pipeline.assessor.population
+        if population is None:
+            raise HTTPException(status_code=404, detail="Risk population tracking is disabled")
+
+        return {metric: population.quantiles(metric) for metric in POPULATION_METRICS}
+
+    @app.get("/traces")
+    def traces(recent: int = 0):
+        """
+        Where the time goes: latency summary per span name (collector calls,
+        analysis, detection, generation, AI, risk, outputs, stages).
+
+        Args:
+            recent (int): Also return this many of the most recent spans (in-memory exporter only)
+
+        Returns:
+            dict: "summary" per span name, and "spans" if requested
+        """
+        tracer = Tracer.shared()
+        result = {"enabled": tracer.enabled, "summary": tracer.summary()}
+
+        if recent > 0 and tracer.collector is not None:
+            result["spans"] = [span.to_dict() for span in tracer.collector.spans()[-recent:]]
+
+        return result
+
+    @app.get("/metrics")
+    def metrics():
+        """
+        Prometheus scrape endpoint: outbound calls per upstream / operation
+        (count, status, bytes, latency, in flight), cache hit ratios, queue
+        depths, SQLite writes, API requests in flight and span latencies.
+
+        Returns:
+            Response: Metrics in the Prometheus text exposition format
+        """
+        return Response(MetricsRegistry.shared().render(), media_type=CONTENT_TYPE)
+
     @app.post("/train")
-    def train_pattern(req: TrainRequest):
+    def train_pattern(req: TrainRequest, pipeline: SignalPipeline = Depends(get_pipeline)):
         """
         Add a new user-defined pattern to the system.
 
         Args:
             req (TrainRequest): Pattern name, description, and conditions provided by user
+            pipeline (SignalPipeline): Shared pipeline
 
         Returns:
             dict: Confirmation message
-        """
-        trainer = ModelTrainer()
 
-        # Save pattern to database
-        trainer.add_pattern(req.name, req.description, req.conditions)
+        Raises:
+            HTTPException: 409 if the name is taken, 422 if the conditions are invalid
+        """
+        # Save pattern and apply it to the following signals
+        try:
+            pipeline.add_pattern(req.name, req.description, req.conditions)
+        except DuplicatePatternError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except RuleCompileError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid conditions: {e}")
 
         return {"message": "Pattern saved successfully."}
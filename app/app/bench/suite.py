@@ -0,0 +1,509 @@
+import argparse
+import copy
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import register_routes
+from app.cli import commands
+from app.core.config_loader import ConfigLoader
+from app.core.signal_pipeline import SignalPipeline
+from app.core.tracing import LatencyHistogram
+from app.db.database import Database
+from app.outputs.json_exporter import JSONExporter
+from app.outputs.logger import setup_logger
+from app.outputs.report_writer import ReportWriter
+from app.standin.server import StandinServer
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Component cases run as a chain (each feeds the next), then the end-to-end cases
+COMPONENT_CASES = ("analyze_wallet", "detect_patterns", "generate_signal", "calculate_risk_score",
+                   "json_export", "report_export")
+END_TO_END_CASES = ("cli_signal", "api_signal")
+CASES = COMPONENT_CASES + END_TO_END_CASES
+
+DEFAULT_SIZES = (1, 100, 10000, 100000)
+
+
+class RSSMonitor:
+    """
+    RSSMonitor samples the resident set size of the process on a
+    background thread and keeps the peak seen while it runs. Without
+    /proc (non-Linux) it falls back to the process-wide high-water mark.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "RSSMonitor":
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._run, name="signalforge-rss", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+    def current(self) -> int:
+        """
+        Resident set size in bytes.
+        """
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * self._page_size
+        except (OSError, IndexError, ValueError):
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+
+class BenchmarkResult:
+    """
+    BenchmarkResult holds the measurements of one case at one wallet count.
+    """
+
+    __slots__ = ("case", "wallets", "errors", "wall_seconds", "histogram", "peak_rss")
+
+    def __init__(self, case: str, wallets: int, errors: int, wall_seconds: float, histogram: LatencyHistogram,
+                 peak_rss: int):
+        self.case = case
+        self.wallets = wallets
+        self.errors = errors
+        self.wall_seconds = wall_seconds
+        self.histogram = histogram
+        self.peak_rss = peak_rss
+
+    @property
+    def calls(self) -> int:
+        """
+        Calls made, failed ones included.
+        """
+        return self.histogram.count + self.errors
+
+    @property
+    def throughput(self) -> float:
+        """
+        Successful calls per second of wall time.
+        """
+        return self.histogram.count / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        def ms(p):
+            value = self.histogram.percentile(p)
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "case": self.case,
+            "wallets": self.wallets,
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.calls, 4) if self.calls else 0.0,
+            "wall_seconds": round(self.wall_seconds, 4),
+            "throughput_per_second": round(self.throughput, 2),
+            "p50_ms": ms(50),
+            "p95_ms": ms(95),
+            "p99_ms": ms(99),
+            "max_ms": ms(100),
+            "peak_rss_mb": round(self.peak_rss / 2 ** 20, 1)
+        }
+
+
+def measure(case: str, wallets: int, func: Callable[[Any], Any], items: Iterable[Any],
+            concurrency: int = 1) -> Tuple[BenchmarkResult, List[Any]]:
+    """
+    Time func on every item, from a thread pool if concurrency > 1.
+
+    A failing call counts as an error (its output is None) and does not stop
+    the run; only successful calls enter the latency and throughput figures.
+
+    Args:
+        case (str): Case name.
+        wallets (int): Wallet count of the run.
+        func (callable): Called once per item.
+        items (iterable): Inputs.
+        concurrency (int): Calls in flight at once.
+
+    Returns:
+        tuple: (BenchmarkResult, outputs in input order)
+    """
+    histogram = LatencyHistogram(significant_figures=3)
+    lock = threading.Lock()
+    errors = 0
+
+    def timed(item):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            output = func(item)
+        except Exception as e:
+            with lock:
+                errors += 1
+            logger.debug(f"Benchmark {case} call failed: {e}")
+            return None
+
+        elapsed = time.perf_counter() - start
+        with lock:
+            histogram.record(elapsed)
+        return output
+
+    with RSSMonitor() as rss:
+        start = time.perf_counter()
+        if concurrency > 1:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{case}") as pool:
+                outputs = list(pool.map(timed, items))
+        else:
+            outputs = [timed(item) for item in items]
+        wall_seconds = time.perf_counter() - start
+
+    result = BenchmarkResult(case, wallets, errors, wall_seconds, histogram, rss.peak)
+    logger.info(f"{case} x{wallets}: {result.throughput:.1f}/s, p95 {result.to_dict()['p95_ms']} ms, "
+                   f"{errors} error(s)")
+    return result, outputs
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2,
+            min_calls: int = 100) -> List[str]:
+    """
+    Compare a run against a baseline run.
+
+    A case regresses when its error rate rises above the baseline's, or
+    when its throughput drops, or its p95 latency grows, by more than the
+    threshold. Cases with fewer calls than min_calls (in either run) are
+    too noisy for the timing comparison; errors are always compared.
+
+    Args:
+        current (dict): Report of this run.
+        baseline (dict): Report of the baseline run.
+        threshold (float): Allowed relative change (0.2 → 20%).
+        min_calls (int): Minimum calls for a case to be compared.
+
+    Returns:
+        list: One message per regression (empty if none).
+    """
+    previous = {(r["case"], r["wallets"]): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in current.get("results", []):
+        before = previous.get((result["case"], result["wallets"]))
+        if before is None:
+            continue
+
+        label = f"{result['case']} x{result['wallets']}"
+        if _error_rate(result) > _error_rate(before):
+            regressions.append(f"{label}: errors {before.get('errors', 0)}/{before['calls']} → "
+                               f"{result['errors']}/{result['calls']}")
+
+        if min(result["calls"], before["calls"]) < min_calls:
+            continue
+
+        if before["throughput_per_second"] and \
+                result["throughput_per_second"] < before["throughput_per_second"] * (1 - threshold):
+            regressions.append(f"{label}: throughput {before['throughput_per_second']}/s → "
+                               f"{result['throughput_per_second']}/s")
+        if before["p95_ms"] and result["p95_ms"] is not None and result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+            regressions.append(f"{label}: p95 {before['p95_ms']} ms → {result['p95_ms']} ms")
+
+    return regressions
+
+
+def _error_rate(result: Dict[str, Any]) -> float:
+    """
+    Failed share of a reported case's calls (0.0 for reports without errors).
+    """
+    return result.get("errors", 0) / result["calls"] if result["calls"] else 0.0
+
+
+class BenchmarkSuite:
+    """
+    BenchmarkSuite measures the pipeline against a local upstream stand-in
+    (see app.standin), at each wallet count:
+
+        analyze_wallet → detect_patterns → generate_signal → calculate_risk_score
+        → json_export / report_export      component cases, each fed by the previous one
+        cli_signal, api_signal             full signal generation (CLI run_signal, POST /signal)
+
+    Each case reports throughput, p50 / p95 / p99 latency and peak RSS.
+    AI comments and webhooks are disabled so runs stay hermetic, and the
+    stand-in is anchored to a fixed time so every run sees the same wallets.
+    """
+
+    def __init__(self, config: Dict[str, Any], sizes: Sequence[int] = DEFAULT_SIZES, cases: Sequence[str] = CASES,
+                 concurrency: int = 50, standin_config: Optional[Dict[str, Any]] = None, work_dir: Optional[str] = None):
+        """
+        Initialize the BenchmarkSuite.
+
+        Args:
+            config (dict): Loaded configuration settings (endpoints are replaced by the stand-in's).
+            sizes (list): Wallet counts to run every case at.
+            cases (list): Cases to report (component cases still run to feed the selected ones).
+            concurrency (int): Wallets in flight at once for analyze_wallet and the end-to-end cases.
+            standin_config (dict, optional): Stand-in settings (see the "standin" config section).
+            work_dir (str, optional): Directory for exports and databases (default: a temporary one).
+        """
+        unknown = set(cases) - set(CASES)
+        if unknown:
+            raise ValueError(f"Unknown benchmark case(s): {', '.join(sorted(unknown))}")
+
+        self.config = config
+        self.sizes = list(sizes)
+        self.cases = [case for case in CASES if case in cases]
+        self.concurrency = max(1, concurrency)
+        self.standin_config = dict(standin_config or {}, port=0)
+        self.work_dir = work_dir
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], sizes: Optional[Sequence[int]] = None,
+                    cases: Optional[Sequence[str]] = None) -> "BenchmarkSuite":
+        """
+        Build a suite from the "benchmark" section of the config.
+
+        Args:
+            config (dict): Loaded configuration settings.
+            sizes (list, optional): Wallet counts overriding benchmark.sizes.
+            cases (list, optional): Cases to report (default: all).
+
+        Returns:
+            BenchmarkSuite: New suite.
+        """
+        benchmark_config = config.get("benchmark", {})
+        return cls(
+            config,
+            sizes=sizes or benchmark_config.get("sizes", DEFAULT_SIZES),
+            cases=cases or CASES,
+            concurrency=benchmark_config.get("concurrency", 50),
+            standin_config={**config.get("standin", {}), **benchmark_config.get("standin", {})}
+        )
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run every selected case at every wallet count.
+
+        Returns:
+            dict: Report with the environment, settings and one result per case and size.
+        """
+        work_dir = self.work_dir or tempfile.mkdtemp(prefix="signalforge-bench-")
+        cwd = os.getcwd()
+        results = []
+
+        with StandinServer.from_config(self.standin_config) as server:
+            config = copy.deepcopy(self.config)
+            config.update(
+                rpc_url=server.rpc_url,
+                coingecko_api=server.coingecko_api,
+                ai_api_key="",
+                webhooks={}
+            )
+
+            # CLI exports are written relative to the working directory
+            os.makedirs(work_dir, exist_ok=True)
+            os.chdir(work_dir)
+            try:
+                for size in self.sizes:
+                    wallets = [f"bench-{size}-{index}" for index in range(size)]
+                    results.extend(self._run_components(config, wallets, work_dir))
+                    results.extend(self._run_end_to_end(config, wallets, work_dir))
+            finally:
+                os.chdir(cwd)
+                if self.work_dir is None:
+                    shutil.rmtree(work_dir, ignore_errors=True)
+
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count()
+            },
+            "settings": {
+                "sizes": self.sizes,
+                "concurrency": self.concurrency,
+                "standin": {key: value for key, value in self.standin_config.items() if key != "port"}
+            },
+            "results": [result.to_dict() for result in results]
+        }
+
+    def _run_components(self, config: Dict[str, Any], wallets: List[str], work_dir: str) -> List[BenchmarkResult]:
+        """
+        Component cases on one shared pipeline, up to the last selected one.
+        """
+        selected = [case for case in COMPONENT_CASES if case in self.cases]
+        if not selected:
+            return []
+        last = COMPONENT_CASES.index(selected[-1])
+
+        pipeline = SignalPipeline(config)
+        detector = pipeline.detector
+        size = len(wallets)
+        results = []
+
+        def keep(result):
+            if result.case in self.cases:
+                results.append(result)
+            return COMPONENT_CASES.index(result.case) < last
+
+        try:
+            result, analyses = measure("analyze_wallet", size, pipeline.scanner.analyze_wallet, wallets,
+                                       self.concurrency)
+            analyses = [analysis for analysis in analyses if analysis is not None]
+            if not keep(result):
+                return results
+
+            result, patterns = measure("detect_patterns", size, detector.detect_patterns, analyses)
+            pairs = [(a, p) for a, p in zip(analyses, patterns) if p is not None]
+            if not keep(result):
+                return results
+
+            result, signals = measure("generate_signal", size, lambda pair: pipeline.generator.generate_signal(*pair),
+                                      pairs)
+            if not keep(result):
+                return results
+
+            result, _ = measure("calculate_risk_score", size,
+                                lambda pair: pipeline.assessor.calculate_risk_score(*pair), pairs)
+            signals = [signal for signal in signals if signal is not None]
+            if not keep(result):
+                return results
+
+            exporter = JSONExporter(os.path.join(work_dir, "component", "signals"))
+            result, _ = measure("json_export", size, exporter.save_signal, signals)
+            if not keep(result):
+                return results
+
+            writer = ReportWriter(os.path.join(work_dir, "component", "reports"))
+            result, _ = measure("report_export", size, writer.save_report, signals)
+            keep(result)
+            return results
+        finally:
+            pipeline.close(wait_for_comments=False)
+
+    def _run_end_to_end(self, config: Dict[str, Any], wallets: List[str], work_dir: str) -> List[BenchmarkResult]:
+        """
+        Full signal generation through the CLI command and the API, each on a fresh pipeline and database.
+        """
+        size = len(wallets)
+        results = []
+
+        if "cli_signal" in self.cases:
+            db = Database(os.path.join(work_dir, f"cli-{size}.db"))
+            pipeline = SignalPipeline(config, db)
+            try:
+                result, _ = measure(
+                    "cli_signal", size,
+                    lambda wallet: commands.run_signal(argparse.Namespace(wallet=wallet), config, db, pipeline),
+                    wallets, self.concurrency
+                )
+                results.append(result)
+            finally:
+                pipeline.close(wait_for_comments=False)
+                db.connection.close()
+
+        if "api_signal" in self.cases:
+            db = Database(os.path.join(work_dir, f"api-{size}.db"))
+            app = FastAPI()
+            register_routes(app, config, db)
+            client = TestClient(app)
+            try:
+                result, _ = measure(
+                    "api_signal", size,
+                    lambda wallet: client.post("/signal", json={"wallet": wallet}).raise_for_status(),
+                    wallets, self.concurrency
+                )
+                results.append(result)
+            finally:
+                app.state.pipeline.close(wait_for_comments=False)
+                db.connection.close()
+
+        return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run the benchmark suite, store the report as JSON and fail on regressions:
+
+        python -m app.bench.suite --sizes 1,100 --baseline benchmarks/baseline.json
+    """
+    parser = argparse.ArgumentParser(description="SignalForge benchmark suite (against the local upstream stand-in)")
+    parser.add_argument("--config", default="config/base_config.yaml", help="Base config file")
+    parser.add_argument("--strategy", default="config/strategy_aggressive.yaml", help="Strategy config file")
+    parser.add_argument("--sizes", help="Comma-separated wallet counts (default: benchmark.sizes)")
+    parser.add_argument("--cases", help=f"Comma-separated cases (default: all of {', '.join(CASES)})")
+    parser.add_argument("--output", help="Report file (default: <benchmark.results_dir>/<timestamp>.json)")
+    parser.add_argument("--baseline", help="Report to compare against (default: benchmark.baseline)")
+    parser.add_argument("--threshold", type=float, help="Allowed relative regression (default: benchmark.threshold)")
+    parser.add_argument("--save-baseline", action="store_true", help="Also store this run as the baseline")
+    args = parser.parse_args(argv)
+
+    setup_logger("WARNING")
+
+    config = ConfigLoader(base_config_path=args.config, strategy_config_path=args.strategy).load_configs()
+    if not config:
+        logger.error("Failed to load configuration. Exiting.")
+        sys.exit(1)
+
+    benchmark_config = config.get("benchmark", {})
+    suite = BenchmarkSuite.from_config(
+        config,
+        sizes=[int(size) for size in args.sizes.split(",")] if args.sizes else None,
+        cases=args.cases.split(",") if args.cases else None
+    )
+
+    report = suite.run()
+
+    # Store the report; runs are compared by case and wallet count
+    results_dir = benchmark_config.get("results_dir", "benchmarks")
+    output = args.output or os.path.join(results_dir, f"{time.strftime('%Y%m%d-%H%M%S')}.json")
+    baseline_path = args.baseline or benchmark_config.get("baseline", os.path.join(results_dir, "baseline.json"))
+
+    for path in [output] + ([baseline_path] if args.save_baseline else []):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"Benchmark report written to {output}")
+
+    for result in report["results"]:
+        print(f"{result['case']:<22}{result['wallets']:>8} wallets  {result['throughput_per_second']:>10}/s  "
+              f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  p99 {result['p99_ms']} ms  "
+              f"peak RSS {result['peak_rss_mb']} MiB  errors {result['errors']} ({result['error_rate']:.1%})")
+
+    if args.save_baseline or not os.path.isfile(baseline_path):
+        return
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    threshold = args.threshold if args.threshold is not None else benchmark_config.get("threshold", 0.2)
+    regressions = compare(report, baseline, threshold, benchmark_config.get("min_calls", 100))
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {threshold:.0%} against {baseline_path}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print(f"No regressions over {threshold:.0%} against {baseline_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
-# Import standard logging module
+# Import standard libraries
+import json
 import logging
+import threading
 
 # Import core modules from SignalForge
-from app.core.data_collector import DataCollector
-from app.core.wallet_scanner import WalletScanner
-from app.core.pattern_detector import PatternDetector
-from app.core.signal_generator import SignalGenerator
-from app.core.risk_assessor import RiskAssessor
-from app.core.model_trainer import ModelTrainer
+from app.core.model_trainer import DuplicatePatternError, ModelTrainer
+from app.core.profiler import Profiler
+from app.core.rule_engine import RuleCompileError
+from app.core.signal_pipeline import SignalPipeline
+from app.core.stage_graph import Stage, StageGraph
 
 # Import output/export modules
 from app.outputs.json_exporter import JSONExporter
@@ -29,11 +30,35 @@ def dispatch(command, args, config, db):
         db (Database): Database connection instance.
     """
 
+    # --profile → capture the whole command (pipeline setup, run, shutdown)
+    if getattr(args, "profile", False) and command in ("scan", "signal"):
+        profiling_config = dict(config.get("profiling") or {})
+        if getattr(args, "profile_dir", None):
+            profiling_config["output_dir"] = args.profile_dir
+
+        with Profiler.from_config(profiling_config).profile(f"{command}-{args.wallet or 'bulk'}"):
+            run_command(command, args, config, db)
+        return
+
+    run_command(command, args, config, db)
+
+
+def run_command(command, args, config, db):
+    """
+    Run one CLI command.
+
+    Args:
+        command (str): CLI command provided by user.
+        args (argparse.Namespace): CLI arguments provided by user.
+        config (dict): Loaded and merged configuration settings.
+        db (Database): Database connection instance.
+    """
+
     if command == "scan":
-        run_scan(args, config)
+        run_scan(args, config, db)
 
     elif command == "signal":
-        run_signal(args, config)
+        run_signal(args, config, db)
 
     elif command == "train":
         run_train(config)
@@ -46,88 +71,168 @@ def dispatch(command, args, config, db):
         print_help()
 
 
-def run_scan(args, config):
+def run_scan(args, config, db=None, pipeline=None):
     """
     Execute wallet scanning (without signal generation).
 
     Args:
         args (argparse.Namespace): CLI arguments provided by user.
         config (dict): Loaded configuration settings.
+        db (Database, optional): Database for incremental transaction history.
+        pipeline (SignalPipeline, optional): Shared pipeline; built (and closed) here if None.
     """
 
+    # Bulk mode → stream a whole wallet list through the scanner
+    if getattr(args, "wallets_file", None):
+        run_bulk_scan(args, config, db, pipeline)
+        return
+
     # Wallet address is mandatory for scan command
     if not args.wallet:
         logger.error("Wallet address required for scan command.")
         return
 
-    # Initialize data collector with Coingecko API & RPC URL
-    collector = DataCollector(
-        coingecko_api=config["coingecko_api"],
-        rpc_url=config["rpc_url"]
-    )
+    # Initialize collector, scanner & history (repeat scans only fetch new signatures)
+    owns_pipeline = pipeline is None
+    pipeline = pipeline or SignalPipeline(config, db)
 
-    # Initialize wallet scanner
-    scanner = WalletScanner(collector)
+    try:
+        # Analyze provided wallet
+        result = pipeline.scan(args.wallet)
 
-    # Analyze provided wallet
-    result = scanner.analyze_wallet(args.wallet)
+        # Log scan result to console and logs
+        logger.info(f"Scan Result: {result}")
+    finally:
+        if owns_pipeline:
+            pipeline.close()
 
-    # Log scan result to console and logs
-    logger.info(f"Scan Result: {result}")
 
+def run_bulk_scan(args, config, db=None, pipeline=None, signals=False):
+    """
+    Scan (or signal) every wallet listed in a file with bounded concurrency.
+
+    Results are logged (and optionally written as JSON Lines) as soon as
+    each wallet completes; a failing wallet does not abort the sweep. With
+    signals, scanned wallets are evaluated in sweeps whose AI comments are
+    fetched in batched requests (see SignalPipeline.signal_many()).
+
+    Args:
+        args (argparse.Namespace): CLI arguments (wallets_file, concurrency, output).
+        config (dict): Loaded configuration settings.
+        db (Database, optional): Database for incremental transaction history.
+        pipeline (SignalPipeline, optional): Shared pipeline; built (and closed) here if None.
+        signals (bool): Generate signals instead of analyses only.
+    """
 
-def run_signal(args, config):
+    label = "Signal" if signals else "Scan"
+    output = open(args.output, "w") if getattr(args, "output", None) else None
+    scanned = 0
+    failed = 0
+
+    owns_pipeline = pipeline is None
+    pipeline = pipeline or SignalPipeline(config, db)
+    run_many = pipeline.signal_many if signals else pipeline.scan_many
+
+    try:
+        with open(args.wallets_file, "r") as wallets_file:
+            # Lazily stream addresses → memory stays flat for huge lists
+            addresses = (line.strip() for line in wallets_file if line.strip())
+
+            for result in run_many(addresses, concurrency=getattr(args, "concurrency", None)):
+                scanned += 1
+                if result["error"]:
+                    failed += 1
+                    logger.error(f"{label} failed [{result['index']}] {result['wallet']}: {result['error']}")
+                else:
+                    logger.info(f"{label} Result [{result['index']}]: {result['signal' if signals else 'analysis']}")
+
+                if output:
+                    if not signals:
+                        analysis = result["analysis"]
+                        result = {**result, "analysis": analysis.to_dict() if analysis else None}
+                    output.write(json.dumps(result) + "\n")
+    finally:
+        if output:
+            output.close()
+        if owns_pipeline:
+            pipeline.close()
+
+    logger.info(f"Bulk {label.lower()} finished: {scanned} wallet(s), {failed} failed.")
+
+
+def run_signal(args, config, db=None, pipeline=None):
     """
     Execute full signal generation workflow for a wallet.
 
     Args:
         args (argparse.Namespace): CLI arguments provided by user.
         config (dict): Loaded configuration settings.
+        db (Database, optional): Database for incremental transaction history.
+        pipeline (SignalPipeline, optional): Shared pipeline; built (and closed) here if None.
     """
 
+    # Bulk mode → signals for a whole wallet list, AI comments batched per sweep
+    if getattr(args, "wallets_file", None):
+        run_bulk_scan(args, config, db, pipeline, signals=True)
+        return
+
     # Wallet address is mandatory for signal command
     if not args.wallet:
         logger.error("Wallet address required for signal command.")
         return
 
     # Initialize all required modules for signal generation
-    collector = DataCollector(
-        coingecko_api=config["coingecko_api"],
-        rpc_url=config["rpc_url"]
-    )
-
-    scanner = WalletScanner(collector)
-    detector = PatternDetector(config)
-    generator = SignalGenerator()
-    assessor = RiskAssessor(config)
+    owns_pipeline = pipeline is None
+    pipeline = pipeline or SignalPipeline(config, db)
     exporter = JSONExporter()
     sender = WebhookSender(config)
     writer = ReportWriter()
 
-    # Step 1: Analyze wallet
-    wallet_analysis = scanner.analyze_wallet(args.wallet)
+    # Background AI comments are emitted as a follow-up once the signal itself went out
+    emitted = threading.Event()
+
+    def emit_comment(updated):
+        emitted.wait()
+        logger.info(f"AI comment ready for {updated.get('wallet')}: {updated.get('ai_comment')}")
+        exporter.save_signal(updated)
+        writer.save_report(updated)
+        sender.send_comment_update(updated)
+
+    try:
+        # Steps 1-4: Analyze wallet, detect patterns, generate signal, score risk
+        # (with wallet_state enabled, steps 2-4 only run when an input changed since the last scan)
+        signal, recomputed = pipeline.signal(args.wallet, emit_comment)
+
+        if not recomputed and not config.get("wallet_state", {}).get("resend_unchanged", False):
+            logger.info(f"Signal unchanged since last emission, skipping exports and webhooks: {signal}")
+            return
+
+        # Log final signal structure
+        logger.info(f"Final Signal: {signal}")
+
+        # Steps 5-7: JSON export, Markdown report and webhooks (Discord / Telegram) run concurrently
+        stages_config = config.get("stages", {})
+        outputs = StageGraph([
+            Stage("json_export", lambda r: exporter.save_signal(r["signal"]),
+                  depends=("signal",), timeout=10.0, on_error="continue"),
+            Stage("report", lambda r: writer.save_report(r["signal"]),
+                  depends=("signal",), timeout=10.0, on_error="continue"),
+            Stage("webhooks", lambda r: sender.send_signal(r["signal"]),
+                  depends=("signal",), timeout=30.0, on_error="continue")
+        ], max_workers=3)
+        for stage in outputs.stages.values():
+            stage.configured(stages_config.get(stage.name))
 
-    # Step 2: Detect patterns based on analysis
-    patterns = detector.detect_patterns(wallet_analysis)
-
-    # Step 3: Generate signal structure
-    signal = generator.generate_signal(wallet_analysis, patterns)
-
-    # Step 4: Calculate risk score for the signal
-    risk_score = assessor.calculate_risk_score(wallet_analysis, patterns)
-    signal["risk_score"] = risk_score
-
-    # Log final signal structure
-    logger.info(f"Final Signal: {signal}")
-
-    # Step 5: Export signal to JSON file
-    exporter.save_signal(signal)
-
-    # Step 6: Export signal as Markdown report
-    writer.save_report(signal)
+        try:
+            outputs.run({"signal": signal})
+        finally:
+            outputs.close()
+    finally:
+        emitted.set()
 
-    # Step 7: Send signal to webhooks (Discord / Telegram)
-    sender.send_signal(signal)
+        # Persist the risk population and deliver pending AI comments before the process exits
+        if owns_pipeline:
+            pipeline.close()
 
 
 def run_train(config):
@@ -145,7 +250,7 @@ def run_train(config):
     name = input("Enter pattern name: ")
     description = input("Enter pattern description: ")
 
-    print("Enter conditions as key=value pairs. Type 'done' when finished.")
+    print("Enter conditions as key=value pairs (e.g. tokens_held=>=10). Type 'done' when finished.")
 
     conditions = {}
 
@@ -155,13 +260,20 @@ def run_train(config):
         if user_input.lower() == "done":
             break
         try:
-            key, value = user_input.split("=")
+            key, value = user_input.split("=", 1)
             conditions[key.strip()] = value.strip()
         except ValueError:
             print("Invalid format. Use key=value")
 
     # Add new pattern to strategy
-    trainer.add_pattern(name, description, conditions)
+    try:
+        trainer.add_pattern(name, description, conditions)
+    except DuplicatePatternError as e:
+        print(f"Pattern not saved: {e}.")
+        return
+    except RuleCompileError as e:
+        print(f"Pattern not saved, invalid conditions: {e}")
+        return
 
     print("Pattern saved successfully.")
 
@@ -173,6 +285,9 @@ def print_help():
 
     print("Available Commands:")
     print("scan --wallet <address>       : Analyze a wallet")
+    print("scan --wallets-file <path>    : Analyze many wallets (use --concurrency, --output)")
     print("signal --wallet <address>     : Generate a full trading signal")
+    print("signal --wallets-file <path>  : Generate signals for many wallets (AI comments batched)")
+    print("  --profile [--profile-dir d] : Profile scan / signal (pstats, collapsed stacks, allocations)")
     print("train                         : Add a new custom pattern")
     print("help                          : Show this help message")
@@ -38,6 +38,25 @@ def main():
         help="Wallet address to analyze"
     )
 
+    # Optional argument → File with one wallet address per line (bulk scan / signal)
+    parser.add_argument(
+        "--wallets-file",
+        help="File with one wallet address per line to scan or signal in bulk"
+    )
+
+    # Optional argument → Max wallets analyzed at once in bulk scans
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="Max wallets analyzed at once in bulk scans (default: scanner.concurrency)"
+    )
+
+    # Optional argument → JSON Lines output file for bulk results
+    parser.add_argument(
+        "--output",
+        help="Write bulk scan / signal results as JSON Lines to this file"
+    )
+
     # Optional argument → Strategy config to use
     parser.add_argument(
         "--strategy",
@@ -45,6 +64,19 @@ def main():
         default="config/strategy_aggressive.yaml"
     )
 
+    # Optional argument → Profile the command (cProfile, stack samples, allocations)
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the command and write pstats / collapsed stacks / allocations to the profiles directory"
+    )
+
+    # Optional argument → Where profiles are written
+    parser.add_argument(
+        "--profile-dir",
+        help="Directory for --profile output (default: profiling.output_dir)"
+    )
+
     # Parse provided arguments
     args = parser.parse_args()
 
@@ -0,0 +1,178 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Sliding windows over transaction blockTimes (name → seconds)
+WINDOWS: Dict[str, int] = {
+    "1h": 3600,
+    "24h": 86400,
+    "7d": 604800
+}
+
+# Metrics produced per wallet, in a fixed order
+WINDOW_METRICS = tuple(
+    [f"tx_{name}" for name in WINDOWS]
+    + ["gap_seconds", "idle_seconds"]
+    + [f"gap_before_{name}" for name in WINDOWS]
+)
+
+
+class _WalletWindows:
+    """
+    Sliding windows of one wallet's activity times.
+
+    Every blockTime is appended once and evicted once per window, so
+    updates cost O(1) amortized.
+    """
+
+    __slots__ = ("events", "before", "last", "previous")
+
+    def __init__(self):
+        self.events = {name: deque() for name in WINDOWS}
+        self.before: Dict[str, Optional[int]] = {name: None for name in WINDOWS}
+        self.last: Optional[int] = None
+        self.previous: Optional[int] = None
+
+    def add(self, block_time: int) -> bool:
+        """
+        Append one activity time (must not be older than the newest one seen).
+        """
+        if self.last is not None and block_time < self.last:
+            return False
+
+        for events in self.events.values():
+            events.append(block_time)
+        self.previous, self.last = self.last, block_time
+        return True
+
+    def evict(self, now: float) -> None:
+        """
+        Drop activity that left each window, remembering the newest dropped time.
+        """
+        for name, span in WINDOWS.items():
+            events = self.events[name]
+            cutoff = now - span
+            while events and events[0] <= cutoff:
+                self.before[name] = events.popleft()
+
+    def snapshot(self, now: float) -> Dict[str, Optional[float]]:
+        """
+        Current window metrics (None where unknown).
+        """
+        self.evict(now)
+
+        metrics: Dict[str, Optional[float]] = {f"tx_{name}": len(events) for name, events in self.events.items()}
+        metrics["gap_seconds"] = self.last - self.previous if self.previous is not None else None
+        metrics["idle_seconds"] = max(0.0, now - self.last) if self.last is not None else None
+
+        # Quiet period that preceded the activity currently inside each window
+        for name, events in self.events.items():
+            before = self.before[name]
+            metrics[f"gap_before_{name}"] = events[0] - before if events and before is not None else None
+
+        return metrics
+
+
+class ActivityWindows:
+    """
+    ActivityWindows maintains per-wallet sliding-window activity metrics
+    (transactions per 1h / 24h / 7d, gap between the last two activities,
+    idle time and the quiet period before each window) incrementally from
+    transaction blockTimes as new signatures arrive.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty window store.
+        """
+        self._wallets: Dict[str, _WalletWindows] = {}
+        self._lock = threading.Lock()
+
+    def known(self, wallet_address: str) -> bool:
+        """
+        Whether any activity of the wallet has been observed.
+        """
+        with self._lock:
+            return wallet_address in self._wallets
+
+    def observe(self, wallet_address: str, block_times: Iterable[Optional[int]]) -> int:
+        """
+        Feed new activity times of a wallet (any order; None is ignored).
+
+        Args:
+            wallet_address (str): Wallet address.
+            block_times (iterable): blockTimes of newly seen signatures.
+
+        Returns:
+            int: Number of times added (times older than the newest seen are skipped).
+        """
+        ordered = sorted(t for t in block_times if t is not None)
+
+        with self._lock:
+            windows = self._wallets.setdefault(wallet_address, _WalletWindows())
+            added = sum(1 for block_time in ordered if windows.add(block_time))
+
+            # Keep memory bounded between snapshots
+            if windows.last is not None:
+                windows.evict(windows.last)
+
+        if added < len(ordered):
+            logger.debug(f"Skipped {len(ordered) - added} out-of-order blockTime(s) for {wallet_address}")
+
+        return added
+
+    def snapshot(self, wallet_address: str, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Return the current window metrics of a wallet.
+
+        Args:
+            wallet_address (str): Wallet address.
+            now (float, optional): Reference unix time (defaults to the current time).
+
+        Returns:
+            dict: One entry per name in WINDOW_METRICS.
+        """
+        now = time.time() if now is None else now
+
+        with self._lock:
+            windows = self._wallets.get(wallet_address)
+            if windows is None:
+                return _empty_metrics()
+            return windows.snapshot(now)
+
+    def forget(self, wallet_address: str) -> None:
+        """
+        Drop all window state of a wallet.
+        """
+        with self._lock:
+            self._wallets.pop(wallet_address, None)
+
+    @staticmethod
+    def compute(block_times: Iterable[Optional[int]], now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Compute window metrics from scratch for a one-off list of blockTimes.
+
+        Args:
+            block_times (iterable): blockTimes of the wallet's signatures.
+            now (float, optional): Reference unix time (defaults to the current time).
+
+        Returns:
+            dict: One entry per name in WINDOW_METRICS.
+        """
+        windows = _WalletWindows()
+        for block_time in sorted(t for t in block_times if t is not None):
+            windows.add(block_time)
+        return windows.snapshot(time.time() if now is None else now)
+
+
+def _empty_metrics() -> Dict[str, Optional[float]]:
+    """
+    Window metrics of a wallet without observed activity.
+    """
+    return {name: (0 if name.startswith("tx_") else None) for name in WINDOW_METRICS}
+
@@ -1,9 +1,14 @@
 import os
+import json
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence, Tuple
 
 import openai
 
+from app.core.comment_cache import CommentCache
+from app.core.metrics import MetricsRegistry
+from app.core.tracing import traced
+
 # Initialize logger
 logger = logging.getLogger("signalforge")
 
@@ -14,16 +19,58 @@ class AIEngine:
     based on wallet analysis and detected patterns.
     """
 
-    def __init__(self, api_key: str):
+    # Returned when OpenAI could not be reached
+    FALLBACK_COMMENT = "AI comment unavailable."
+
+    SYSTEM_PROMPT = "You are an expert crypto trading analyst. Keep responses short, clear, and realistic."
+
+    # Rough size of one comment in a batched answer (tokens)
+    BATCH_COMMENT_TOKENS = 80
+
+    def __init__(self, api_key: str, cache: Optional[CommentCache] = None,
+                 batch_size: int = 20, batch_token_budget: int = 3000):
         """
         Initialize AIEngine with OpenAI API Key.
 
         Args:
             api_key (str): OpenAI API key for authentication.
+            cache (CommentCache, optional): Cache of comments per normalized wallet profile.
+            batch_size (int): Max wallets per batched request.
+            batch_token_budget (int): Max estimated tokens (prompt + answer) per batched request.
         """
         self.api_key = api_key
-        openai.api_key = api_key
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.batch_token_budget = batch_token_budget
+        self.client = openai.OpenAI(api_key=api_key)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], db=None) -> Optional["AIEngine"]:
+        """
+        Build an AIEngine from "ai_api_key" and the "ai_cache" section of the config.
+
+        Args:
+            config (dict): Loaded configuration settings.
+            db (Database, optional): SQLite database for the persistent comment cache.
+
+        Returns:
+            AIEngine or None: New engine, or None if no API key is configured.
+        """
+        # Resolve "${OPENAI_API_KEY}" style placeholders from the environment
+        api_key = os.path.expandvars(config.get("ai_api_key") or "")
+        if not api_key or "${" in api_key:
+            logger.info("No OpenAI API key configured. AI comments disabled.")
+            return None
+
+        comment_config = config.get("ai_comments", {})
+        return cls(
+            api_key,
+            CommentCache.from_config(db, config.get("ai_cache")),
+            batch_size=comment_config.get("batch_size", 20),
+            batch_token_budget=comment_config.get("batch_token_budget", 3000)
+        )
 
+    @traced("ai.generate_comment", attributes=lambda self, wallet_analysis, *a, **k: {"wallet": wallet_analysis.get("wallet")})
     def generate_comment(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> str:
         """
         Generate an AI comment based on wallet analysis and patterns.
@@ -35,37 +82,242 @@ class AIEngine:
         Returns:
             str: AI-generated comment or fallback message.
         """
+        # Identical (bucketed) wallet profiles share one comment
+        cache_key = self.cache.fingerprint(wallet_analysis, patterns) if self.cache is not None else None
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("AI comment served from cache.")
+                return cached
+
         try:
             # Build prompt for GPT
             prompt = self._build_prompt(wallet_analysis, patterns)
 
-            # Call OpenAI ChatCompletion API
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert crypto trading analyst. Keep responses short, clear, and realistic."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.4,  # Low creativity for consistency
-                max_tokens=200,   # Limit output length
-                request_timeout=15  # Prevent long hangs
-            )
+            # Call OpenAI Chat Completions API
+            comment = self._chat(
+                prompt,
+                max_tokens=200,  # Limit output length
+                timeout=15       # Prevent long hangs
+            ).strip()
 
-            # Extract result
-            comment = response.choices[0].message.content.strip()
+            if cache_key is not None:
+                self.cache.put(cache_key, comment)
 
             logger.info("AI comment generated successfully.")
             return comment
 
         except Exception as e:
             logger.error(f"Failed to generate AI comment: {e}")
-            return "AI comment unavailable."
+            return self.FALLBACK_COMMENT
+
+    @traced("ai.generate_comments", attributes=lambda self, items: {"wallets": len(items)})
+    def generate_comments(self, items: Sequence[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> List[str]:
+        """
+        Generate comments for many wallets with as few requests as possible.
+
+        Cached profiles are served directly and wallets with the same profile
+        share one entry. The rest are packed into batched requests (bounded by
+        batch_size and batch_token_budget) asking for a JSON answer; wallets
+        missing from an answer, or from one that cannot be parsed, fall back
+        to generate_comment().
+
+        Args:
+            items (list): (wallet_analysis, patterns) per wallet.
+
+        Returns:
+            list: One comment per item, in input order.
+        """
+        comments: List[Optional[str]] = [None] * len(items)
+
+        # Profile key → indexes of the items sharing it
+        pending: Dict[str, List[int]] = {}
+        for index, (wallet_analysis, patterns) in enumerate(items):
+            key = self.cache.fingerprint(wallet_analysis, patterns) if self.cache is not None else str(index)
+            if key not in pending:
+                cached = self.cache.get(key) if self.cache is not None else None
+                if cached is not None:
+                    comments[index] = cached
+                    continue
+                pending[key] = []
+            pending[key].append(index)
+
+        keys = list(pending)
+        for chunk in self._chunks(keys, items, pending):
+            answers = self._request_batch([items[pending[key][0]] for key in chunk])
+
+            for key, answer in zip(chunk, answers):
+                if answer is None:
+                    # Missing / unparseable → one request for this wallet alone
+                    answer = self.generate_comment(*items[pending[key][0]])
+                elif self.cache is not None:
+                    self.cache.put(key, answer)
+
+                for index in pending[key]:
+                    comments[index] = answer
+
+        logger.info(f"Generated {len(items)} AI comment(s) with {len(keys)} uncached profile(s).")
+        return comments
+
+    def cached_comment(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        Return a cached comment for this wallet profile without calling OpenAI.
+
+        Args:
+            wallet_analysis (dict): Result of wallet analysis.
+            patterns (list): List of detected patterns.
+
+        Returns:
+            str or None: Cached comment, or None if not cached (or no cache configured).
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache.fingerprint(wallet_analysis, patterns))
+
+    def template_comment(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> str:
+        """
+        Build a short comment locally, used when OpenAI misses its deadline.
+
+        Args:
+            wallet_analysis (dict): Result of wallet analysis.
+            patterns (list): List of detected patterns.
+
+        Returns:
+            str: Templated comment.
+        """
+        activity = wallet_analysis.get("activity_type") or "Unknown activity"
+        comment = (
+            f"{activity}: holds {wallet_analysis.get('tokens_held', 0)} token(s) with "
+            f"{wallet_analysis.get('transaction_count', 0)} recent transaction(s)."
+        )
+
+        if patterns:
+            comment += f" Patterns: {', '.join(p.get('name', 'Unknown Pattern') for p in patterns)}."
+        else:
+            comment += " No notable patterns detected."
+
+        return comment
+
+    def _chunks(self, keys: List[str], items, pending: Dict[str, List[int]]) -> List[List[str]]:
+        """
+        Split the profiles into batches within batch_size and batch_token_budget.
+        """
+        chunks: List[List[str]] = []
+        chunk: List[str] = []
+        tokens = 0
+
+        for key in keys:
+            # ~4 characters per token, plus room for the answer
+            cost = len(self._build_summary("0", *items[pending[key][0]])) // 4 + self.BATCH_COMMENT_TOKENS
+            if chunk and (len(chunk) >= self.batch_size or tokens + cost > self.batch_token_budget):
+                chunks.append(chunk)
+                chunk, tokens = [], 0
+            chunk.append(key)
+            tokens += cost
+
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    @traced("ai.request_batch", attributes=lambda self, items: {"wallets": len(items)})
+    def _request_batch(self, items: Sequence[Tuple[Dict[str, Any], List[Dict[str, Any]]]]) -> List[Optional[str]]:
+        """
+        Ask for the comments of several wallets in one request.
+
+        Returns:
+            list: Comment per item, None where the answer had none.
+        """
+        if len(items) == 1:
+            return [None]
+
+        ids = [str(i) for i in range(len(items))]
+        summaries = "\n".join(self._build_summary(i, *item) for i, item in zip(ids, items))
+
+        prompt = (
+            f"Analyze the behavior of each of the following {len(items)} wallets:\n"
+            f"{summaries}\n"
+            f"Provide a short and realistic comment about each wallet's trading behavior. "
+            f'Answer with JSON only: {{"comments": [{{"id": "<id>", "comment": "<comment>"}}, ...]}}'
+        )
+
+        try:
+            content = self._chat(prompt, max_tokens=self.BATCH_COMMENT_TOKENS * len(items), timeout=30,
+                                 json_answer=True)
+            answer = json.loads(content)
+            by_id = {
+                str(entry.get("id")): str(entry.get("comment")).strip()
+                for entry in answer.get("comments", [])
+                if isinstance(entry, dict) and entry.get("comment")
+            }
+        except Exception as e:
+            logger.warning(f"Batched AI comment request for {len(items)} wallet(s) failed, falling back: {e}")
+            return [None] * len(items)
+
+        missing = [i for i in ids if i not in by_id]
+        if missing:
+            logger.warning(f"Batched AI answer lacks {len(missing)} of {len(items)} comment(s), falling back for those.")
+
+        return [by_id.get(i) for i in ids]
+
+    def _chat(self, prompt: str, max_tokens: int, timeout: float, json_answer: bool = False) -> str:
+        """
+        Send one chat completion request and return the answer text.
+
+        json_answer asks for JSON mode (the prompt must mention JSON).
+        Counted in the upstream metrics ("openai") with its token usage.
+        """
+        messages = [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
+        options = {"response_format": {"type": "json_object"}} if json_answer else {}
+        metrics = MetricsRegistry.shared()
+
+        with metrics.upstream_call("openai", "chat.completions") as call:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                temperature=0.4,  # Low creativity for consistency
+                max_tokens=max_tokens,
+                timeout=timeout,
+                **options
+            )
+            content = response.choices[0].message.content
+            call.response(200, len(json.dumps(messages).encode()), len(content.encode()))
+
+        usage = getattr(response, "usage", None)
+        if usage is not None and metrics.enabled:
+            metrics.openai_tokens.inc(getattr(usage, "prompt_tokens", 0) or 0, kind="prompt")
+            metrics.openai_tokens.inc(getattr(usage, "completion_tokens", 0) or 0, kind="completion")
+
+        return content
+
+    def _profile(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Prompt inputs without the wallet address; bucketed like the cache key when a cache is used,
+        so a shared comment never carries one wallet's exact data.
+        """
+        if self.cache is not None:
+            return self.cache.profile(wallet_analysis, patterns)
+
+        return {
+            "tokens_held": str(wallet_analysis.get("tokens_held", 0)),
+            "transaction_count": str(wallet_analysis.get("transaction_count", 0)),
+            "patterns": [p.get("name", "Unknown Pattern") for p in patterns]
+        }
+
+    def _build_summary(self, summary_id: str, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> str:
+        """
+        One line of a batched prompt.
+        """
+        profile = self._profile(wallet_analysis, patterns)
+        patterns_text = ", ".join(profile["patterns"]) or "No patterns detected"
+        return (
+            f"- id {summary_id}: "
+            f"Tokens Held {profile['tokens_held']}, "
+            f"Transaction Count {profile['transaction_count']}, "
+            f"Detected Patterns: {patterns_text}"
+        )
 
     def _build_prompt(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> str:
         """
@@ -79,19 +331,17 @@ class AIEngine:
             str: The final prompt text for GPT.
         """
 
+        # Normalized profile (no address, bucketed counts) → the comment fits every wallet sharing it
+        profile = self._profile(wallet_analysis, patterns)
+
         # Extract pattern names or provide fallback text
-        if patterns:
-            pattern_names = [p.get("name", "Unknown Pattern") for p in patterns]
-            patterns_text = ', '.join(pattern_names)
-        else:
-            patterns_text = "No patterns detected"
+        patterns_text = ', '.join(profile["patterns"]) or "No patterns detected"
 
         # Build prompt string
         prompt = (
             f"Analyze the following wallet behavior:\n"
-            f"Wallet Address: {wallet_analysis.get('wallet', 'N/A')}\n"
-            f"Tokens Held: {wallet_analysis.get('tokens_held', 0)}\n"
-            f"Transaction Count: {wallet_analysis.get('transaction_count', 0)}\n"
+            f"Tokens Held: {profile['tokens_held']}\n"
+            f"Transaction Count: {profile['transaction_count']}\n"
             f"Detected Patterns: {patterns_text}\n"
             f"Provide a short and realistic comment about this trading behavior."
         )
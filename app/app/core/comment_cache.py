@@ -0,0 +1,197 @@
+import bisect
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Default count ranges: 0 | 1 | 2-4 | 5-9 | 10-19 | 20-49 | 50-99 | 100+
+DEFAULT_BUCKET_BOUNDS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class CommentCache:
+    """
+    CommentCache is a two-tier cache for AI comments: an in-memory LRU in
+    front of a SQLite table. Entries are keyed on a normalized fingerprint
+    of the prompt inputs, with the wallet address removed and the counts
+    bucketed into ranges, so wallets with the same profile share a comment.
+    """
+
+    def __init__(self, db=None, max_entries: int = 1000, max_db_entries: int = 50000,
+                 ttl_seconds: float = 86400.0, bucket_bounds: Sequence[int] = DEFAULT_BUCKET_BOUNDS):
+        """
+        Initialize the CommentCache.
+
+        Args:
+            db (Database, optional): SQLite database for the second tier (memory only if None).
+            max_entries (int): Max comments in the in-memory LRU.
+            max_db_entries (int): Max comments kept in SQLite; the least recently used are evicted.
+            ttl_seconds (float): Age after which a comment is regenerated.
+            bucket_bounds (list): Ascending lower bounds of the count ranges.
+        """
+        self.db = db
+        self.max_entries = max(1, max_entries)
+        self.max_db_entries = max(1, max_db_entries)
+        self.ttl = ttl_seconds
+        self.bucket_bounds = sorted(bucket_bounds)
+
+        # fingerprint → (comment, created_at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Cache statistics
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, db=None, cache_config: Optional[Dict[str, Any]] = None) -> Optional["CommentCache"]:
+        """
+        Build a comment cache from the "ai_cache" section of the config.
+
+        Args:
+            db (Database, optional): SQLite database for the second tier.
+            cache_config (dict, optional): Cache settings.
+
+        Returns:
+            CommentCache or None: New cache, or None if disabled.
+        """
+        cache_config = cache_config or {}
+        if not cache_config.get("enabled", True):
+            return None
+
+        return cls(
+            db=db if cache_config.get("persist", True) else None,
+            max_entries=cache_config.get("max_entries", 1000),
+            max_db_entries=cache_config.get("max_db_entries", 50000),
+            ttl_seconds=cache_config.get("ttl_seconds", 86400.0),
+            bucket_bounds=cache_config.get("bucket_bounds", DEFAULT_BUCKET_BOUNDS)
+        )
+
+    def bucket(self, count: int) -> str:
+        """
+        Map a count onto its range label (e.g. 7 → "5-9").
+
+        Args:
+            count (int): Token or transaction count.
+
+        Returns:
+            str: Range label.
+        """
+        count = max(0, int(count or 0))
+        index = bisect.bisect_right(self.bucket_bounds, count)
+
+        low = self.bucket_bounds[index - 1] if index > 0 else 0
+        if index == len(self.bucket_bounds):
+            return f"{low}+"
+
+        high = self.bucket_bounds[index] - 1
+        return str(low) if low == high else f"{low}-{high}"
+
+    def profile(self, wallet_analysis: Mapping[str, Any], patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Normalized prompt inputs (wallet address removed, counts bucketed).
+
+        Prompts must be built from this profile only: a cached comment is
+        served to every wallet sharing it.
+
+        Args:
+            wallet_analysis (dict): Analyzed wallet data.
+            patterns (list): Patterns detected during analysis.
+
+        Returns:
+            dict: tokens_held and transaction_count ranges, sorted pattern names.
+        """
+        return {
+            "tokens_held": self.bucket(wallet_analysis.get("tokens_held", 0)),
+            "transaction_count": self.bucket(wallet_analysis.get("transaction_count", 0)),
+            "patterns": sorted(p.get("name", "Unknown Pattern") for p in patterns)
+        }
+
+    def fingerprint(self, wallet_analysis: Mapping[str, Any], patterns: List[Dict[str, Any]]) -> str:
+        """
+        Key of the normalized profile (see profile()).
+
+        Args:
+            wallet_analysis (dict): Analyzed wallet data.
+            patterns (list): Patterns detected during analysis.
+
+        Returns:
+            str: Hex digest.
+        """
+        profile = self.profile(wallet_analysis, patterns)
+        return hashlib.sha1(json.dumps(profile, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Return a cached comment that has not expired.
+
+        Args:
+            key (str): Fingerprint.
+
+        Returns:
+            str or None: Cached comment, or None on a miss.
+        """
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+
+        # Second tier → promote into memory
+        if self.db is not None:
+            entry = self.db.get_ai_comment(key)
+            if entry is not None and now - entry[1] <= self.ttl:
+                self._remember(key, entry)
+                with self._lock:
+                    self.db_hits += 1
+                return entry[0]
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, comment: str) -> None:
+        """
+        Store a comment in both tiers.
+
+        Args:
+            key (str): Fingerprint.
+            comment (str): AI comment.
+        """
+        entry = (comment, time.time())
+        self._remember(key, entry)
+
+        if self.db is not None:
+            self.db.save_ai_comment(key, comment, entry[1], max_entries=self.max_db_entries,
+                                    expire_before=entry[1] - self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Entries held in memory, memory hits, SQLite hits and misses.
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "db_hits": self.db_hits, "misses": self.misses}
+
+    def _remember(self, key: str, entry: Tuple[str, float]) -> None:
+        """
+        Insert into the in-memory LRU, evicting the least recently used entries.
+        """
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,169 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from app.core.ai_engine import AIEngine
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# ai_comment value of a signal whose comment is still being generated
+PENDING_COMMENT = "pending"
+
+
+class CommentWorker:
+    """
+    CommentWorker takes AI commentary off the signal's critical path.
+
+    Comments are generated on a small thread pool under a latency budget:
+    if OpenAI has not answered by the deadline, a locally templated
+    comment is used instead. In background mode the signal is returned
+    with ai_comment "pending" and the final comment is handed to a
+    callback once it is available.
+    """
+
+    def __init__(self, ai_engine: AIEngine, background: bool = True, deadline: float = 5.0, max_workers: int = 4):
+        """
+        Initialize the CommentWorker.
+
+        Args:
+            ai_engine (AIEngine): Engine generating the comments.
+            background (bool): Return signals right away with a pending comment.
+            deadline (float): Seconds to wait for OpenAI before falling back to the local template.
+            max_workers (int): Concurrent OpenAI calls.
+        """
+        self.ai_engine = ai_engine
+        self.background = background
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="signalforge-ai")
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, ai_engine: Optional[AIEngine],
+                    comment_config: Optional[Dict[str, Any]] = None) -> Optional["CommentWorker"]:
+        """
+        Build a worker from the "ai_comments" section of the config.
+
+        Args:
+            ai_engine (AIEngine, optional): Engine generating the comments.
+            comment_config (dict, optional): Commentary settings.
+
+        Returns:
+            CommentWorker or None: New worker, or None without an AI engine.
+        """
+        if ai_engine is None:
+            return None
+
+        comment_config = comment_config or {}
+        return cls(
+            ai_engine,
+            background=comment_config.get("mode", "background") == "background",
+            deadline=comment_config.get("deadline_seconds", 5.0),
+            max_workers=comment_config.get("max_workers", 4)
+        )
+
+    def comment(self, wallet_analysis: Mapping[str, Any], patterns: List[Dict[str, Any]],
+                on_comment: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Return the comment for a signal, or PENDING_COMMENT in background mode.
+
+        Cached comments are returned immediately in either mode.
+
+        Args:
+            wallet_analysis (dict): Analyzed wallet data.
+            patterns (list): Patterns detected during analysis.
+            on_comment (callable, optional): Receives the final comment (background mode).
+
+        Returns:
+            str: Final comment, or PENDING_COMMENT if it is generated in the background.
+        """
+        cached = self.ai_engine.cached_comment(wallet_analysis, patterns)
+        if cached is not None:
+            return cached
+
+        result = self._start(wallet_analysis, patterns)
+
+        if not self.background:
+            return result.result()
+
+        def deliver(done: Future) -> None:
+            if on_comment is None:
+                return
+            try:
+                on_comment(done.result())
+            except Exception as e:
+                logger.error(f"Failed to deliver AI comment for {wallet_analysis.get('wallet')}: {e}")
+
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()] + [result]
+        result.add_done_callback(deliver)
+
+        return PENDING_COMMENT
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Background comments not delivered yet.
+        """
+        with self._lock:
+            return sum(1 for future in self._pending if not future.done())
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until all background comments have been delivered.
+
+        Args:
+            timeout (float, optional): Max seconds to wait per comment.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for future in pending:
+            try:
+                future.result(timeout=timeout)
+            except Exception as e:
+                logger.warning(f"Background AI comment did not complete: {e}")
+
+    def close(self) -> None:
+        """
+        Stop accepting work; running calls finish in the background.
+        """
+        self._executor.shutdown(wait=False)
+
+    def _start(self, wallet_analysis: Mapping[str, Any], patterns: List[Dict[str, Any]]) -> Future:
+        """
+        Start the OpenAI call and resolve with its comment or, at the deadline, the local template.
+        """
+        result: Future = Future()
+        resolved = threading.Event()
+        call = self._executor.submit(self.ai_engine.generate_comment, wallet_analysis, patterns)
+
+        def resolve(comment: str, source: str) -> None:
+            # First of OpenAI / deadline wins
+            with self._lock:
+                if resolved.is_set():
+                    return
+                resolved.set()
+            result.set_result(comment)
+            logger.info(f"AI comment for {wallet_analysis.get('wallet')} resolved from {source}")
+
+        def on_done(done: Future) -> None:
+            timer.cancel()
+            comment = done.result() if done.exception() is None else None
+            if comment is None or comment == self.ai_engine.FALLBACK_COMMENT:
+                resolve(self.ai_engine.template_comment(wallet_analysis, patterns), "template (error)")
+            else:
+                resolve(comment, "OpenAI")
+
+        def on_deadline() -> None:
+            # Late OpenAI answers still land in the comment cache
+            resolve(self.ai_engine.template_comment(wallet_analysis, patterns), "template (deadline)")
+
+        timer = threading.Timer(self.deadline, on_deadline)
+        timer.daemon = True
+        timer.start()
+        call.add_done_callback(on_done)
+
+        return result
@@ -1,30 +1,59 @@
-import requests
-import json
-import time
+import asyncio
 import logging
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Union
+
+from app.core.endpoint_pool import RPCEndpointPool
+from app.core.http_transport import HTTPTransport
+from app.core.price_service import PriceService
+from app.core.rpc_batcher import RPCBatcher, RPCError
+from app.core.rpc_cache import RPCResponseCache
+from app.core.tracing import traced
 
 # Initialize logger
 logger = logging.getLogger("signalforge")
 
 
-class DataCollector:
+class AsyncDataCollector:
     """
-    DataCollector is responsible for fetching blockchain 
-    data and token prices from external APIs (RPC & CoinGecko).
+    AsyncDataCollector fetches blockchain data and token prices
+    from external APIs (RPC & CoinGecko) over pooled keep-alive connections.
     """
 
-    def __init__(self, coingecko_api: str, rpc_url: str):
+    def __init__(self, coingecko_api: str, rpc_url: Union[str, Sequence[str]],
+                 transport: Optional[HTTPTransport] = None, config: Optional[Dict[str, Any]] = None):
         """
-        Initialize the DataCollector with API endpoints.
+        Initialize the AsyncDataCollector with API endpoints.
 
         Args:
             coingecko_api (str): CoinGecko API base URL.
-            rpc_url (str): RPC URL for blockchain data.
+            rpc_url (str or list): RPC URL(s) for blockchain data.
+            transport (HTTPTransport, optional): Pooled transport. Defaults to the shared one.
+            config (dict, optional): Loaded configuration ("http", "resilience", "rpc_pool", "rpc_batch",
+                                     "price_service", "rpc_cache" sections and "rpc_commitment").
         """
+        config = config or {}
+
         self.coingecko_api = coingecko_api
         self.rpc_url = rpc_url
+        self.transport = transport or HTTPTransport.shared(config)
 
-    def fetch_token_price(self, token_id: str) -> float:
+        # RPC calls are routed to the fastest healthy endpoint
+        self.rpc_pool = RPCEndpointPool.from_config(self.transport, rpc_url, config.get("rpc_pool"))
+
+        # Concurrent RPC calls are coalesced into JSON-RPC batch requests
+        self.batcher = RPCBatcher.from_config(self.rpc_pool, config.get("rpc_batch"))
+
+        # Token prices are coalesced into multi-id requests and cached
+        self.price_service = PriceService.from_config(self.transport, coingecko_api, config.get("price_service"))
+
+        # Commitment level for wallet reads (None → RPC default "finalized")
+        self.commitment = config.get("rpc_commitment")
+
+        # Bounded, slot-aware LRU cache for wallet RPC responses (None if disabled)
+        self.cache = RPCResponseCache.from_config(config.get("rpc_cache"))
+
+    @traced("collector.fetch_token_price", attributes=lambda self, token_id: {"token": token_id})
+    async def fetch_token_price(self, token_id: str) -> float:
         """
         Fetch real-time token price in USD from CoinGecko.
 
@@ -34,19 +63,33 @@ class DataCollector:
         Returns:
             float: Token price or 0.0 on failure.
         """
-        url = f"{self.coingecko_api}/simple/price?ids={token_id}&vs_currencies=usd"
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            price = data.get(token_id, {}).get('usd', 0.0)
+            price = await self.price_service.get_price(token_id)
             logger.info(f"Fetched price for {token_id}: ${price}")
             return price
         except Exception as e:
             logger.error(f"Failed to fetch price for {token_id}: {e}")
             return 0.0
 
-    def fetch_wallet_balance(self, wallet_address: str) -> dict:
+    @traced("collector.fetch_token_prices", attributes=lambda self, token_ids: {"tokens": len(token_ids)})
+    async def fetch_token_prices(self, token_ids: List[str]) -> Dict[str, float]:
+        """
+        Fetch USD prices for many tokens with as few CoinGecko requests as possible.
+
+        Args:
+            token_ids (list): Token identifiers for CoinGecko API.
+
+        Returns:
+            dict: Token id → price (0.0 on failure).
+        """
+        try:
+            return await self.price_service.get_prices(token_ids)
+        except Exception as e:
+            logger.error(f"Failed to fetch prices for {len(token_ids)} token(s): {e}")
+            return {token_id: 0.0 for token_id in token_ids}
+
+    @traced("collector.fetch_wallet_balance", attributes=lambda self, wallet_address, *a, **k: {"wallet": wallet_address})
+    async def fetch_wallet_balance(self, wallet_address: str) -> dict:
         """
         Fetch token balances of a wallet using blockchain RPC.
 
@@ -56,21 +99,22 @@ class DataCollector:
         Returns:
             dict: Token balances result with "empty" flag if no holdings found.
         """
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getTokenAccountsByOwner",
-            "params": [
-                wallet_address,
-                {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
-                {"encoding": "jsonParsed"}
-            ]
-        }
+        cache_key = RPCResponseCache.make_key("getTokenAccountsByOwner", wallet_address, self.commitment)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for wallet balance of {wallet_address}")
+                return cached
+
+        params = [
+            wallet_address,
+            {"programId": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"},
+            self._with_commitment({"encoding": "jsonParsed"})
+        ]
 
         try:
-            response = requests.post(self.rpc_url, json=payload, timeout=10)
-            response.raise_for_status()
-            result = response.json().get("result", {})
+            data = await self.batcher.call("getTokenAccountsByOwner", params)
+            result = data.get("result", {})
 
             # Extra flag for empty wallets
             if not result.get("value"):
@@ -80,12 +124,229 @@ class DataCollector:
                 result["empty"] = False
                 logger.info(f"Fetched wallet balance for {wallet_address}")
 
+            # Only successful RPC results are cached, keyed to the slot they were read at
+            if self.cache is not None and "result" in data:
+                self.cache.put(cache_key, result, slot=result.get("context", {}).get("slot"))
+
             return result
 
         except Exception as e:
             logger.error(f"Failed to fetch wallet balance for {wallet_address}: {e}")
             return {"empty": True}
 
+    @traced("collector.fetch_recent_transactions", attributes=lambda self, wallet_address, *a, **k: {"wallet": wallet_address})
+    async def fetch_recent_transactions(self, wallet_address: str, limit: int = 10) -> list:
+        """
+        Fetch recent transaction signatures for a given wallet.
+
+        Args:
+            wallet_address (str): Blockchain wallet address.
+            limit (int): Max number of transactions to fetch.
+
+        Returns:
+            list: List of transaction signatures or empty list on failure.
+        """
+        cache_key = RPCResponseCache.make_key("getSignaturesForAddress", wallet_address, self.commitment, limit)
+        if self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug(f"Cache hit for transactions of {wallet_address}")
+                return cached
+
+        params = [
+            wallet_address,
+            self._with_commitment({"limit": limit})
+        ]
+
+        # Retries with backoff, rate limiting and circuit breaking happen in the transport
+        try:
+            data = await self.batcher.call("getSignaturesForAddress", params)
+            transactions = data.get("result", [])
+
+            logger.info(f"Fetched {len(transactions)} transactions for {wallet_address}")
+
+            if self.cache is not None and "result" in data:
+                self.cache.put(cache_key, transactions)
+
+            return transactions
+
+        except Exception as e:
+            logger.error(f"Failed to fetch transactions for {wallet_address}: {e}")
+            return []
+
+    @traced("collector.fetch_signatures_page", attributes=lambda self, wallet_address, *a, **k: {"wallet": wallet_address})
+    async def fetch_signatures_page(self, wallet_address: str, before: Optional[str] = None,
+                                    until: Optional[str] = None, limit: int = 1000) -> list:
+        """
+        Fetch one page of transaction signatures (newest first).
+
+        Unlike fetch_recent_transactions this raises on failure, so that
+        callers paging through history never mistake an error for the end.
+
+        Args:
+            wallet_address (str): Blockchain wallet address.
+            before (str, optional): Start searching backwards from this signature.
+            until (str, optional): Stop once this signature is reached (exclusive).
+            limit (int): Page size (max 1000).
+
+        Returns:
+            list: Signature objects of this page.
+
+        Raises:
+            RPCError: If the RPC returned an error object.
+        """
+        options = {"limit": limit}
+        if before:
+            options["before"] = before
+        if until:
+            options["until"] = until
+
+        data = await self.batcher.call("getSignaturesForAddress", [wallet_address, self._with_commitment(options)])
+        if "error" in data:
+            raise RPCError(f"getSignaturesForAddress failed for {wallet_address}: {data['error']}")
+
+        return data.get("result") or []
+
+    async def iter_signatures(self, wallet_address: str, before: Optional[str] = None, until: Optional[str] = None,
+                              page_size: int = 1000, max_pages: Optional[int] = None) -> AsyncIterator[dict]:
+        """
+        Stream a wallet's transaction signatures, newest first, page by page.
+
+        Args:
+            wallet_address (str): Blockchain wallet address.
+            before (str, optional): Start searching backwards from this signature.
+            until (str, optional): Stop once this signature is reached (exclusive).
+            page_size (int): Signatures per RPC call (max 1000).
+            max_pages (int, optional): Stop after this many pages (None → full history).
+
+        Yields:
+            dict: Signature objects.
+        """
+        pages = 0
+
+        while max_pages is None or pages < max_pages:
+            page = await self.fetch_signatures_page(wallet_address, before=before, until=until, limit=page_size)
+            pages += 1
+
+            for signature in page:
+                yield signature
+
+            # Short page → reached the "until" cursor or the start of history
+            if len(page) < page_size:
+                break
+
+            before = page[-1]["signature"]
+
+        logger.debug(f"Paged {pages} signature page(s) for {wallet_address}")
+
+    @traced("collector.fetch_many_wallet_balances", attributes=lambda self, wallet_addresses: {"wallets": len(wallet_addresses)})
+    async def fetch_many_wallet_balances(self, wallet_addresses: List[str]) -> Dict[str, dict]:
+        """
+        Fetch token balances for many wallets at once.
+
+        All calls are issued concurrently, so the batcher packs them
+        into a few JSON-RPC batch requests instead of one request per wallet.
+
+        Args:
+            wallet_addresses (list): Blockchain wallet addresses.
+
+        Returns:
+            dict: Wallet address → balance result (same shape as fetch_wallet_balance).
+        """
+        results = await asyncio.gather(*(self.fetch_wallet_balance(w) for w in wallet_addresses))
+        return dict(zip(wallet_addresses, results))
+
+    @traced("collector.fetch_many_recent_transactions", attributes=lambda self, wallet_addresses, *a, **k: {"wallets": len(wallet_addresses)})
+    async def fetch_many_recent_transactions(self, wallet_addresses: List[str], limit: int = 10) -> Dict[str, list]:
+        """
+        Fetch recent transaction signatures for many wallets at once.
+
+        Args:
+            wallet_addresses (list): Blockchain wallet addresses.
+            limit (int): Max number of transactions to fetch per wallet.
+
+        Returns:
+            dict: Wallet address → list of transaction signatures.
+        """
+        results = await asyncio.gather(*(self.fetch_recent_transactions(w, limit) for w in wallet_addresses))
+        return dict(zip(wallet_addresses, results))
+
+    def _with_commitment(self, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add the configured commitment level to an RPC options object.
+
+        Args:
+            options (dict): RPC call options.
+
+        Returns:
+            dict: Options including "commitment" if one is configured.
+        """
+        if self.commitment:
+            options["commitment"] = self.commitment
+        return options
+
+
+class DataCollector:
+    """
+    DataCollector is responsible for fetching blockchain
+    data and token prices from external APIs (RPC & CoinGecko).
+
+    Thin sync wrapper around AsyncDataCollector; all requests run
+    on the shared pooled HTTP transport.
+    """
+
+    def __init__(self, coingecko_api: str, rpc_url: Union[str, Sequence[str]],
+                 transport: Optional[HTTPTransport] = None, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the DataCollector with API endpoints.
+
+        Args:
+            coingecko_api (str): CoinGecko API base URL.
+            rpc_url (str or list): RPC URL(s) for blockchain data.
+            transport (HTTPTransport, optional): Pooled transport. Defaults to the shared one.
+            config (dict, optional): Loaded configuration (see AsyncDataCollector).
+        """
+        self.coingecko_api = coingecko_api
+        self.rpc_url = rpc_url
+        self.async_collector = AsyncDataCollector(coingecko_api, rpc_url, transport=transport, config=config)
+        self.transport = self.async_collector.transport
+
+    def fetch_token_price(self, token_id: str) -> float:
+        """
+        Fetch real-time token price in USD from CoinGecko.
+
+        Args:
+            token_id (str): Token identifier for CoinGecko API.
+
+        Returns:
+            float: Token price or 0.0 on failure.
+        """
+        return self.transport.run_sync(self.async_collector.fetch_token_price(token_id))
+
+    def fetch_token_prices(self, token_ids: List[str]) -> Dict[str, float]:
+        """
+        Fetch USD prices for many tokens with as few CoinGecko requests as possible.
+
+        Args:
+            token_ids (list): Token identifiers for CoinGecko API.
+
+        Returns:
+            dict: Token id → price (0.0 on failure).
+        """
+        return self.transport.run_sync(self.async_collector.fetch_token_prices(token_ids))
+
+    def fetch_wallet_balance(self, wallet_address: str) -> dict:
+        """
+        Fetch token balances of a wallet using blockchain RPC.
+
+        Args:
+            wallet_address (str): Blockchain wallet address.
+
+        Returns:
+            dict: Token balances result with "empty" flag if no holdings found.
+        """
+        return self.transport.run_sync(self.async_collector.fetch_wallet_balance(wallet_address))
+
     def fetch_recent_transactions(self, wallet_address: str, limit: int = 10) -> list:
         """
         Fetch recent transaction signatures for a given wallet.
@@ -97,32 +358,55 @@ class DataCollector:
         Returns:
             list: List of transaction signatures or empty list on failure.
         """
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getSignaturesForAddress",
-            "params": [
-                wallet_address,
-                {"limit": limit}
-            ]
-        }
-
-        attempts = 0
-        max_attempts = 3
-
-        while attempts < max_attempts:
-            try:
-                response = requests.post(self.rpc_url, json=payload, timeout=10)
-                response.raise_for_status()
-                transactions = response.json().get("result", [])
-
-                logger.info(f"Fetched {len(transactions)} transactions for {wallet_address}")
-                return transactions
-
-            except Exception as e:
-                attempts += 1
-                logger.warning(f"Attempt {attempts}/{max_attempts} failed to fetch transactions for {wallet_address}: {e}")
-                time.sleep(1)
-
-        logger.error(f"Failed to fetch transactions for {wallet_address} after {max_attempts} attempts.")
-        return []
+        return self.transport.run_sync(self.async_collector.fetch_recent_transactions(wallet_address, limit))
+
+    def iter_signatures(self, wallet_address: str, before: Optional[str] = None, until: Optional[str] = None,
+                        page_size: int = 1000, max_pages: Optional[int] = None) -> Iterator[dict]:
+        """
+        Stream a wallet's transaction signatures, newest first, page by page.
+
+        Args:
+            wallet_address (str): Blockchain wallet address.
+            before (str, optional): Start searching backwards from this signature.
+            until (str, optional): Stop once this signature is reached (exclusive).
+            page_size (int): Signatures per RPC call (max 1000).
+            max_pages (int, optional): Stop after this many pages (None → full history).
+
+        Yields:
+            dict: Signature objects.
+        """
+        pages = self.async_collector.iter_signatures(wallet_address, before, until, page_size, max_pages)
+
+        try:
+            while True:
+                try:
+                    yield self.transport.run_sync(pages.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.transport.run_sync(pages.aclose())
+
+    def fetch_many_wallet_balances(self, wallet_addresses: List[str]) -> Dict[str, dict]:
+        """
+        Fetch token balances for many wallets using batched JSON-RPC requests.
+
+        Args:
+            wallet_addresses (list): Blockchain wallet addresses.
+
+        Returns:
+            dict: Wallet address → balance result.
+        """
+        return self.transport.run_sync(self.async_collector.fetch_many_wallet_balances(wallet_addresses))
+
+    def fetch_many_recent_transactions(self, wallet_addresses: List[str], limit: int = 10) -> Dict[str, list]:
+        """
+        Fetch recent transaction signatures for many wallets using batched JSON-RPC requests.
+
+        Args:
+            wallet_addresses (list): Blockchain wallet addresses.
+            limit (int): Max number of transactions to fetch per wallet.
+
+        Returns:
+            dict: Wallet address → list of transaction signatures.
+        """
+        return self.transport.run_sync(self.async_collector.fetch_many_recent_transactions(wallet_addresses, limit))
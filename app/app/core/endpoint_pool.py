@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+from app.core.http_transport import HTTPTransport
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class _Endpoint:
+    """
+    Health and latency statistics of one RPC endpoint.
+    """
+
+    def __init__(self, url: str, sample_size: int):
+        self.url = url
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.samples: deque = deque(maxlen=sample_size)
+        self.last_attempt = 0.0
+        self.requests = 0
+        self.errors = 0
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Latency percentile over the recent samples (None without samples).
+        """
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class RPCEndpointPool:
+    """
+    RPCEndpointPool spreads JSON-RPC traffic over several RPC endpoints.
+
+    Each endpoint's latency and error rate are tracked as EWMAs; every
+    call goes to the fastest healthy endpoint and fails over to the next
+    one on error. Optionally a hedged duplicate is sent to the second
+    endpoint once the first one is slower than its own p95 latency.
+    """
+
+    def __init__(self, transport: HTTPTransport, rpc_urls: Union[str, Sequence[str]],
+                 ewma_alpha: float = 0.2, max_error_rate: float = 0.5, retry_unhealthy_after: float = 30.0,
+                 hedge: bool = False, hedge_quantile: float = 0.95, hedge_min_delay_ms: float = 50.0,
+                 sample_size: int = 100):
+        """
+        Initialize the RPCEndpointPool.
+
+        Args:
+            transport (HTTPTransport): Pooled transport used to send requests.
+            rpc_urls (str or list): One or more RPC endpoint URLs.
+            ewma_alpha (float): Smoothing factor of the latency / error EWMAs.
+            max_error_rate (float): Endpoints above this error EWMA are considered unhealthy.
+            retry_unhealthy_after (float): Seconds after which an unhealthy endpoint gets a probe call.
+            hedge (bool): Send a hedged duplicate when the primary is slower than its p95.
+            hedge_quantile (float): Latency quantile of the primary that triggers the hedge.
+            hedge_min_delay_ms (float): Lower bound (and cold-start value) for the hedge delay.
+            sample_size (int): Latency samples kept per endpoint for the percentile.
+        """
+        urls = [rpc_urls] if isinstance(rpc_urls, str) else list(rpc_urls)
+        if not urls:
+            raise ValueError("At least one RPC URL is required.")
+
+        self.transport = transport
+        self.endpoints = [_Endpoint(url, sample_size) for url in urls]
+        self.ewma_alpha = ewma_alpha
+        self.max_error_rate = max_error_rate
+        self.retry_unhealthy_after = retry_unhealthy_after
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay_ms / 1000.0
+
+        # Pool statistics
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+
+    @classmethod
+    def from_config(cls, transport: HTTPTransport, rpc_urls: Union[str, Sequence[str]],
+                    pool_config: Optional[Dict[str, Any]] = None) -> "RPCEndpointPool":
+        """
+        Build an endpoint pool from the "rpc_pool" section of the config.
+
+        Args:
+            transport (HTTPTransport): Pooled transport used to send requests.
+            rpc_urls (str or list): One or more RPC endpoint URLs.
+            pool_config (dict, optional): Routing and hedging settings.
+
+        Returns:
+            RPCEndpointPool: New endpoint pool.
+        """
+        pool_config = pool_config or {}
+        return cls(
+            transport,
+            rpc_urls,
+            ewma_alpha=pool_config.get("ewma_alpha", 0.2),
+            max_error_rate=pool_config.get("max_error_rate", 0.5),
+            retry_unhealthy_after=pool_config.get("retry_unhealthy_after", 30.0),
+            hedge=pool_config.get("hedge", False),
+            hedge_quantile=pool_config.get("hedge_quantile", 0.95),
+            hedge_min_delay_ms=pool_config.get("hedge_min_delay_ms", 50.0)
+        )
+
+    @property
+    def urls(self) -> List[str]:
+        """
+        Configured endpoint URLs in declaration order.
+        """
+        return [endpoint.url for endpoint in self.endpoints]
+
+    async def post_json(self, payload: Any) -> Any:
+        """
+        POST a JSON-RPC payload to the best endpoint and return the decoded reply.
+
+        Args:
+            payload (Any): JSON-RPC request object or batch array.
+
+        Returns:
+            Any: Decoded JSON response.
+
+        Raises:
+            Exception: The last error if every endpoint failed.
+        """
+        return await self.transport.run_on_loop(self._post_json(payload))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """
+        Return per-endpoint routing statistics.
+
+        Returns:
+            list: One dict per endpoint with latency EWMA, p95, error rate and counters.
+        """
+        return [
+            {
+                "url": endpoint.url,
+                "healthy": self._is_healthy(endpoint, time.monotonic()),
+                "latency_ewma_ms": round(endpoint.latency_ewma * 1000, 2) if endpoint.latency_ewma is not None else None,
+                "latency_p95_ms": round(endpoint.percentile(0.95) * 1000, 2) if endpoint.samples else None,
+                "error_rate": round(endpoint.error_ewma, 4),
+                "requests": endpoint.requests,
+                "errors": endpoint.errors
+            }
+            for endpoint in self.endpoints
+        ]
+
+    async def _post_json(self, payload: Any) -> Any:
+        """
+        Route one payload (runs on the transport loop).
+        """
+        ranked = self._ranked()
+        tried: List[_Endpoint] = []
+        last_error: Optional[BaseException] = None
+
+        if self.hedge and len(ranked) > 1:
+            try:
+                return await self._hedged(ranked[0], ranked[1], payload, tried)
+            except Exception as e:
+                last_error = e
+
+        # Sequential failover through the remaining endpoints
+        for endpoint in ranked:
+            if endpoint in tried:
+                continue
+            if tried:
+                self.failovers += 1
+                logger.warning(f"Failing over RPC call to {endpoint.url}")
+            tried.append(endpoint)
+
+            try:
+                return await self._send(endpoint, payload)
+            except Exception as e:
+                last_error = e
+
+        raise last_error
+
+    async def _hedged(self, primary: _Endpoint, secondary: _Endpoint, payload: Any, tried: List[_Endpoint]) -> Any:
+        """
+        Send to the primary and, if it is slower than its p95, also to the secondary.
+        """
+        tried.append(primary)
+        tasks = {asyncio.ensure_future(self._send(primary, payload))}
+        done, _ = await asyncio.wait(tasks, timeout=self._hedge_delay(primary))
+
+        hedge_task = None
+        if not done:
+            self.hedges += 1
+            tried.append(secondary)
+            hedge_task = asyncio.ensure_future(self._send(secondary, payload))
+            tasks.add(hedge_task)
+            logger.debug(f"Hedging slow RPC call on {primary.url} with {secondary.url}")
+
+        last_error: Optional[BaseException] = None
+        pending = tasks
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    if task is hedge_task:
+                        self.hedge_wins += 1
+                    return task.result()
+                last_error = task.exception()
+
+        raise last_error
+
+    async def _send(self, endpoint: _Endpoint, payload: Any) -> Any:
+        """
+        Send to one endpoint and update its latency / error statistics.
+        """
+        start = time.monotonic()
+        endpoint.last_attempt = start
+        endpoint.requests += 1
+
+        try:
+            data = await self.transport.request_json("POST", endpoint.url, json=payload)
+        except asyncio.CancelledError:
+            # Lost a hedge race → the real latency is at least the time waited so far
+            self._record_latency(endpoint, time.monotonic() - start, censored=True)
+            raise
+        except Exception:
+            endpoint.errors += 1
+            endpoint.error_ewma += self.ewma_alpha * (1.0 - endpoint.error_ewma)
+            raise
+
+        self._record_latency(endpoint, time.monotonic() - start)
+        endpoint.error_ewma -= self.ewma_alpha * endpoint.error_ewma
+        return data
+
+    def _record_latency(self, endpoint: _Endpoint, elapsed: float, censored: bool = False) -> None:
+        """
+        Add a latency sample; a censored (lower-bound) sample only ever raises the EWMA.
+        """
+        endpoint.samples.append(elapsed)
+        if endpoint.latency_ewma is None:
+            endpoint.latency_ewma = elapsed
+        elif not censored or elapsed > endpoint.latency_ewma:
+            endpoint.latency_ewma += self.ewma_alpha * (elapsed - endpoint.latency_ewma)
+
+    def _ranked(self) -> List[_Endpoint]:
+        """
+        Endpoints ordered healthy-first, then by expected latency.
+        """
+        now = time.monotonic()
+
+        def score(endpoint: _Endpoint):
+            # Unmeasured endpoints sort first so that every endpoint gets sampled
+            latency = endpoint.latency_ewma if endpoint.latency_ewma is not None else 0.0
+            return (not self._is_healthy(endpoint, now), latency * (1.0 + endpoint.error_ewma))
+
+        return sorted(self.endpoints, key=score)
+
+    def _is_healthy(self, endpoint: _Endpoint, now: float) -> bool:
+        """
+        An endpoint is healthy below the error threshold, or when a probe is due.
+        """
+        if endpoint.error_ewma <= self.max_error_rate:
+            return True
+        return now - endpoint.last_attempt >= self.retry_unhealthy_after
+
+    def _hedge_delay(self, endpoint: _Endpoint) -> float:
+        """
+        Time to wait for the primary before sending the hedged duplicate.
+        """
+        if len(endpoint.samples) >= 20:
+            return max(self.hedge_min_delay, endpoint.percentile(self.hedge_quantile))
+
+        # Too few samples for a percentile → twice the typical latency
+        return max(self.hedge_min_delay, 2.0 * (endpoint.latency_ewma or 0.25))
@@ -0,0 +1,286 @@
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.core.metrics import MetricsRegistry, rpc_operation
+from app.core.resilience import ResilienceManager
+
+# HTTP/2 needs the optional "h2" package → fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class HTTPTransport:
+    """
+    HTTPTransport owns persistent keep-alive connection pools
+    (one per upstream origin) and a dedicated asyncio event loop thread
+    on which all outbound HTTP traffic of SignalForge runs.
+
+    Running every request on one loop lets async callers (API) and
+    sync callers (CLI, sync wrappers) share the same pools safely.
+    """
+
+    _shared: Optional["HTTPTransport"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, pool_size: int = 20, max_keepalive: int = 10,
+                 keepalive_expiry: float = 30.0, timeout: float = 10.0, http2: bool = True,
+                 resilience: Optional[ResilienceManager] = None):
+        """
+        Initialize HTTPTransport and start its event loop thread.
+
+        Args:
+            pool_size (int): Max open connections per upstream origin.
+            max_keepalive (int): Max idle keep-alive connections per upstream origin.
+            keepalive_expiry (float): Seconds an idle connection is kept open.
+            timeout (float): Default request timeout in seconds.
+            http2 (bool): Use HTTP/2 where the "h2" package is installed.
+            resilience (ResilienceManager, optional): Per-upstream rate limits, retries and circuit breakers.
+        """
+        self.limits = httpx.Limits(
+            max_connections=pool_size,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = timeout
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.resilience = resilience or ResilienceManager()
+
+        # One pooled client per upstream origin (scheme://host:port)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+        # Dedicated loop thread → pools are never bound to a short-lived loop
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="signalforge-http", daemon=True)
+        self._thread.start()
+
+        logger.info(f"HTTP transport started (pool_size={pool_size}, http2={self.http2})")
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> "HTTPTransport":
+        """
+        Build a transport from the "http" and "resilience" sections of the config.
+
+        Args:
+            config (dict, optional): Loaded configuration.
+
+        Returns:
+            HTTPTransport: New transport instance.
+        """
+        config = config or {}
+        http_config = config.get("http") or {}
+        return cls(
+            pool_size=http_config.get("pool_size", 20),
+            max_keepalive=http_config.get("max_keepalive", 10),
+            keepalive_expiry=http_config.get("keepalive_expiry", 30.0),
+            timeout=http_config.get("timeout", 10.0),
+            http2=http_config.get("http2", True),
+            resilience=ResilienceManager(config.get("resilience"))
+        )
+
+    @classmethod
+    def shared(cls, config: Optional[Dict[str, Any]] = None) -> "HTTPTransport":
+        """
+        Return the process-wide transport, creating it on first use.
+
+        The settings of the first caller win; later calls reuse the same pools.
+
+        Args:
+            config (dict, optional): Loaded configuration ("http", "resilience" sections).
+
+        Returns:
+            HTTPTransport: Shared transport instance.
+        """
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared.closed:
+                cls._shared = cls.from_config(config)
+                atexit.register(cls._shared.close)
+            return cls._shared
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the transport loop has been stopped.
+        """
+        return self.loop.is_closed() or not self._thread.is_alive()
+
+    def _run_loop(self) -> None:
+        """
+        Run the transport event loop forever (thread target).
+        """
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        """
+        Return the pooled client for the origin of the given URL.
+
+        Must only be called on the transport loop.
+
+        Args:
+            url (str): Target URL.
+
+        Returns:
+            httpx.AsyncClient: Pooled client for this upstream.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+
+        client = self._clients.get(origin)
+        if client is None:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            self._clients[origin] = client
+            logger.debug(f"Opened connection pool for {origin}")
+
+        return client
+
+    async def _request(self, method: str, url: str, json: Any = None,
+                       params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        """
+        Send a request on the transport loop through the upstream's guard.
+        """
+        client = self._client_for(url)
+        parts = urlsplit(url)
+        guard = self.resilience.guard_for(parts.hostname or url)
+
+        # Metrics labels: upstream host, JSON-RPC method or URL path
+        upstream = parts.netloc or url
+        operation = rpc_operation(json) if _is_json_rpc(json) else f"{method} {parts.path or '/'}"
+
+        async def send() -> httpx.Response:
+            # Every attempt (incl. retries) counts as one outbound call
+            with MetricsRegistry.shared().upstream_call(upstream, operation) as call:
+                response = await client.request(
+                    method, url, json=json, params=params,
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+                call.response(response.status_code, len(response.request.content), len(response.content))
+                response.raise_for_status()
+                return response
+
+        return await guard.call(send)
+
+    async def request(self, method: str, url: str, json: Any = None,
+                      params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> httpx.Response:
+        """
+        Send an HTTP request through the pooled client of its upstream.
+
+        Safe to await from any event loop; the request itself always runs
+        on the transport loop.
+
+        Args:
+            method (str): HTTP method (GET, POST, ...).
+            url (str): Target URL.
+            json (Any, optional): JSON body.
+            params (dict, optional): Query parameters.
+            timeout (float, optional): Per-request timeout override.
+
+        Returns:
+            httpx.Response: Successful response.
+
+        Raises:
+            httpx.HTTPError: On network errors or non-2xx status codes (after retries).
+            CircuitOpenError: If the upstream's circuit breaker is open.
+        """
+        return await self.run_on_loop(self._request(method, url, json=json, params=params, timeout=timeout))
+
+    async def request_json(self, method: str, url: str, json: Any = None,
+                           params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Any:
+        """
+        Send an HTTP request and return the decoded JSON body.
+
+        Args:
+            method (str): HTTP method (GET, POST, ...).
+            url (str): Target URL.
+            json (Any, optional): JSON body.
+            params (dict, optional): Query parameters.
+            timeout (float, optional): Per-request timeout override.
+
+        Returns:
+            Any: Decoded JSON response.
+        """
+        response = await self.request(method, url, json=json, params=params, timeout=timeout)
+        return response.json()
+
+    async def run_on_loop(self, coro) -> Any:
+        """
+        Await a coroutine on the transport loop from any event loop.
+
+        Args:
+            coro (Coroutine): Coroutine to run.
+
+        Returns:
+            Any: Result of the coroutine.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            return await coro
+
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def run_sync(self, coro) -> Any:
+        """
+        Run a coroutine on the transport loop and block until it finishes.
+
+        Used by the sync wrappers of the async collectors.
+
+        Args:
+            coro (Coroutine): Coroutine to run.
+
+        Returns:
+            Any: Result of the coroutine.
+
+        Raises:
+            RuntimeError: If called from the transport loop itself (would deadlock).
+        """
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_sync() cannot be called from the transport loop. Await the coroutine instead.")
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def close(self) -> None:
+        """
+        Close all connection pools and stop the transport loop.
+        """
+        if self.closed:
+            return
+
+        async def _close_clients():
+            for client in self._clients.values():
+                await client.aclose()
+            self._clients.clear()
+
+        try:
+            asyncio.run_coroutine_threadsafe(_close_clients(), self.loop).result(timeout=5)
+        except Exception as e:
+            logger.warning(f"Failed to close HTTP connection pools cleanly: {e}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+        logger.info("HTTP transport closed.")
+
+
+def _is_json_rpc(payload: Any) -> bool:
+    """
+    Whether a JSON body is a JSON-RPC request object or batch.
+    """
+    if isinstance(payload, list):
+        return bool(payload) and all(isinstance(item, dict) and "jsonrpc" in item for item in payload)
+    return isinstance(payload, dict) and "jsonrpc" in payload
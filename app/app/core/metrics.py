@@ -0,0 +1,442 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the upstream latency histogram buckets
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class MetricFamily:
+    """
+    MetricFamily is one metric as rendered: name, type, help and samples
+    (sample name, labels, value). Collectors registered on a
+    MetricsRegistry return these at scrape time.
+    """
+
+    __slots__ = ("name", "type", "help", "samples")
+
+    def __init__(self, name: str, metric_type: str, help_text: str,
+                 samples: Optional[List[Tuple[str, Dict[str, str], float]]] = None):
+        self.name = name
+        self.type = metric_type
+        self.help = help_text
+        self.samples = samples or []
+
+    def add(self, value: float, suffix: str = "", **labels: Any) -> "MetricFamily":
+        """
+        Add a sample (name + suffix, e.g. "_sum") and return the family.
+        """
+        self.samples.append((self.name + suffix, {k: str(v) for k, v in labels.items()}, value))
+        return self
+
+
+class _Metric:
+    """
+    Base of the labelled metrics held by a MetricsRegistry.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                family.samples.append((self.name, self._labels(key), value))
+        return family
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count (requests, bytes, writes).
+    """
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """
+    Value that goes up and down (requests in flight).
+    """
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed cumulative buckets.
+    """
+
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [per-bucket counts (+ overflow), sum]
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def collect(self) -> MetricFamily:
+        family = MetricFamily(self.name, self.type, self.help)
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                labels = self._labels(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets + (math.inf,), counts):
+                    cumulative += count
+                    family.samples.append((self.name + "_bucket", dict(labels, le=_format_value(bound)), cumulative))
+                family.samples.append((self.name + "_sum", labels, total))
+                family.samples.append((self.name + "_count", labels, cumulative))
+        return family
+
+
+class MetricsRegistry:
+    """
+    MetricsRegistry holds SignalForge's Prometheus metrics: counters,
+    gauges and histograms updated as things happen (outbound calls,
+    SQLite writes), plus collectors that report component state (cache
+    hit ratios, queue depths) when scraped. render() produces the text
+    exposition format served by GET /metrics.
+    """
+
+    _shared: Optional["MetricsRegistry"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, enabled: bool = True, latency_buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        """
+        Initialize the registry.
+
+        Args:
+            enabled (bool): Record metrics (a disabled registry renders nothing).
+            latency_buckets (list): Upper bounds (seconds) of the upstream latency buckets.
+        """
+        self.enabled = enabled
+        self.latency_buckets = tuple(latency_buckets)
+
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[MetricFamily]]] = {}
+        self._lock = threading.Lock()
+
+        # Every outbound call (RPC method, CoinGecko, OpenAI, webhook target)
+        self.upstream_requests = self.counter(
+            "signalforge_upstream_requests_total", "Outbound requests by upstream, operation and status.",
+            ("upstream", "operation", "status"))
+        self.upstream_latency = self.histogram(
+            "signalforge_upstream_request_duration_seconds", "Outbound request latency.",
+            ("upstream", "operation"), self.latency_buckets)
+        self.upstream_sent = self.counter(
+            "signalforge_upstream_sent_bytes_total", "Request body bytes sent upstream.", ("upstream", "operation"))
+        self.upstream_received = self.counter(
+            "signalforge_upstream_received_bytes_total", "Response body bytes received from upstream.",
+            ("upstream", "operation"))
+        self.upstream_in_flight = self.gauge(
+            "signalforge_upstream_requests_in_flight", "Outbound requests currently awaiting a response.",
+            ("upstream",))
+
+        # API requests being served
+        self.api_in_flight = self.gauge("signalforge_api_requests_in_flight", "API requests currently being served.")
+
+        # JSON-RPC calls count individually against provider quotas, also when batched
+        self.rpc_calls = self.counter(
+            "signalforge_rpc_calls_total", "JSON-RPC calls by method (each call of a batch counted).", ("method",))
+
+        # OpenAI quotas are in tokens
+        self.openai_tokens = self.counter(
+            "signalforge_openai_tokens_total", "OpenAI tokens used by kind (prompt / completion).", ("kind",))
+
+        # SQLite writes (rate() of this is the write rate)
+        self.db_writes = self.counter(
+            "signalforge_db_writes_total", "Committed SQLite write transactions by table.", ("table",))
+        self.db_rows = self.counter(
+            "signalforge_db_rows_written_total", "Rows written to SQLite by table.", ("table",))
+
+    @classmethod
+    def from_config(cls, metrics_config: Optional[Dict[str, Any]] = None) -> "MetricsRegistry":
+        """
+        Build a registry from the "metrics" section of the config.
+
+        Args:
+            metrics_config (dict, optional): Metrics settings.
+
+        Returns:
+            MetricsRegistry: New registry.
+        """
+        metrics_config = metrics_config or {}
+        return cls(
+            enabled=metrics_config.get("enabled", True),
+            latency_buckets=metrics_config.get("latency_buckets_seconds", DEFAULT_LATENCY_BUCKETS)
+        )
+
+    @classmethod
+    def shared(cls) -> "MetricsRegistry":
+        """
+        Return the process-wide registry (default settings until configured).
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_config()
+            return cls._shared
+
+    @classmethod
+    def configure(cls, metrics_config: Optional[Dict[str, Any]] = None) -> "MetricsRegistry":
+        """
+        Replace the process-wide registry with one built from the config.
+
+        Args:
+            metrics_config (dict, optional): Metrics settings.
+
+        Returns:
+            MetricsRegistry: The new shared registry.
+        """
+        registry = cls.from_config(metrics_config)
+        with cls._shared_lock:
+            cls._shared = registry
+        return registry
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Return the counter with this name, creating it on first use.
+        """
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """
+        Return the gauge with this name, creating it on first use.
+        """
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        """
+        Return the histogram with this name, creating it on first use.
+        """
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def register_collector(self, key: str, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """
+        Add (or replace) a collector called on every scrape.
+
+        Args:
+            key (str): Collector name; registering the same key again replaces it.
+            collector (callable): Returns the MetricFamily objects to expose.
+        """
+        with self._lock:
+            self._collectors[key] = collector
+
+    def unregister_collector(self, key: str) -> None:
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    @contextmanager
+    def upstream_call(self, upstream: str, operation: str) -> Iterator["UpstreamCall"]:
+        """
+        Count and time one outbound call.
+
+        The block reports status and body sizes on the yielded UpstreamCall;
+        if it raises without a status, the status of the exception's
+        response (HTTP errors) or "error" is recorded.
+
+        Args:
+            upstream (str): Upstream name (solana_rpc, coingecko, openai, webhook).
+            operation (str): RPC method, endpoint or webhook target.
+
+        Yields:
+            UpstreamCall: Call record to fill in.
+        """
+        call = UpstreamCall()
+        if not self.enabled:
+            yield call
+            return
+
+        self.upstream_in_flight.inc(upstream=upstream)
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException as e:
+            if call.status is None:
+                # httpx / requests / openai errors carry the response
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                call.status = str(status) if status is not None else "error"
+            raise
+        finally:
+            self.upstream_in_flight.dec(upstream=upstream)
+            self.upstream_latency.observe(time.perf_counter() - start, upstream=upstream, operation=operation)
+            self.upstream_requests.inc(upstream=upstream, operation=operation, status=call.status or "ok")
+            if call.bytes_sent:
+                self.upstream_sent.inc(call.bytes_sent, upstream=upstream, operation=operation)
+            if call.bytes_received:
+                self.upstream_received.inc(call.bytes_received, upstream=upstream, operation=operation)
+
+    def record_write(self, table: str, rows: int = 1) -> None:
+        """
+        Count one committed SQLite write transaction.
+
+        Args:
+            table (str): Table written.
+            rows (int): Rows written.
+        """
+        if self.enabled:
+            self.db_writes.inc(table=table)
+            self.db_rows.inc(rows, table=table)
+
+    def collect(self) -> List[MetricFamily]:
+        """
+        All metric families: recorded metrics, then the registered collectors.
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+
+        families = [metric.collect() for metric in metrics]
+        for key, collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {key} failed: {e}")
+        return families
+
+    def render(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format (version 0.0.4).
+        """
+        if not self.enabled:
+            return ""
+
+        lines = []
+        for family in self.collect():
+            lines.append(f"# HELP {family.name} {_escape_help(family.help)}")
+            lines.append(f"# TYPE {family.name} {family.type}")
+            for name, labels, value in family.samples:
+                if labels:
+                    label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                    lines.append(f"{name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _get_or_create(self, metric_class, name: str, help_text: str, labelnames: Sequence[str], **kwargs) -> Any:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, metric_class) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+
+class UpstreamCall:
+    """
+    UpstreamCall is filled in by the block timed by MetricsRegistry.upstream_call().
+    """
+
+    __slots__ = ("status", "bytes_sent", "bytes_received")
+
+    def __init__(self):
+        self.status: Optional[str] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def response(self, status: Any, bytes_sent: int = 0, bytes_received: int = 0) -> None:
+        """
+        Record the response status and the request / response body sizes.
+        """
+        self.status = str(status)
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+
+
+def rpc_operation(payload: Any) -> str:
+    """
+    Operation label of a JSON-RPC payload: its method, or "batch:<method>"
+    for a batch of one method ("batch:mixed" otherwise).
+    """
+    if isinstance(payload, dict):
+        return str(payload.get("method", "unknown"))
+    if isinstance(payload, list):
+        methods = {request.get("method") for request in payload if isinstance(request, dict)}
+        return f"batch:{methods.pop()}" if len(methods) == 1 else "batch:mixed"
+    return "unknown"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isnan(value):
+            return "NaN"
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
@@ -3,10 +3,18 @@ import json
 import logging
 from typing import Dict, Any, List
 
+from app.core.rule_engine import RuleCompileError, compile_conditions
+
 # Initialize logger
 logger = logging.getLogger("signalforge")
 
 
+class DuplicatePatternError(ValueError):
+    """
+    Raised when a pattern with the same name (case-insensitive) is already stored.
+    """
+
+
 class ModelTrainer:
     """
     ModelTrainer allows users to create, store, retrieve 
@@ -49,6 +57,12 @@ class ModelTrainer:
             logger.error(f"Failed to load pattern memory: {e}")
             return []
 
+    def reload(self) -> None:
+        """
+        Re-read the pattern memory (e.g. after another process added a pattern).
+        """
+        self.memory = self._load_memory()
+
     def _save_memory(self) -> None:
         """
         Save current memory to local JSON file.
@@ -68,11 +82,22 @@ class ModelTrainer:
             pattern_name (str): Name of the new pattern.
             description (str): Explanation of the pattern.
             conditions (dict): Detection conditions of the pattern.
+
+        Raises:
+            DuplicatePatternError: If a pattern with this name already exists.
+            RuleCompileError: If the conditions cannot be compiled by the rule engine.
         """
         # Prevent duplicate pattern names
         if any(p["name"].lower() == pattern_name.lower() for p in self.memory):
-            logger.warning(f"Pattern with name '{pattern_name}' already exists. Skipping add.")
-            return
+            logger.warning(f"Pattern with name '{pattern_name}' already exists. Not added.")
+            raise DuplicatePatternError(f"Pattern '{pattern_name}' already exists")
+
+        # Reject conditions the rule engine could never evaluate
+        try:
+            compile_conditions(conditions)
+        except RuleCompileError as e:
+            logger.error(f"Invalid conditions for pattern '{pattern_name}': {e}. Not added.")
+            raise
 
         new_pattern = {
             "name": pattern_name,
@@ -1,5 +1,29 @@
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from app.core.rule_engine import RuleEngine
+from app.core.tracing import traced
+from app.core.wallet_analysis import fetched, known_empty
+from app.core.wallet_metrics import WalletMetrics
+
+# Built-in patterns in bitmask order (bit 0 = first); custom rules follow
+BUILTIN_PATTERNS = (
+    "Empty Wallet",
+    "Whale Wallet",
+    "Dormant Awakening",
+    "Accumulation Behavior"
+)
+
+# Analysis fields the built-in patterns read
+BUILTIN_INPUT_FIELDS = ("tokens_held", "transaction_count", "tx_24h", "gap_before_24h")
+
+# Pattern bitmasks are uint64
+MAX_BATCH_PATTERNS = 64
+
+# Set bits per byte → popcount of uint64 masks without a Python loop
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
 
 # Initialize logger
 logger = logging.getLogger("signalforge")
@@ -11,15 +35,24 @@ class PatternDetector:
     specific trading patterns based on dynamic config rules.
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Dict[str, Any], rule_engine: Optional[RuleEngine] = None):
         """
         Initialize PatternDetector.
 
         Args:
             config (dict): Loaded configuration rules.
+            rule_engine (RuleEngine, optional): Compiled custom patterns (from ModelTrainer).
         """
         self.config = config
+        self.rule_engine = rule_engine
+
+        # Load pattern rules from config once, with safe defaults
+        pattern_rules = self.config.get("pattern_rules", {})
+        self.whale_tokens_threshold = pattern_rules.get("whale_tokens", 20)
+        self.dormant_threshold = pattern_rules.get("dormant_threshold", 5)
+        self.dormant_gap = pattern_rules.get("dormant_gap_hours", 168) * 3600.0
 
+    @traced("detector.detect_patterns", attributes=lambda self, wallet_analysis, *a, **k: {"wallet": wallet_analysis.get("wallet")})
     def detect_patterns(self, wallet_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Detect patterns from wallet analysis result.
@@ -35,16 +68,17 @@ class PatternDetector:
         # Extract relevant wallet metrics
         tokens_held = wallet_analysis.get("tokens_held", 0)
         transaction_count = wallet_analysis.get("transaction_count", 0)
-        activity_type = wallet_analysis.get("activity_type", "")
         wallet_address = wallet_analysis.get("wallet", "unknown")
 
-        # Load pattern rules from config with safe defaults
-        pattern_rules = self.config.get("pattern_rules", {})
-        whale_tokens_threshold = pattern_rules.get("whale_tokens", 20)
-        dormant_threshold = pattern_rules.get("dormant_threshold", 5)
+        whale_tokens_threshold = self.whale_tokens_threshold
+        dormant_threshold = self.dormant_threshold
+
+        # Sliding activity windows (None when unknown)
+        tx_24h = wallet_analysis.get("tx_24h") or 0
+        quiet_before_24h = wallet_analysis.get("gap_before_24h")
 
-        # Pattern 1: Empty Wallet
-        if tokens_held == 0 and transaction_count == 0:
+        # Pattern 1: Empty Wallet (both counts actually fetched)
+        if known_empty(wallet_analysis):
             patterns.append({
                 "name": "Empty Wallet",
                 "description": "Wallet holds no tokens and has no transactions."
@@ -57,20 +91,109 @@ class PatternDetector:
                 "description": f"Wallet holds at least {whale_tokens_threshold} tokens."
             })
 
-        # Pattern 3: Dormant Awakening
-        if activity_type == "High Activity" and transaction_count < dormant_threshold:
+        # Pattern 3: Dormant Awakening → long quiet period, then more than dormant-level activity within 24h
+        if quiet_before_24h is not None and quiet_before_24h >= self.dormant_gap and tx_24h > dormant_threshold:
             patterns.append({
                 "name": "Dormant Awakening",
                 "description": "Previously inactive wallet is now highly active."
             })
 
-        # Pattern 4: Accumulation Behavior
-        if tokens_held >= 3 and transaction_count <= 5:
+        # Pattern 4: Accumulation Behavior (few transactions only counts if they were fetched)
+        if tokens_held >= 3 and transaction_count <= 5 and fetched(wallet_analysis, "transactions"):
             patterns.append({
                 "name": "Accumulation Behavior",
                 "description": "Wallet is accumulating tokens quietly."
             })
 
+        # Custom patterns stored through ModelTrainer / /train
+        if self.rule_engine is not None:
+            patterns.extend(self.rule_engine.match([wallet_analysis])[0])
+
         logger.info(f"Detected {len(patterns)} pattern(s) for wallet {wallet_address}")
 
         return patterns
+
+    @property
+    def input_fields(self) -> List[str]:
+        """
+        Analysis fields detect_patterns() depends on (built-in and custom rules).
+        """
+        custom = self.rule_engine.fields if self.rule_engine is not None else []
+        return sorted(set(BUILTIN_INPUT_FIELDS) | set(custom))
+
+    @property
+    def pattern_names(self) -> List[str]:
+        """
+        Pattern names in bitmask order: built-in patterns, then custom rules.
+        """
+        custom = [rule.name for rule in self.rule_engine.rules] if self.rule_engine is not None else []
+        return (list(BUILTIN_PATTERNS) + custom)[:MAX_BATCH_PATTERNS]
+
+    def detect_patterns_batch(self, metrics: WalletMetrics) -> np.ndarray:
+        """
+        Detect patterns for many wallets in one vectorized pass.
+
+        Args:
+            metrics (WalletMetrics): Columnar wallet metrics.
+
+        Returns:
+            np.ndarray: One uint64 bitmask per wallet; bit i ↔ pattern_names[i].
+        """
+        tokens_held = metrics.tokens_held
+        transaction_count = metrics.transaction_count
+        # NaN (unknown window) compares False
+        awakened = (metrics.windows["gap_before_24h"] >= self.dormant_gap) & \
+                   (metrics.windows["tx_24h"] > self.dormant_threshold)
+        accumulating = (tokens_held >= 3) & (transaction_count <= 5) & metrics.has_transactions
+
+        builtin = (
+            metrics.empty,                                                     # Empty Wallet
+            tokens_held >= self.whale_tokens_threshold,                        # Whale Wallet
+            awakened,                                                          # Dormant Awakening
+            accumulating                                                       # Accumulation Behavior
+        )
+
+        masks = np.zeros(len(metrics), dtype=np.uint64)
+        for bit, matched in enumerate(builtin):
+            masks |= matched.astype(np.uint64) << np.uint64(bit)
+
+        # Custom rules take the remaining bits
+        if self.rule_engine is not None and self.rule_engine.rules:
+            free_bits = MAX_BATCH_PATTERNS - len(BUILTIN_PATTERNS)
+            if len(self.rule_engine.rules) > free_bits:
+                logger.warning(f"Only the first {free_bits} custom patterns fit into batch bitmasks")
+
+            custom = self.rule_engine.evaluate(metrics.columns())[:free_bits]
+            for offset, matched in enumerate(custom):
+                masks |= matched.astype(np.uint64) << np.uint64(len(BUILTIN_PATTERNS) + offset)
+
+        logger.info(f"Detected patterns for {len(metrics)} wallet(s) in batch")
+
+        return masks
+
+    @staticmethod
+    def count_patterns(masks: np.ndarray) -> np.ndarray:
+        """
+        Number of detected patterns per wallet (popcount of each bitmask).
+
+        Args:
+            masks (np.ndarray): Bitmasks from detect_patterns_batch().
+
+        Returns:
+            np.ndarray: Pattern count per wallet (int64).
+        """
+        masks = np.ascontiguousarray(masks, dtype=np.uint64)
+        return _POPCOUNT[masks.view(np.uint8).reshape(-1, 8)].sum(axis=1, dtype=np.int64)
+
+    def decode_patterns(self, mask: int) -> List[str]:
+        """
+        Pattern names encoded in one bitmask.
+
+        Args:
+            mask (int): Bitmask from detect_patterns_batch().
+
+        Returns:
+            list: Names of the detected patterns.
+        """
+        mask = int(mask)
+        return [name for bit, name in enumerate(self.pattern_names) if mask >> bit & 1]
@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.http_transport import HTTPTransport
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class PriceService:
+    """
+    PriceService serves token prices from CoinGecko's simple/price endpoint.
+
+    Concurrent lookups are coalesced into multi-id requests, prices are
+    cached with a TTL, and slightly stale prices are served immediately
+    while being refreshed in the background (stale-while-revalidate).
+    """
+
+    def __init__(self, transport: HTTPTransport, coingecko_api: str, ttl_seconds: float = 60.0,
+                 stale_seconds: float = 300.0, max_ids_per_request: int = 250,
+                 window_ms: float = 10.0, max_entries: int = 10000, vs_currency: str = "usd"):
+        """
+        Initialize the PriceService.
+
+        Args:
+            transport (HTTPTransport): Pooled transport used for CoinGecko calls.
+            coingecko_api (str): CoinGecko API base URL.
+            ttl_seconds (float): Age until a cached price is considered stale.
+            stale_seconds (float): Extra age during which a stale price is still served (and refreshed).
+            max_ids_per_request (int): Max token ids per simple/price request.
+            window_ms (float): Max time in milliseconds a lookup waits to be coalesced.
+            max_entries (int): Max number of cached prices.
+            vs_currency (str): Quote currency.
+        """
+        self.transport = transport
+        self.coingecko_api = coingecko_api
+        self.ttl = ttl_seconds
+        self.stale = stale_seconds
+        self.max_ids_per_request = max(1, max_ids_per_request)
+        self.window = max(0.0, window_ms) / 1000.0
+        self.max_entries = max_entries
+        self.vs_currency = vs_currency
+
+        # token_id → (price, fetched_at); only touched on the transport loop
+        self._cache: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._queued: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+        # In-flight fetches → referenced until done so they are not garbage-collected
+        self._tasks: Set[asyncio.Task] = set()
+
+        # Cache statistics
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, transport: HTTPTransport, coingecko_api: str,
+                    price_config: Optional[Dict] = None) -> "PriceService":
+        """
+        Build a price service from the "price_service" section of the config.
+
+        Args:
+            transport (HTTPTransport): Pooled transport used for CoinGecko calls.
+            coingecko_api (str): CoinGecko API base URL.
+            price_config (dict, optional): Price service settings.
+
+        Returns:
+            PriceService: New price service instance.
+        """
+        price_config = price_config or {}
+        return cls(
+            transport,
+            coingecko_api,
+            ttl_seconds=price_config.get("ttl_seconds", 60.0),
+            stale_seconds=price_config.get("stale_seconds", 300.0),
+            max_ids_per_request=price_config.get("max_ids_per_request", 250),
+            window_ms=price_config.get("window_ms", 10.0),
+            max_entries=price_config.get("max_entries", 10000)
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Token ids waiting for the next coalesced request.
+        """
+        return len(self._queued)
+
+    async def get_price(self, token_id: str) -> float:
+        """
+        Get the USD price of a single token.
+
+        Args:
+            token_id (str): CoinGecko token id.
+
+        Returns:
+            float: Token price or 0.0 if unavailable.
+        """
+        prices = await self.get_prices([token_id])
+        return prices[token_id]
+
+    async def get_prices(self, token_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        Get USD prices for many tokens at once.
+
+        Args:
+            token_ids (iterable): CoinGecko token ids.
+
+        Returns:
+            dict: Token id → price (0.0 if unavailable).
+        """
+        return await self.transport.run_on_loop(self._get_prices(list(token_ids)))
+
+    async def _get_prices(self, token_ids: List[str]) -> Dict[str, float]:
+        """
+        Resolve prices from cache or coalesced requests (runs on the transport loop).
+        """
+        now = time.monotonic()
+        unique_ids = list(dict.fromkeys(token_ids))
+
+        prices: Dict[str, float] = {}
+        pending: Dict[str, asyncio.Future] = {}
+
+        for token_id in unique_ids:
+            cached = self._cache.get(token_id)
+            age = now - cached[1] if cached else None
+
+            # Fresh → serve from cache
+            if cached and age < self.ttl:
+                self.hits += 1
+                prices[token_id] = cached[0]
+                self._cache.move_to_end(token_id)
+
+            # Stale but within grace period → serve now, refresh in background
+            elif cached and age < self.ttl + self.stale:
+                self.stale_hits += 1
+                prices[token_id] = cached[0]
+                self._request(token_id)
+
+            # Missing or expired → wait for a coalesced request
+            else:
+                self.misses += 1
+                pending[token_id] = self._request(token_id)
+
+        for token_id, future in pending.items():
+            price = await future
+            prices[token_id] = price if price is not None else 0.0
+
+        return {token_id: prices[token_id] for token_id in unique_ids}
+
+    def _request(self, token_id: str) -> asyncio.Future:
+        """
+        Queue a token id for the next coalesced request, reusing in-flight lookups.
+        """
+        future = self._inflight.get(token_id)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._inflight[token_id] = future
+        self._queued.append(token_id)
+
+        if len(self._queued) >= self.max_ids_per_request:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return future
+
+    def _flush(self) -> None:
+        """
+        Send queued ids as multi-id requests (runs on the transport loop).
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        queued, self._queued = self._queued, []
+        loop = asyncio.get_running_loop()
+
+        for start in range(0, len(queued), self.max_ids_per_request):
+            task = loop.create_task(self._fetch(queued[start:start + self.max_ids_per_request]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, token_ids: List[str]) -> None:
+        """
+        Fetch one chunk of prices and resolve the waiting lookups.
+        """
+        url = f"{self.coingecko_api}/simple/price"
+
+        try:
+            data = await self.transport.request_json(
+                "GET", url, params={"ids": ",".join(token_ids), "vs_currencies": self.vs_currency}
+            )
+            logger.info(f"Fetched {len(token_ids)} token price(s) from CoinGecko")
+        except Exception as e:
+            logger.error(f"Failed to fetch prices for {len(token_ids)} token(s): {e}")
+            data = None
+
+        now = time.monotonic()
+
+        for token_id in token_ids:
+            if data is not None:
+                price = data.get(token_id, {}).get(self.vs_currency, 0.0)
+                self._store(token_id, price, now)
+            else:
+                # Upstream failed → fall back to the last known price if any
+                cached = self._cache.get(token_id)
+                price = cached[0] if cached else None
+
+            future = self._inflight.pop(token_id, None)
+            if future is not None and not future.done():
+                future.set_result(price)
+
+    def _store(self, token_id: str, price: float, fetched_at: float) -> None:
+        """
+        Cache a price and evict the least recently used entries beyond max_entries.
+        """
+        self._cache[token_id] = (price, fetched_at)
+        self._cache.move_to_end(token_id)
+
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
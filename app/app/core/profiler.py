@@ -0,0 +1,272 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Leaf frames of threads parked waiting for work / IO → left out unless include_idle
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("thread.py", "_worker"),
+    ("queue.py", "get")
+}
+
+
+class StackSampler:
+    """
+    StackSampler is a wall-clock sampling profiler over all threads:
+    every interval it records the Python stack of each thread, which
+    covers the work running on the transport loop and the stage / AI
+    thread pools that cProfile (calling thread only) does not see.
+    """
+
+    def __init__(self, interval: float = 0.005, include_idle: bool = False):
+        """
+        Initialize the StackSampler.
+
+        Args:
+            interval (float): Seconds between samples.
+            include_idle (bool): Keep samples of threads parked in a wait / select.
+        """
+        self.interval = max(0.001, interval)
+        self.include_idle = include_idle
+        self.stacks: Counter = Counter()
+        self.samples = 0
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="signalforge-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        """
+        Samples as flamegraph-compatible collapsed stacks ("thread;frame;frame count").
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            self.samples += 1
+
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append((os.path.basename(code.co_filename), code.co_name, frame.f_lineno))
+                    frame = frame.f_back
+
+                if not frames or (not self.include_idle and frames[0][:2] in IDLE_FRAMES):
+                    continue
+
+                stack = [names.get(ident, f"thread-{ident}")]
+                stack.extend(f"{name} ({filename}:{lineno})" for filename, name, lineno in reversed(frames))
+                self.stacks[";".join(stack)] += 1
+
+
+class ProfileResult:
+    """
+    ProfileResult describes the files written for one profiled run.
+    """
+
+    __slots__ = ("directory", "files", "wall_seconds", "samples")
+
+    def __init__(self, directory: str, files: Dict[str, str], wall_seconds: float, samples: int):
+        self.directory = directory
+        self.files = files
+        self.wall_seconds = wall_seconds
+        self.samples = samples
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "directory": self.directory,
+            "files": self.files,
+            "wall_ms": round(self.wall_seconds * 1000, 3),
+            "samples": self.samples
+        }
+
+
+class Profiler:
+    """
+    Profiler captures one run (a CLI command, an API request) with
+    cProfile, a StackSampler over all threads and tracemalloc, and writes
+    per run, under output_dir/<timestamp>-<label>/:
+
+        cpu.pstats         cProfile stats of the calling thread (pstats / snakeviz)
+        cpu.txt            top functions by cumulative time
+        stacks.collapsed   sampled stacks of all threads (flamegraph.pl, speedscope)
+        allocations.txt    top allocation sites grown during the run (tracemalloc)
+
+    Only one run is profiled at a time; a concurrent request runs unprofiled.
+    """
+
+    _active = threading.Lock()
+
+    def __init__(self, output_dir: str = "profiles", sample_interval: float = 0.005, include_idle: bool = False,
+                 trace_allocations: bool = True, allocation_frames: int = 10, top: int = 40):
+        """
+        Initialize the Profiler.
+
+        Args:
+            output_dir (str): Directory receiving one sub-directory per profiled run.
+            sample_interval (float): Seconds between stack samples.
+            include_idle (bool): Keep stack samples of idle threads.
+            trace_allocations (bool): Snapshot allocations with tracemalloc.
+            allocation_frames (int): Traceback depth recorded per allocation.
+            top (int): Entries in cpu.txt and allocations.txt.
+        """
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.include_idle = include_idle
+        self.trace_allocations = trace_allocations
+        self.allocation_frames = max(1, allocation_frames)
+        self.top = top
+
+    @classmethod
+    def from_config(cls, profiling_config: Optional[Dict[str, Any]] = None) -> "Profiler":
+        """
+        Build a profiler from the "profiling" section of the config.
+
+        Args:
+            profiling_config (dict, optional): Profiling settings.
+
+        Returns:
+            Profiler: New profiler.
+        """
+        profiling_config = profiling_config or {}
+        return cls(
+            output_dir=profiling_config.get("output_dir", "profiles"),
+            sample_interval=profiling_config.get("sample_interval_ms", 5) / 1000.0,
+            include_idle=profiling_config.get("include_idle", False),
+            trace_allocations=profiling_config.get("trace_allocations", True),
+            allocation_frames=profiling_config.get("allocation_frames", 10),
+            top=profiling_config.get("top", 40)
+        )
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[Optional[ProfileResult]]:
+        """
+        Profile the enclosed block.
+
+        The yielded result is filled in when the block exits.
+
+        Args:
+            label (str): Run label used in the directory name (e.g. "signal").
+
+        Yields:
+            ProfileResult or None: Result (None if another run is being profiled).
+        """
+        if not self._active.acquire(blocking=False):
+            logger.warning(f"Another run is being profiled; running {label} without profiling.")
+            yield None
+            return
+
+        now = time.time()
+        stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now % 1 * 1000):03d}"
+        directory = os.path.join(self.output_dir, f"{stamp}-{_slug(label)}")
+        result = ProfileResult(directory, {}, 0.0, 0)
+
+        started_tracing = False
+        before = None
+        if self.trace_allocations:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start(self.allocation_frames)
+                started_tracing = True
+            before = tracemalloc.take_snapshot()
+
+        sampler = StackSampler(self.sample_interval, self.include_idle)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+
+        try:
+            sampler.start()
+            profile.enable()
+            try:
+                yield result
+            finally:
+                profile.disable()
+                sampler.stop()
+                result.wall_seconds = time.perf_counter() - start
+                result.samples = sampler.samples
+
+                after = tracemalloc.take_snapshot() if before is not None else None
+                memory = tracemalloc.get_traced_memory() if before is not None else (0, 0)
+                if started_tracing:
+                    tracemalloc.stop()
+
+                try:
+                    self._write(result, profile, sampler, before, after, memory)
+                except OSError as e:
+                    logger.error(f"Failed to write profile to {directory}: {e}")
+        finally:
+            self._active.release()
+
+    def _write(self, result: ProfileResult, profile: cProfile.Profile, sampler: StackSampler,
+               before: Optional[tracemalloc.Snapshot], after: Optional[tracemalloc.Snapshot],
+               memory: Tuple[int, int]) -> None:
+        """
+        Write the profile files of one run.
+        """
+        os.makedirs(result.directory, exist_ok=True)
+
+        def path(name: str) -> str:
+            result.files[name] = os.path.join(result.directory, name)
+            return result.files[name]
+
+        profile.dump_stats(path("cpu.pstats"))
+
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(self.top)
+        with open(path("cpu.txt"), "w") as f:
+            f.write(text.getvalue())
+
+        with open(path("stacks.collapsed"), "w") as f:
+            f.write(sampler.collapsed())
+
+        if before is not None and after is not None:
+            # Drop the profiler's own bookkeeping from the comparison
+            ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+            growth = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "traceback")
+            current, peak = memory
+
+            with open(path("allocations.txt"), "w") as f:
+                total = sum(stat.size_diff for stat in growth)
+                f.write(f"Net allocated during run: {total / 1024:.1f} KiB "
+                        f"(traced at end {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB)\n")
+
+                for stat in growth[:self.top]:
+                    f.write(f"\n{stat.size_diff / 1024:+.1f} KiB, {stat.count_diff:+d} block(s)\n")
+                    for line in stat.traceback.format(most_recent_first=True):
+                        f.write(f"  {line}\n")
+
+        logger.info(f"Profile written to {result.directory} ({result.wall_seconds:.3f}s, {result.samples} samples)")
+
+
+def _slug(label: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]+", "-", label).strip("-")[:60] or "run"
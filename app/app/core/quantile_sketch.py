@@ -0,0 +1,227 @@
+import logging
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Capacity ratio between a compactor and the one above it
+_CAPACITY_DECAY = 2.0 / 3.0
+
+
+class KLLSketch:
+    """
+    KLLSketch is a mergeable streaming quantile sketch (Karnin, Lang &
+    Liberty). Values are kept in a hierarchy of compactors; an item on
+    level h stands for 2^h original values. Full compactors are sorted
+    and every other item (random offset) is promoted a level up, so
+    memory stays around 3k items however many values are added, with a
+    rank error of roughly 1.7 / k.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Initialize an empty sketch.
+
+        Args:
+            k (int): Accuracy parameter (capacity of the top compactor).
+            seed (int, optional): Seed of the compaction coin flips.
+        """
+        self.k = max(8, int(k))
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.compactors: List[List[float]] = [[]]
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def update(self, value: float) -> None:
+        """
+        Add one value.
+
+        Args:
+            value (float): Observed value.
+        """
+        value = float(value)
+        self.compactors[0].append(value)
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._compress()
+
+    def update_many(self, values: Iterable[float]) -> None:
+        """
+        Add many values at once.
+
+        Args:
+            values (iterable): Observed values (NaN values are skipped).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+
+        self.compactors[0].extend(values.tolist())
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        Fold another sketch into this one (e.g. from another worker).
+
+        Args:
+            other (KLLSketch): Sketch to merge.
+
+        Returns:
+            KLLSketch: This sketch.
+        """
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append([])
+        for level, items in enumerate(other.compactors):
+            self.compactors[level].extend(items)
+
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def ranks(self, values: Iterable[float]) -> np.ndarray:
+        """
+        Estimated fraction of values below each of the given values (ties count half).
+
+        Args:
+            values (iterable): Values to rank.
+
+        Returns:
+            np.ndarray: Ranks in [0, 1] (NaN if the sketch is empty).
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not self.count:
+            return np.full(values.shape, np.nan)
+
+        below = np.zeros(values.shape, dtype=np.float64)
+        total = 0.0
+        for level, items in enumerate(self.compactors):
+            if not items:
+                continue
+            weight = float(1 << level)
+            items = np.sort(np.asarray(items, dtype=np.float64))
+            left = np.searchsorted(items, values, side="left")
+            right = np.searchsorted(items, values, side="right")
+            below += weight * (left + (right - left) / 2.0)
+            total += weight * len(items)
+
+        return below / total
+
+    def rank(self, value: float) -> Optional[float]:
+        """
+        Estimated fraction of values below the given value (ties count half).
+
+        Args:
+            value (float): Value to rank.
+
+        Returns:
+            float or None: Rank in [0, 1], or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        return float(self.ranks([value])[0])
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimated value at quantile q.
+
+        Args:
+            q (float): Quantile in [0, 1] (e.g. 0.99).
+
+        Returns:
+            float or None: Value, or None if the sketch is empty.
+        """
+        if not self.count:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+
+        weighted = sorted(
+            (value, 1 << level) for level, items in enumerate(self.compactors) for value in items
+        )
+        target = q * sum(weight for _, weight in weighted)
+
+        cumulative = 0
+        for value, weight in weighted:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable form of the sketch.
+
+        Returns:
+            dict: k, count, min / max and the compactor contents.
+        """
+        return {
+            "k": self.k,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "compactors": [list(items) for items in self.compactors]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "KLLSketch":
+        """
+        Restore a sketch saved with to_dict().
+
+        Args:
+            data (dict): Serialized sketch.
+
+        Returns:
+            KLLSketch: Restored sketch.
+        """
+        sketch = cls(data.get("k", 200))
+        sketch.count = data.get("count", 0)
+        if sketch.count:
+            sketch.min = data["min"]
+            sketch.max = data["max"]
+        sketch.compactors = [list(items) for items in data.get("compactors") or [[]]]
+        return sketch
+
+    def _capacity(self, level: int) -> int:
+        """
+        Capacity of a compactor; lower levels get geometrically smaller ones.
+        """
+        depth = len(self.compactors) - level - 1
+        return max(2, int(math.ceil(self.k * _CAPACITY_DECAY ** depth)))
+
+    def _compress(self) -> None:
+        """
+        Compact full levels until the sketch fits its total capacity again.
+        """
+        while sum(len(items) for items in self.compactors) >= \
+                sum(self._capacity(level) for level in range(len(self.compactors))):
+            for level, items in enumerate(self.compactors):
+                if len(items) < self._capacity(level):
+                    continue
+
+                if level + 1 == len(self.compactors):
+                    self.compactors.append([])
+
+                items.sort()
+                # An odd item out stays on this level
+                kept = [items.pop()] if len(items) % 2 else []
+                offset = self._rng.randint(0, 1)
+                self.compactors[level + 1].extend(items[offset::2])
+                self.compactors[level] = kept
+                break
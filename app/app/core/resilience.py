@@ -0,0 +1,357 @@
+import asyncio
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Status codes worth retrying → throttling and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a call is rejected because the upstream's circuit breaker is open.
+    """
+
+
+class TokenBucket:
+    """
+    TokenBucket limits the request rate to an upstream.
+
+    The rate adapts AIMD-style: it is halved whenever the upstream
+    throttles (HTTP 429) and grows back towards the configured quota
+    with every successful call.
+    """
+
+    def __init__(self, rate: float, burst: float, min_rate: Optional[float] = None):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            rate (float): Configured quota in requests per second.
+            burst (float): Bucket capacity (max requests sent back-to-back).
+            min_rate (float, optional): Lowest rate the bucket may adapt down to.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16.0
+        self.capacity = max(1.0, burst)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+        # Set from Retry-After → nobody sends before this moment
+        self.blocked_until = 0.0
+
+    async def acquire(self) -> None:
+        """
+        Wait until a request may be sent and consume one token.
+        """
+        while True:
+            now = time.monotonic()
+
+            if now < self.blocked_until:
+                await asyncio.sleep(self.blocked_until - now)
+                continue
+
+            # Refill tokens for the time elapsed since the last update
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return
+
+            await asyncio.sleep((1.0 - self.tokens) / self.rate)
+
+    def on_success(self) -> None:
+        """
+        Additive increase of the rate after a successful call.
+        """
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20.0)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicative decrease of the rate after HTTP 429.
+
+        Args:
+            retry_after (float, optional): Seconds the upstream asked us to wait.
+        """
+        self.rate = max(self.min_rate, self.rate / 2.0)
+        self.tokens = 0.0
+
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+        logger.warning(f"Upstream throttled → rate limit lowered to {self.rate:.2f} req/s")
+
+
+class CircuitBreaker:
+    """
+    CircuitBreaker fails fast while an upstream is down.
+
+    After failure_threshold consecutive failures the circuit opens and
+    calls are rejected for reset_timeout seconds; then a single trial
+    call is let through (half-open) to decide whether to close it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Seconds to stay open before a trial call.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        """
+        Check whether a call may be attempted right now.
+
+        Returns:
+            bool: True if the call may proceed.
+        """
+        if self.state == self.CLOSED:
+            return True
+
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+
+        return False
+
+    def release_trial(self) -> None:
+        """
+        Give back an abandoned half-open trial (cancelled, or failed without an
+        upstream verdict) so that the next call can try again.
+        """
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        """
+        Record a successful call and close the circuit.
+        """
+        if self.state != self.CLOSED:
+            logger.info("Circuit breaker closed → upstream recovered.")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """
+        Record a failed call and open the circuit if the threshold is reached.
+        """
+        self.failures += 1
+        self._trial_in_flight = False
+
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.error(f"Circuit breaker opened after {self.failures} failure(s).")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class UpstreamGuard:
+    """
+    UpstreamGuard wraps every call to one upstream with rate limiting,
+    a circuit breaker, and exponential backoff with jitter that honours
+    Retry-After.
+    """
+
+    def __init__(self, name: str, limiter: Optional[TokenBucket], breaker: CircuitBreaker,
+                 max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 8.0,
+                 max_retry_after: float = 30.0):
+        """
+        Initialize the UpstreamGuard.
+
+        Args:
+            name (str): Upstream name for logging (host).
+            limiter (TokenBucket, optional): Rate limiter, or None for unlimited.
+            breaker (CircuitBreaker): Circuit breaker for this upstream.
+            max_attempts (int): Max attempts per call (including the first).
+            base_delay (float): Backoff base delay in seconds.
+            max_delay (float): Backoff delay cap in seconds.
+            max_retry_after (float): Longest Retry-After we are willing to wait.
+        """
+        self.name = name
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    async def call(self, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Run a request through the limiter, breaker and retry policy.
+
+        Args:
+            send (callable): Zero-argument coroutine function that sends the request
+                             and raises httpx.HTTPError on failure.
+
+        Returns:
+            httpx.Response: Successful response.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            httpx.HTTPError: If the last attempt failed or the error is not retryable.
+        """
+        attempt = 0
+
+        while True:
+            attempt += 1
+
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.name} → failing fast.")
+
+            try:
+                if self.limiter is not None:
+                    await self.limiter.acquire()
+                response = await send()
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                retry_after = None
+
+                if status == 429:
+                    # Throttling → upstream is alive, slow down instead of tripping the breaker
+                    retry_after = parse_retry_after(e.response.headers.get("Retry-After"))
+                    if self.limiter is not None:
+                        self.limiter.on_throttle(retry_after)
+                    self.breaker.record_success()
+                elif status in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_failure()
+                else:
+                    # Client errors are not an upstream health problem
+                    self.breaker.record_success()
+                    raise
+
+                if attempt >= self.max_attempts or (retry_after or 0) > self.max_retry_after:
+                    raise
+
+                await self._backoff(attempt, retry_after, f"HTTP {status}")
+                continue
+            except httpx.TransportError as e:
+                self.breaker.record_failure()
+                if attempt >= self.max_attempts:
+                    raise
+                await self._backoff(attempt, None, type(e).__name__)
+                continue
+            except BaseException:
+                # Cancelled (hedging, scanner deadline) or unexpected error → no verdict on the upstream
+                self.breaker.release_trial()
+                raise
+
+            self.breaker.record_success()
+            if self.limiter is not None:
+                self.limiter.on_success()
+            return response
+
+    async def _backoff(self, attempt: int, retry_after: Optional[float], reason: str) -> None:
+        """
+        Sleep before the next attempt (exponential backoff, full jitter, Retry-After floor).
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        logger.warning(f"{self.name}: attempt {attempt}/{self.max_attempts} failed ({reason}), retrying in {delay:.2f}s")
+        await asyncio.sleep(delay)
+
+
+class ResilienceManager:
+    """
+    ResilienceManager hands out one UpstreamGuard per upstream host,
+    sized from the "resilience" section of the config.
+    """
+
+    def __init__(self, resilience_config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the ResilienceManager.
+
+        Args:
+            resilience_config (dict, optional): Retry, circuit breaker and rate limit settings.
+        """
+        resilience_config = resilience_config or {}
+        self.retry_config = resilience_config.get("retry", {})
+        self.breaker_config = resilience_config.get("circuit_breaker", {})
+        self.rate_limits = resilience_config.get("rate_limits", {}) or {}
+        self._guards: Dict[str, UpstreamGuard] = {}
+
+    def guard_for(self, host: str) -> UpstreamGuard:
+        """
+        Return the guard for an upstream host, creating it on first use.
+
+        Args:
+            host (str): Upstream host name (e.g. "api.coingecko.com").
+
+        Returns:
+            UpstreamGuard: Guard shared by all calls to this host.
+        """
+        guard = self._guards.get(host)
+        if guard is not None:
+            return guard
+
+        # Per-host quota, falling back to the "default" entry (None → unlimited)
+        limit = self.rate_limits.get(host, self.rate_limits.get("default"))
+        limiter = None
+        if limit and limit.get("rate"):
+            limiter = TokenBucket(rate=limit["rate"], burst=limit.get("burst", limit["rate"]))
+
+        guard = UpstreamGuard(
+            name=host,
+            limiter=limiter,
+            breaker=CircuitBreaker(
+                failure_threshold=self.breaker_config.get("failure_threshold", 5),
+                reset_timeout=self.breaker_config.get("reset_timeout", 30.0)
+            ),
+            max_attempts=self.retry_config.get("max_attempts", 3),
+            base_delay=self.retry_config.get("base_delay", 0.25),
+            max_delay=self.retry_config.get("max_delay", 8.0),
+            max_retry_after=self.retry_config.get("max_retry_after", 30.0)
+        )
+        self._guards[host] = guard
+        return guard
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date).
+
+    Args:
+        value (str, optional): Raw header value.
+
+    Returns:
+        float or None: Seconds to wait, or None if missing/invalid.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
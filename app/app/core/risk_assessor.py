@@ -1,5 +1,13 @@
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from app.core.pattern_detector import PatternDetector
+from app.core.risk_population import RiskPopulation
+from app.core.tracing import traced
+from app.core.wallet_analysis import known_empty
+from app.core.wallet_metrics import ACTIVITY_TYPES, WalletMetrics
 
 logger = logging.getLogger("signalforge")
 
@@ -10,14 +18,30 @@ class RiskAssessor:
     based on wallet analysis and detected patterns.
     """
 
-    def __init__(self, config: Dict[str, Any]):
+    # Analysis fields calculate_risk_score() reads besides the patterns
+    INPUT_FIELDS = ("activity_type", "tokens_held", "transaction_count")
+
+    def __init__(self, config: Dict[str, Any], population: Optional[RiskPopulation] = None):
         """
         Initialize RiskAssessor with loaded configuration.
 
         Args:
             config (dict): Configuration dictionary with risk rules.
+            population (RiskPopulation, optional): Sketches of all scored wallets for percentiles.
         """
         self.config = config
+        self.population = population
+
+        # Fetch weights from config once
+        risk_weights = self.config.get("risk_weights", {})
+        self.activity_weights = risk_weights.get("activity", {})
+        self.pattern_weight = risk_weights.get("pattern", 1.5)
+        self.whale_threshold = risk_weights.get("whale_token_threshold", 20)
+
+        # Activity weight per activity code (unknown activity → 1.0)
+        self._activity_weight_table = np.array(
+            [self.activity_weights.get(name, 1.0) for name in ACTIVITY_TYPES], dtype=np.float64
+        )
 
     def calculate_risk_score(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> float:
         """
@@ -35,10 +59,9 @@ class RiskAssessor:
 
         score = 0.0  # Initial base score
 
-        # Fetch weights from config safely
-        activity_weights = self.config.get("risk_weights", {}).get("activity", {})
-        pattern_weight = self.config.get("risk_weights", {}).get("pattern", 1.5)
-        whale_threshold = self.config.get("risk_weights", {}).get("whale_token_threshold", 20)
+        activity_weights = self.activity_weights
+        pattern_weight = self.pattern_weight
+        whale_threshold = self.whale_threshold
 
         # Determine wallet activity type
         activity_type = wallet_analysis.get("activity_type", "")
@@ -61,8 +84,8 @@ class RiskAssessor:
             score += 2.5
             logger.debug(f"Whale threshold exceeded: {tokens_held} tokens → +2.5")
 
-        # Extra rule → penalty if wallet is completely empty
-        if tokens_held == 0 and wallet_analysis.get("transaction_count", 0) == 0:
+        # Extra rule → penalty if wallet is completely empty (both fetches completed)
+        if known_empty(wallet_analysis):
             score = max(score - 1.0, 0.0)
             logger.debug(f"Empty wallet detected → -1.0 penalty")
 
@@ -71,3 +94,125 @@ class RiskAssessor:
 
         logger.info(f"Final risk score for wallet {wallet_analysis.get('wallet')}: {final_score}")
         return final_score
+
+    @traced("risk.assess", attributes=lambda self, wallet_analysis, *a, **k: {"wallet": wallet_analysis.get("wallet")})
+    def assess(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]],
+               observe: bool = True) -> Dict[str, Any]:
+        """
+        Calculate the risk score and place it within the population of scored wallets.
+
+        Args:
+            wallet_analysis (dict): Wallet analysis result from WalletScanner.
+            patterns (list): List of detected pattern dictionaries.
+            observe (bool): Add the wallet to the population; False if it is already counted
+                            (e.g. a re-evaluation), so each wallet contributes only once.
+
+        Returns:
+            dict: risk_score, plus risk_percentile and metric_percentiles (0-100)
+                  when a population is configured.
+        """
+        risk_score = self.calculate_risk_score(wallet_analysis, patterns)
+        result = {"risk_score": risk_score}
+
+        if self.population is None:
+            return result
+
+        values = {
+            "risk_score": risk_score,
+            "tokens_held": wallet_analysis.get("tokens_held", 0),
+            "transaction_count": wallet_analysis.get("transaction_count", 0)
+        }
+        if observe:
+            self.population.observe(values)
+
+        percentiles = self.population.percentiles(values)
+        result["risk_percentile"] = percentiles.pop("risk_score")
+        result["metric_percentiles"] = percentiles
+
+        return result
+
+    def assess_batch(self, metrics: WalletMetrics, pattern_masks: np.ndarray,
+                     observe: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Score many wallets and place them within the population (batch form of assess()).
+
+        Args:
+            metrics (WalletMetrics): Columnar wallet metrics.
+            pattern_masks (np.ndarray): Bitmasks from PatternDetector.detect_patterns_batch().
+            observe (np.ndarray, optional): Per wallet, whether to add it to the population; all if None.
+
+        Returns:
+            list: One assess() result per wallet.
+        """
+        risk_scores = self.calculate_risk_scores_batch(metrics, pattern_masks)
+        if self.population is None:
+            return [{"risk_score": float(score)} for score in risk_scores]
+
+        risk_percentiles = self.risk_percentiles_batch(metrics, risk_scores, observe)
+        metric_percentiles = {
+            "tokens_held": self.population.percentiles_many("tokens_held", metrics.tokens_held),
+            "transaction_count": self.population.percentiles_many("transaction_count", metrics.transaction_count)
+        }
+
+        return [{
+            "risk_score": float(risk_scores[index]),
+            "risk_percentile": _percentile(risk_percentiles[index]),
+            "metric_percentiles": {metric: _percentile(values[index]) for metric, values in metric_percentiles.items()}
+        } for index in range(len(metrics))]
+
+    def risk_percentiles_batch(self, metrics: WalletMetrics, risk_scores: np.ndarray,
+                               observe: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Add a batch of scored wallets to the population and return their risk percentiles.
+
+        Args:
+            metrics (WalletMetrics): Columnar wallet metrics.
+            risk_scores (np.ndarray): Scores from calculate_risk_scores_batch().
+            observe (np.ndarray, optional): Per wallet, whether to add it to the population; all if None.
+
+        Returns:
+            np.ndarray: Risk percentiles (0-100; NaN without a population).
+        """
+        if self.population is None:
+            return np.full(len(risk_scores), np.nan)
+
+        observed = slice(None) if observe is None else np.asarray(observe, dtype=bool)
+        self.population.observe_many({
+            "risk_score": risk_scores[observed],
+            "tokens_held": metrics.tokens_held[observed],
+            "transaction_count": metrics.transaction_count[observed]
+        })
+        return self.population.percentiles_many("risk_score", risk_scores)
+
+    def calculate_risk_scores_batch(self, metrics: WalletMetrics, pattern_masks: np.ndarray) -> np.ndarray:
+        """
+        Calculate risk scores for many wallets in one vectorized pass.
+
+        Applies the same rules as calculate_risk_score().
+
+        Args:
+            metrics (WalletMetrics): Columnar wallet metrics.
+            pattern_masks (np.ndarray): Bitmasks from PatternDetector.detect_patterns_batch().
+
+        Returns:
+            np.ndarray: Risk scores between 0.0 and 10.0 (float64).
+        """
+        score = self._activity_weight_table[metrics.activity_code]
+        score = score + PatternDetector.count_patterns(pattern_masks) * self.pattern_weight
+
+        # Bonus score for whale wallets
+        score = score + np.where(metrics.tokens_held >= self.whale_threshold, 2.5, 0.0)
+
+        # Penalty for completely empty wallets
+        score = np.where(metrics.empty, np.maximum(score - 1.0, 0.0), score)
+
+        logger.info(f"Calculated {len(metrics)} risk score(s) in batch")
+
+        return np.minimum(np.round(score, 2), 10.0)
+
+
+def _percentile(value: float) -> Optional[float]:
+    """
+    Percentile from a batch array as reported by assess() (None for NaN / empty population).
+    """
+    return None if np.isnan(value) else float(value)
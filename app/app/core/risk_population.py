@@ -0,0 +1,205 @@
+import logging
+import threading
+from typing import Any, Dict, Mapping, Optional
+
+import numpy as np
+
+from app.core.quantile_sketch import KLLSketch
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Metrics tracked across all scanned wallets
+POPULATION_METRICS = ("risk_score", "tokens_held", "transaction_count")
+
+
+class RiskPopulation:
+    """
+    RiskPopulation keeps one KLL quantile sketch per metric over every
+    scored wallet, so a result can be placed relative to the population
+    (percentile) without keeping or sorting the signal history.
+
+    Sketches are persisted in SQLite. Each process collects its own
+    updates and periodically merges them into the stored sketches,
+    picking up what other workers merged in the meantime.
+    """
+
+    def __init__(self, db=None, k: int = 200, flush_every: int = 100):
+        """
+        Initialize the RiskPopulation and load the stored sketches.
+
+        Args:
+            db (Database, optional): SQLite database; memory only if None.
+            k (int): Sketch accuracy parameter (rank error ≈ 1.7 / k).
+            flush_every (int): Merge local updates into the database after this many wallets.
+        """
+        self.db = db
+        self.k = k
+        self.flush_every = max(1, flush_every)
+
+        # Population view (stored + local) and local updates not yet persisted
+        self._sketches = {metric: self._load(metric) for metric in POPULATION_METRICS}
+        self._deltas = {metric: KLLSketch(k) for metric in POPULATION_METRICS}
+        self._unflushed = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, db=None, population_config: Optional[Dict[str, Any]] = None) -> Optional["RiskPopulation"]:
+        """
+        Build a RiskPopulation from the "risk_population" section of the config.
+
+        Args:
+            db (Database, optional): SQLite database.
+            population_config (dict, optional): Population settings.
+
+        Returns:
+            RiskPopulation or None: New population, or None if disabled.
+        """
+        population_config = population_config or {}
+        if not population_config.get("enabled", True):
+            return None
+
+        return cls(
+            db=db if population_config.get("persist", True) else None,
+            k=population_config.get("k", 200),
+            flush_every=population_config.get("flush_every", 100)
+        )
+
+    def observe(self, values: Mapping[str, float]) -> None:
+        """
+        Add one wallet to the population.
+
+        Args:
+            values (dict): Metric → value (see POPULATION_METRICS; missing metrics are skipped).
+        """
+        with self._lock:
+            for metric in POPULATION_METRICS:
+                value = values.get(metric)
+                if value is not None:
+                    self._sketches[metric].update(value)
+                    self._deltas[metric].update(value)
+            self._unflushed += 1
+            flush = self._unflushed >= self.flush_every
+
+        if flush:
+            self.flush()
+
+    def observe_many(self, columns: Mapping[str, np.ndarray]) -> None:
+        """
+        Add many wallets at once.
+
+        Args:
+            columns (dict): Metric → array of values.
+        """
+        with self._lock:
+            for metric in POPULATION_METRICS:
+                if metric in columns:
+                    self._sketches[metric].update_many(columns[metric])
+                    self._deltas[metric].update_many(columns[metric])
+            self._unflushed += len(next(iter(columns.values()), []))
+            flush = self._unflushed >= self.flush_every
+
+        if flush:
+            self.flush()
+
+    def percentiles(self, values: Mapping[str, float]) -> Dict[str, Optional[float]]:
+        """
+        Percentile of each value within the population.
+
+        Args:
+            values (dict): Metric → value.
+
+        Returns:
+            dict: Metric → percentile (0-100, one decimal), None if the population is empty.
+        """
+        with self._lock:
+            ranks = {
+                metric: self._sketches[metric].rank(value)
+                for metric, value in values.items()
+                if metric in self._sketches and value is not None
+            }
+        return {metric: None if rank is None else round(rank * 100, 1) for metric, rank in ranks.items()}
+
+    def percentiles_many(self, metric: str, values: np.ndarray) -> np.ndarray:
+        """
+        Percentiles of many values of one metric.
+
+        Args:
+            metric (str): Metric name.
+            values (np.ndarray): Values to place.
+
+        Returns:
+            np.ndarray: Percentiles (0-100, one decimal; NaN if the population is empty).
+        """
+        with self._lock:
+            ranks = self._sketches[metric].ranks(values)
+        return np.round(ranks * 100, 1)
+
+    def quantiles(self, metric: str, qs=(0.5, 0.9, 0.99)) -> Dict[str, Optional[float]]:
+        """
+        Population quantiles of a metric (e.g. median / p90 / p99 risk score).
+
+        Args:
+            metric (str): Metric name.
+            qs (tuple): Quantiles to report.
+
+        Returns:
+            dict: "p50" style label → value.
+        """
+        with self._lock:
+            sketch = self._sketches[metric]
+            return {f"p{round(q * 100, 1):g}": sketch.quantile(q) for q in qs}
+
+    def merge(self, other: "RiskPopulation") -> None:
+        """
+        Fold the sketches of another population into this one, e.g. one built
+        by a worker without access to the shared database.
+
+        Args:
+            other (RiskPopulation): Population to merge.
+        """
+        with self._lock:
+            for metric in POPULATION_METRICS:
+                self._sketches[metric].merge(KLLSketch.from_dict(other._sketches[metric].to_dict()))
+                self._deltas[metric].merge(KLLSketch.from_dict(other._sketches[metric].to_dict()))
+
+    def flush(self) -> None:
+        """
+        Merge local updates into the stored sketches and refresh the population view.
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, {metric: KLLSketch(self.k) for metric in POPULATION_METRICS}
+            self._unflushed = 0
+
+        if self.db is None:
+            return
+
+        for metric, delta in deltas.items():
+            if not delta.count:
+                continue
+
+            merged = self.db.merge_quantile_sketch(
+                f"risk_population:{metric}",
+                lambda stored: self._from_stored(stored).merge(delta).to_dict()
+            )
+            if merged is not None:
+                with self._lock:
+                    # Stored sketch + updates observed since this flush started
+                    self._sketches[metric] = KLLSketch.from_dict(merged).merge(
+                        KLLSketch.from_dict(self._deltas[metric].to_dict())
+                    )
+
+        logger.info("Risk population sketches persisted.")
+
+    def _load(self, metric: str) -> KLLSketch:
+        """
+        Stored sketch of a metric (empty without a database).
+        """
+        stored = self.db.get_quantile_sketch(f"risk_population:{metric}") if self.db is not None else None
+        return self._from_stored(stored)
+
+    def _from_stored(self, stored: Optional[Dict[str, Any]]) -> KLLSketch:
+        """
+        Deserialize a stored sketch, or create an empty one.
+        """
+        return KLLSketch.from_dict(stored) if stored else KLLSketch(self.k)
@@ -0,0 +1,173 @@
+import asyncio
+import itertools
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app.core.endpoint_pool import RPCEndpointPool
+from app.core.metrics import MetricsRegistry
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class RPCBatchError(Exception):
+    """
+    Raised for a call whose response is missing from a JSON-RPC batch reply.
+    """
+
+
+class RPCError(Exception):
+    """
+    Raised when a JSON-RPC call returned an "error" object instead of a result.
+    """
+
+
+class RPCBatcher:
+    """
+    RPCBatcher coalesces JSON-RPC calls issued within a short window
+    (or up to a size cap) into a single JSON-RPC batch request and
+    hands each caller back its own response, matched by id.
+    """
+
+    def __init__(self, pool: RPCEndpointPool, max_batch_size: int = 100, window_ms: float = 5.0):
+        """
+        Initialize the RPCBatcher.
+
+        Args:
+            pool (RPCEndpointPool): RPC endpoints batches are routed to.
+            max_batch_size (int): Flush as soon as this many calls are pending.
+            window_ms (float): Max time in milliseconds a call waits for company.
+        """
+        self.pool = pool
+        self.transport = pool.transport
+        self.max_batch_size = max(1, max_batch_size)
+        self.window = max(0.0, window_ms) / 1000.0
+
+        # Pending (request, future) pairs → only touched on the transport loop
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._ids = itertools.count(1)
+
+        # In-flight batch sends → referenced until done so they are not garbage-collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_config(cls, pool: RPCEndpointPool, batch_config: Optional[Dict[str, Any]] = None) -> "RPCBatcher":
+        """
+        Build a batcher from the "rpc_batch" section of the config.
+
+        Args:
+            pool (RPCEndpointPool): RPC endpoints batches are routed to.
+            batch_config (dict, optional): Batching settings.
+
+        Returns:
+            RPCBatcher: New batcher instance.
+        """
+        batch_config = batch_config or {}
+        enabled = batch_config.get("enabled", True)
+        return cls(
+            pool,
+            max_batch_size=batch_config.get("max_size", 100) if enabled else 1,
+            window_ms=batch_config.get("window_ms", 5.0) if enabled else 0.0
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Calls waiting for the current batch window to close.
+        """
+        return len(self._pending)
+
+    async def call(self, method: str, params: List[Any]) -> Dict[str, Any]:
+        """
+        Queue a JSON-RPC call and wait for its response object.
+
+        Args:
+            method (str): JSON-RPC method name.
+            params (list): JSON-RPC params.
+
+        Returns:
+            dict: The JSON-RPC response object ("result" or "error") for this call.
+
+        Raises:
+            httpx.HTTPError: If the batch request itself failed.
+            RPCBatchError: If the reply did not contain a response for this call.
+        """
+        return await self.transport.run_on_loop(self._enqueue(method, params))
+
+    async def _enqueue(self, method: str, params: List[Any]) -> Dict[str, Any]:
+        """
+        Add a call to the pending batch (runs on the transport loop).
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        request = {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params
+        }
+        self._pending.append((request, future))
+
+        # Size cap reached → send now, otherwise wait for the window to close
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """
+        Send all pending calls as one batch (runs on the transport loop).
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """
+        POST one batch and resolve every caller's future from the reply.
+        """
+        # Single call → plain JSON-RPC object for maximum endpoint compatibility
+        payload = batch[0][0] if len(batch) == 1 else [request for request, _ in batch]
+
+        metrics = MetricsRegistry.shared()
+        if metrics.enabled:
+            for request, _ in batch:
+                metrics.rpc_calls.inc(method=request["method"])
+
+        try:
+            data = await self.pool.post_json(payload)
+        except Exception as e:
+            logger.warning(f"JSON-RPC batch of {len(batch)} call(s) failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"Sent JSON-RPC batch of {len(batch)} call(s)")
+
+        # Demultiplex responses by id
+        responses = data if isinstance(data, list) else [data]
+        by_id = {r.get("id"): r for r in responses if isinstance(r, dict)}
+
+        # Endpoint rejected the whole batch with one error object → every caller gets it
+        batch_error = by_id.get(None) if len(by_id) == 1 and "error" in by_id.get(None, {}) else None
+
+        for request, future in batch:
+            if future.done():
+                continue
+
+            response = by_id.get(request["id"], batch_error)
+            if response is None:
+                future.set_exception(RPCBatchError(f"No response for JSON-RPC id {request['id']} ({request['method']})"))
+            else:
+                future.set_result(response)
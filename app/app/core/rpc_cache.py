@@ -0,0 +1,221 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class _CacheEntry:
+    """
+    Single cached RPC response with its bookkeeping data.
+    """
+
+    __slots__ = ("value", "size", "slot", "stored_at")
+
+    def __init__(self, value: Any, size: int, slot: Optional[int], stored_at: float):
+        self.value = value
+        self.size = size
+        self.slot = slot
+        self.stored_at = stored_at
+
+
+class RPCResponseCache:
+    """
+    RPCResponseCache is a bounded, slot-aware LRU cache for wallet RPC responses.
+
+    Entries are evicted least-recently-used once the entry count or the
+    total byte size is exceeded, and expire after a TTL or once the chain
+    has moved more than max_slot_age slots past the slot they were read at.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 30.0, max_slot_age: Optional[int] = 150):
+        """
+        Initialize the RPCResponseCache.
+
+        Args:
+            max_entries (int): Max number of cached responses.
+            max_bytes (int): Max total (JSON-encoded) size of cached responses.
+            ttl_seconds (float): Max age of an entry in seconds.
+            max_slot_age (int, optional): Max number of slots an entry may lag the newest seen slot.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+        self.max_slot_age = max_slot_age
+
+        self._entries: "OrderedDict[Hashable, _CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        # Newest slot seen in any RPC response → reference point for slot age
+        self.latest_slot: Optional[int] = None
+
+        # Cache statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Optional[Dict[str, Any]] = None) -> Optional["RPCResponseCache"]:
+        """
+        Build a cache from the "rpc_cache" section of the config.
+
+        Args:
+            cache_config (dict, optional): Cache settings.
+
+        Returns:
+            RPCResponseCache or None: New cache, or None if caching is disabled.
+        """
+        cache_config = cache_config or {}
+        if not cache_config.get("enabled", True):
+            return None
+
+        return cls(
+            max_entries=cache_config.get("max_entries", 10000),
+            max_bytes=int(cache_config.get("max_mb", 64) * 1024 * 1024),
+            ttl_seconds=cache_config.get("ttl_seconds", 30.0),
+            max_slot_age=cache_config.get("max_slot_age", 150)
+        )
+
+    @staticmethod
+    def make_key(method: str, wallet_address: str, commitment: Optional[str], *extra: Hashable) -> Tuple:
+        """
+        Build a cache key for a wallet RPC call.
+
+        Args:
+            method (str): RPC method name.
+            wallet_address (str): Wallet address.
+            commitment (str, optional): Commitment level the data was read at.
+            *extra: Further call arguments that change the response (e.g. limit).
+
+        Returns:
+            tuple: Hashable cache key.
+        """
+        return (method, wallet_address, commitment or "finalized") + extra
+
+    def observe_slot(self, slot: Optional[int]) -> None:
+        """
+        Record a slot seen in an RPC response.
+
+        Args:
+            slot (int, optional): Slot number.
+        """
+        if slot is None:
+            return
+        with self._lock:
+            if self.latest_slot is None or slot > self.latest_slot:
+                self.latest_slot = slot
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Return a cached response if present and still valid.
+
+        Cached values are shared and must be treated as read-only.
+
+        Args:
+            key (tuple): Cache key from make_key().
+
+        Returns:
+            Any or None: Cached response, or None on miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if self._is_expired(entry):
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: Hashable, value: Any, slot: Optional[int] = None) -> None:
+        """
+        Store a response, evicting least-recently-used entries if needed.
+
+        Args:
+            key (tuple): Cache key from make_key().
+            value (Any): JSON-serializable RPC response.
+            slot (int, optional): Slot the response was read at. Defaults to the newest seen slot.
+        """
+        size = len(json.dumps(value, separators=(",", ":")))
+
+        # Entries larger than the whole budget are never cached
+        if size > self.max_bytes:
+            return
+
+        self.observe_slot(slot)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _CacheEntry(value, size, slot if slot is not None else self.latest_slot, time.monotonic())
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                evicted_key, _ = next(iter(self._entries.items()))
+                self._remove(evicted_key)
+                self.evictions += 1
+
+    def invalidate(self, wallet_address: Optional[str] = None) -> None:
+        """
+        Drop cached entries for one wallet, or everything.
+
+        Args:
+            wallet_address (str, optional): Wallet to invalidate. All entries if None.
+        """
+        with self._lock:
+            keys = [k for k in self._entries if wallet_address is None or k[1] == wallet_address]
+            for key in keys:
+                self._remove(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Entry count, byte size, hits, misses, evictions, expirations and hit ratio.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _is_expired(self, entry: _CacheEntry) -> bool:
+        """
+        Check an entry against the TTL and the slot age limit.
+        """
+        if time.monotonic() - entry.stored_at > self.ttl:
+            return True
+
+        if self.max_slot_age is not None and entry.slot is not None and self.latest_slot is not None:
+            return self.latest_slot - entry.slot > self.max_slot_age
+
+        return False
+
+    def _remove(self, key: Hashable) -> None:
+        """
+        Remove an entry and update the byte counter (lock must be held).
+        """
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
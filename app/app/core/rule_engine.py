@@ -0,0 +1,349 @@
+import logging
+import operator
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.activity_windows import WINDOW_METRICS
+from app.core.wallet_metrics import WalletMetrics
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Wallet metrics rules may reference → column kind
+METRIC_FIELDS: Dict[str, str] = {
+    "tokens_held": "number",
+    "transaction_count": "number",
+    "is_whale": "bool",
+    "partial": "bool",
+    "activity_type": "category",
+    "behavior_type": "category",
+    **{name: "number" for name in WINDOW_METRICS}
+}
+
+# Duration suffixes accepted for numeric constants ("gap_before_24h": ">=7d")
+_DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Comparison operators; longest prefix first so ">=" wins over ">"
+_OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">=": operator.ge,
+    "<=": operator.le,
+    "!=": operator.ne,
+    "==": operator.eq,
+    ">": operator.gt,
+    "<": operator.lt,
+    "=": operator.eq
+}
+
+# Only equality makes sense for categorical metrics
+_CATEGORY_OPERATORS = {"==", "=", "!=", "in"}
+
+# A compiled predicate maps metric columns to one boolean per wallet
+Predicate = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+
+class RuleCompileError(ValueError):
+    """
+    Raised when stored pattern conditions cannot be compiled.
+    """
+
+
+def compile_conditions(conditions: Any) -> Predicate:
+    """
+    Compile stored pattern conditions into a vectorized predicate.
+
+    Supported forms:
+        {"tokens_held": ">=10"}                    → comparison (as entered in the CLI)
+        {"tokens_held": 10}                        → equality
+        {"tokens_held": {">=": 3, "<": 10}}        → several comparisons, all must hold
+        {"activity_type": ["Low Activity", ...]}   → membership
+        {"tx_24h": ">=10", "gap_before_24h": ">=7d"} → sliding activity windows (durations in s/m/h/d)
+        {"all": [...]}, {"any": [...]}, {"not": {...}}
+    Several keys in one dict must all hold.
+
+    Args:
+        conditions (dict or list): Conditions as stored by ModelTrainer.
+
+    Returns:
+        Predicate: Callable taking metric columns and returning a boolean array.
+
+    Raises:
+        RuleCompileError: If the conditions reference unknown metrics or are malformed.
+    """
+    if isinstance(conditions, list):
+        return _all([compile_conditions(c) for c in conditions], "empty 'all' list")
+
+    if not isinstance(conditions, dict):
+        raise RuleCompileError(f"Conditions must be a dict or list, got {type(conditions).__name__}")
+
+    clauses = []
+    for key, spec in conditions.items():
+        if key == "all":
+            clauses.append(_all([compile_conditions(c) for c in _as_list(spec)], "empty 'all' list"))
+        elif key == "any":
+            clauses.append(_any([compile_conditions(c) for c in _as_list(spec)]))
+        elif key == "not":
+            clauses.append(_not(compile_conditions(spec)))
+        else:
+            clauses.append(_compile_field(key, spec))
+
+    return _all(clauses, "no conditions given")
+
+
+def referenced_fields(conditions: Any) -> List[str]:
+    """
+    Return the metrics a conditions structure reads.
+
+    Args:
+        conditions (dict or list): Conditions as stored by ModelTrainer.
+
+    Returns:
+        list: Sorted metric names.
+    """
+    fields = set()
+
+    def walk(node: Any) -> None:
+        if isinstance(node, list):
+            for child in node:
+                walk(child)
+        elif isinstance(node, dict):
+            for key, spec in node.items():
+                if key in ("all", "any", "not"):
+                    walk(spec)
+                else:
+                    fields.add(key)
+
+    walk(conditions)
+    return sorted(fields)
+
+
+def build_metric_columns(wallet_analyses: Sequence[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Convert wallet analyses into one NumPy column per metric.
+
+    Args:
+        wallet_analyses (list): WalletAnalysis objects or analysis dicts.
+
+    Returns:
+        dict: Metric name → array with one entry per wallet.
+    """
+    return WalletMetrics.from_analyses(wallet_analyses).columns()
+
+
+class CompiledRule:
+    """
+    A custom pattern together with its compiled predicate.
+    """
+
+    __slots__ = ("name", "description", "conditions", "fields", "predicate")
+
+    def __init__(self, name: str, description: str, conditions: Any, predicate: Predicate):
+        self.name = name
+        self.description = description
+        self.conditions = conditions
+        self.fields = referenced_fields(conditions)
+        self.predicate = predicate
+
+
+class RuleEngine:
+    """
+    RuleEngine compiles the custom patterns stored by ModelTrainer once
+    and evaluates all of them against a columnar batch of wallet metrics,
+    so N rules over M wallets cost N vectorized passes instead of N×M
+    dict lookups.
+    """
+
+    def __init__(self, patterns: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the RuleEngine.
+
+        Args:
+            patterns (list, optional): Stored patterns ({"name", "description", "conditions"}).
+                                       Patterns that fail to compile are skipped with an error log.
+        """
+        self.rules: List[CompiledRule] = []
+
+        for pattern in patterns or []:
+            name = pattern.get("name", "unnamed")
+            try:
+                predicate = compile_conditions(pattern.get("conditions", {}))
+            except RuleCompileError as e:
+                logger.error(f"Skipping custom pattern '{name}': {e}")
+                continue
+            self.rules.append(CompiledRule(name, pattern.get("description", ""), pattern.get("conditions", {}), predicate))
+
+        logger.info(f"Compiled {len(self.rules)} custom pattern rule(s)")
+
+    @classmethod
+    def from_trainer(cls, trainer) -> "RuleEngine":
+        """
+        Build a rule engine from the patterns stored by a ModelTrainer.
+
+        Args:
+            trainer (ModelTrainer): Pattern store.
+
+        Returns:
+            RuleEngine: New rule engine.
+        """
+        return cls(trainer.get_patterns())
+
+    @property
+    def fields(self) -> List[str]:
+        """
+        Metrics referenced by any compiled rule.
+        """
+        return sorted({field for rule in self.rules for field in rule.fields})
+
+    def evaluate(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Evaluate every rule against a batch of metric columns.
+
+        Args:
+            columns (dict): Metric columns as built by build_metric_columns().
+
+        Returns:
+            np.ndarray: Boolean matrix of shape (rules, wallets).
+        """
+        count = len(next(iter(columns.values()))) if columns else 0
+        matches = np.zeros((len(self.rules), count), dtype=bool)
+
+        for row, rule in enumerate(self.rules):
+            matches[row] = rule.predicate(columns)
+
+        return matches
+
+    def match(self, wallet_analyses: Sequence[Mapping[str, Any]]) -> List[List[Dict[str, str]]]:
+        """
+        Return the matching custom patterns of each wallet.
+
+        Args:
+            wallet_analyses (list): WalletAnalysis objects or analysis dicts.
+
+        Returns:
+            list: Per wallet, a list of {"name", "description"} pattern dicts.
+        """
+        results: List[List[Dict[str, str]]] = [[] for _ in wallet_analyses]
+        if not self.rules or not wallet_analyses:
+            return results
+
+        matches = self.evaluate(build_metric_columns(wallet_analyses))
+
+        # Only walk the hits, not the full matrix
+        for row, wallet_index in zip(*np.nonzero(matches)):
+            rule = self.rules[row]
+            results[wallet_index].append({"name": rule.name, "description": rule.description})
+
+        return results
+
+
+def _compile_field(field: str, spec: Any) -> Predicate:
+    """
+    Compile the condition(s) on a single metric.
+    """
+    if field not in METRIC_FIELDS:
+        raise RuleCompileError(f"Unknown metric '{field}' (known: {', '.join(sorted(METRIC_FIELDS))})")
+
+    if isinstance(spec, dict):
+        return _all([_compare(field, op, value) for op, value in spec.items()], f"no comparison for '{field}'")
+
+    if isinstance(spec, (list, tuple)):
+        return _compare(field, "in", list(spec))
+
+    if isinstance(spec, str):
+        text = spec.strip()
+        for op in _OPERATORS:
+            if text.startswith(op):
+                return _compare(field, op, text[len(op):].strip())
+        return _compare(field, "==", text)
+
+    return _compare(field, "==", spec)
+
+
+def _compare(field: str, op: str, value: Any) -> Predicate:
+    """
+    Compile one comparison of a metric against a constant.
+    """
+    kind = METRIC_FIELDS[field]
+
+    if op != "in" and op not in _OPERATORS:
+        raise RuleCompileError(f"Unknown operator '{op}' for '{field}'")
+    if kind == "category" and op not in _CATEGORY_OPERATORS:
+        raise RuleCompileError(f"Operator '{op}' is not supported for categorical metric '{field}'")
+
+    if op == "in":
+        constants = [_coerce(field, kind, v) for v in _as_list(value)]
+        return lambda columns: np.isin(columns[field], constants)
+
+    constant = _coerce(field, kind, value)
+    compare = _OPERATORS[op]
+    return lambda columns: compare(columns[field], constant)
+
+
+def _coerce(field: str, kind: str, value: Any) -> Any:
+    """
+    Convert a stored constant (often a CLI string) to the metric's type.
+    """
+    if kind == "category":
+        return str(value)
+
+    if kind == "bool":
+        if isinstance(value, str):
+            lowered = value.strip().lower()
+            if lowered in ("true", "yes", "1"):
+                return True
+            if lowered in ("false", "no", "0"):
+                return False
+            raise RuleCompileError(f"Expected true/false for '{field}', got '{value}'")
+        return bool(value)
+
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+
+    # Durations such as "30m" or "7d" → seconds
+    if isinstance(value, str) and value[-1:].lower() in _DURATIONS:
+        try:
+            return float(value[:-1]) * _DURATIONS[value[-1].lower()]
+        except ValueError:
+            pass
+
+    raise RuleCompileError(f"Expected a number for '{field}', got '{value}'")
+
+
+def _as_list(value: Any) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+
+def _all(predicates: List[Predicate], empty_message: str) -> Predicate:
+    if not predicates:
+        raise RuleCompileError(empty_message)
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def predicate(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        result = predicates[0](columns)
+        for other in predicates[1:]:
+            result = result & other(columns)
+        return result
+
+    return predicate
+
+
+def _any(predicates: List[Predicate]) -> Predicate:
+    if not predicates:
+        raise RuleCompileError("empty 'any' list")
+    if len(predicates) == 1:
+        return predicates[0]
+
+    def predicate(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        result = predicates[0](columns)
+        for other in predicates[1:]:
+            result = result | other(columns)
+        return result
+
+    return predicate
+
+
+def _not(inner: Predicate) -> Predicate:
+    return lambda columns: ~inner(columns)
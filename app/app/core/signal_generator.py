@@ -1,8 +1,18 @@
 import logging
 import random
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
 
 from app.core.ai_engine import AIEngine
+from app.core.comment_worker import CommentWorker
+from app.core.pattern_detector import PatternDetector
+from app.core.tracing import traced
+from app.core.wallet_analysis import known_empty
+from app.core.wallet_metrics import WalletMetrics
+
+# Signal types of the batch API
+SIGNAL_TYPES = ("HOLD", "BUY", "AVOID")
 
 logger = logging.getLogger("signalforge")
 
@@ -13,22 +23,48 @@ class SignalGenerator:
     based on wallet analysis and detected patterns.
     """
 
-    def __init__(self, ai_engine: Optional[AIEngine] = None):
+    # Analysis fields generate_signal() reads besides the patterns (incl. the AI prompt)
+    INPUT_FIELDS = ("wallet", "tokens_held", "transaction_count")
+
+    def __init__(self, ai_engine: Optional[AIEngine] = None, comment_worker: Optional[CommentWorker] = None):
         """
         Initialize SignalGenerator.
 
         Args:
             ai_engine (AIEngine, optional): AI Engine instance for comment generation.
+            comment_worker (CommentWorker, optional): Generates comments under a deadline / in the background.
         """
         self.ai_engine = ai_engine
+        self.comment_worker = comment_worker
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], db=None) -> "SignalGenerator":
+        """
+        Build a generator with the AI engine and commentary mode from the config.
+
+        Args:
+            config (dict): Loaded configuration settings.
+            db (Database, optional): SQLite database for the AI comment cache.
+
+        Returns:
+            SignalGenerator: New generator (without AI if no API key is configured).
+        """
+        ai_engine = AIEngine.from_config(config, db)
+        return cls(ai_engine, CommentWorker.from_config(ai_engine, config.get("ai_comments")))
 
-    def generate_signal(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @traced("generator.generate_signal", attributes=lambda self, wallet_analysis, *a, **k: {"wallet": wallet_analysis.get("wallet")})
+    def generate_signal(self, wallet_analysis: Dict[str, Any], patterns: List[Dict[str, Any]],
+                        on_comment: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
         """
         Generate a trading signal based on provided wallet analysis and detected patterns.
 
+        With a background CommentWorker the signal is returned right away with
+        ai_comment "pending"; the final comment is passed to on_comment later.
+
         Args:
             wallet_analysis (dict): Analysis result for a wallet.
             patterns (list): List of detected patterns.
+            on_comment (callable, optional): Receives the final AI comment in background mode.
 
         Returns:
             dict: Final trading signal object with all data.
@@ -39,23 +75,22 @@ class SignalGenerator:
         # Default values
         signal_type = "HOLD"
         confidence = 0.3
-        reason = "No significant patterns detected."
 
         # Basic rule: If patterns detected → BUY signal
         if patterns:
             signal_type = "BUY"
             confidence = min(0.5 + (len(patterns) * 0.1), 0.95)
-            reason = f"{len(patterns)} pattern(s) detected: {', '.join([p['name'] for p in patterns])}"
 
-        # Additional rule: If empty wallet → suggest AVOID instead of HOLD
-        if wallet_analysis.get("tokens_held", 0) == 0 and wallet_analysis.get("transaction_count", 0) == 0:
+        # Additional rule: If empty wallet → suggest AVOID instead of HOLD (not if the data was never fetched)
+        if known_empty(wallet_analysis):
             signal_type = "AVOID"
             confidence = 0.1
-            reason = "Empty wallet detected. No holdings or activity."
 
         # Optional AI generated comment
         ai_comment = None
-        if self.ai_engine:
+        if self.comment_worker is not None:
+            ai_comment = self.comment_worker.comment(wallet_analysis, patterns, on_comment)
+        elif self.ai_engine:
             ai_comment = self.ai_engine.generate_comment(wallet_analysis, patterns)
             logger.info("AI comment generated.")
 
@@ -64,10 +99,93 @@ class SignalGenerator:
             "wallet": wallet_analysis.get("wallet"),
             "signal": signal_type,  # BUY / HOLD / AVOID
             "confidence": round(confidence, 2),  # Confidence between 0.1 - 0.95
-            "reason": reason,  # Explanation why signal was generated
+            "reason": self._reason(signal_type, patterns),  # Explanation why signal was generated
             "ai_comment": ai_comment or "No AI comment available."  # AI explanation or fallback text
         }
 
         logger.info(f"Signal generated successfully: {signal}")
 
         return signal
+
+    def generate_signals(self, wallet_analyses: List[Dict[str, Any]], patterns_list: List[List[Dict[str, Any]]],
+                         metrics: Optional[WalletMetrics] = None,
+                         pattern_masks: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        """
+        Generate the signals of a sweep: rules in one vectorized pass
+        (generate_signals_batch()), AI comments in batched requests.
+
+        Args:
+            wallet_analyses (list): Analysis result per wallet.
+            patterns_list (list): Detected patterns per wallet.
+            metrics (WalletMetrics, optional): Columnar form of the analyses; built if None.
+            pattern_masks (np.ndarray, optional): Bitmasks from PatternDetector.detect_patterns_batch();
+                                                  derived from the pattern counts if None.
+
+        Returns:
+            list: One signal per wallet, in input order.
+        """
+        if metrics is None:
+            metrics = WalletMetrics.from_analyses(wallet_analyses)
+        if pattern_masks is None:
+            # Only the number of patterns enters the rules
+            pattern_masks = np.array([(1 << len(patterns)) - 1 for patterns in patterns_list], dtype=np.uint64)
+
+        signal_types, confidences = self.generate_signals_batch(metrics, pattern_masks)
+
+        comments = [None] * len(wallet_analyses)
+        if self.ai_engine:
+            comments = self.ai_engine.generate_comments(list(zip(wallet_analyses, patterns_list)))
+
+        signals = []
+        for index, (wallet_analysis, patterns) in enumerate(zip(wallet_analyses, patterns_list)):
+            signal_type = str(signal_types[index])
+            signals.append({
+                "wallet": wallet_analysis.get("wallet"),
+                "signal": signal_type,
+                "confidence": float(confidences[index]),
+                "reason": self._reason(signal_type, patterns),
+                "ai_comment": comments[index] or "No AI comment available."
+            })
+
+        logger.info(f"Generated {len(signals)} signal(s) for a sweep")
+        return signals
+
+    def generate_signals_batch(self, metrics: WalletMetrics, pattern_masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Generate signal types and confidences for many wallets in one vectorized pass.
+
+        Applies the same rules as generate_signal(); reasons and AI comments are
+        left to the per-wallet path.
+
+        Args:
+            metrics (WalletMetrics): Columnar wallet metrics.
+            pattern_masks (np.ndarray): Bitmasks from PatternDetector.detect_patterns_batch().
+
+        Returns:
+            tuple: (signal types as a str array of SIGNAL_TYPES, confidences as a float array)
+        """
+        pattern_counts = PatternDetector.count_patterns(pattern_masks)
+
+        # Default → HOLD, patterns detected → BUY
+        codes = np.where(pattern_counts > 0, SIGNAL_TYPES.index("BUY"), SIGNAL_TYPES.index("HOLD")).astype(np.int8)
+        confidences = np.where(pattern_counts > 0, np.minimum(0.5 + pattern_counts * 0.1, 0.95), 0.3)
+
+        # Empty wallet → AVOID
+        empty = metrics.empty
+        codes[empty] = SIGNAL_TYPES.index("AVOID")
+        confidences[empty] = 0.1
+
+        logger.info(f"Generated {len(metrics)} signal(s) in batch")
+
+        return np.asarray(SIGNAL_TYPES)[codes], np.round(confidences, 2)
+
+    @staticmethod
+    def _reason(signal_type: str, patterns: List[Dict[str, Any]]) -> str:
+        """
+        Explanation of a signal type and its patterns.
+        """
+        if signal_type == "AVOID":
+            return "Empty wallet detected. No holdings or activity."
+        if patterns:
+            return f"{len(patterns)} pattern(s) detected: {', '.join([p['name'] for p in patterns])}"
+        return "No significant patterns detected."
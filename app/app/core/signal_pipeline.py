@@ -0,0 +1,437 @@
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.data_collector import DataCollector
+from app.core.metrics import MetricFamily, MetricsRegistry
+from app.core.model_trainer import ModelTrainer
+from app.core.pattern_detector import PatternDetector
+from app.core.risk_assessor import RiskAssessor
+from app.core.risk_population import RiskPopulation
+from app.core.rule_engine import RuleEngine
+from app.core.signal_generator import SignalGenerator
+from app.core.stage_graph import Stage, StageError, StageGraph
+from app.core.tracing import Tracer
+from app.core.transaction_history import TransactionHistory
+from app.core.wallet_analysis import WalletAnalysis
+from app.core.wallet_metrics import WalletMetrics
+from app.core.wallet_scanner import WalletScanner
+from app.core.wallet_state import WalletStateTracker
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class SignalPipeline:
+    """
+    SignalPipeline wires the collector, scanner, detector, generator,
+    assessor and state tracker together once, so every scan and signal
+    reuses the same connection pools, caches, transaction history,
+    activity windows and risk population.
+
+    Deriving a signal runs as a stage graph: pattern detection first,
+    then signal generation and risk scoring concurrently, each with the
+    timeout and error policy from the "stages" config section.
+
+    It is safe to share across threads (FastAPI's threadpool, CLI
+    workers) and event loops: scans run on the transport loop, and the
+    custom rules are swapped atomically when the pattern memory changes.
+    """
+
+    def __init__(self, config: Dict[str, Any], db=None, trainer: Optional[ModelTrainer] = None):
+        """
+        Build all pipeline components from the config.
+
+        Args:
+            config (dict): Loaded configuration settings.
+            db (Database, optional): Database for history, wallet state, AI comments and sketches.
+            trainer (ModelTrainer, optional): Source of custom patterns. Defaults to the pattern memory file.
+        """
+        self.config = config
+        self.db = db
+        self.trainer = trainer or ModelTrainer()
+        self.tracer = Tracer.configure(config.get("tracing"))
+        self.metrics = MetricsRegistry.configure(config.get("metrics"))
+
+        scanner_config = config.get("scanner", {})
+
+        self.collector = DataCollector(
+            coingecko_api=config["coingecko_api"],
+            rpc_url=config["rpc_url"],
+            config=config
+        )
+        self.history = TransactionHistory.from_config(self.collector, db, config.get("history_sync"))
+        self.scanner = WalletScanner(
+            self.collector,
+            self.history,
+            deadline=scanner_config.get("deadline_seconds", 20),
+            concurrency=scanner_config.get("concurrency", 50)
+        )
+        self.generator = SignalGenerator.from_config(config, db)
+        self.assessor = RiskAssessor(config, RiskPopulation.from_config(db, config.get("risk_population")))
+        self.track_state = config.get("wallet_state", {}).get("enabled", True)
+        self.sweep_size = max(1, config.get("ai_comments", {}).get("sweep_size", 100))
+        self.signal_graph = self._build_signal_graph(config.get("stages", {}))
+
+        # Custom rules (detector + tracker) are rebuilt when the pattern memory changes
+        self._lock = threading.Lock()
+        self._rules_version = None
+        self._detector: Optional[PatternDetector] = None
+        self._tracker: Optional[WalletStateTracker] = None
+        self.reload_rules()
+
+        # Cache, queue and stage state is read when /metrics is scraped
+        self.metrics.register_collector("pipeline", self._collect_metrics)
+
+    @property
+    def detector(self) -> PatternDetector:
+        """
+        Pattern detector with the current custom rules.
+        """
+        return self._rules()[0]
+
+    @property
+    def tracker(self) -> Optional[WalletStateTracker]:
+        """
+        Wallet state tracker (None if wallet_state is disabled).
+        """
+        return self._rules()[1]
+
+    def scan(self, wallet_address: str) -> WalletAnalysis:
+        """
+        Analyze a wallet.
+
+        Args:
+            wallet_address (str): Wallet address.
+
+        Returns:
+            WalletAnalysis: Analysis result.
+        """
+        return self.scanner.analyze_wallet(wallet_address)
+
+    async def scan_async(self, wallet_address: str) -> WalletAnalysis:
+        """
+        Analyze a wallet from any event loop (runs on the transport loop).
+
+        Args:
+            wallet_address (str): Wallet address.
+
+        Returns:
+            WalletAnalysis: Analysis result.
+        """
+        return await self.collector.transport.run_on_loop(self.scanner.analyze_wallet_async(wallet_address))
+
+    def scan_many(self, wallet_addresses: Iterable[str], concurrency: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze many wallets with bounded concurrency (see WalletScanner.analyze_wallets()).
+
+        Args:
+            wallet_addresses (iterable): Wallet addresses.
+            concurrency (int, optional): Wallets analyzed at once.
+
+        Returns:
+            iterator: Result entries in completion order.
+        """
+        return self.scanner.analyze_wallets(wallet_addresses, concurrency=concurrency)
+
+    def signal_many(self, wallet_addresses: Iterable[str], concurrency: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze many wallets and return their signals.
+
+        Scanned wallets are evaluated in sweeps of ai_comments.sweep_size: with
+        wallet_state enabled only wallets whose inputs changed are re-derived,
+        in columnar passes (WalletMetrics) with their AI comments fetched in
+        batched requests.
+
+        Args:
+            wallet_addresses (iterable): Wallet addresses.
+            concurrency (int, optional): Wallets analyzed at once.
+
+        Returns:
+            iterator: {"index", "wallet", "signal", "recomputed", "error"} per wallet, in completion order.
+        """
+        sweep: List[Dict[str, Any]] = []
+
+        for result in self.scan_many(wallet_addresses, concurrency=concurrency):
+            if result["error"]:
+                yield {"index": result["index"], "wallet": result["wallet"], "signal": None,
+                       "recomputed": False, "error": result["error"]}
+                continue
+
+            sweep.append(result)
+            if len(sweep) >= self.sweep_size:
+                yield from self._signal_sweep(sweep)
+                sweep = []
+
+        if sweep:
+            yield from self._signal_sweep(sweep)
+
+    def signal(self, wallet_address: str,
+               on_comment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Analyze a wallet and return its signal.
+
+        Args:
+            wallet_address (str): Wallet address.
+            on_comment (callable, optional): Receives the signal once a background AI comment arrived.
+
+        Returns:
+            tuple: (signal incl. risk_score, True if it was recomputed / False if reused)
+        """
+        with Tracer.shared().span("pipeline.signal", wallet=wallet_address) as span:
+            signal, recomputed = self.evaluate(self.scan(wallet_address), on_comment)
+            if span is not None:
+                span.set_attribute("recomputed", recomputed)
+            return signal, recomputed
+
+    def evaluate(self, wallet_analysis: WalletAnalysis,
+                 on_comment: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Detect patterns, generate the signal and score its risk for an analysis.
+
+        With wallet_state enabled this only recomputes when an input changed.
+
+        Args:
+            wallet_analysis (WalletAnalysis): Analysis result.
+            on_comment (callable, optional): Receives the signal once a background AI comment arrived.
+
+        Returns:
+            tuple: (signal incl. risk_score, True if it was recomputed / False if reused)
+        """
+        detector, tracker = self._rules()
+
+        def compute(analysis, attach_comment, observe=True):
+            return self._compute_signal(detector, analysis, attach_comment, observe)
+
+        if tracker is not None:
+            return tracker.evaluate(wallet_analysis, on_comment, compute)
+
+        # Background comments are only handed out once the signal is complete
+        ready = threading.Event()
+
+        def attach_comment(comment: str) -> None:
+            ready.wait()
+            if on_comment is not None:
+                on_comment(dict(signal, ai_comment=comment))
+
+        try:
+            signal = compute(wallet_analysis, attach_comment)
+        finally:
+            ready.set()
+
+        return signal, True
+
+    def stored_signal(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Last signal stored for a wallet (incl. a background AI comment).
+
+        Args:
+            wallet_address (str): Wallet address.
+
+        Returns:
+            dict or None: Stored signal, or None if never evaluated / state tracking disabled.
+        """
+        tracker = self.tracker
+        state = tracker.get_state(wallet_address) if tracker is not None else None
+        return state.get("signal") if state else None
+
+    def add_pattern(self, name: str, description: str, conditions: Dict[str, Any]) -> None:
+        """
+        Store a new custom pattern and apply it to the following signals.
+
+        Args:
+            name (str): Pattern name.
+            description (str): Pattern description.
+            conditions (dict): Pattern conditions (see rule_engine.compile_conditions).
+
+        Raises:
+            DuplicatePatternError: If a pattern with this name already exists.
+            RuleCompileError: If the conditions cannot be compiled.
+        """
+        with self._lock:
+            self.trainer.add_pattern(name, description, conditions)
+        self.reload_rules()
+
+    def reload_rules(self) -> None:
+        """
+        Rebuild the detector and state tracker from the current custom patterns.
+        """
+        with self._lock:
+            self._rules_version = self._patterns_version()
+            self.trainer.reload()
+
+            detector = PatternDetector(self.config, RuleEngine.from_trainer(self.trainer))
+            if self._tracker is not None:
+                self._tracker.set_detector(detector)
+            elif self.track_state:
+                self._tracker = WalletStateTracker(detector, self.generator, self.assessor, self.db)
+            self._detector = detector
+
+        logger.info(f"Signal pipeline rules loaded ({len(self.trainer.get_patterns())} custom pattern(s)).")
+
+    def close(self, wait_for_comments: bool = True) -> None:
+        """
+        Persist the risk population and stop the AI comment worker.
+
+        Args:
+            wait_for_comments (bool): Deliver pending background AI comments first.
+        """
+        if self.assessor.population is not None:
+            self.assessor.population.flush()
+
+        worker = self.generator.comment_worker
+        if worker is not None:
+            if wait_for_comments:
+                worker.wait()
+            worker.close()
+
+        self.signal_graph.close()
+        self.tracer.close()
+        self.metrics.unregister_collector("pipeline")
+
+    def _build_signal_graph(self, stages_config: Dict[str, Any]) -> StageGraph:
+        """
+        detect → (generate ∥ risk); a failing risk stage falls back to an unscored signal.
+        """
+        stages = [
+            Stage("detect", lambda r: r["detector"].detect_patterns(r["analysis"]),
+                  depends=("detector", "analysis"), timeout=5.0),
+            Stage("generate", lambda r: self.generator.generate_signal(r["analysis"], r["detect"], r["on_comment"]),
+                  depends=("analysis", "detect", "on_comment"), timeout=10.0),
+            Stage("risk", lambda r: self.assessor.assess(r["analysis"], r["detect"], r["observe"]),
+                  depends=("analysis", "detect", "observe"), timeout=5.0, on_error="fallback", fallback={"risk_score": None})
+        ]
+        return StageGraph(
+            [stage.configured(stages_config.get(stage.name)) for stage in stages],
+            max_workers=stages_config.get("max_workers", 64),
+            queue_timeout=stages_config.get("queue_timeout_seconds", 10.0)
+        )
+
+    def _compute_signal(self, detector: PatternDetector, wallet_analysis: WalletAnalysis,
+                        on_comment: Callable[[str], None], observe: bool = True) -> Dict[str, Any]:
+        """
+        Run the signal stage graph for one analysis and merge its results.
+        """
+        run = self.signal_graph.run({"detector": detector, "analysis": wallet_analysis, "on_comment": on_comment,
+                                     "observe": observe})
+
+        if "generate" not in run.results:
+            raise StageError("generate", run.errors.get("generate") or RuntimeError(run.status.get("generate")))
+
+        signal = dict(run["generate"])
+        signal.update(run.get("risk") or {})
+
+        logger.debug(f"Signal stages for {wallet_analysis.get('wallet')}: "
+                     + ", ".join(f"{name} {run.status[name]} ({run.durations.get(name, 0.0) * 1000:.1f}ms)"
+                                 for name in self.signal_graph.order))
+        return signal
+
+    def _signal_sweep(self, results: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluate the scanned wallets of one sweep; a failing sweep is reported per wallet.
+        """
+        detector, tracker = self._rules()
+        analyses = [result["analysis"] for result in results]
+
+        def compute_many(wallet_analyses, observe):
+            return self._compute_signals(detector, wallet_analyses, observe)
+
+        try:
+            if tracker is not None:
+                evaluated = tracker.evaluate_many(analyses, compute_many)
+            else:
+                evaluated = [(signal, True) for signal in compute_many(analyses, [True] * len(analyses))]
+        except Exception as e:
+            logger.error(f"Signal sweep of {len(results)} wallet(s) failed: {e}")
+            evaluated = [(None, False)] * len(results)
+            error = str(e)
+        else:
+            error = None
+
+        for result, (signal, recomputed) in zip(results, evaluated):
+            yield {"index": result["index"], "wallet": result["wallet"], "signal": signal,
+                   "recomputed": recomputed, "error": error}
+
+    def _compute_signals(self, detector: PatternDetector, wallet_analyses: List[WalletAnalysis],
+                         observe: List[bool]) -> List[Dict[str, Any]]:
+        """
+        Detect patterns, generate the signals and score their risk in columnar passes
+        (AI comments in batched requests).
+        """
+        metrics = WalletMetrics.from_analyses(wallet_analyses)
+        pattern_masks = detector.detect_patterns_batch(metrics)
+        patterns_list = [[{"name": name} for name in detector.decode_patterns(mask)] for mask in pattern_masks]
+
+        signals = self.generator.generate_signals(wallet_analyses, patterns_list, metrics, pattern_masks)
+        for signal, risk in zip(signals, self.assessor.assess_batch(metrics, pattern_masks, np.asarray(observe))):
+            signal.update(risk)
+
+        return signals
+
+    def _collect_metrics(self) -> List[MetricFamily]:
+        """
+        Scrape-time metrics: cache lookups and hit ratios, queue depths,
+        RPC endpoint health and traced span latencies.
+        """
+        collector = self.collector.async_collector
+
+        # Lookups per cache by result; every result but "miss" was served from the cache
+        caches = {"price": {"hit": collector.price_service.hits, "stale_hit": collector.price_service.stale_hits,
+                            "miss": collector.price_service.misses}}
+        if collector.cache is not None:
+            caches["rpc"] = {"hit": collector.cache.hits, "miss": collector.cache.misses}
+        ai_cache = self.generator.ai_engine.cache if self.generator.ai_engine is not None else None
+        if ai_cache is not None:
+            stats = ai_cache.stats()
+            caches["ai_comment"] = {"hit": stats["hits"], "db_hit": stats["db_hits"], "miss": stats["misses"]}
+
+        lookups = MetricFamily("signalforge_cache_lookups_total", "counter", "Cache lookups by cache and result.")
+        ratios = MetricFamily("signalforge_cache_hit_ratio", "gauge", "Share of cache lookups served from the cache.")
+        for cache, results in caches.items():
+            for result, count in results.items():
+                lookups.add(count, cache=cache, result=result)
+            total = sum(results.values())
+            ratios.add((total - results["miss"]) / total if total else 0.0, cache=cache)
+
+        worker = self.generator.comment_worker
+        queues = MetricFamily("signalforge_queue_depth", "gauge", "Work waiting in internal queues.")
+        queues.add(collector.batcher.queue_depth, queue="rpc_batch")
+        queues.add(collector.price_service.queue_depth, queue="price_batch")
+        queues.add(worker.queue_depth if worker is not None else 0, queue="ai_comments")
+
+        healthy = MetricFamily("signalforge_rpc_endpoint_healthy", "gauge", "Whether an RPC endpoint is routable.")
+        error_rate = MetricFamily("signalforge_rpc_endpoint_error_rate", "gauge", "Error rate EWMA per RPC endpoint.")
+        for endpoint in collector.rpc_pool.stats():
+            healthy.add(int(endpoint["healthy"]), endpoint=endpoint["url"])
+            error_rate.add(endpoint["error_rate"], endpoint=endpoint["url"])
+
+        spans = MetricFamily("signalforge_span_duration_seconds", "summary", "Wall time of traced spans.")
+        for name, histogram in sorted(self.tracer.histograms().items()):
+            for quantile in (0.5, 0.9, 0.99):
+                spans.add(histogram.percentile(quantile * 100), span=name, quantile=quantile)
+            spans.add(histogram.total / 1_000_000, "_sum", span=name)
+            spans.add(histogram.count, "_count", span=name)
+
+        return [lookups, ratios, queues, healthy, error_rate, spans]
+
+    def _rules(self) -> Tuple[PatternDetector, Optional[WalletStateTracker]]:
+        """
+        Current (detector, tracker); reloaded first if the pattern memory changed on disk.
+        """
+        if self._patterns_version() != self._rules_version:
+            self.reload_rules()
+
+        with self._lock:
+            return self._detector, self._tracker
+
+    def _patterns_version(self) -> Optional[int]:
+        """
+        Modification time of the pattern memory file (None if it does not exist).
+        """
+        try:
+            return os.stat(self.trainer.storage_path).st_mtime_ns
+        except OSError:
+            return None
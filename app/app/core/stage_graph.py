@@ -0,0 +1,312 @@
+import contextvars
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from app.core.tracing import Tracer
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# What happens when a stage raises or times out:
+#   fail     → abort the run with StageError
+#   continue → record the error, skip the stages depending on it
+#   fallback → use the stage's fallback value and carry on
+ERROR_POLICIES = ("fail", "continue", "fallback")
+
+
+class StageGraphError(ValueError):
+    """
+    Raised for an invalid stage graph (unknown dependency, cycle, bad policy).
+    """
+
+
+class StageError(RuntimeError):
+    """
+    Raised when a stage with the "fail" policy raises or times out.
+    """
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"Stage {stage} failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class Stage:
+    """
+    Stage is one step of a StageGraph: a callable receiving the results
+    of the stages (and run inputs) it depends on.
+    """
+
+    __slots__ = ("name", "func", "depends", "timeout", "on_error", "fallback")
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], depends: Sequence[str] = (),
+                 timeout: Optional[float] = None, on_error: str = "fail", fallback: Any = None):
+        """
+        Initialize a Stage.
+
+        Args:
+            name (str): Unique stage name; its result is passed on under this name.
+            func (callable): Receives {dependency name: result} and returns the stage result.
+            depends (list): Names of the stages / run inputs this stage needs.
+            timeout (float, optional): Seconds before the stage counts as failed (None → no limit).
+            on_error (str): One of ERROR_POLICIES.
+            fallback: Result used by the "fallback" policy.
+        """
+        if on_error not in ERROR_POLICIES:
+            raise StageGraphError(f"Stage {name}: unknown error policy {on_error!r}")
+
+        self.name = name
+        self.func = func
+        self.depends = tuple(depends)
+        self.timeout = timeout
+        self.on_error = on_error
+        self.fallback = fallback
+
+    def configured(self, stage_config: Optional[Mapping[str, Any]]) -> "Stage":
+        """
+        Apply timeout_seconds / on_error overrides from a config section.
+
+        Args:
+            stage_config (dict, optional): Stage settings.
+
+        Returns:
+            Stage: This stage.
+        """
+        stage_config = stage_config or {}
+        on_error = stage_config.get("on_error", self.on_error)
+        if on_error not in ERROR_POLICIES:
+            raise StageGraphError(f"Stage {self.name}: unknown error policy {on_error!r}")
+
+        self.timeout = stage_config.get("timeout_seconds", self.timeout)
+        self.on_error = on_error
+        return self
+
+
+class StageRun:
+    """
+    StageRun is the outcome of one StageGraph.run(): results, status,
+    errors and duration per stage.
+    """
+
+    __slots__ = ("results", "status", "errors", "durations")
+
+    def __init__(self):
+        self.results: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self.durations: Dict[str, float] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.results.get(name, default)
+
+
+class StageGraph:
+    """
+    StageGraph runs stages as a DAG: every stage starts as soon as the
+    stages it depends on are done, so independent stages run concurrently
+    on a shared thread pool. Each stage has its own timeout and error
+    policy; stages downstream of a failed stage are skipped.
+
+    A stage's timeout counts from the moment a worker starts it, not from
+    when it was queued, so a busy pool shared by many runs delays stages
+    instead of timing them out. Waiting for a worker is bounded separately
+    by queue_timeout. A timed-out stage is abandoned, not interrupted: its
+    thread finishes in the background and its result is discarded.
+    """
+
+    def __init__(self, stages: Iterable[Stage], max_workers: int = 4, queue_timeout: Optional[float] = 10.0):
+        """
+        Initialize and validate the graph.
+
+        Args:
+            stages (list): Stages in any order.
+            max_workers (int): Upper bound on stage threads shared by all runs (created on demand).
+            queue_timeout (float, optional): Seconds a stage may wait for a free worker (e.g. while
+                                             abandoned stages hold the pool) before it is cancelled
+                                             and counts as timed out (None → no limit).
+
+        Raises:
+            StageGraphError: On duplicate names or dependency cycles.
+        """
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise StageGraphError(f"Duplicate stage {stage.name}")
+            self.stages[stage.name] = stage
+
+        self.order = self._topological_order()
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="signalforge-stage")
+
+    @property
+    def inputs(self) -> List[str]:
+        """
+        Names the stages depend on that are not stages themselves (run inputs).
+        """
+        return sorted({dep for stage in self.stages.values() for dep in stage.depends if dep not in self.stages})
+
+    def run(self, inputs: Optional[Mapping[str, Any]] = None) -> StageRun:
+        """
+        Run every stage once.
+
+        Args:
+            inputs (dict, optional): Run inputs referenced in stage dependencies.
+
+        Returns:
+            StageRun: Results, status ("ok", "fallback", "failed", "timeout", "skipped"), errors, durations.
+
+        Raises:
+            StageGraphError: If a run input is missing.
+            StageError: If a stage with the "fail" policy raises or times out.
+        """
+        inputs = dict(inputs or {})
+        missing = [name for name in self.inputs if name not in inputs]
+        if missing:
+            raise StageGraphError(f"Missing stage graph input(s): {', '.join(missing)}")
+
+        run = StageRun()
+        available = dict(inputs)
+        pending = list(self.order)
+        running: Dict[Future, str] = {}
+        submitted: Dict[str, float] = {}
+        started: Dict[str, float] = {}   # Set by the worker when the stage begins executing
+
+        while pending or running:
+            # Start / skip every stage whose dependencies are settled
+            for name in list(pending):
+                stage = self.stages[name]
+                if any(dep in self.stages and dep not in run.status for dep in stage.depends):
+                    continue
+                pending.remove(name)
+
+                blocked = [dep for dep in stage.depends if dep in self.stages and dep not in available]
+                if blocked:
+                    run.status[name] = "skipped"
+                    logger.warning(f"Stage {name} skipped: {', '.join(blocked)} did not complete")
+                    continue
+
+                args = {dep: available[dep] for dep in stage.depends}
+
+                # Run in a copy of the caller's context → stage spans nest under the caller's span
+                context = contextvars.copy_context()
+                running[self._executor.submit(context.run, self._run_stage, stage, args, started)] = name
+                submitted[name] = time.monotonic()
+
+            if not running:
+                continue
+
+            # Wait for the next completion or the nearest deadline (timeout of a running
+            # stage, queue_timeout of a queued one)
+            now = time.monotonic()
+            deadlines = [self._deadline(name, submitted, started) for name in running.values()]
+            deadlines = [deadline for deadline in deadlines if deadline is not None]
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name = running.pop(future)
+                run.durations[name] = time.monotonic() - started.get(name, submitted[name])
+                error = future.exception()
+                if error is None:
+                    run.status[name] = "ok"
+                    run.results[name] = available[name] = future.result()
+                else:
+                    self._failed(run, available, name, error, "failed")
+
+            # Abandon stages past their timeout; a stage queued past queue_timeout
+            # (every worker busy, e.g. with abandoned stages) is cancelled unstarted
+            now = time.monotonic()
+            for future, name in list(running.items()):
+                deadline = self._deadline(name, submitted, started)
+                if deadline is None or now < deadline:
+                    continue
+
+                if name in started:
+                    error = TimeoutError(f"timed out after {self.stages[name].timeout}s")
+                elif future.cancel():
+                    error = TimeoutError(f"no free stage worker within {self.queue_timeout}s")
+                else:
+                    continue
+
+                running.pop(future)
+                run.durations[name] = now - started.get(name, submitted[name])
+                self._failed(run, available, name, error, "timeout")
+
+        return run
+
+    def close(self) -> None:
+        """
+        Stop the thread pool; abandoned stages finish in the background.
+        """
+        self._executor.shutdown(wait=False)
+
+    def _deadline(self, name: str, submitted: Dict[str, float], started: Dict[str, float]) -> Optional[float]:
+        """
+        When a stage times out: its timeout after it started, queue_timeout after it was submitted.
+        """
+        if name in started:
+            timeout = self.stages[name].timeout
+            return started[name] + timeout if timeout is not None else None
+        return submitted[name] + self.queue_timeout if self.queue_timeout is not None else None
+
+    @staticmethod
+    def _run_stage(stage: Stage, args: Dict[str, Any], started: Dict[str, float]) -> Any:
+        """
+        Run one stage inside a tracing span, recording when it started.
+        """
+        started[stage.name] = time.monotonic()
+        with Tracer.shared().span(f"stage.{stage.name}"):
+            return stage.func(args)
+
+    def _failed(self, run: StageRun, available: Dict[str, Any], name: str, error: BaseException, status: str) -> None:
+        """
+        Apply the error policy of a stage that raised or timed out.
+        """
+        stage = self.stages[name]
+        run.errors[name] = error
+
+        if stage.on_error == "fail":
+            run.status[name] = status
+            logger.error(f"Stage {name} {status}: {error}")
+            raise StageError(name, error)
+
+        if stage.on_error == "fallback":
+            run.status[name] = "fallback"
+            run.results[name] = available[name] = stage.fallback
+            logger.warning(f"Stage {name} {status}, using fallback: {error}")
+            return
+
+        run.status[name] = status
+        logger.warning(f"Stage {name} {status}, continuing without it: {error}")
+
+    def _topological_order(self) -> List[str]:
+        """
+        Stage names with every stage after its dependencies.
+
+        Raises:
+            StageGraphError: If the stages contain a cycle.
+        """
+        order: List[str] = []
+        state: Dict[str, str] = {}
+
+        def visit(name: str, path: List[str]) -> None:
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "visiting":
+                raise StageGraphError(f"Stage dependency cycle: {' → '.join(path + [name])}")
+
+            state[name] = "visiting"
+            for dep in self.stages[name].depends:
+                if dep in self.stages:
+                    visit(dep, path + [name])
+            state[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
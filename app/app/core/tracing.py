@@ -0,0 +1,487 @@
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Span currently open in this thread / task (parent of the next one)
+_CURRENT_SPAN: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("signalforge_span", default=None)
+
+
+class Span:
+    """
+    Span is one timed operation: wall and CPU time, attributes, and its
+    place in the trace (trace id, parent span id).
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "wall_seconds", "cpu_seconds",
+                 "attributes", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time()
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.attributes = dict(attributes or {})
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Attach an attribute (e.g. wallet, batch size) to the span.
+        """
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable form of the span.
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "wall_ms": round(self.wall_seconds * 1000, 3),
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error
+        }
+
+
+class LatencyHistogram:
+    """
+    LatencyHistogram is an HDR-style log-linear histogram of durations:
+    exact below 2 × 10^digits microseconds, then power-of-two magnitudes
+    split into linear sub-buckets, which bounds the relative error of any
+    percentile to about 10^-digits whatever the range. Histograms with the
+    same precision can be merged.
+    """
+
+    def __init__(self, significant_figures: int = 2):
+        """
+        Initialize an empty histogram.
+
+        Args:
+            significant_figures (int): Decimal digits of precision (1-4).
+        """
+        self.significant_figures = min(max(int(significant_figures), 1), 4)
+
+        # Smallest power of two covering 2 × 10^digits → values below it are exact
+        self._sub_bits = (2 * 10 ** self.significant_figures - 1).bit_length()
+        self._sub_count = 1 << self._sub_bits
+        self._half = self._sub_count >> 1
+
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, seconds: float) -> None:
+        """
+        Record one duration.
+
+        Args:
+            seconds (float): Duration in seconds.
+        """
+        value = max(0, int(round(seconds * 1_000_000)))
+        index = self._index(value)
+
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Duration at the given percentile.
+
+        Args:
+            p (float): Percentile (0-100).
+
+        Returns:
+            float or None: Seconds (upper bound of the matching bucket), None if empty.
+        """
+        if not self.count:
+            return None
+
+        target = max(1, int(round(p / 100.0 * self.count + 0.4999999)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    @property
+    def mean(self) -> Optional[float]:
+        """
+        Mean duration in seconds (None if empty).
+        """
+        return self.total / self.count / 1_000_000 if self.count else None
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """
+        Add the counts of another histogram with the same precision.
+
+        Args:
+            other (LatencyHistogram): Histogram to merge.
+
+        Returns:
+            LatencyHistogram: This histogram.
+        """
+        if other.significant_figures != self.significant_figures:
+            raise ValueError("Cannot merge histograms of different precision")
+
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def buckets(self) -> List[tuple]:
+        """
+        Non-empty buckets as (upper bound in seconds, count), ascending.
+        """
+        return [(self._upper(index) / 1_000_000, self.counts[index]) for index in sorted(self.counts)]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Count, mean, percentiles and max in milliseconds.
+        """
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.percentile(50)),
+            "p90_ms": ms(self.percentile(90)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(None if self.max is None else self.max / 1_000_000)
+        }
+
+    def _index(self, value: int) -> int:
+        """
+        Bucket of a value in microseconds.
+        """
+        if value < self._sub_count:
+            return value
+        magnitude = value.bit_length() - self._sub_bits
+        return self._sub_count + (magnitude - 1) * self._half + ((value >> magnitude) - self._half)
+
+    def _upper(self, index: int) -> int:
+        """
+        Largest value (microseconds) falling into a bucket.
+        """
+        if index < self._sub_count:
+            return index
+        magnitude = (index - self._sub_count) // self._half + 1
+        sub = (index - self._sub_count) % self._half + self._half
+        return ((sub + 1) << magnitude) - 1
+
+
+class InMemorySpanCollector:
+    """
+    InMemorySpanCollector keeps the most recent finished spans in process.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self._spans = deque(maxlen=max(1, max_spans))
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, name: Optional[str] = None) -> List[Span]:
+        """
+        Collected spans, oldest first (optionally only those with the given name).
+        """
+        with self._lock:
+            return [span for span in self._spans if name is None or span.name == name]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+    def close(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """
+    FileSpanExporter appends finished spans to a JSON Lines file.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line)
+                self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Tracer:
+    """
+    Tracer records spans around the pipeline's stages (collector calls,
+    wallet analysis, detection, signal generation, AI, risk, outputs),
+    aggregates their wall and CPU time into one LatencyHistogram per span
+    name, and hands finished spans to its exporters.
+
+    Spans nest through context variables, so a span opened in a request
+    is the parent of the spans of the calls it makes, also across the
+    transport loop and the stage graph's threads. CPU time is that of
+    the running thread, so async spans include interleaved tasks.
+    """
+
+    _shared: Optional["Tracer"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, enabled: bool = True, exporters: Sequence[Any] = (), significant_figures: int = 2):
+        """
+        Initialize the Tracer.
+
+        Args:
+            enabled (bool): Record spans (a disabled tracer only calls through).
+            exporters (list): Receivers of finished spans (InMemorySpanCollector, FileSpanExporter).
+            significant_figures (int): Precision of the latency histograms.
+        """
+        self.enabled = enabled
+        self.exporters = list(exporters)
+        self.significant_figures = significant_figures
+
+        self._wall: Dict[str, LatencyHistogram] = {}
+        self._cpu: Dict[str, LatencyHistogram] = {}
+        self._errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, tracing_config: Optional[Dict[str, Any]] = None) -> "Tracer":
+        """
+        Build a tracer from the "tracing" section of the config.
+
+        Args:
+            tracing_config (dict, optional): Tracing settings.
+
+        Returns:
+            Tracer: New tracer.
+        """
+        tracing_config = tracing_config or {}
+        exporter = tracing_config.get("exporter", "memory")
+
+        exporters = []
+        if exporter == "memory":
+            exporters.append(InMemorySpanCollector(tracing_config.get("max_spans", 10000)))
+        elif exporter == "file":
+            exporters.append(FileSpanExporter(tracing_config.get("file_path", "traces/spans.jsonl")))
+
+        return cls(
+            enabled=tracing_config.get("enabled", True),
+            exporters=exporters,
+            significant_figures=tracing_config.get("significant_figures", 2)
+        )
+
+    @classmethod
+    def shared(cls) -> "Tracer":
+        """
+        Return the process-wide tracer (in-memory collector until configured).
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_config()
+            return cls._shared
+
+    @classmethod
+    def configure(cls, tracing_config: Optional[Dict[str, Any]] = None) -> "Tracer":
+        """
+        Replace the process-wide tracer with one built from the config.
+
+        Args:
+            tracing_config (dict, optional): Tracing settings.
+
+        Returns:
+            Tracer: The new shared tracer.
+        """
+        tracer = cls.from_config(tracing_config)
+        with cls._shared_lock:
+            previous, cls._shared = cls._shared, tracer
+        if previous is not None:
+            previous.close()
+        return tracer
+
+    @property
+    def collector(self) -> Optional[InMemorySpanCollector]:
+        """
+        The in-memory collector, if one is configured.
+        """
+        return next((e for e in self.exporters if isinstance(e, InMemorySpanCollector)), None)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        """
+        Time the enclosed block as a span.
+
+        Args:
+            name (str): Span name (e.g. "scanner.analyze_wallet").
+            **attributes: Span attributes.
+
+        Yields:
+            Span or None: The open span (None if tracing is disabled).
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        span = Span(name, _CURRENT_SPAN.get(), attributes)
+        token = _CURRENT_SPAN.set(span)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.wall_seconds = time.perf_counter() - wall_start
+            span.cpu_seconds = max(0.0, time.thread_time() - cpu_start)
+            _CURRENT_SPAN.reset(token)
+            self._finish(span)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Latency summary per span name.
+
+        Returns:
+            dict: Span name → count, errors, wall time mean / p50 / p90 / p99 / max and CPU mean (ms).
+        """
+        with self._lock:
+            result = {}
+            for name in sorted(self._wall):
+                stats = self._wall[name].summary()
+                stats["errors"] = self._errors.get(name, 0)
+                stats["cpu_mean_ms"] = self._cpu[name].summary()["mean_ms"]
+                result[name] = stats
+            return result
+
+    def histograms(self) -> Dict[str, LatencyHistogram]:
+        """
+        Wall-time histogram per span name (copies).
+        """
+        with self._lock:
+            return {name: LatencyHistogram(h.significant_figures).merge(h) for name, h in self._wall.items()}
+
+    def error_counts(self) -> Dict[str, int]:
+        """
+        Failed spans per span name.
+        """
+        with self._lock:
+            return dict(self._errors)
+
+    def reset(self) -> None:
+        """
+        Drop the aggregated histograms (e.g. before measuring an optimization).
+        """
+        with self._lock:
+            self._wall.clear()
+            self._cpu.clear()
+            self._errors.clear()
+
+    def close(self) -> None:
+        """
+        Close the exporters.
+        """
+        for exporter in self.exporters:
+            exporter.close()
+
+    def _finish(self, span: Span) -> None:
+        """
+        Aggregate a finished span and export it.
+        """
+        with self._lock:
+            wall = self._wall.get(span.name)
+            if wall is None:
+                wall = self._wall[span.name] = LatencyHistogram(self.significant_figures)
+                self._cpu[span.name] = LatencyHistogram(self.significant_figures)
+            wall.record(span.wall_seconds)
+            self._cpu[span.name].record(span.cpu_seconds)
+            if span.error is not None:
+                self._errors[span.name] = self._errors.get(span.name, 0) + 1
+
+        for exporter in self.exporters:
+            try:
+                exporter.export(span)
+            except Exception as e:
+                logger.warning(f"Failed to export span {span.name}: {e}")
+
+
+def traced(name: str, attributes: Optional[Callable[..., Dict[str, Any]]] = None) -> Callable:
+    """
+    Decorator recording every call of a function or coroutine function as a span.
+
+    Args:
+        name (str): Span name.
+        attributes (callable, optional): Receives the call's arguments, returns span attributes.
+
+    Returns:
+        callable: Decorator.
+    """
+    def decorate(func: Callable) -> Callable:
+        def span_attributes(args, kwargs) -> Dict[str, Any]:
+            if attributes is None:
+                return {}
+            try:
+                return attributes(*args, **kwargs)
+            except Exception:
+                return {}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                tracer = Tracer.shared()
+                if not tracer.enabled:
+                    return await func(*args, **kwargs)
+                with tracer.span(name, **span_attributes(args, kwargs)):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = Tracer.shared()
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name, **span_attributes(args, kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
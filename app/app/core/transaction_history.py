@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.activity_windows import ActivityWindows
+from app.core.data_collector import DataCollector
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+
+class TransactionHistory:
+    """
+    TransactionHistory keeps a local, incrementally synced copy of each
+    wallet's transaction signatures.
+
+    A per-wallet high-water-mark signature is stored, so repeat syncs
+    only page through signatures newer than the last one seen. When a
+    sync runs out of pages before reaching the mark, the unfetched range
+    is kept as a gap (before, until) and filled by the following syncs.
+    Signatures are kept in memory and, if a Database is given, persisted
+    to SQLite so that later runs continue where the last one stopped.
+    New signatures also feed the wallet's sliding activity windows.
+    """
+
+    def __init__(self, data_collector: DataCollector, db=None, page_size: int = 1000,
+                 initial_pages: int = 1, max_pages_per_sync: int = 50, memory_limit: int = 1000,
+                 windows: Optional[ActivityWindows] = None):
+        """
+        Initialize TransactionHistory.
+
+        Args:
+            data_collector (DataCollector): Collector used for RPC paging.
+            db (Database, optional): SQLite database for persistence.
+            page_size (int): Signatures per RPC page (max 1000).
+            initial_pages (int): Pages fetched for a wallet that was never synced.
+            max_pages_per_sync (int): Upper bound of pages per incremental sync.
+            memory_limit (int): Newest signatures kept in memory per wallet.
+            windows (ActivityWindows, optional): Sliding activity windows fed with new signatures.
+        """
+        self.data_collector = data_collector
+        self.db = db
+        self.page_size = page_size
+        self.initial_pages = initial_pages
+        self.max_pages_per_sync = max_pages_per_sync
+        self.memory_limit = memory_limit
+        self.windows = windows
+
+        # wallet → newest-first signatures / high-water-mark signature / unfetched (before, until) ranges
+        self._signatures: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, Optional[str]] = {}
+        self._gaps: Dict[str, List[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, data_collector: DataCollector, db=None,
+                    history_config: Optional[Dict[str, Any]] = None) -> "TransactionHistory":
+        """
+        Build a history store from the "history_sync" section of the config.
+
+        Args:
+            data_collector (DataCollector): Collector used for RPC paging.
+            db (Database, optional): SQLite database for persistence.
+            history_config (dict, optional): History sync settings.
+
+        Returns:
+            TransactionHistory: New history store.
+        """
+        history_config = history_config or {}
+        return cls(
+            data_collector,
+            db=db,
+            page_size=history_config.get("page_size", 1000),
+            initial_pages=history_config.get("initial_pages", 1),
+            max_pages_per_sync=history_config.get("max_pages_per_sync", 50),
+            memory_limit=history_config.get("memory_limit", 1000),
+            windows=ActivityWindows() if history_config.get("activity_windows", True) else None
+        )
+
+    def last_signature(self, wallet_address: str) -> Optional[str]:
+        """
+        Return the high-water-mark signature of a wallet.
+
+        Args:
+            wallet_address (str): Wallet address.
+
+        Returns:
+            str or None: Newest synced signature, or None if never synced.
+        """
+        self._load(wallet_address)
+        return self._cursors.get(wallet_address)
+
+    async def sync_async(self, wallet_address: str) -> List[Dict[str, Any]]:
+        """
+        Fetch only the signatures newer than the wallet's high-water mark.
+
+        Args:
+            wallet_address (str): Wallet address.
+
+        Returns:
+            list: Newly seen signature objects, newest first.
+
+        Raises:
+            Exception: If paging failed; the high-water mark is left untouched.
+        """
+        await self._off_loop(self._load, wallet_address)
+        with self._lock:
+            cursor = self._cursors.get(wallet_address)
+            gaps = list(self._gaps.get(wallet_address, []))
+
+        # Never synced → only the newest pages; afterwards → everything up to the cursor
+        budget = self.max_pages_per_sync if cursor else self.initial_pages
+
+        newest, reached, pages = await self._fetch_range(wallet_address, None, cursor, budget)
+        budget -= pages
+        if cursor and not reached:
+            # Truncated → remember what lies between the last page and the old mark
+            gaps.insert(0, (newest[-1]["signature"], cursor))
+            logger.warning(f"History sync of {wallet_address} truncated after {pages} page(s); resuming next sync")
+
+        # Fill earlier gaps (newest first) with the pages left
+        filled = []
+        remaining_gaps = []
+        for before, until in gaps:
+            if budget <= 0:
+                remaining_gaps.append((before, until))
+                continue
+            older, reached, pages = await self._fetch_range(wallet_address, before, until, budget)
+            budget -= pages
+            filled.extend(older)
+            if not reached:
+                remaining_gaps.append((older[-1]["signature"], until))
+
+        new_signatures = newest + filled
+        if new_signatures or remaining_gaps != gaps:
+            await self._off_loop(self._store, wallet_address, newest, filled, remaining_gaps)
+
+        logger.info(f"Synced {len(new_signatures)} new signature(s) for {wallet_address}")
+        return new_signatures
+
+    async def recent_async(self, wallet_address: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Sync a wallet and return its newest signatures.
+
+        Args:
+            wallet_address (str): Wallet address.
+            limit (int): Max number of signatures to return.
+
+        Returns:
+            list: Newest signature objects, newest first (synced copy on RPC failure).
+        """
+        try:
+            await self.sync_async(wallet_address)
+        except Exception as e:
+            logger.warning(f"History sync failed for {wallet_address}, using stored signatures: {e}")
+
+        return await self._off_loop(self.stored, wallet_address, limit)
+
+    def activity_windows(self, wallet_address: str, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Return the sliding-window activity metrics of a wallet.
+
+        Args:
+            wallet_address (str): Wallet address.
+            now (float, optional): Reference unix time (defaults to the current time).
+
+        Returns:
+            dict: Window metrics (see activity_windows.WINDOW_METRICS).
+        """
+        self._load(wallet_address)
+
+        if self.windows is None:
+            return ActivityWindows.compute((s.get("blockTime") for s in self.stored(wallet_address)), now)
+        return self.windows.snapshot(wallet_address, now)
+
+    def sync(self, wallet_address: str) -> List[Dict[str, Any]]:
+        """
+        Sync wrapper for sync_async().
+        """
+        return self.data_collector.transport.run_sync(self.sync_async(wallet_address))
+
+    def recent(self, wallet_address: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Sync wrapper for recent_async().
+        """
+        return self.data_collector.transport.run_sync(self.recent_async(wallet_address, limit))
+
+    def stored(self, wallet_address: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Return synced signatures without contacting the RPC.
+
+        Args:
+            wallet_address (str): Wallet address.
+            limit (int, optional): Max number of signatures (None → all kept).
+
+        Returns:
+            list: Signature objects, newest first.
+        """
+        self._load(wallet_address)
+
+        # Full history beyond the in-memory window lives in SQLite
+        if self.db is not None and (limit is None or limit > self.memory_limit):
+            return self.db.load_wallet_signatures(wallet_address, limit)
+
+        with self._lock:
+            signatures = self._signatures.get(wallet_address, [])
+            return list(signatures[:limit] if limit is not None else signatures)
+
+    async def _fetch_range(self, wallet_address: str, before: Optional[str], until: Optional[str],
+                           max_pages: int) -> Tuple[List[Dict[str, Any]], bool, int]:
+        """
+        Page backwards from "before" towards "until" (both exclusive).
+
+        Returns:
+            tuple: (signatures newest first, True if "until" / the start of history was reached, pages used)
+        """
+        collector = self.data_collector.async_collector
+        signatures: List[Dict[str, Any]] = []
+        pages = 0
+
+        while pages < max_pages:
+            page = await collector.fetch_signatures_page(wallet_address, before=before, until=until,
+                                                         limit=self.page_size)
+            pages += 1
+            signatures.extend(page)
+
+            # Short page → reached the "until" cursor or the start of history
+            if len(page) < self.page_size:
+                return signatures, True, pages
+            before = page[-1]["signature"]
+
+        return signatures, False, pages
+
+    async def _off_loop(self, func, *args) -> Any:
+        """
+        Run SQLite-backed bookkeeping in a worker thread so it does not stall the transport loop.
+        """
+        if self.db is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    def _load(self, wallet_address: str) -> None:
+        """
+        Load a wallet's cursor, gaps and newest signatures from SQLite on first use.
+        """
+        with self._lock:
+            if wallet_address in self._cursors:
+                return
+
+        cursor = None
+        gaps: List[Tuple[str, str]] = []
+        signatures: List[Dict[str, Any]] = []
+        if self.db is not None:
+            cursor = self.db.get_wallet_cursor(wallet_address)
+            if cursor:
+                gaps = self.db.get_wallet_gaps(wallet_address)
+                signatures = self.db.load_wallet_signatures(wallet_address, self.memory_limit)
+
+        with self._lock:
+            first_load = wallet_address not in self._cursors
+            self._cursors.setdefault(wallet_address, cursor)
+            self._gaps.setdefault(wallet_address, gaps)
+            self._signatures.setdefault(wallet_address, signatures)
+
+        # Seed the windows once from what was persisted
+        if first_load and self.windows is not None and signatures:
+            self.windows.observe(wallet_address, (s.get("blockTime") for s in signatures))
+
+    def _store(self, wallet_address: str, newest: List[Dict[str, Any]], filled: List[Dict[str, Any]],
+               gaps: List[Tuple[str, str]]) -> None:
+        """
+        Merge new signatures, advance the cursor, record the remaining gaps and persist all three.
+
+        Args:
+            wallet_address (str): Wallet address.
+            newest (list): Signatures newer than the old high-water mark, newest first.
+            filled (list): Older signatures fetched from gaps, newest first.
+            gaps (list): Still unfetched (before, until) ranges, newest first.
+        """
+        with self._lock:
+            # Concurrent syncs of a wallet page from the same cursor → keep only signatures not stored yet
+            existing = self._signatures.get(wallet_address, [])
+            known = {s["signature"] for s in existing}
+            newest = [s for s in newest if s["signature"] not in known]
+            merged = newest + existing
+            if filled:
+                # Gap signatures belong below the ones already kept
+                known.update(s["signature"] for s in newest)
+                merged = sorted(merged + [s for s in filled if s["signature"] not in known],
+                                key=lambda s: s.get("slot") or 0, reverse=True)
+            self._signatures[wallet_address] = merged[:self.memory_limit]
+            if newest:
+                self._cursors[wallet_address] = newest[0]["signature"]
+            self._gaps[wallet_address] = gaps
+
+        if self.windows is not None:
+            if filled:
+                # Windows skip times older than the newest seen → rebuild from the merged history
+                self.windows.forget(wallet_address)
+                self.windows.observe(wallet_address, (s.get("blockTime") for s in merged))
+            else:
+                self.windows.observe(wallet_address, (s.get("blockTime") for s in newest))
+
+        if self.db is not None:
+            self.db.save_wallet_signatures(wallet_address, newest + filled, advance=bool(newest), gaps=gaps)
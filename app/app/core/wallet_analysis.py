@@ -0,0 +1,282 @@
+import hashlib
+import json
+import logging
+import math
+from array import array
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core.activity_windows import WINDOW_METRICS
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Sentinel for a missing blockTime in the compact array
+_NO_BLOCK_TIME = -1
+
+# Public keys, in serialization order
+_KEYS = (
+    "wallet",
+    "tokens_held",
+    "transaction_count",
+    "activity_type",
+    "behavior_type",
+    "is_whale",
+    "top_tokens",
+    "recent_transactions",
+    "partial",
+    "missing"
+) + WINDOW_METRICS
+
+_WINDOW_INDEX = {name: index for index, name in enumerate(WINDOW_METRICS)}
+
+
+class WalletAnalysis(Mapping):
+    """
+    WalletAnalysis is the compact result of WalletScanner.analyze_wallet().
+
+    Only the fields the pipeline uses are kept: per token the mint, raw
+    amount and decimals, per transaction the signature and blockTime,
+    stored in tuples and typed arrays instead of the full jsonParsed
+    RPC payloads. The raw payloads can be re-loaded on demand.
+
+    It is a read-only Mapping, so existing dict-style consumers
+    (wallet_analysis.get("tokens_held"), analysis["wallet"]) keep working.
+    """
+
+    __slots__ = (
+        "wallet", "tokens_held", "transaction_count", "activity_type", "behavior_type",
+        "is_whale", "partial", "missing",
+        "_mints", "_amounts", "_decimals", "_signatures", "_block_times", "_last_slot", "_windows",
+        "_load_token_accounts", "_load_transactions"
+    )
+
+    def __init__(self, wallet: str, token_accounts: List[Dict[str, Any]], transactions: List[Dict[str, Any]],
+                 activity_type: str, behavior_type: str, is_whale: bool, missing: Optional[List[str]] = None,
+                 activity_windows: Optional[Dict[str, Optional[float]]] = None,
+                 load_token_accounts: Optional[Callable[[], List[Dict[str, Any]]]] = None,
+                 load_transactions: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        """
+        Initialize WalletAnalysis from raw RPC payloads (which are not retained).
+
+        Args:
+            wallet (str): Wallet address.
+            token_accounts (list): jsonParsed token accounts ("value" of getTokenAccountsByOwner).
+            transactions (list): Signature objects of getSignaturesForAddress.
+            activity_type (str): Activity classification.
+            behavior_type (str): Behavior classification.
+            is_whale (bool): Whale flag.
+            missing (list, optional): Fetches ("balance", "transactions") that failed or missed the deadline.
+            activity_windows (dict, optional): Sliding-window activity metrics (WINDOW_METRICS).
+            load_token_accounts (callable, optional): Re-loads the raw token accounts on demand.
+            load_transactions (callable, optional): Re-loads the raw signature objects on demand.
+        """
+        self.wallet = wallet
+        self.tokens_held = len(token_accounts)
+        self.transaction_count = len(transactions)
+        self.activity_type = activity_type
+        self.behavior_type = behavior_type
+        self.is_whale = is_whale
+        self.missing = list(missing or [])
+        self.partial = bool(self.missing)
+
+        # Token columns
+        self._mints = tuple(_token_info(account).get("mint", "") for account in token_accounts)
+        self._amounts = array("Q", (_token_amount(account) for account in token_accounts))
+        self._decimals = array("B", (_token_info(account).get("tokenAmount", {}).get("decimals", 0) or 0
+                                     for account in token_accounts))
+
+        # Transaction columns
+        self._signatures = tuple(tx.get("signature", "") for tx in transactions)
+        self._block_times = array("q", (tx.get("blockTime") if tx.get("blockTime") is not None else _NO_BLOCK_TIME
+                                        for tx in transactions))
+        self._last_slot = transactions[0].get("slot") if transactions else None
+
+        # Window metrics → NaN where unknown
+        activity_windows = activity_windows or {}
+        self._windows = array("d", (_to_float(activity_windows.get(name)) for name in WINDOW_METRICS))
+
+        self._load_token_accounts = load_token_accounts
+        self._load_transactions = load_transactions
+
+    # Mapping protocol → dict-compatible read access
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "top_tokens":
+            return self.top_tokens
+        if key == "recent_transactions":
+            return self.recent_transactions
+        if key in _WINDOW_INDEX:
+            return _from_float(key, self._windows[_WINDOW_INDEX[key]])
+        if key in _KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return len(_KEYS)
+
+    def __repr__(self) -> str:
+        return (f"WalletAnalysis(wallet={self.wallet!r}, tokens_held={self.tokens_held}, "
+                f"transaction_count={self.transaction_count}, activity_type={self.activity_type!r}, "
+                f"behavior_type={self.behavior_type!r}, is_whale={self.is_whale}, partial={self.partial})")
+
+    @property
+    def top_tokens(self) -> List[Dict[str, Any]]:
+        """
+        Compact token holdings: mint, raw amount and decimals.
+        """
+        return [
+            {"mint": mint, "amount": amount, "decimals": decimals}
+            for mint, amount, decimals in zip(self._mints, self._amounts, self._decimals)
+        ]
+
+    @property
+    def recent_transactions(self) -> List[Dict[str, Any]]:
+        """
+        Compact recent transactions: signature and blockTime.
+        """
+        return [
+            {"signature": signature, "blockTime": block_time if block_time != _NO_BLOCK_TIME else None}
+            for signature, block_time in zip(self._signatures, self._block_times)
+        ]
+
+    @property
+    def block_times(self) -> array:
+        """
+        Block times of the recent transactions (-1 where unknown), newest first.
+        """
+        return self._block_times
+
+    @property
+    def last_signature(self) -> Optional[str]:
+        """
+        Newest transaction signature seen by this analysis (None without transactions).
+        """
+        return self._signatures[0] if self._signatures else None
+
+    @property
+    def last_slot(self) -> Optional[int]:
+        """
+        Slot of the newest transaction (None without transactions).
+        """
+        return self._last_slot
+
+    def token_fingerprint(self) -> str:
+        """
+        Stable digest of the token holdings (mint, amount, decimals).
+
+        Returns:
+            str: Hex digest; equal digests mean unchanged token accounts.
+        """
+        digest = hashlib.sha1()
+        for mint, amount, decimals in sorted(zip(self._mints, self._amounts, self._decimals)):
+            digest.update(f"{mint}:{amount}:{decimals};".encode())
+        return digest.hexdigest()
+
+    def raw_token_accounts(self) -> List[Dict[str, Any]]:
+        """
+        Load the full jsonParsed token accounts on demand.
+
+        Returns:
+            list: Raw token accounts, or [] if no loader is attached.
+        """
+        if self._load_token_accounts is None:
+            return []
+        return self._load_token_accounts()
+
+    def raw_transactions(self) -> List[Dict[str, Any]]:
+        """
+        Load the full signature objects on demand.
+
+        Returns:
+            list: Raw signature objects, or [] if no loader is attached.
+        """
+        if self._load_transactions is None:
+            return []
+        return self._load_transactions()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert to a plain, JSON-serializable dictionary.
+
+        Returns:
+            dict: Analysis with compact token and transaction lists.
+        """
+        return {key: self[key] for key in _KEYS}
+
+    def to_json(self) -> str:
+        """
+        Serialize straight to a JSON string.
+
+        Returns:
+            str: JSON document.
+        """
+        return json.dumps(self.to_dict())
+
+
+def fetched(wallet_analysis: Mapping, *fetches: str) -> bool:
+    """
+    Whether the given fetches completed for an analysis, so zeros derived from them are real.
+
+    Args:
+        wallet_analysis (WalletAnalysis or dict): Analysis (dicts without "missing" count as complete).
+        *fetches (str): "balance" (tokens_held) and / or "transactions" (transaction_count).
+
+    Returns:
+        bool: True if none of the fetches is listed in "missing".
+    """
+    missing = wallet_analysis.get("missing") or ()
+    return not any(fetch in missing for fetch in fetches)
+
+
+def known_empty(wallet_analysis: Mapping) -> bool:
+    """
+    Whether a wallet is known to hold no tokens and have no transactions (not merely unfetched).
+
+    Args:
+        wallet_analysis (WalletAnalysis or dict): Analysis.
+
+    Returns:
+        bool: True if both counts are 0 and both fetches completed.
+    """
+    return (wallet_analysis.get("tokens_held", 0) == 0 and wallet_analysis.get("transaction_count", 0) == 0
+            and fetched(wallet_analysis, "balance", "transactions"))
+
+
+def _token_info(account: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the parsed token info of a jsonParsed token account.
+    """
+    try:
+        return account["account"]["data"]["parsed"]["info"]
+    except (KeyError, TypeError):
+        return {}
+
+
+def _token_amount(account: Dict[str, Any]) -> int:
+    """
+    Extract the raw (integer) token amount of a jsonParsed token account.
+    """
+    try:
+        return int(_token_info(account).get("tokenAmount", {}).get("amount", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value: Optional[float]) -> float:
+    """
+    Encode an optional window metric for the compact array.
+    """
+    return math.nan if value is None else float(value)
+
+
+def _from_float(name: str, value: float) -> Optional[float]:
+    """
+    Decode a window metric from the compact array (NaN → None, counts → int).
+    """
+    if math.isnan(value):
+        return None
+    return int(value) if name.startswith("tx_") else value
@@ -0,0 +1,124 @@
+import logging
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.activity_windows import WINDOW_METRICS
+from app.core.wallet_analysis import fetched
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Activity / behavior classes as produced by WalletScanner; the index is the code (0 → unknown, e.g. partial analyses)
+ACTIVITY_TYPES = ("Unknown", "Dormant Wallet", "Low Activity", "Moderate Activity", "High Activity")
+BEHAVIOR_TYPES = ("Unknown", "Holder", "Active Trader")
+
+_ACTIVITY_CODES = {name: code for code, name in enumerate(ACTIVITY_TYPES)}
+_BEHAVIOR_CODES = {name: code for code, name in enumerate(BEHAVIOR_TYPES)}
+
+
+class WalletMetrics:
+    """
+    WalletMetrics is a structure-of-arrays view of many wallet analyses:
+    one NumPy array per metric, indexed by wallet position. It is the
+    input of the batch entry points of PatternDetector, SignalGenerator
+    and RiskAssessor.
+    """
+
+    __slots__ = ("wallets", "tokens_held", "transaction_count", "activity_code", "behavior_code",
+                 "is_whale", "partial", "has_balance", "has_transactions", "windows")
+
+    def __init__(self, wallets: Sequence[str], tokens_held: np.ndarray, transaction_count: np.ndarray,
+                 activity_code: np.ndarray, behavior_code: np.ndarray, is_whale: np.ndarray, partial: np.ndarray,
+                 windows: Optional[Dict[str, np.ndarray]] = None, has_balance: Optional[np.ndarray] = None,
+                 has_transactions: Optional[np.ndarray] = None):
+        """
+        Initialize WalletMetrics from equally long arrays.
+
+        Args:
+            wallets (list): Wallet addresses.
+            tokens_held (np.ndarray): Token accounts per wallet (int64).
+            transaction_count (np.ndarray): Recent transactions per wallet (int64).
+            activity_code (np.ndarray): Index into ACTIVITY_TYPES (int8).
+            behavior_code (np.ndarray): Index into BEHAVIOR_TYPES (int8).
+            is_whale (np.ndarray): Whale flag (bool).
+            partial (np.ndarray): Analysis missed its deadline (bool).
+            windows (dict, optional): Sliding-window metric → float64 array (NaN where unknown).
+            has_balance (np.ndarray, optional): Balance was fetched, tokens_held is real (bool; all if None).
+            has_transactions (np.ndarray, optional): Transactions were fetched (bool; all if None).
+        """
+        self.wallets = list(wallets)
+        self.tokens_held = tokens_held
+        self.transaction_count = transaction_count
+        self.activity_code = activity_code
+        self.behavior_code = behavior_code
+        self.is_whale = is_whale
+        self.partial = partial
+        self.has_balance = has_balance if has_balance is not None else np.ones(len(self.wallets), dtype=bool)
+        self.has_transactions = has_transactions if has_transactions is not None \
+            else np.ones(len(self.wallets), dtype=bool)
+
+        # Missing window metrics are unknown for every wallet
+        windows = windows or {}
+        self.windows = {
+            name: windows[name] if name in windows else np.full(len(self.wallets), np.nan)
+            for name in WINDOW_METRICS
+        }
+
+    @classmethod
+    def from_analyses(cls, wallet_analyses: Sequence[Mapping[str, Any]]) -> "WalletMetrics":
+        """
+        Build the columns from WalletAnalysis objects or analysis dicts.
+
+        Args:
+            wallet_analyses (list): Results of WalletScanner.analyze_wallet().
+
+        Returns:
+            WalletMetrics: Columnar metrics, one entry per analysis.
+        """
+        count = len(wallet_analyses)
+
+        def column(field, default, dtype, convert=lambda v: v):
+            return np.fromiter((convert(a.get(field, default)) for a in wallet_analyses), dtype=dtype, count=count)
+
+        return cls(
+            wallets=[a.get("wallet", "unknown") for a in wallet_analyses],
+            tokens_held=column("tokens_held", 0, np.int64, lambda v: v or 0),
+            transaction_count=column("transaction_count", 0, np.int64, lambda v: v or 0),
+            activity_code=column("activity_type", "", np.int8, lambda v: _ACTIVITY_CODES.get(v, 0)),
+            behavior_code=column("behavior_type", "", np.int8, lambda v: _BEHAVIOR_CODES.get(v, 0)),
+            is_whale=column("is_whale", False, bool, bool),
+            partial=column("partial", False, bool, bool),
+            windows={name: column(name, None, np.float64, lambda v: np.nan if v is None else v)
+                     for name in WINDOW_METRICS},
+            has_balance=np.fromiter((fetched(a, "balance") for a in wallet_analyses), dtype=bool, count=count),
+            has_transactions=np.fromiter((fetched(a, "transactions") for a in wallet_analyses), dtype=bool,
+                                         count=count)
+        )
+
+    @property
+    def empty(self) -> np.ndarray:
+        """
+        Wallets known to hold no tokens and have no transactions (both fetches completed).
+        """
+        return (self.tokens_held == 0) & (self.transaction_count == 0) & self.has_balance & self.has_transactions
+
+    def __len__(self) -> int:
+        return len(self.wallets)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        Metric columns keyed by analysis field name (as referenced by custom rules).
+
+        Returns:
+            dict: Field name → array; categorical fields are decoded to strings.
+        """
+        return {
+            "tokens_held": self.tokens_held,
+            "transaction_count": self.transaction_count,
+            "is_whale": self.is_whale,
+            "partial": self.partial,
+            "activity_type": np.asarray(ACTIVITY_TYPES)[self.activity_code],
+            "behavior_type": np.asarray(BEHAVIOR_TYPES)[self.behavior_code],
+            **self.windows
+        }
@@ -1,7 +1,12 @@
+import asyncio
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Iterable, Iterator, List, Optional
 
+from app.core.activity_windows import ActivityWindows
 from app.core.data_collector import DataCollector
+from app.core.tracing import traced
+from app.core.transaction_history import TransactionHistory
+from app.core.wallet_analysis import WalletAnalysis
 
 # Initialize logger for SignalForge
 logger = logging.getLogger("signalforge")
@@ -13,16 +18,25 @@ class WalletScanner:
     based on its holdings and recent transaction activity.
     """
 
-    def __init__(self, data_collector: DataCollector):
+    def __init__(self, data_collector: DataCollector, history: Optional[TransactionHistory] = None,
+                 deadline: Optional[float] = 20.0, concurrency: int = 50):
         """
         Initialize the WalletScanner instance.
 
         Args:
             data_collector (DataCollector): Instance of DataCollector for fetching wallet data.
+            history (TransactionHistory, optional): Incremental signature store. If given,
+                                                    repeat scans only fetch new signatures.
+            deadline (float, optional): Overall seconds allowed per wallet analysis (None → no limit).
+                                        Fetches still running at the deadline are dropped.
+            concurrency (int): Default number of wallets analyzed at once by analyze_wallets().
         """
         self.data_collector = data_collector
+        self.history = history
+        self.deadline = deadline
+        self.concurrency = concurrency
 
-    def analyze_wallet(self, wallet_address: str) -> Dict[str, Any]:
+    def analyze_wallet(self, wallet_address: str) -> WalletAnalysis:
         """
         Analyze a wallet address and return a behavior profile.
 
@@ -30,33 +44,201 @@ class WalletScanner:
             wallet_address (str): Blockchain wallet address to analyze.
 
         Returns:
-            dict: Analysis result containing activity and behavior classification.
+            WalletAnalysis: Analysis result containing activity and behavior classification.
+        """
+        return self.data_collector.transport.run_sync(self.analyze_wallet_async(wallet_address))
+
+    @traced("scanner.analyze_wallet", attributes=lambda self, wallet_address, *a, **k: {"wallet": wallet_address})
+    async def analyze_wallet_async(self, wallet_address: str) -> WalletAnalysis:
+        """
+        Analyze a wallet address and return a behavior profile.
+
+        Balance and transactions are fetched concurrently under one overall
+        deadline. If a fetch fails or misses the deadline the analysis is
+        returned with what arrived, flagged as "partial" with the fetch in
+        "missing".
+
+        Args:
+            wallet_address (str): Blockchain wallet address to analyze.
+
+        Returns:
+            WalletAnalysis: Analysis result containing activity and behavior classification.
         """
 
         logger.info(f"Starting analysis for wallet: {wallet_address}")
 
         # Safe default values
-        token_count = 0
-        transaction_count = 0
         balance_data = {}
         transactions = []
+        missing = []
+
+        # Fetch balance and transactions concurrently
+        balance_task = asyncio.ensure_future(self._fetch_balance(wallet_address))
+        transactions_task = asyncio.ensure_future(self._fetch_transactions(wallet_address))
+
+        done, pending = await asyncio.wait({balance_task, transactions_task}, timeout=self.deadline)
+
+        # Drop whatever did not make the deadline
+        for task in pending:
+            task.cancel()
+
+        # A failed fetch (None) is as unknown as a late one
+        if balance_task in done and balance_task.result() is not None:
+            balance_data = balance_task.result()
+        else:
+            missing.append("balance")
+
+        if transactions_task in done and transactions_task.result() is not None:
+            transactions = transactions_task.result()
+        else:
+            missing.append("transactions")
+
+        if missing:
+            logger.warning(f"Analysis of {wallet_address} is partial (failed or past the {self.deadline}s deadline); "
+                           f"missing: {', '.join(missing)}")
+
+        # Sliding-window activity metrics (unknown if the transactions missed the deadline)
+        activity_windows = None
+        if "transactions" not in missing:
+            activity_windows = self._activity_windows(wallet_address, transactions)
+
+        return self._build_analysis(wallet_address, balance_data, transactions, missing, activity_windows)
+
+    def analyze_wallets(self, wallet_addresses: Iterable[str], concurrency: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Analyze many wallets with bounded concurrency, yielding results as they complete.
+
+        Args:
+            wallet_addresses (iterable): Wallet addresses; consumed lazily, so large iterators are fine.
+            concurrency (int, optional): Max wallets in flight. Defaults to the scanner setting.
+
+        Yields:
+            dict: {"index", "wallet", "analysis", "error"} in completion order.
+        """
+        results = self.analyze_wallets_async(wallet_addresses, concurrency)
 
-        # Fetch balance
         try:
-            balance_data = self.data_collector.fetch_wallet_balance(wallet_address)
-            token_count = len(balance_data.get('value', []))
+            while True:
+                try:
+                    yield self.data_collector.transport.run_sync(results.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self.data_collector.transport.run_sync(results.aclose())
+
+    async def analyze_wallets_async(self, wallet_addresses: Iterable[str],
+                                    concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Analyze many wallets with bounded concurrency, yielding results as they complete.
+
+        Each result keeps the wallet's position in the input ("index"). A failing
+        wallet yields an "error" instead of aborting the batch.
+
+        Args:
+            wallet_addresses (iterable): Wallet addresses; consumed lazily, so large iterators are fine.
+            concurrency (int, optional): Max wallets in flight. Defaults to the scanner setting.
+
+        Yields:
+            dict: {"index", "wallet", "analysis", "error"} in completion order.
+        """
+        limit = max(1, concurrency or self.concurrency)
+        addresses = enumerate(wallet_addresses)
+        in_flight = set()
+
+        def start_next() -> bool:
+            # Pull the next address only when a slot is free
+            for index, wallet_address in addresses:
+                in_flight.add(asyncio.ensure_future(self._analyze_indexed(index, wallet_address)))
+                return True
+            return False
+
+        try:
+            while len(in_flight) < limit and start_next():
+                pass
+
+            while in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                in_flight.difference_update(done)
+
+                # Refill before yielding so the pipeline never runs dry while the caller is busy
+                for _ in done:
+                    start_next()
+
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in in_flight:
+                task.cancel()
+
+    async def _analyze_indexed(self, index: int, wallet_address: str) -> Dict[str, Any]:
+        """
+        Analyze one wallet of a batch, capturing errors instead of raising.
+        """
+        try:
+            analysis = await self.analyze_wallet_async(wallet_address)
+            return {"index": index, "wallet": wallet_address, "analysis": analysis, "error": None}
+        except Exception as e:
+            logger.error(f"Batch analysis failed for wallet {wallet_address}: {e}")
+            return {"index": index, "wallet": wallet_address, "analysis": None, "error": str(e)}
+
+    async def _fetch_balance(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the wallet balance (None on failure).
+        """
+        try:
+            return await self.data_collector.async_collector.fetch_wallet_balance(wallet_address)
         except Exception as e:
             logger.warning(f"Failed to fetch wallet balance for {wallet_address}: {e}")
+            return None
 
-        # Fetch transactions
+    async def _fetch_transactions(self, wallet_address: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch recent transactions (None on failure).
+        """
         try:
-            transactions = self.data_collector.fetch_recent_transactions(wallet_address, limit=20)
-            transaction_count = len(transactions)
+            if self.history is not None:
+                return await self.history.recent_async(wallet_address, limit=20)
+            return await self.data_collector.async_collector.fetch_recent_transactions(wallet_address, limit=20)
         except Exception as e:
             logger.warning(f"Failed to fetch transactions for {wallet_address}: {e}")
+            return None
+
+    def _activity_windows(self, wallet_address: str, transactions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Window metrics: incremental via the history store, else computed from the fetched signatures.
+        """
+        try:
+            if self.history is not None:
+                return self.history.activity_windows(wallet_address)
+            return ActivityWindows.compute(tx.get("blockTime") for tx in transactions)
+        except Exception as e:
+            logger.warning(f"Failed to compute activity windows for {wallet_address}: {e}")
+            return None
+
+    def _build_analysis(self, wallet_address: str, balance_data: Dict[str, Any],
+                        transactions: List[Dict[str, Any]], missing: List[str],
+                        activity_windows: Optional[Dict[str, Any]] = None) -> WalletAnalysis:
+        """
+        Classify the fetched data into a behavior profile.
 
-        # Activity type classification
-        if transaction_count == 0:
+        Args:
+            wallet_address (str): Blockchain wallet address.
+            balance_data (dict): Token accounts result (may be empty).
+            transactions (list): Recent signatures (may be empty).
+            missing (list): Fetches that failed or missed the deadline.
+            activity_windows (dict, optional): Sliding-window activity metrics.
+
+        Returns:
+            WalletAnalysis: Compact analysis result (raw payloads are not kept).
+        """
+        token_accounts = balance_data.get('value', [])
+        token_count = len(token_accounts)
+        transaction_count = len(transactions)
+
+        # Activity type classification (unknown, not dormant, if the transactions missed the deadline)
+        if "transactions" in missing:
+            activity_type = "Unknown"
+        elif transaction_count == 0:
             activity_type = "Dormant Wallet"
         elif transaction_count <= 5:
             activity_type = "Low Activity"
@@ -65,23 +247,28 @@ class WalletScanner:
         else:
             activity_type = "High Activity"
 
-        # Behavior type classification
-        behavior_type = "Holder" if transaction_count < 5 and token_count >= 2 else "Active Trader"
+        # Behavior type classification (needs both fetches)
+        if missing:
+            behavior_type = "Unknown"
+        else:
+            behavior_type = "Holder" if transaction_count < 5 and token_count >= 2 else "Active Trader"
 
         # Quick Whale Detection (purely based on tokens held)
         is_whale = True if token_count >= 20 else False
 
         # Final Analysis Result
-        analysis = {
-            "wallet": wallet_address,
-            "tokens_held": token_count,
-            "transaction_count": transaction_count,
-            "activity_type": activity_type,
-            "behavior_type": behavior_type,
-            "is_whale": is_whale,
-            "top_tokens": balance_data.get('value', []),
-            "recent_transactions": transactions
-        }
+        analysis = WalletAnalysis(
+            wallet_address,
+            token_accounts,
+            transactions,
+            activity_type=activity_type,
+            behavior_type=behavior_type,
+            is_whale=is_whale,
+            missing=missing,
+            activity_windows=activity_windows,
+            load_token_accounts=lambda: self._load_token_accounts(wallet_address),
+            load_transactions=lambda: self._load_transactions(wallet_address)
+        )
 
         logger.info(f"Analysis completed for wallet {wallet_address}: "
                     f"Tokens Held: {token_count}, "
@@ -91,3 +278,17 @@ class WalletScanner:
                     f"Whale: {is_whale}")
 
         return analysis
+
+    def _load_token_accounts(self, wallet_address: str) -> List[Dict[str, Any]]:
+        """
+        Re-load the raw token accounts of a wallet (served from the RPC cache when fresh).
+        """
+        return self.data_collector.fetch_wallet_balance(wallet_address).get("value", [])
+
+    def _load_transactions(self, wallet_address: str) -> List[Dict[str, Any]]:
+        """
+        Re-load the raw signature objects of a wallet (from the synced history if available).
+        """
+        if self.history is not None:
+            return self.history.stored(wallet_address, limit=20)
+        return self.data_collector.fetch_recent_transactions(wallet_address, limit=20)
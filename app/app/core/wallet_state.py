@@ -0,0 +1,317 @@
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from app.core.comment_worker import PENDING_COMMENT
+from app.core.pattern_detector import PatternDetector
+from app.core.risk_assessor import RiskAssessor
+from app.core.signal_generator import SignalGenerator
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# Changes after which the signal is re-derived (the others only update the stored state)
+RECOMPUTE_CHANGES = ("new wallet", "signal inputs", "pending comment")
+
+
+class WalletStateTracker:
+    """
+    WalletStateTracker remembers the last evaluated state of each wallet
+    (analysis, newest signature and slot, token fingerprint and emitted
+    signal) and only re-runs pattern detection, signal generation and
+    risk scoring when an input they depend on actually changed.
+    """
+
+    def __init__(self, detector: PatternDetector, generator: SignalGenerator, assessor: RiskAssessor, db=None):
+        """
+        Initialize the WalletStateTracker.
+
+        Args:
+            detector (PatternDetector): Pattern detector (built-in and custom rules).
+            generator (SignalGenerator): Signal generator.
+            assessor (RiskAssessor): Risk assessor.
+            db (Database, optional): SQLite database; state is kept in memory only if None.
+        """
+        self.generator = generator
+        self.assessor = assessor
+        self.db = db
+
+        self._states: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        # Wallets whose background comment is still being generated by this process
+        self._commenting: Set[str] = set()
+
+        self.set_detector(detector)
+
+    def set_detector(self, detector: PatternDetector) -> None:
+        """
+        Switch to a detector with different rules; affected wallets are re-evaluated on their next scan.
+
+        Args:
+            detector (PatternDetector): Pattern detector (built-in and custom rules).
+        """
+        self.detector = detector
+
+        # Everything the signal is derived from
+        self.input_fields = sorted(
+            set(detector.input_fields) | set(self.generator.INPUT_FIELDS) | set(self.assessor.INPUT_FIELDS)
+        )
+        self.rules_fingerprint = self._rules_fingerprint()
+
+    def get_state(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the stored state of a wallet.
+
+        Args:
+            wallet_address (str): Wallet address.
+
+        Returns:
+            dict or None: Last state (see Database.get_wallet_state), or None if never evaluated.
+        """
+        with self._lock:
+            state = self._states.get(wallet_address)
+
+        if state is None and self.db is not None:
+            state = self.db.get_wallet_state(wallet_address)
+            if state is not None:
+                with self._lock:
+                    self._states.setdefault(wallet_address, state)
+
+        return state
+
+    def evaluate(self, wallet_analysis: Mapping[str, Any],
+                 on_comment: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 compute: Optional[Callable[..., Dict[str, Any]]] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Return the wallet's signal, recomputing it only if its inputs changed.
+
+        New signatures or changed token accounts update the stored state; the
+        signal itself is only re-derived when a field it depends on (or a rule,
+        threshold or weight) differs from the last evaluation.
+
+        A comment generated in the background is attached to the stored
+        signal once it arrives; on_comment then receives the updated signal.
+        A signal stored with a pending comment that never arrived (e.g. the
+        process stopped first) is re-derived so that its comment is regenerated.
+
+        Args:
+            wallet_analysis (WalletAnalysis): Fresh analysis of the wallet.
+            on_comment (callable, optional): Receives the signal with its final AI comment.
+            compute (callable, optional): Derives the signal as compute(wallet_analysis, on_comment, observe),
+                                          e.g. SignalPipeline's stage graph. Defaults to running
+                                          detector, generator and assessor in sequence. observe is
+                                          False once the wallet was counted in the risk population.
+
+        Returns:
+            tuple: (signal incl. risk_score, True if it was recomputed / False if reused)
+        """
+        wallet_address = wallet_analysis.get("wallet")
+        state = self.get_state(wallet_address)
+        changes = self._changes(wallet_analysis, state)
+
+        if not changes:
+            logger.info(f"No input changed for wallet {wallet_address}; reusing stored signal")
+            return dict(state["signal"]), False
+
+        recompute = any(change in RECOMPUTE_CHANGES for change in changes)
+
+        # Only the first stored evaluation adds the wallet to the risk population
+        observe = "new wallet" in changes and not wallet_analysis.get("partial")
+
+        # Background comments are only attached once this evaluation is stored
+        stored = threading.Event()
+
+        def attach_comment(comment: str) -> None:
+            stored.wait()
+            with self._lock:
+                self._commenting.discard(wallet_address)
+            updated = self._attach_comment(wallet_address, signal, comment)
+            if on_comment is not None:
+                on_comment(updated)
+
+        try:
+            if recompute:
+                logger.info(f"Re-evaluating wallet {wallet_address}: {', '.join(changes)} changed")
+                signal = (compute or self._compute)(wallet_analysis, attach_comment, observe)
+                if signal.get("ai_comment") == PENDING_COMMENT:
+                    with self._lock:
+                        self._commenting.add(wallet_address)
+            else:
+                logger.info(f"Updating state of wallet {wallet_address} ({', '.join(changes)}); signal inputs unchanged")
+                signal = dict(state["signal"])
+
+            self._store(wallet_analysis, signal)
+        finally:
+            stored.set()
+
+        return signal, recompute
+
+    def evaluate_many(self, wallet_analyses: Sequence[Mapping[str, Any]],
+                      compute_many: Callable[[List[Mapping[str, Any]], List[bool]], List[Dict[str, Any]]]
+                      ) -> List[Tuple[Dict[str, Any], bool]]:
+        """
+        Return the signals of a sweep, recomputing only the wallets whose inputs changed.
+
+        Same rules as evaluate(), but every wallet to re-derive is handed to
+        compute_many in one call (e.g. to batch their AI comments).
+
+        Args:
+            wallet_analyses (list): Fresh analysis per wallet.
+            compute_many (callable): Derives the signals as compute_many(wallet_analyses, observe)
+                                     with one observe flag per analysis (see evaluate()).
+
+        Returns:
+            list: (signal incl. risk_score, recomputed) per analysis, in input order.
+        """
+        results: List[Optional[Tuple[Dict[str, Any], bool]]] = [None] * len(wallet_analyses)
+        recompute: List[Tuple[int, bool]] = []
+
+        for index, wallet_analysis in enumerate(wallet_analyses):
+            state = self.get_state(wallet_analysis.get("wallet"))
+            changes = self._changes(wallet_analysis, state)
+
+            if any(change in RECOMPUTE_CHANGES for change in changes):
+                recompute.append((index, "new wallet" in changes and not wallet_analysis.get("partial")))
+                continue
+
+            results[index] = (dict(state["signal"]), False)
+            if changes:
+                self._store(wallet_analysis, state["signal"])
+
+        if recompute:
+            signals = compute_many([wallet_analyses[index] for index, _ in recompute],
+                                   [observe for _, observe in recompute])
+            for (index, _), signal in zip(recompute, signals):
+                self._store(wallet_analyses[index], signal)
+                results[index] = (signal, True)
+
+        logger.info(f"Evaluated {len(wallet_analyses)} wallet(s), {len(recompute)} recomputed")
+        return results
+
+    def _compute(self, wallet_analysis: Mapping[str, Any], on_comment: Callable[[str], None],
+                 observe: bool = True) -> Dict[str, Any]:
+        """
+        Detect patterns, generate the signal and score its risk.
+        """
+        patterns = self.detector.detect_patterns(wallet_analysis)
+        signal = self.generator.generate_signal(wallet_analysis, patterns, on_comment)
+        signal.update(self.assessor.assess(wallet_analysis, patterns, observe))
+        return signal
+
+    def _changes(self, wallet_analysis: Mapping[str, Any], state: Optional[Dict[str, Any]]) -> List[str]:
+        """
+        Names of the inputs that differ from the stored state.
+        """
+        if state is None or not state.get("signal"):
+            return ["new wallet"]
+
+        changes = []
+
+        # Stored while its background comment was pending, and no comment is on its way
+        # (e.g. the process stopped first) → regenerate it instead of reusing "pending"
+        if state["signal"].get("ai_comment") == PENDING_COMMENT:
+            with self._lock:
+                if wallet_analysis.get("wallet") not in self._commenting:
+                    changes.append("pending comment")
+
+        if getattr(wallet_analysis, "last_signature", None) != state.get("last_signature"):
+            changes.append("new signatures")
+        if _token_fingerprint(wallet_analysis) != state.get("token_fingerprint"):
+            changes.append("token accounts")
+
+        # Time-dependent inputs (activity windows) and rule / weight changes
+        if self._inputs_fingerprint(wallet_analysis) != state.get("inputs_fingerprint"):
+            changes.append("signal inputs")
+
+        return changes
+
+    def _inputs_fingerprint(self, wallet_analysis: Mapping[str, Any]) -> str:
+        """
+        Digest of every analysis field the signal depends on, plus the rules.
+        """
+        inputs = {field: wallet_analysis.get(field) for field in self.input_fields}
+        payload = json.dumps([self.rules_fingerprint, inputs], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _rules_fingerprint(self) -> str:
+        """
+        Digest of the thresholds, weights and custom rules in effect.
+        """
+        rule_engine = self.detector.rule_engine
+        custom = [[rule.name, rule.conditions] for rule in rule_engine.rules] if rule_engine is not None else []
+
+        payload = json.dumps([
+            self.detector.whale_tokens_threshold,
+            self.detector.dormant_threshold,
+            self.detector.dormant_gap,
+            self.assessor.activity_weights,
+            self.assessor.pattern_weight,
+            self.assessor.whale_threshold,
+            self.generator.ai_engine is not None,
+            custom
+        ], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    def _store(self, wallet_analysis: Mapping[str, Any], signal: Dict[str, Any]) -> None:
+        """
+        Store the evaluated state of a wallet (not for partial analyses).
+        """
+        wallet_address = wallet_analysis.get("wallet")
+
+        # A partial analysis is not a reliable baseline for the next delta
+        if wallet_analysis.get("partial"):
+            logger.warning(f"Not storing state of {wallet_address}: analysis is partial")
+            return
+
+        self._save(wallet_address, {
+            "analysis": _to_dict(wallet_analysis),
+            "last_signature": getattr(wallet_analysis, "last_signature", None),
+            "last_slot": getattr(wallet_analysis, "last_slot", None),
+            "token_fingerprint": _token_fingerprint(wallet_analysis),
+            "inputs_fingerprint": self._inputs_fingerprint(wallet_analysis),
+            "signal": dict(signal)
+        })
+
+    def _attach_comment(self, wallet_address: str, signal: Dict[str, Any], comment: str) -> Dict[str, Any]:
+        """
+        Fill in the AI comment of a signal generated in the background.
+
+        The stored state is only updated if it still holds that signal, so a
+        late comment never overwrites a newer evaluation.
+        """
+        updated = dict(signal, ai_comment=comment)
+
+        state = self.get_state(wallet_address)
+        if state is not None and state.get("signal") == signal:
+            self._save(wallet_address, dict(state, signal=updated))
+
+        return updated
+
+    def _save(self, wallet_address: str, state: Dict[str, Any]) -> None:
+        """
+        Keep the state in memory and persist it.
+        """
+        with self._lock:
+            self._states[wallet_address] = state
+
+        if self.db is not None:
+            self.db.save_wallet_state(wallet_address, state)
+
+
+def _to_dict(wallet_analysis: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Plain dict of an analysis (WalletAnalysis or dict).
+    """
+    to_dict = getattr(wallet_analysis, "to_dict", None)
+    return to_dict() if to_dict is not None else dict(wallet_analysis)
+
+
+def _token_fingerprint(wallet_analysis: Mapping[str, Any]) -> Optional[str]:
+    """
+    Token holdings digest of an analysis (None for plain dicts).
+    """
+    token_fingerprint = getattr(wallet_analysis, "token_fingerprint", None)
+    return token_fingerprint() if token_fingerprint is not None else None
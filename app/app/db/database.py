@@ -1,6 +1,12 @@
 import sqlite3
 import os
+import json
 import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core.metrics import MetricsRegistry
 
 logger = logging.getLogger("signalforge")
 
@@ -27,6 +33,10 @@ class Database:
             self.db_path = db_path
 
         self.connection = None
+
+        # One connection shared across threads → serialize access
+        self.lock = threading.RLock()
+
         self._connect()
         self._create_tables()
 
@@ -35,7 +45,7 @@ class Database:
         Establish connection to the SQLite database.
         """
         try:
-            self.connection = sqlite3.connect(self.db_path)
+            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
             logger.info(f"Connected to SQLite database at {self.db_path}")
         except sqlite3.Error as e:
             logger.error(f"Failed to connect to database: {e}")
@@ -86,6 +96,80 @@ class Database:
                 )
             """)
 
+            # Table for per-wallet signature high-water marks (incremental history sync)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS wallet_cursors (
+                    wallet TEXT PRIMARY KEY,
+                    last_signature TEXT,
+                    last_slot INTEGER,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Table for signature ranges a truncated sync has yet to fetch (newest first per wallet)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS wallet_sync_gaps (
+                    wallet TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    before_signature TEXT NOT NULL,
+                    until_signature TEXT NOT NULL,
+                    PRIMARY KEY (wallet, position)
+                )
+            """)
+
+            # Table for synced transaction signatures per wallet
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS wallet_signatures (
+                    wallet TEXT NOT NULL,
+                    signature TEXT NOT NULL,
+                    slot INTEGER,
+                    block_time INTEGER,
+                    data TEXT,
+                    PRIMARY KEY (wallet, signature)
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_wallet_signatures_slot
+                ON wallet_signatures (wallet, slot DESC)
+            """)
+
+            # Table for the last evaluated state of each wallet (delta-based re-evaluation)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS wallet_state (
+                    wallet TEXT PRIMARY KEY,
+                    analysis TEXT,
+                    last_signature TEXT,
+                    last_slot INTEGER,
+                    token_fingerprint TEXT,
+                    inputs_fingerprint TEXT,
+                    signal TEXT,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            # Table for cached AI comments (second tier behind the in-memory LRU)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS ai_comments (
+                    fingerprint TEXT PRIMARY KEY,
+                    comment TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_ai_comments_last_used
+                ON ai_comments (last_used)
+            """)
+
+            # Table for mergeable quantile sketches (population-relative percentiles)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS quantile_sketches (
+                    name TEXT PRIMARY KEY,
+                    sketch TEXT NOT NULL,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             self.connection.commit()
             logger.info("Database tables created successfully.")
 
@@ -100,3 +184,273 @@ class Database:
             sqlite3.Connection: Active connection object.
         """
         return self.connection
+
+    def get_wallet_cursor(self, wallet: str) -> Optional[str]:
+        """
+        Return the newest synced signature (high-water mark) of a wallet.
+
+        Args:
+            wallet (str): Wallet address.
+
+        Returns:
+            str or None: Last seen signature, or None if never synced.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT last_signature FROM wallet_cursors WHERE wallet = ?", (wallet,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_wallet_gaps(self, wallet: str) -> List[Tuple[str, str]]:
+        """
+        Return the signature ranges a truncated sync left unfetched.
+
+        Args:
+            wallet (str): Wallet address.
+
+        Returns:
+            list: (before, until) signature pairs, newest first.
+        """
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT before_signature, until_signature FROM wallet_sync_gaps WHERE wallet = ? ORDER BY position",
+                (wallet,)
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def save_wallet_signatures(self, wallet: str, signatures: List[Dict[str, Any]], advance: bool = True,
+                               gaps: Optional[List[Tuple[str, str]]] = None) -> None:
+        """
+        Store newly synced signatures and advance the wallet's high-water mark.
+
+        Args:
+            wallet (str): Wallet address.
+            signatures (list): Signature objects, newest first.
+            advance (bool): Move the high-water mark to the first signature.
+            gaps (list, optional): Replace the wallet's unfetched (before, until) ranges.
+        """
+        if not signatures and gaps is None:
+            return
+
+        rows = [
+            (wallet, s["signature"], s.get("slot"), s.get("blockTime"), json.dumps(s))
+            for s in signatures
+        ]
+
+        with self.lock:
+            try:
+                self.connection.executemany(
+                    "INSERT OR IGNORE INTO wallet_signatures (wallet, signature, slot, block_time, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                if advance and signatures:
+                    newest = signatures[0]
+                    self.connection.execute(
+                        "INSERT INTO wallet_cursors (wallet, last_signature, last_slot, updated_at) "
+                        "VALUES (?, ?, ?, CURRENT_TIMESTAMP) "
+                        "ON CONFLICT(wallet) DO UPDATE SET last_signature = excluded.last_signature, "
+                        "last_slot = excluded.last_slot, updated_at = CURRENT_TIMESTAMP",
+                        (wallet, newest["signature"], newest.get("slot"))
+                    )
+                if gaps is not None:
+                    self.connection.execute("DELETE FROM wallet_sync_gaps WHERE wallet = ?", (wallet,))
+                    self.connection.executemany(
+                        "INSERT INTO wallet_sync_gaps (wallet, position, before_signature, until_signature) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(wallet, position, before, until) for position, (before, until) in enumerate(gaps)]
+                    )
+                self.connection.commit()
+                MetricsRegistry.shared().record_write("wallet_signatures", len(rows))
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                logger.error(f"Failed to save signatures for {wallet}: {e}")
+
+    def load_wallet_signatures(self, wallet: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Load synced signatures of a wallet, newest first.
+
+        Args:
+            wallet (str): Wallet address.
+            limit (int, optional): Max number of signatures (None → all).
+
+        Returns:
+            list: Signature objects.
+        """
+        query = "SELECT data FROM wallet_signatures WHERE wallet = ? ORDER BY slot DESC, rowid ASC"
+        params: tuple = (wallet,)
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (wallet, limit)
+
+        with self.lock:
+            rows = self.connection.execute(query, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_wallet_state(self, wallet: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the last evaluated state of a wallet.
+
+        Args:
+            wallet (str): Wallet address.
+
+        Returns:
+            dict or None: analysis, last_signature, last_slot, token_fingerprint,
+                          inputs_fingerprint, signal and updated_at; None if never evaluated.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT analysis, last_signature, last_slot, token_fingerprint, inputs_fingerprint, signal, updated_at "
+                "FROM wallet_state WHERE wallet = ?", (wallet,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return {
+            "analysis": json.loads(row[0]) if row[0] else None,
+            "last_signature": row[1],
+            "last_slot": row[2],
+            "token_fingerprint": row[3],
+            "inputs_fingerprint": row[4],
+            "signal": json.loads(row[5]) if row[5] else None,
+            "updated_at": row[6]
+        }
+
+    def save_wallet_state(self, wallet: str, state: Dict[str, Any]) -> None:
+        """
+        Insert or replace the evaluated state of a wallet.
+
+        Args:
+            wallet (str): Wallet address.
+            state (dict): Same keys as returned by get_wallet_state() (updated_at is set here).
+        """
+        with self.lock:
+            try:
+                self.connection.execute(
+                    "INSERT INTO wallet_state (wallet, analysis, last_signature, last_slot, token_fingerprint, "
+                    "inputs_fingerprint, signal, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) "
+                    "ON CONFLICT(wallet) DO UPDATE SET analysis = excluded.analysis, "
+                    "last_signature = excluded.last_signature, last_slot = excluded.last_slot, "
+                    "token_fingerprint = excluded.token_fingerprint, inputs_fingerprint = excluded.inputs_fingerprint, "
+                    "signal = excluded.signal, updated_at = CURRENT_TIMESTAMP",
+                    (
+                        wallet,
+                        json.dumps(state.get("analysis")),
+                        state.get("last_signature"),
+                        state.get("last_slot"),
+                        state.get("token_fingerprint"),
+                        state.get("inputs_fingerprint"),
+                        json.dumps(state.get("signal"))
+                    )
+                )
+                self.connection.commit()
+                MetricsRegistry.shared().record_write("wallet_state")
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                logger.error(f"Failed to save state for {wallet}: {e}")
+
+    def get_ai_comment(self, fingerprint: str) -> Optional[Tuple[str, float]]:
+        """
+        Return a cached AI comment and mark it as recently used.
+
+        Args:
+            fingerprint (str): Normalized prompt fingerprint.
+
+        Returns:
+            tuple or None: (comment, created_at), or None if not cached.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT comment, created_at FROM ai_comments WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+            if row:
+                self.connection.execute(
+                    "UPDATE ai_comments SET last_used = ? WHERE fingerprint = ?", (time.time(), fingerprint)
+                )
+                self.connection.commit()
+                MetricsRegistry.shared().record_write("ai_comments")
+        return (row[0], row[1]) if row else None
+
+    def save_ai_comment(self, fingerprint: str, comment: str, created_at: float,
+                        max_entries: Optional[int] = None, expire_before: Optional[float] = None) -> None:
+        """
+        Store an AI comment, then drop expired and least recently used entries.
+
+        Args:
+            fingerprint (str): Normalized prompt fingerprint.
+            comment (str): AI comment.
+            created_at (float): Unix time the comment was generated.
+            max_entries (int, optional): Max cached comments to keep.
+            expire_before (float, optional): Delete comments created before this unix time.
+        """
+        with self.lock:
+            try:
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO ai_comments (fingerprint, comment, created_at, last_used) "
+                    "VALUES (?, ?, ?, ?)",
+                    (fingerprint, comment, created_at, created_at)
+                )
+                if expire_before is not None:
+                    self.connection.execute("DELETE FROM ai_comments WHERE created_at < ?", (expire_before,))
+                if max_entries is not None:
+                    self.connection.execute(
+                        "DELETE FROM ai_comments WHERE fingerprint IN ("
+                        "SELECT fingerprint FROM ai_comments ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                        (max_entries,)
+                    )
+                self.connection.commit()
+                MetricsRegistry.shared().record_write("ai_comments")
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                logger.error(f"Failed to cache AI comment: {e}")
+
+    def get_quantile_sketch(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a stored quantile sketch.
+
+        Args:
+            name (str): Sketch name.
+
+        Returns:
+            dict or None: Serialized sketch, or None if not stored yet.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT sketch FROM quantile_sketches WHERE name = ?", (name,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def merge_quantile_sketch(self, name: str,
+                              merge: Callable[[Optional[Dict[str, Any]]], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Read, merge and write back a quantile sketch in one write transaction,
+        so concurrent workers sharing the database do not lose each other's updates.
+
+        Args:
+            name (str): Sketch name.
+            merge (callable): Receives the stored sketch (or None) and returns the merged one.
+
+        Returns:
+            dict or None: Merged sketch as stored, or None on failure.
+        """
+        with self.lock:
+            try:
+                self.connection.commit()
+                self.connection.execute("BEGIN IMMEDIATE")
+                row = self.connection.execute(
+                    "SELECT sketch FROM quantile_sketches WHERE name = ?", (name,)
+                ).fetchone()
+                merged = merge(json.loads(row[0]) if row else None)
+                self.connection.execute(
+                    "INSERT OR REPLACE INTO quantile_sketches (name, sketch, updated_at) "
+                    "VALUES (?, ?, CURRENT_TIMESTAMP)",
+                    (name, json.dumps(merged))
+                )
+                self.connection.commit()
+                MetricsRegistry.shared().record_write("quantile_sketches")
+                return merged
+            except sqlite3.Error as e:
+                self.connection.rollback()
+                logger.error(f"Failed to merge quantile sketch {name}: {e}")
+                return None
@@ -5,6 +5,8 @@ import logging
 from datetime import datetime
 from typing import Dict, Any
 
+from app.core.tracing import traced
+
 logger = logging.getLogger("signalforge")
 
 
@@ -62,6 +64,7 @@ class JSONExporter:
 
         return os.path.join(dir_path, filename)
 
+    @traced("output.json_export", attributes=lambda self, signal: {"wallet": signal.get("wallet")})
     def save_signal(self, signal: Dict[str, Any]) -> None:
         """
         Save the given signal to a local JSON file.
@@ -3,6 +3,8 @@ import logging
 from datetime import datetime
 from typing import Dict, Any
 
+from app.core.tracing import traced
+
 logger = logging.getLogger("signalforge")
 
 
@@ -21,6 +23,7 @@ class ReportWriter:
         """
         self.base_dir = base_dir
 
+    @traced("output.report", attributes=lambda self, signal: {"wallet": signal.get("wallet")})
     def save_report(self, signal: Dict[str, Any]) -> None:
         """
         Save the provided signal as a Markdown (.md) report file.
@@ -3,6 +3,9 @@ import requests
 import logging
 from typing import Dict, Any
 
+from app.core.metrics import MetricsRegistry
+from app.core.tracing import traced
+
 logger = logging.getLogger("signalforge")
 
 
@@ -25,6 +28,7 @@ class WebhookSender:
         self.telegram_chat_id = config.get("webhooks", {}).get("telegram_chat_id")
         self.custom_url = config.get("webhooks", {}).get("custom")
 
+    @traced("output.webhooks", attributes=lambda self, signal: {"wallet": signal.get("wallet")})
     def send_signal(self, signal: Dict[str, Any]) -> None:
         """
         Send signal to all configured webhook endpoints.
@@ -44,6 +48,23 @@ class WebhookSender:
         if self.custom_url:
             self._send_custom(signal)
 
+    def _post(self, target: str, url: str, payload: Dict[str, Any]) -> None:
+        """
+        POST a JSON payload to a webhook, counted in the upstream metrics.
+
+        Args:
+            target (str): Webhook target (discord, telegram, custom).
+            url (str): Webhook URL.
+            payload (dict): JSON body.
+
+        Raises:
+            requests.RequestException: On network errors or non-2xx status codes.
+        """
+        with MetricsRegistry.shared().upstream_call("webhook", target) as call:
+            response = requests.post(url, json=payload, timeout=10)
+            call.response(response.status_code, len(response.request.body or b""), len(response.content))
+            response.raise_for_status()
+
     def _send_discord(self, signal: Dict[str, Any]) -> None:
         """
         Send signal to Discord webhook.
@@ -62,8 +83,7 @@ class WebhookSender:
         payload = {"content": content}
 
         try:
-            response = requests.post(self.discord_url, json=payload, timeout=10)
-            response.raise_for_status()
+            self._post("discord", self.discord_url, payload)
             logger.info("Signal sent to Discord webhook.")
         except Exception as e:
             logger.error(f"Failed to send signal to Discord: {e}")
@@ -92,8 +112,7 @@ class WebhookSender:
         }
 
         try:
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
+            self._post("telegram", url, payload)
             logger.info("Signal sent to Telegram.")
         except Exception as e:
             logger.error(f"Failed to send signal to Telegram: {e}")
@@ -106,8 +125,43 @@ class WebhookSender:
             signal (dict): Signal to send.
         """
         try:
-            response = requests.post(self.custom_url, json=signal, timeout=10)
-            response.raise_for_status()
+            self._post("custom", self.custom_url, signal)
             logger.info("Signal sent to custom webhook.")
         except Exception as e:
             logger.error(f"Failed to send signal to custom webhook: {e}")
+
+    def send_comment_update(self, signal: Dict[str, Any]) -> None:
+        """
+        Follow up on an already sent signal with its AI comment.
+
+        Used when the comment was generated in the background after the
+        signal itself had been delivered.
+
+        Args:
+            signal (dict): Signal including its final ai_comment.
+        """
+        content = (
+            f"AI comment for `{signal.get('wallet')}` ({signal.get('signal')}):\n"
+            f"{signal.get('ai_comment')}"
+        )
+
+        # Send to Discord if URL provided
+        if self.discord_url:
+            try:
+                self._post("discord", self.discord_url, {"content": content})
+                logger.info("AI comment sent to Discord webhook.")
+            except Exception as e:
+                logger.error(f"Failed to send AI comment to Discord: {e}")
+
+        # Send to Telegram if token & chat_id provided
+        if self.telegram_token and self.telegram_chat_id:
+            url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
+            try:
+                self._post("telegram", url, {"chat_id": self.telegram_chat_id, "text": content})
+                logger.info("AI comment sent to Telegram.")
+            except Exception as e:
+                logger.error(f"Failed to send AI comment to Telegram: {e}")
+
+        # Custom endpoints receive the full signal, marked as an update
+        if self.custom_url:
+            self._send_custom({**signal, "update": "ai_comment"})
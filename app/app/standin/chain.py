@@ -0,0 +1,211 @@
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# SPL token program the collector asks for in getTokenAccountsByOwner
+TOKEN_PROGRAM_ID = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
+
+# Mainnet produces a slot roughly every 400ms
+SLOTS_PER_SECOND = 2.5
+
+# Wallet profiles: (name, share, (min tokens, max tokens), (min transactions, max transactions))
+WALLET_PROFILES = (
+    ("empty", 0.15, (0, 0), (0, 0)),
+    ("retail", 0.50, (1, 5), (1, 30)),
+    ("active", 0.30, (3, 20), (30, 300)),
+    ("whale", 0.05, (20, 60), (300, 3000))
+)
+
+
+class SyntheticWallet:
+    """
+    SyntheticWallet is the generated state of one wallet: its token
+    accounts and its signatures (newest first) with an index for paging.
+    """
+
+    __slots__ = ("address", "profile", "token_accounts", "signatures", "positions")
+
+    def __init__(self, address: str, profile: str, token_accounts: List[Dict[str, Any]],
+                 signatures: List[Dict[str, Any]]):
+        self.address = address
+        self.profile = profile
+        self.token_accounts = token_accounts
+        self.signatures = signatures
+        self.positions = {entry["signature"]: index for index, entry in enumerate(signatures)}
+
+
+class SyntheticChain:
+    """
+    SyntheticChain deterministically derives wallets, their token
+    holdings and transaction history, and token prices from a seed: the
+    same seed and address always give the same wallet, so any address
+    can be queried without generating a population up front.
+
+    Block times are laid out backwards from the anchor time, so activity
+    windows look the same on every run with the same anchor.
+    """
+
+    def __init__(self, seed: int = 42, anchor_time: Optional[int] = None, base_slot: int = 250_000_000,
+                 cache_size: int = 10000):
+        """
+        Initialize the SyntheticChain.
+
+        Args:
+            seed (int): Seed of all generated data.
+            anchor_time (int, optional): Unix time of the newest possible transaction (default: now).
+            base_slot (int): Slot at the anchor time.
+            cache_size (int): Generated wallets kept in memory (LRU).
+        """
+        self.seed = seed
+        self.anchor_time = int(anchor_time if anchor_time is not None else time.time())
+        self.base_slot = base_slot
+        self.cache_size = max(1, cache_size)
+
+        self._wallets: "OrderedDict[str, SyntheticWallet]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def current_slot(self) -> int:
+        """
+        Slot advancing with wall-clock time since the anchor.
+        """
+        return self.base_slot + max(0, int((time.time() - self.anchor_time) * SLOTS_PER_SECOND))
+
+    def wallet(self, address: str) -> SyntheticWallet:
+        """
+        Return the generated wallet for an address.
+
+        Args:
+            address (str): Wallet address (any string).
+
+        Returns:
+            SyntheticWallet: Token accounts and signatures of the wallet.
+        """
+        with self._lock:
+            wallet = self._wallets.get(address)
+            if wallet is not None:
+                self._wallets.move_to_end(address)
+                return wallet
+
+        wallet = self._generate(address)
+
+        with self._lock:
+            self._wallets[address] = wallet
+            while len(self._wallets) > self.cache_size:
+                self._wallets.popitem(last=False)
+        return wallet
+
+    def token_accounts(self, address: str) -> Dict[str, Any]:
+        """
+        getTokenAccountsByOwner result (jsonParsed encoding).
+        """
+        return {
+            "context": {"apiVersion": "1.18.0", "slot": self.current_slot},
+            "value": self.wallet(address).token_accounts
+        }
+
+    def signatures(self, address: str, limit: int = 1000, before: Optional[str] = None,
+                   until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        getSignaturesForAddress result: newest first, starting after "before"
+        and stopping at "until" (both exclusive).
+        """
+        wallet = self.wallet(address)
+
+        start = 0
+        if before is not None:
+            position = wallet.positions.get(before)
+            if position is None:
+                return []
+            start = position + 1
+
+        end = len(wallet.signatures)
+        if until is not None and until in wallet.positions:
+            end = wallet.positions[until]
+
+        return wallet.signatures[start:min(end, start + limit)]
+
+    def price(self, token_id: str) -> float:
+        """
+        USD price of a token, between 0.0001 and 10000.
+        """
+        rng = random.Random(f"{self.seed}:price:{token_id}")
+        return round(10 ** rng.uniform(-4, 4), 6)
+
+    def _generate(self, address: str) -> SyntheticWallet:
+        """
+        Derive a wallet from the seed and its address.
+        """
+        rng = random.Random(f"{self.seed}:wallet:{address}")
+        profile, tokens_range, transactions_range = self._pick_profile(rng)
+
+        token_accounts = []
+        for index in range(rng.randint(*tokens_range)):
+            decimals = rng.choice((0, 6, 6, 9, 9, 9))
+            amount = int(10 ** rng.uniform(0, 7) * 10 ** decimals)
+            ui_amount = amount / 10 ** decimals
+            token_accounts.append({
+                "pubkey": self._digest(address, "account", index),
+                "account": {
+                    "data": {
+                        "parsed": {
+                            "info": {
+                                "isNative": False,
+                                "mint": self._digest("mint", rng.randrange(5000)),
+                                "owner": address,
+                                "state": "initialized",
+                                "tokenAmount": {
+                                    "amount": str(amount),
+                                    "decimals": decimals,
+                                    "uiAmount": ui_amount,
+                                    "uiAmountString": str(ui_amount)
+                                }
+                            },
+                            "type": "account"
+                        },
+                        "program": "spl-token",
+                        "space": 165
+                    },
+                    "executable": False,
+                    "lamports": 2039280,
+                    "owner": TOKEN_PROGRAM_ID,
+                    "rentEpoch": 0
+                }
+            })
+
+        # Newest first: gaps between transactions are exponential around the profile's pace
+        count = rng.randint(*transactions_range)
+        mean_gap = 30 * 86400 / max(1, count) if count else 0
+        block_time = self.anchor_time - int(rng.expovariate(1 / max(1.0, mean_gap)))
+
+        signatures = []
+        for index in range(count):
+            signatures.append({
+                "signature": self._digest(address, "signature", count - index),
+                "slot": self.base_slot - int((self.anchor_time - block_time) * SLOTS_PER_SECOND),
+                "blockTime": block_time,
+                "err": None if rng.random() > 0.03 else {"InstructionError": [0, "Custom"]},
+                "memo": None,
+                "confirmationStatus": "finalized"
+            })
+            block_time -= 1 + int(rng.expovariate(1 / max(1.0, mean_gap)))
+
+        return SyntheticWallet(address, profile, token_accounts, signatures)
+
+    def _pick_profile(self, rng: random.Random) -> Tuple[str, Tuple[int, int], Tuple[int, int]]:
+        roll = rng.random()
+        for name, share, tokens_range, transactions_range in WALLET_PROFILES:
+            if roll < share:
+                return name, tokens_range, transactions_range
+            roll -= share
+        name, _, tokens_range, transactions_range = WALLET_PROFILES[-1]
+        return name, tokens_range, transactions_range
+
+    def _digest(self, *parts: Any) -> str:
+        """
+        Stable opaque identifier (signatures, mints, account keys).
+        """
+        return hashlib.blake2b(":".join(map(str, (self.seed,) + parts)).encode(), digest_size=32).hexdigest()
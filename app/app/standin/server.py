@@ -0,0 +1,366 @@
+import argparse
+import asyncio
+import logging
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from app.standin.chain import SyntheticChain
+
+# Initialize logger
+logger = logging.getLogger("signalforge")
+
+# JSON-RPC error codes
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+
+# getSignaturesForAddress page size limit of real RPC nodes
+MAX_SIGNATURES_LIMIT = 1000
+
+
+class FaultInjector:
+    """
+    FaultInjector shapes every HTTP request the stand-in serves: a
+    latency drawn from the configured distribution (plus a cost per call
+    of a JSON-RPC batch), random 500 errors, and 429 throttling, both
+    random and from a requests-per-second quota, with Retry-After.
+    """
+
+    def __init__(self, latency: Optional[Dict[str, Any]] = None, per_call_ms: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, rate_limit_rps: float = 0.0, retry_after_seconds: float = 1.0,
+                 seed: int = 42):
+        """
+        Initialize the FaultInjector.
+
+        Args:
+            latency (dict, optional): {"distribution": none | fixed | uniform | lognormal, "ms", "min_ms",
+                                       "max_ms", "median_ms", "sigma"}.
+            per_call_ms (float): Extra latency per call of a JSON-RPC batch.
+            error_rate (float): Share of requests answered with HTTP 500.
+            throttle_rate (float): Share of requests answered with HTTP 429.
+            rate_limit_rps (float): Requests per second before answering 429 (0 → unlimited).
+            retry_after_seconds (float): Retry-After sent with 429 answers.
+            seed (int): Seed of the latency / fault draws.
+        """
+        self.latency = dict(latency or {"distribution": "none"})
+        self.per_call = max(0.0, per_call_ms) / 1000.0
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.rate_limit = rate_limit_rps
+        self.retry_after = retry_after_seconds
+
+        self._rng = random.Random(seed)
+        self._window_start = time.monotonic()
+        self._window_count = 0
+
+    def delay(self, calls: int = 1) -> float:
+        """
+        Seconds to wait before answering a request with this many calls.
+        """
+        latency = self.latency
+        distribution = latency.get("distribution", "none")
+
+        if distribution == "fixed":
+            seconds = latency.get("ms", 0.0) / 1000.0
+        elif distribution == "uniform":
+            seconds = self._rng.uniform(latency.get("min_ms", 0.0), latency.get("max_ms", 0.0)) / 1000.0
+        elif distribution == "lognormal":
+            seconds = latency.get("median_ms", 20.0) / 1000.0 * self._rng.lognormvariate(0.0, latency.get("sigma", 0.5))
+        else:
+            seconds = 0.0
+
+        return seconds + self.per_call * max(0, calls - 1)
+
+    def fault(self) -> Optional[int]:
+        """
+        HTTP status to fail the next request with (429 / 500), or None to serve it.
+        """
+        if self.rate_limit > 0:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            self._window_count += 1
+            if self._window_count > self.rate_limit:
+                return 429
+
+        roll = self._rng.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 500
+        return None
+
+
+def create_app(chain: SyntheticChain, faults: Optional[FaultInjector] = None) -> FastAPI:
+    """
+    Build the stand-in app: Solana JSON-RPC on POST /rpc (single calls and
+    batches) and CoinGecko's GET /coingecko/simple/price.
+
+    Args:
+        chain (SyntheticChain): Source of wallets and prices.
+        faults (FaultInjector, optional): Latency and error injection.
+
+    Returns:
+        FastAPI: Stand-in application (GET /stats shows what it served).
+    """
+    faults = faults or FaultInjector()
+    app = FastAPI(title="SignalForge upstream stand-in")
+    stats = Counter()
+    calls = Counter()
+
+    async def shaped(calls_in_request: int) -> Optional[JSONResponse]:
+        """
+        Apply latency and faults; returns the error response if the request fails.
+        """
+        delay = faults.delay(calls_in_request)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        status = faults.fault()
+        if status == 429:
+            stats["throttled"] += 1
+            return JSONResponse({"error": "Too many requests"}, status_code=429,
+                                headers={"Retry-After": f"{faults.retry_after:g}"})
+        if status is not None:
+            stats["errors"] += 1
+            return JSONResponse({"error": "Internal error"}, status_code=status)
+        return None
+
+    def rpc_call(request: Any) -> Dict[str, Any]:
+        """
+        Answer one JSON-RPC request object.
+        """
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" or "method" not in request:
+            return _rpc_error(None, INVALID_REQUEST, "Invalid request")
+
+        method, params, request_id = request["method"], request.get("params") or [], request.get("id")
+        calls[method] += 1
+
+        if method == "getTokenAccountsByOwner":
+            if not params or not isinstance(params[0], str):
+                return _rpc_error(request_id, INVALID_PARAMS, "Invalid param: expected wallet address")
+            return {"jsonrpc": "2.0", "id": request_id, "result": chain.token_accounts(params[0])}
+
+        if method == "getSignaturesForAddress":
+            if not params or not isinstance(params[0], str):
+                return _rpc_error(request_id, INVALID_PARAMS, "Invalid param: expected wallet address")
+            options = params[1] if len(params) > 1 and isinstance(params[1], dict) else {}
+            limit = options.get("limit", MAX_SIGNATURES_LIMIT)
+            if not isinstance(limit, int) or not 1 <= limit <= MAX_SIGNATURES_LIMIT:
+                return _rpc_error(request_id, INVALID_PARAMS, f"Invalid limit; max {MAX_SIGNATURES_LIMIT}")
+            result = chain.signatures(params[0], limit, options.get("before"), options.get("until"))
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+        if method == "getSlot":
+            return {"jsonrpc": "2.0", "id": request_id, "result": chain.current_slot}
+
+        if method == "getHealth":
+            return {"jsonrpc": "2.0", "id": request_id, "result": "ok"}
+
+        return _rpc_error(request_id, METHOD_NOT_FOUND, f"Method not found: {method}")
+
+    @app.post("/rpc")
+    async def rpc(request: Request):
+        try:
+            payload = await request.json()
+        except ValueError:
+            return JSONResponse(_rpc_error(None, -32700, "Parse error"))
+
+        batch = isinstance(payload, list)
+        stats["http_requests"] += 1
+        stats["batches" if batch else "single_calls"] += 1
+
+        failed = await shaped(len(payload) if batch else 1)
+        if failed is not None:
+            return failed
+
+        if batch:
+            if not payload:
+                return JSONResponse(_rpc_error(None, INVALID_REQUEST, "Empty batch"))
+            return JSONResponse([rpc_call(item) for item in payload])
+        return JSONResponse(rpc_call(payload))
+
+    @app.get("/coingecko/simple/price")
+    async def simple_price(ids: str = "", vs_currencies: str = "usd"):
+        stats["http_requests"] += 1
+        stats["price_requests"] += 1
+
+        failed = await shaped(1)
+        if failed is not None:
+            return failed
+
+        currencies = [c for c in vs_currencies.lower().split(",") if c]
+        return {token_id: {currency: chain.price(token_id) for currency in currencies}
+                for token_id in ids.split(",") if token_id}
+
+    @app.get("/stats")
+    def get_stats():
+        return {**stats, "rpc_calls": dict(calls)}
+
+    @app.delete("/stats")
+    def reset_stats():
+        stats.clear()
+        calls.clear()
+        return {"reset": True}
+
+    return app
+
+
+class StandinServer:
+    """
+    StandinServer runs the stand-in app with uvicorn on a background
+    thread, for tests and benchmarks:
+
+        with StandinServer(seed=7) as server:
+            config["rpc_url"], config["coingecko_api"] = server.rpc_url, server.coingecko_api
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, seed: int = 42, anchor_time: Optional[int] = None,
+                 faults: Optional[FaultInjector] = None):
+        """
+        Initialize the StandinServer.
+
+        Args:
+            host (str): Interface to listen on.
+            port (int): Port to listen on (0 → any free port).
+            seed (int): Seed of the synthetic chain and the fault draws.
+            anchor_time (int, optional): Unix time of the newest transactions (default: now).
+            faults (FaultInjector, optional): Latency and error injection.
+        """
+        self.host = host
+        self.port = port
+        self.chain = SyntheticChain(seed=seed, anchor_time=anchor_time)
+        self.app = create_app(self.chain, faults)
+
+        self._server: Optional[uvicorn.Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, standin_config: Optional[Dict[str, Any]] = None) -> "StandinServer":
+        """
+        Build a server from the "standin" section of the config.
+
+        Args:
+            standin_config (dict, optional): Stand-in settings.
+
+        Returns:
+            StandinServer: New (not yet started) server.
+        """
+        standin_config = standin_config or {}
+        seed = standin_config.get("seed", 42)
+        return cls(
+            host=standin_config.get("host", "127.0.0.1"),
+            port=standin_config.get("port", 8899),
+            seed=seed,
+            anchor_time=standin_config.get("anchor_time"),
+            faults=FaultInjector(
+                latency=standin_config.get("latency"),
+                per_call_ms=standin_config.get("per_call_ms", 0.0),
+                error_rate=standin_config.get("error_rate", 0.0),
+                throttle_rate=standin_config.get("throttle_rate", 0.0),
+                rate_limit_rps=standin_config.get("rate_limit_rps", 0.0),
+                retry_after_seconds=standin_config.get("retry_after_seconds", 1.0),
+                seed=seed
+            )
+        )
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def rpc_url(self) -> str:
+        """
+        Value for the rpc_url setting.
+        """
+        return f"{self.url}/rpc"
+
+    @property
+    def coingecko_api(self) -> str:
+        """
+        Value for the coingecko_api setting.
+        """
+        return f"{self.url}/coingecko"
+
+    def start(self) -> "StandinServer":
+        """
+        Start serving on a background thread; returns once the server accepts connections.
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        self.port = sock.getsockname()[1]
+
+        self._server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning", access_log=False))
+        self._thread = threading.Thread(target=self._server.run, kwargs={"sockets": [sock]},
+                                        name="signalforge-standin", daemon=True)
+        self._thread.start()
+
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError(f"Stand-in server failed to start on {self.url}")
+            time.sleep(0.01)
+
+        logger.info(f"Upstream stand-in listening on {self.url} (seed={self.chain.seed})")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stop the server and wait for its thread.
+        """
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+            self._server = None
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _rpc_error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Run the stand-in in the foreground:
+
+        python -m app.standin.server --port 8899 --seed 42 --latency-ms 20 --error-rate 0.01
+    """
+    parser = argparse.ArgumentParser(description="SignalForge upstream stand-in (Solana RPC + CoinGecko)")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=8899, help="Port to listen on")
+    parser.add_argument("--seed", type=int, default=42, help="Seed of the synthetic wallets and fault draws")
+    parser.add_argument("--anchor-time", type=int, help="Unix time of the newest transactions (default: now)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Median request latency (lognormal)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Lognormal sigma of the latency")
+    parser.add_argument("--per-call-ms", type=float, default=0.0, help="Extra latency per call of a batch")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failing with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests throttled with 429")
+    parser.add_argument("--rate-limit-rps", type=float, default=0.0, help="Requests per second before 429 (0 → off)")
+    args = parser.parse_args(argv)
+
+    latency = {"distribution": "lognormal", "median_ms": args.latency_ms, "sigma": args.latency_sigma} \
+        if args.latency_ms > 0 else None
+    faults = FaultInjector(latency=latency, per_call_ms=args.per_call_ms, error_rate=args.error_rate,
+                           throttle_rate=args.throttle_rate, rate_limit_rps=args.rate_limit_rps, seed=args.seed)
+    app = create_app(SyntheticChain(seed=args.seed, anchor_time=args.anchor_time), faults)
+
+    print(f"rpc_url: http://{args.host}:{args.port}/rpc")
+    print(f"coingecko_api: http://{args.host}:{args.port}/coingecko")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
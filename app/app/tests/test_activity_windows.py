@@ -0,0 +1,63 @@
+# Import the sliding-window engine from core modules
+from app.core.activity_windows import ActivityWindows, WINDOW_METRICS
+
+
+NOW = 1_700_000_000
+HOUR = 3600
+DAY = 86400
+
+
+def test_windows_count_and_gaps():
+    """
+    Test window counts, idle time and the quiet periods before each window.
+    """
+    windows = ActivityWindows()
+
+    # One old transaction 30 days ago, then a burst in the last two hours
+    windows.observe("w", [NOW - 30 * DAY])
+    windows.observe("w", [NOW - 2 * HOUR, NOW - 30 * 60, NOW - 10 * 60])
+
+    metrics = windows.snapshot("w", now=NOW)
+
+    assert set(metrics) == set(WINDOW_METRICS)
+    assert metrics["tx_1h"] == 2
+    assert metrics["tx_24h"] == 3
+    assert metrics["tx_7d"] == 3
+    assert metrics["gap_seconds"] == 20 * 60
+    assert metrics["idle_seconds"] == 10 * 60
+    assert metrics["gap_before_24h"] == 30 * DAY - 2 * HOUR
+    assert metrics["gap_before_1h"] == 2 * HOUR - 30 * 60
+
+
+def test_windows_incremental_matches_recompute():
+    """
+    Test that feeding signatures batch by batch gives the same metrics as
+    computing the windows from scratch, and that time moving on evicts.
+    """
+    times = [NOW - 9 * DAY, NOW - 3 * DAY, NOW - 5 * HOUR, NOW - 50 * 60, NOW - 5 * 60]
+    windows = ActivityWindows()
+
+    # Signatures arrive newest first per sync, like getSignaturesForAddress pages
+    windows.observe("w", reversed(times[:2]))
+    windows.observe("w", reversed(times[2:]))
+
+    assert windows.snapshot("w", now=NOW) == ActivityWindows.compute(times, now=NOW)
+
+    # Out-of-order times are skipped instead of corrupting the windows
+    assert windows.observe("w", [NOW - 10 * DAY]) == 0
+
+    later = windows.snapshot("w", now=NOW + 2 * DAY)
+    assert later["tx_1h"] == 0
+    assert later["tx_24h"] == 0
+    assert later["tx_7d"] == 4
+
+
+def test_unknown_wallet_has_empty_windows():
+    """
+    Test the metrics of a wallet without observed activity.
+    """
+    metrics = ActivityWindows().snapshot("nobody", now=NOW)
+
+    assert metrics["tx_24h"] == 0
+    assert metrics["gap_seconds"] is None
+    assert metrics["idle_seconds"] is None
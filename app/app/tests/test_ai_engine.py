@@ -1,5 +1,12 @@
+import json
 import os
+import re
+from types import SimpleNamespace
+
+import openai
+
 from app.core.ai_engine import AIEngine
+from app.core.comment_cache import CommentCache
 
 
 def test_generate_comment():
@@ -39,3 +46,92 @@ def test_generate_comment():
 
     # Optional: Print the comment during manual testing
     print("AI Comment:", comment)
+
+
+def _fake_openai(monkeypatch, answer):
+    """
+    Replace the openai.OpenAI client with a fake returning answer(prompt), recording the calls.
+    """
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=answer(kwargs["messages"][-1]["content"]))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    class FakeOpenAI:
+        def __init__(self, api_key):
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    monkeypatch.setattr(openai, "OpenAI", FakeOpenAI)
+    return calls
+
+
+def test_generate_comments_batches_wallets(monkeypatch):
+    """
+    Test that a sweep is packed into batched requests and split back per wallet.
+    """
+    def answer(prompt):
+        ids = re.findall(r"- id (\d+):", prompt)
+        return json.dumps({"comments": [{"id": i, "comment": f"comment {i}"} for i in ids]})
+
+    calls = _fake_openai(monkeypatch, answer)
+    engine = AIEngine("test-key", batch_size=4)
+
+    items = [({"wallet": f"w{i}", "tokens_held": i, "transaction_count": 1}, []) for i in range(10)]
+    comments = engine.generate_comments(items)
+
+    # 10 wallets → batches of 4, 4, 2, answered in JSON mode
+    assert len(calls) == 3
+    assert all(call["response_format"] == {"type": "json_object"} for call in calls)
+    assert comments[:4] == ["comment 0", "comment 1", "comment 2", "comment 3"]
+    assert comments[9] == "comment 1"
+
+
+def test_generate_comments_shares_profiles_and_respects_token_budget(monkeypatch):
+    """
+    Test that wallets with the same profile share one comment and the token budget splits batches.
+    """
+    def answer(prompt):
+        ids = re.findall(r"- id (\d+):", prompt)
+        if not ids:
+            return "single comment"
+        return json.dumps({"comments": [{"id": i, "comment": f"comment {i}"} for i in ids]})
+
+    calls = _fake_openai(monkeypatch, answer)
+
+    # Two profiles, each repeated three times
+    items = [({"wallet": f"w{i}", "tokens_held": 3 if i % 2 else 30, "transaction_count": 1}, [])
+             for i in range(6)]
+
+    engine = AIEngine("test-key", CommentCache(), batch_token_budget=1000)
+    assert engine.generate_comments(items) == ["comment 0", "comment 1"] * 3
+    assert len(calls) == 1
+
+    # Repeat sweep is served from the cache
+    assert engine.generate_comments(items) == ["comment 0", "comment 1"] * 3
+    assert len(calls) == 1
+
+    # A budget below two summaries → one request per profile
+    calls.clear()
+    engine = AIEngine("test-key", CommentCache(), batch_token_budget=150)
+    assert engine.generate_comments(items) == ["single comment"] * 6
+    assert len(calls) == 2
+
+
+def test_generate_comments_falls_back_per_wallet(monkeypatch):
+    """
+    Test that an unparseable batched answer falls back to one request per wallet.
+    """
+    def answer(prompt):
+        if "JSON only" in prompt:
+            return "Sure! Here are your comments."
+        return "single comment"
+
+    calls = _fake_openai(monkeypatch, answer)
+    engine = AIEngine("test-key")
+
+    items = [({"wallet": f"w{i}", "tokens_held": i, "transaction_count": 1}, []) for i in range(3)]
+
+    assert engine.generate_comments(items) == ["single comment"] * 3
+    assert len(calls) == 1 + 3
@@ -0,0 +1,105 @@
+import copy
+import json
+
+import pytest
+
+from app.bench.suite import CASES, BenchmarkSuite, compare, main, measure
+
+CONFIG = {
+    "coingecko_api": "http://127.0.0.1:9/coingecko",
+    "rpc_url": "http://127.0.0.1:9/rpc",
+    "risk_weights": {},
+    "whale_wallets": {},
+    "patterns": {}
+}
+
+STANDIN = {"anchor_time": 1_700_000_000, "latency": {"distribution": "none"}}
+
+
+def report(**throughputs):
+    return {"results": [{"case": case, "wallets": 1000, "calls": 1000, "throughput_per_second": value,
+                         "p95_ms": 1000.0 / value} for case, value in throughputs.items()]}
+
+
+def test_suite_measures_every_case_against_standin(tmp_path):
+    """
+    Test that a run reports throughput, latency percentiles and peak RSS for every case and size.
+    """
+    suite = BenchmarkSuite(CONFIG, sizes=[1, 3], concurrency=2, standin_config=STANDIN, work_dir=str(tmp_path))
+
+    results = suite.run()["results"]
+
+    assert [(r["case"], r["wallets"]) for r in results] == [(case, size) for size in (1, 3) for case in CASES]
+    for result in results:
+        assert result["calls"] == result["wallets"] and result["errors"] == 0
+        assert result["throughput_per_second"] > 0 and result["peak_rss_mb"] > 0
+        assert 0 <= result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"] <= result["max_ms"]
+
+    with pytest.raises(ValueError):
+        BenchmarkSuite(CONFIG, cases=["analyze_wallet", "warp_drive"])
+
+
+def test_compare_flags_regressions_over_threshold():
+    """
+    Test that only throughput / p95 changes over the threshold, on enough calls, count as regressions.
+    """
+    baseline = report(detect_patterns=1000.0, generate_signal=1000.0)
+
+    assert compare(report(detect_patterns=850.0, generate_signal=1200.0), baseline, threshold=0.2) == []
+
+    regressions = compare(report(detect_patterns=700.0, generate_signal=1000.0), baseline, threshold=0.2)
+    assert len(regressions) == 2 and all(r.startswith("detect_patterns x1000") for r in regressions)
+
+    assert compare(report(detect_patterns=700.0), baseline, threshold=0.2, min_calls=5000) == []
+
+
+def test_failed_calls_count_as_errors_not_latency():
+    """
+    Test that failed calls stay out of latency and throughput, and that a higher error rate is a regression.
+    """
+    def call(item):
+        if item % 2:
+            raise RuntimeError("upstream down")
+        return item
+
+    result, outputs = measure("detect_patterns", 10, call, range(10))
+    reported = result.to_dict()
+
+    assert outputs == [0, None, 2, None, 4, None, 6, None, 8, None]
+    assert (reported["calls"], reported["errors"], reported["error_rate"]) == (10, 5, 0.5)
+    assert result.histogram.count == 5
+
+    baseline = report(detect_patterns=1000.0)
+    failing = report(detect_patterns=1000.0)
+    failing["results"][0]["errors"] = 3
+
+    regressions = compare(failing, baseline, threshold=0.2, min_calls=5000)
+    assert regressions == ["detect_patterns x1000: errors 0/1000 → 3/1000"]
+    assert compare(failing, failing, threshold=0.2) == []
+
+
+def test_main_fails_on_regression(tmp_path, monkeypatch):
+    """
+    Test that the command stores its report and exits non-zero when it regressed against the baseline.
+    """
+    base_config = tmp_path / "base.yaml"
+    strategy_config = tmp_path / "strategy.yaml"
+    base_config.write_text(json.dumps({**CONFIG, "standin": STANDIN, "benchmark": {"min_calls": 1}}))
+    strategy_config.write_text("{}")
+
+    args = ["--config", str(base_config), "--strategy", str(strategy_config), "--sizes", "2", "--cases",
+            "detect_patterns,calculate_risk_score", "--baseline", str(tmp_path / "baseline.json")]
+    monkeypatch.chdir(tmp_path)
+
+    main(args + ["--output", str(tmp_path / "first.json"), "--save-baseline"])
+    first = json.loads((tmp_path / "first.json").read_text())
+    assert [r["case"] for r in first["results"]] == ["detect_patterns", "calculate_risk_score"]
+
+    faster = copy.deepcopy(first)
+    for result in faster["results"]:
+        result["throughput_per_second"] *= 1000
+    (tmp_path / "baseline.json").write_text(json.dumps(faster))
+
+    with pytest.raises(SystemExit) as exit_info:
+        main(args + ["--output", str(tmp_path / "second.json")])
+    assert exit_info.value.code == 1
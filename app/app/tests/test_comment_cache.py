@@ -0,0 +1,117 @@
+import time
+from types import SimpleNamespace
+
+import openai
+
+from app.core.ai_engine import AIEngine
+from app.core.comment_cache import CommentCache
+from app.db.database import Database
+
+
+def test_fingerprint_normalizes_profile():
+    """
+    Test that the fingerprint ignores the wallet address and pattern order
+    and buckets the counts into ranges.
+    """
+    cache = CommentCache()
+
+    assert [cache.bucket(n) for n in (0, 1, 3, 7, 12, 49, 100, 5000)] == \
+        ["0", "1", "2-4", "5-9", "10-19", "20-49", "100+", "100+"]
+
+    a = cache.fingerprint({"wallet": "aaa", "tokens_held": 12, "transaction_count": 3},
+                          [{"name": "Whale Wallet"}, {"name": "Accumulation Behavior"}])
+    b = cache.fingerprint({"wallet": "bbb", "tokens_held": 17, "transaction_count": 4},
+                          [{"name": "Accumulation Behavior"}, {"name": "Whale Wallet"}])
+    c = cache.fingerprint({"wallet": "aaa", "tokens_held": 25, "transaction_count": 3},
+                          [{"name": "Whale Wallet"}, {"name": "Accumulation Behavior"}])
+
+    assert a == b
+    assert a != c
+
+
+def test_two_tier_cache_with_ttl_and_eviction(tmp_path):
+    """
+    Test memory LRU eviction, SQLite persistence across instances and TTL expiry.
+    """
+    db = Database(str(tmp_path / "comments.db"))
+    cache = CommentCache(db=db, max_entries=2, ttl_seconds=60)
+
+    for key in ("k1", "k2", "k3"):
+        cache.put(key, f"comment {key}")
+
+    # k1 fell out of memory but is still in SQLite
+    assert cache.stats()["entries"] == 2
+    assert cache.get("k1") == "comment k1"
+    assert cache.stats()["db_hits"] == 1
+
+    # A fresh process sees the persisted comments
+    restarted = CommentCache(db=db, ttl_seconds=60)
+    assert restarted.get("k3") == "comment k3"
+
+    # Expired entries are misses
+    expired = CommentCache(db=db, ttl_seconds=60)
+    expired._entries["old"] = ("stale", time.time() - 120)
+    assert expired.get("old") is None
+
+    # SQLite keeps only the most recently used entries
+    small = CommentCache(db=db, max_db_entries=2, ttl_seconds=60)
+    small.put("k4", "comment k4")
+    assert db.get_ai_comment("k2") is None
+    assert db.get_ai_comment("k4") is not None
+
+
+def test_ai_engine_serves_repeat_profiles_from_cache(monkeypatch):
+    """
+    Test that AIEngine only calls OpenAI once for two wallets with the same profile.
+    """
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        message = SimpleNamespace(content=" Quiet accumulator. ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    class FakeOpenAI:
+        def __init__(self, api_key):
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    monkeypatch.setattr(openai, "OpenAI", FakeOpenAI)
+
+    engine = AIEngine("test-key", CommentCache())
+    patterns = [{"name": "Accumulation Behavior"}]
+
+    first = engine.generate_comment({"wallet": "a", "tokens_held": 6, "transaction_count": 2}, patterns)
+    second = engine.generate_comment({"wallet": "b", "tokens_held": 8, "transaction_count": 3}, patterns)
+
+    assert first == second == "Quiet accumulator."
+    assert len(calls) == 1
+
+
+def test_prompts_only_carry_the_cached_profile(monkeypatch):
+    """
+    Test that single and batched prompts omit the wallet address and exact counts behind a shared cache key.
+    """
+    prompts = []
+
+    def create(**kwargs):
+        prompts.append(kwargs["messages"][-1]["content"])
+        message = SimpleNamespace(content="Busy trader.")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    class FakeOpenAI:
+        def __init__(self, api_key):
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    monkeypatch.setattr(openai, "OpenAI", FakeOpenAI)
+
+    engine = AIEngine("test-key", CommentCache())
+    wallet = {"wallet": "SecretWallet123", "tokens_held": 7, "transaction_count": 23}
+
+    engine.generate_comment(wallet, [{"name": "Whale Wallet"}])
+    engine._request_batch([(wallet, []), ({"wallet": "OtherWallet456", "tokens_held": 1, "transaction_count": 2}, [])])
+
+    assert len(prompts) == 2
+    for prompt in prompts:
+        assert "SecretWallet123" not in prompt and "OtherWallet456" not in prompt
+        assert "Tokens Held: 5-9" in prompt or "Tokens Held 5-9" in prompt
+        assert "23" not in prompt and "20-49" in prompt
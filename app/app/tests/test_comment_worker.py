@@ -0,0 +1,93 @@
+import threading
+import time
+
+from app.core.ai_engine import AIEngine
+from app.core.comment_worker import CommentWorker, PENDING_COMMENT
+from app.core.pattern_detector import PatternDetector
+from app.core.risk_assessor import RiskAssessor
+from app.core.signal_generator import SignalGenerator
+from app.core.wallet_state import WalletStateTracker
+
+
+class FakeEngine(AIEngine):
+    """
+    AIEngine whose OpenAI call is replaced by a fixed (optionally slow) answer.
+    """
+
+    def __init__(self, comment="Quiet accumulator.", delay=0.0):
+        super().__init__("test-key")
+        self.comment = comment
+        self.delay = delay
+        self.calls = 0
+
+    def generate_comment(self, wallet_analysis, patterns):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.comment
+
+
+ANALYSIS = {"wallet": "abc", "tokens_held": 3, "transaction_count": 2, "activity_type": "Low Activity"}
+PATTERNS = [{"name": "Accumulation Behavior"}]
+
+
+def test_background_comment_is_delivered_later():
+    """
+    Test that background mode returns "pending" and hands the comment to the callback.
+    """
+    worker = CommentWorker(FakeEngine(delay=0.05), background=True, deadline=2.0)
+    delivered = []
+
+    assert worker.comment(ANALYSIS, PATTERNS, delivered.append) == PENDING_COMMENT
+
+    worker.wait(timeout=2.0)
+    assert delivered == ["Quiet accumulator."]
+
+
+def test_deadline_falls_back_to_template():
+    """
+    Test that a slow OpenAI call is replaced by the local template at the deadline.
+    """
+    worker = CommentWorker(FakeEngine(delay=1.0), background=False, deadline=0.05)
+
+    started = time.monotonic()
+    comment = worker.comment(ANALYSIS, PATTERNS)
+
+    assert time.monotonic() - started < 0.5
+    assert comment.startswith("Low Activity: holds 3 token(s) with 2 recent transaction(s).")
+    assert "Accumulation Behavior" in comment
+
+
+def test_failed_call_uses_template_inline():
+    """
+    Test that inline mode returns the template when OpenAI fails.
+    """
+    worker = CommentWorker(FakeEngine(comment=AIEngine.FALLBACK_COMMENT), background=False, deadline=1.0)
+
+    assert worker.comment(ANALYSIS, []).endswith("No notable patterns detected.")
+
+
+def test_tracker_attaches_background_comment_to_stored_signal():
+    """
+    Test that the stored signal is updated once its background comment arrives.
+    """
+    config = {"risk_weights": {}, "whale_wallets": {}, "patterns": {}}
+    engine = FakeEngine(delay=0.05)
+    worker = CommentWorker(engine, background=True, deadline=2.0)
+    tracker = WalletStateTracker(PatternDetector(config), SignalGenerator(engine, worker), RiskAssessor(config))
+
+    updates = []
+    received = threading.Event()
+
+    def on_comment(signal):
+        updates.append(signal)
+        received.set()
+
+    signal, recomputed = tracker.evaluate(ANALYSIS, on_comment)
+
+    assert recomputed
+    assert signal["ai_comment"] == PENDING_COMMENT
+
+    assert received.wait(timeout=2.0)
+    assert updates[0]["ai_comment"] == "Quiet accumulator."
+    assert updates[0]["risk_score"] == signal["risk_score"]
+    assert tracker.get_state("abc")["signal"]["ai_comment"] == "Quiet accumulator."
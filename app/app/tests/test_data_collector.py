@@ -1,16 +1,35 @@
-from app.core.data_collector import DataCollector
+import asyncio
 
+import pytest
 
-def test_fetch_token_price():
+from app.core.data_collector import DataCollector, AsyncDataCollector
+from app.core.http_transport import HTTPTransport
+from app.standin.server import StandinServer
+
+
+@pytest.fixture(scope="module")
+def standin():
+    """
+    Local stand-in for Solana RPC and CoinGecko, with a transport of its own.
+    """
+    transport = HTTPTransport()
+    with StandinServer(seed=42) as server:
+        yield server, transport
+    transport.close()
+
+
+def test_fetch_token_price(standin):
     """
     Test fetch_token_price() method.
 
     Verifies that the method returns a non-negative price for a known token.
-    This ensures that the external API is reachable and returns valid data.
+    This ensures that the price API is reachable and returns valid data.
     """
+    server, transport = standin
     collector = DataCollector(
-        coingecko_api="https://api.coingecko.com/api/v3",
-        rpc_url="https://api.mainnet-beta.solana.com"
+        coingecko_api=server.coingecko_api,
+        rpc_url=server.rpc_url,
+        transport=transport
     )
 
     price = collector.fetch_token_price("solana")
@@ -20,16 +39,18 @@ def test_fetch_token_price():
     assert price >= 0, "Token price should not be negative"
 
 
-def test_fetch_wallet_balance():
+def test_fetch_wallet_balance(standin):
     """
     Test fetch_wallet_balance() method.
 
     Verifies that the method returns a dictionary structure for any input wallet.
     Use a placeholder wallet for structure testing only.
     """
+    server, transport = standin
     collector = DataCollector(
-        coingecko_api="https://api.coingecko.com/api/v3",
-        rpc_url="https://api.mainnet-beta.solana.com"
+        coingecko_api=server.coingecko_api,
+        rpc_url=server.rpc_url,
+        transport=transport
     )
 
     # Use a dummy or devnet wallet; this test checks structure, not real values
@@ -39,3 +60,23 @@ def test_fetch_wallet_balance():
     # Assert structure
     assert isinstance(result, dict), "Wallet balance should return a dictionary"
     assert "wallet" in result or "value" in result, "Expected keys missing in wallet balance response"
+
+
+def test_async_fetch_token_price(standin):
+    """
+    Test AsyncDataCollector.fetch_token_price().
+
+    Verifies that the async collector can be awaited from a caller's own
+    event loop while the request runs on the pooled transport.
+    """
+    server, transport = standin
+    collector = AsyncDataCollector(
+        coingecko_api=server.coingecko_api,
+        rpc_url=server.rpc_url,
+        transport=transport
+    )
+
+    price = asyncio.run(collector.fetch_token_price("solana"))
+
+    assert isinstance(price, (int, float)), "Token price should be numeric"
+    assert price >= 0, "Token price should not be negative"
@@ -0,0 +1,96 @@
+import asyncio
+
+from app.core.endpoint_pool import RPCEndpointPool
+
+
+class EndpointTransport:
+    """
+    Minimal stand-in for HTTPTransport with a fixed latency (or failure) per URL.
+    """
+
+    def __init__(self, latencies):
+        self.latencies = latencies
+        self.calls = []
+
+    async def run_on_loop(self, coro):
+        return await coro
+
+    async def request_json(self, method, url, json=None, params=None, timeout=None):
+        self.calls.append(url)
+        latency = self.latencies[url]
+        if latency is None:
+            raise ConnectionError(f"{url} is down")
+        await asyncio.sleep(latency)
+        return {"jsonrpc": "2.0", "id": 1, "result": url}
+
+
+def test_routes_to_fastest_endpoint():
+    """
+    Test RPCEndpointPool routing.
+
+    After every endpoint has been sampled, calls should go to the one
+    with the lowest latency EWMA.
+    """
+    transport = EndpointTransport({"http://slow": 0.03, "http://fast": 0.001})
+    pool = RPCEndpointPool(transport, ["http://slow", "http://fast"])
+
+    async def run():
+        return [await pool.post_json({"method": "getSlot"}) for _ in range(6)]
+
+    results = asyncio.run(run())
+
+    assert results[-1]["result"] == "http://fast"
+    assert transport.calls.count("http://slow") == 1, "Slow endpoint should only be sampled once"
+
+
+def test_fails_over_to_next_endpoint():
+    """
+    Test that a failing endpoint is skipped and the call succeeds elsewhere.
+    """
+    transport = EndpointTransport({"http://down": None, "http://up": 0.001})
+    pool = RPCEndpointPool(transport, ["http://down", "http://up"], max_error_rate=0.1)
+
+    async def run():
+        return [await pool.post_json({"method": "getSlot"}) for _ in range(4)]
+
+    results = asyncio.run(run())
+
+    assert all(r["result"] == "http://up" for r in results)
+    assert pool.failovers >= 1
+    assert transport.calls.count("http://down") == 1, "Unhealthy endpoint should not be retried immediately"
+
+
+def test_hedged_request_wins_over_slow_primary():
+    """
+    Test hedging: a slow primary should be raced by the secondary endpoint.
+    """
+    transport = EndpointTransport({"http://primary": 2.0, "http://secondary": 0.001})
+    pool = RPCEndpointPool(transport, ["http://primary", "http://secondary"], hedge=True, hedge_min_delay_ms=10)
+
+    result = asyncio.run(pool.post_json({"method": "getSlot"}))
+
+    assert result["result"] == "http://secondary"
+    assert pool.hedges == 1
+    assert pool.hedge_wins == 1
+
+
+def test_hedge_losses_raise_primary_latency():
+    """
+    Test that a primary repeatedly losing hedge races stops looking fast and is demoted.
+    """
+    transport = EndpointTransport({"http://primary": 2.0, "http://secondary": 0.001})
+    pool = RPCEndpointPool(transport, ["http://primary", "http://secondary"], hedge=True, hedge_min_delay_ms=10)
+    primary, secondary = pool.endpoints
+    primary.latency_ewma, secondary.latency_ewma = 0.001, 0.005
+
+    async def calls():
+        for _ in range(5):
+            await pool.post_json({"method": "getSlot"})
+            if pool._ranked()[0] is secondary:
+                break
+
+    asyncio.run(calls())
+
+    assert pool.hedge_wins >= 1
+    assert primary.latency_ewma > 0.005 and primary.samples
+    assert pool._ranked()[0] is secondary
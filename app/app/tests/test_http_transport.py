@@ -0,0 +1,42 @@
+import asyncio
+
+from app.core.http_transport import HTTPTransport
+
+
+def test_shared_transport_is_reused():
+    """
+    Test HTTPTransport.shared().
+
+    Verifies that every caller gets the same process-wide transport,
+    so connection pools are reused between API requests and CLI runs.
+    """
+    first = HTTPTransport.shared()
+    second = HTTPTransport.shared({"http": {"pool_size": 1}})
+
+    assert first is second, "Shared transport should be created only once"
+    assert not first.closed, "Shared transport should be running"
+
+
+def test_run_sync_and_run_on_loop():
+    """
+    Test HTTPTransport.run_sync() and run_on_loop().
+
+    Ensures coroutines execute on the transport loop from both
+    sync callers and foreign event loops.
+    """
+    transport = HTTPTransport(pool_size=2)
+
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    try:
+        # Sync caller → runs on the transport loop
+        assert transport.run_sync(current_loop()) is transport.loop
+
+        # Foreign event loop → hops onto the transport loop
+        loop_used = asyncio.run(transport.run_on_loop(current_loop()))
+        assert loop_used is transport.loop
+    finally:
+        transport.close()
+
+    assert transport.closed, "Transport should be closed after close()"
@@ -0,0 +1,96 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import register_routes
+from app.core.metrics import MetricsRegistry, rpc_operation
+from app.db.database import Database
+
+CONFIG = {
+    "coingecko_api": "http://127.0.0.1:9/coingecko",
+    "rpc_url": "http://127.0.0.1:9/rpc",
+    "risk_weights": {},
+    "whale_wallets": {},
+    "patterns": {}
+}
+
+
+def test_render_exposition_format():
+    """
+    Test that counters, gauges and histograms render in the Prometheus text format.
+    """
+    registry = MetricsRegistry(latency_buckets=(0.1, 1.0))
+    registry.counter("jobs_total", "Jobs done.", ("kind",)).inc(2, kind='say "hi"\n')
+    registry.upstream_latency.observe(0.05, upstream="rpc", operation="getBalance")
+    registry.upstream_latency.observe(0.5, upstream="rpc", operation="getBalance")
+    registry.upstream_latency.observe(3.0, upstream="rpc", operation="getBalance")
+
+    text = registry.render()
+
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="say \\"hi\\"\\n"} 2' in text
+    assert "# TYPE signalforge_upstream_request_duration_seconds histogram" in text
+    for le, count in (("0.1", 1), ("1", 2), ("+Inf", 3)):
+        assert (f'signalforge_upstream_request_duration_seconds_bucket{{upstream="rpc",operation="getBalance",'
+                f'le="{le}"}} {count}') in text
+    assert 'signalforge_upstream_request_duration_seconds_count{upstream="rpc",operation="getBalance"} 3' in text
+    assert text.endswith("\n")
+
+    with pytest.raises(ValueError):
+        registry.gauge("jobs_total", "Same name, other type.")
+
+
+def test_upstream_call_records_status_bytes_and_in_flight():
+    """
+    Test that outbound calls are counted by status (incl. throttled / failed ones) with their bytes.
+    """
+    registry = MetricsRegistry()
+
+    with registry.upstream_call("webhook", "discord") as call:
+        assert registry.upstream_in_flight.value(upstream="webhook") == 1
+        call.response(204, bytes_sent=120, bytes_received=0)
+
+    throttled = Exception("429 Too Many Requests")
+    throttled.response = SimpleNamespace(status_code=429)
+    for error in (throttled, ConnectionError("refused")):
+        with pytest.raises(type(error)):
+            with registry.upstream_call("webhook", "discord"):
+                raise error
+
+    requests = registry.upstream_requests
+    assert requests.value(upstream="webhook", operation="discord", status="204") == 1
+    assert requests.value(upstream="webhook", operation="discord", status="429") == 1
+    assert requests.value(upstream="webhook", operation="discord", status="error") == 1
+    assert registry.upstream_sent.value(upstream="webhook", operation="discord") == 120
+    assert registry.upstream_latency.count(upstream="webhook", operation="discord") == 3
+    assert registry.upstream_in_flight.value(upstream="webhook") == 0
+
+    assert rpc_operation({"jsonrpc": "2.0", "method": "getBalance"}) == "getBalance"
+    assert rpc_operation([{"method": "getBalance"}, {"method": "getBalance"}]) == "batch:getBalance"
+    assert rpc_operation([{"method": "getBalance"}, {"method": "getSlot"}]) == "batch:mixed"
+
+
+def test_metrics_endpoint(tmp_path):
+    """
+    Test that GET /metrics serves SQLite writes, cache hit ratios and queue depths.
+    """
+    db = Database(str(tmp_path / "metrics.db"))
+    app = FastAPI()
+    register_routes(app, CONFIG, db)
+
+    db.save_wallet_state("w1", {"analysis": {}, "signal": {}})
+    db.save_wallet_signatures("w1", [{"signature": "s1", "slot": 2}, {"signature": "s2", "slot": 1}])
+
+    response = TestClient(app).get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'signalforge_db_writes_total{table="wallet_state"} 1' in response.text
+    assert 'signalforge_db_rows_written_total{table="wallet_signatures"} 2' in response.text
+    assert 'signalforge_cache_hit_ratio{cache="price"} 0' in response.text
+    assert 'signalforge_queue_depth{queue="rpc_batch"} 0' in response.text
+    assert "signalforge_api_requests_in_flight 1" in response.text
+
+    app.state.pipeline.close()
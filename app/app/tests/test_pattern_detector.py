@@ -1,4 +1,15 @@
 from app.core.pattern_detector import PatternDetector
+from app.core.rule_engine import RuleEngine
+from app.core.wallet_metrics import WalletMetrics
+
+SAMPLE_WALLETS = [
+    {"wallet": "empty", "tokens_held": 0, "transaction_count": 0, "activity_type": "Dormant Wallet"},
+    {"wallet": "whale", "tokens_held": 25, "transaction_count": 3, "activity_type": "Low Activity", "is_whale": True},
+    {"wallet": "trader", "tokens_held": 1, "transaction_count": 25, "activity_type": "High Activity"},
+    {"wallet": "quiet", "tokens_held": 4, "transaction_count": 2, "activity_type": "Low Activity"},
+    {"wallet": "awake", "tokens_held": 1, "transaction_count": 12, "activity_type": "Moderate Activity",
+     "tx_24h": 12, "gap_before_24h": 40 * 86400}
+]
 
 
 def test_detect_patterns():
@@ -37,3 +48,54 @@ def test_detect_patterns():
     if patterns:
         assert "name" in patterns[0], "Each pattern should have a 'name'"
         assert "description" in patterns[0], "Each pattern should have a 'description'"
+
+
+def test_detect_custom_patterns():
+    """
+    Test that custom patterns stored through ModelTrainer are evaluated
+    alongside the built-in rules.
+    """
+    engine = RuleEngine([
+        {"name": "Quiet Holder", "description": "Holds tokens, barely trades.",
+         "conditions": {"tokens_held": ">=2", "transaction_count": "<3"}}
+    ])
+    detector = PatternDetector({"pattern_rules": {"whale_tokens": 10}}, engine)
+
+    patterns = detector.detect_patterns({"tokens_held": 4, "transaction_count": 1,
+                                         "activity_type": "Low Activity", "wallet": "abc"})
+
+    assert "Quiet Holder" in [p["name"] for p in patterns]
+
+
+def test_detect_patterns_batch_matches_single():
+    """
+    Test that the vectorized bitmasks agree with detect_patterns() per wallet.
+    """
+    engine = RuleEngine([{"name": "Busy", "description": "Very active.", "conditions": {"transaction_count": ">20"}}])
+    detector = PatternDetector({"pattern_rules": {"whale_tokens": 20}}, engine)
+
+    masks = detector.detect_patterns_batch(WalletMetrics.from_analyses(SAMPLE_WALLETS))
+
+    for wallet, mask in zip(SAMPLE_WALLETS, masks):
+        assert detector.decode_patterns(mask) == [p["name"] for p in detector.detect_patterns(wallet)]
+
+    assert PatternDetector.count_patterns(masks).tolist() == [
+        len(detector.detect_patterns(wallet)) for wallet in SAMPLE_WALLETS
+    ]
+
+
+def test_detect_dormant_awakening_from_windows():
+    """
+    Test that Dormant Awakening fires for a burst after a long quiet period
+    and that custom rules can reference the activity windows.
+    """
+    engine = RuleEngine([{"name": "Hourly Burst", "description": "Busy hour.",
+                          "conditions": {"tx_1h": ">=5", "gap_before_1h": ">=1d"}}])
+    detector = PatternDetector({"pattern_rules": {"dormant_threshold": 3, "dormant_gap_hours": 168}}, engine)
+
+    awakened = {"wallet": "a", "tokens_held": 1, "transaction_count": 8, "activity_type": "Moderate Activity",
+                "tx_1h": 6, "tx_24h": 8, "gap_before_1h": 2 * 86400, "gap_before_24h": 30 * 86400}
+    steady = dict(awakened, gap_before_24h=600, gap_before_1h=600)
+
+    assert [p["name"] for p in detector.detect_patterns(awakened)] == ["Dormant Awakening", "Hourly Burst"]
+    assert detector.detect_patterns(steady) == []
@@ -0,0 +1,93 @@
+import asyncio
+
+from app.core.price_service import PriceService
+
+
+class PriceTransport:
+    """
+    Minimal stand-in for HTTPTransport that serves simple/price replies
+    locally and records every query it receives.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    async def run_on_loop(self, coro):
+        return await coro
+
+    async def request_json(self, method, url, json=None, params=None, timeout=None):
+        ids = params["ids"].split(",")
+        self.queries.append(ids)
+        return {token_id: {"usd": float(len(token_id))} for token_id in ids}
+
+
+def test_concurrent_lookups_are_coalesced():
+    """
+    Test PriceService.get_prices() with concurrent lookups.
+
+    Verifies that concurrent single-token lookups are sent as one
+    multi-id request and that repeated lookups are served from cache.
+    """
+    transport = PriceTransport()
+    service = PriceService(transport, "http://coingecko.local", ttl_seconds=60, window_ms=5)
+
+    async def run():
+        tokens = ["solana", "bonk", "jup", "solana"]
+        results = await asyncio.gather(*(service.get_price(t) for t in tokens))
+        cached = await service.get_prices(["bonk", "jup"])
+        return results, cached
+
+    results, cached = asyncio.run(run())
+
+    assert results == [6.0, 4.0, 3.0, 6.0]
+    assert cached == {"bonk": 4.0, "jup": 3.0}
+
+    # One upstream request for all tokens, none for the cached lookups
+    assert len(transport.queries) == 1
+    assert sorted(transport.queries[0]) == ["bonk", "jup", "solana"]
+    assert service.hits == 2
+
+
+def test_stale_prices_are_served_and_revalidated():
+    """
+    Test stale-while-revalidate behavior.
+
+    A stale price must be returned immediately while a background
+    refresh is triggered.
+    """
+    transport = PriceTransport()
+    service = PriceService(transport, "http://coingecko.local", ttl_seconds=0, stale_seconds=60, window_ms=1)
+
+    async def run():
+        first = await service.get_price("solana")
+        second = await service.get_price("solana")
+        await asyncio.sleep(0.05)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == 6.0
+    assert service.stale_hits == 1
+    assert len(transport.queries) == 2, "Stale lookup should trigger a background refresh"
+
+
+def test_eviction_keeps_recently_read_prices():
+    """
+    Test that max_entries evicts the least recently used price, not the oldest fetched one.
+    """
+    transport = PriceTransport()
+    service = PriceService(transport, "http://coingecko.local", ttl_seconds=60, window_ms=1, max_entries=2)
+
+    async def run():
+        await service.get_prices(["solana", "bonk"])
+        await service.get_price("solana")
+        await service.get_price("jup")
+
+        # Fetch tasks are released once done
+        await asyncio.sleep(0)
+        assert not service._tasks
+
+    asyncio.run(run())
+
+    assert list(service._cache) == ["solana", "jup"]
+    assert len(transport.queries) == 2
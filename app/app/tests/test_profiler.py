@@ -0,0 +1,99 @@
+import os
+import pstats
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import get_pipeline, register_routes
+from app.core.profiler import Profiler
+
+CONFIG = {
+    "coingecko_api": "http://127.0.0.1:9/coingecko",
+    "rpc_url": "http://127.0.0.1:9/rpc",
+    "risk_weights": {},
+    "whale_wallets": {},
+    "patterns": {}
+}
+
+
+def busy_worker(seconds):
+    """
+    Burn CPU for a while (stands in for work on a pipeline thread).
+    """
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(i * i for i in range(1000))
+
+
+def test_profile_writes_pstats_stacks_and_allocations(tmp_path):
+    """
+    Test that a profiled run writes loadable pstats, collapsed stacks of all threads and allocation sites.
+    """
+    profiler = Profiler(output_dir=str(tmp_path), sample_interval=0.002)
+
+    with profiler.profile("signal wallet/1") as result:
+        worker = threading.Thread(target=busy_worker, args=(0.2,), name="stage-worker")
+        worker.start()
+        retained = [bytearray(1024) for _ in range(2000)]
+        worker.join()
+
+    assert result.directory.startswith(str(tmp_path)) and result.directory.endswith("signal-wallet-1")
+    assert set(result.files) == {"cpu.pstats", "cpu.txt", "stacks.collapsed", "allocations.txt"}
+
+    stats = pstats.Stats(result.files["cpu.pstats"])
+    assert any(name == "<listcomp>" or "test_profiler" in filename for filename, _, name in stats.stats)
+
+    with open(result.files["stacks.collapsed"]) as f:
+        lines = f.read().splitlines()
+    assert lines and all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any(line.startswith("stage-worker;") and "busy_worker (test_profiler.py" in line for line in lines)
+
+    with open(result.files["allocations.txt"]) as f:
+        allocations = f.read()
+    assert "Net allocated during run" in allocations and "test_profiler.py" in allocations
+    assert len(retained) == 2000
+
+
+def test_concurrent_profile_runs_unprofiled(tmp_path):
+    """
+    Test that a second run started while one is profiled is not profiled.
+    """
+    profiler = Profiler(output_dir=str(tmp_path), trace_allocations=False)
+
+    with profiler.profile("outer") as outer:
+        with profiler.profile("inner") as inner:
+            assert inner is None
+
+    assert os.path.isdir(outer.directory)
+    assert os.listdir(tmp_path) == [os.path.basename(outer.directory)]
+
+
+def test_signal_request_profiling_is_opt_in(tmp_path):
+    """
+    Test that POST /signal profiles only on request, and only when enabled in the config.
+    """
+    class StubPipeline:
+        def signal(self, wallet, on_comment=None):
+            busy_worker(0.01)
+            return {"wallet": wallet, "signal": "HOLD"}, True
+
+    def client_for(api_enabled):
+        app = FastAPI()
+        register_routes(app, {**CONFIG, "profiling": {"output_dir": str(tmp_path), "api_enabled": api_enabled}}, None)
+        app.dependency_overrides[get_pipeline] = StubPipeline
+        return TestClient(app)
+
+    client = client_for(api_enabled=True)
+
+    plain = client.post("/signal", json={"wallet": "w1"})
+    assert plain.json()["signal"] == "HOLD"
+    assert "x-signalforge-profile" not in plain.headers
+
+    profiled = client.post("/signal", json={"wallet": "w1"}, headers={"X-SignalForge-Profile": "1"})
+    assert profiled.json()["signal"] == "HOLD"
+    assert os.path.isfile(os.path.join(profiled.headers["x-signalforge-profile"], "cpu.pstats"))
+
+    assert client.post("/signal?profile=true", json={"wallet": "w1"}).headers["x-signalforge-profile"]
+    assert client_for(api_enabled=False).post("/signal?profile=true", json={"wallet": "w1"}).status_code == 403
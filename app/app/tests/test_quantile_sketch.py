@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+
+from app.core.quantile_sketch import KLLSketch
+from app.core.risk_assessor import RiskAssessor
+from app.core.risk_population import RiskPopulation
+from app.core.wallet_metrics import WalletMetrics
+from app.db.database import Database
+
+
+def test_sketch_quantiles_within_error_bounds():
+    """
+    Test that a KLL sketch over 100k values stays small and its ranks / quantiles are accurate.
+    """
+    values = np.random.default_rng(7).random(100_000)
+
+    sketch = KLLSketch(k=200, seed=1)
+    sketch.update_many(values[:50_000])
+    for value in values[50_000:60_000]:
+        sketch.update(value)
+    sketch.update_many(values[60_000:])
+
+    assert sketch.count == 100_000
+    assert sum(len(items) for items in sketch.compactors) < 1000
+
+    for q in (0.1, 0.5, 0.9, 0.99):
+        assert abs(sketch.quantile(q) - np.quantile(values, q)) < 0.02
+        assert abs(sketch.rank(np.quantile(values, q)) - q) < 0.02
+
+
+def test_sketch_merge_and_serialization():
+    """
+    Test that merging two sketches matches a sketch over all values, also after a JSON round trip.
+    """
+    rng = np.random.default_rng(3)
+    first, second = rng.normal(0, 1, 20_000), rng.normal(5, 1, 20_000)
+
+    a, b = KLLSketch(seed=1), KLLSketch(seed=2)
+    a.update_many(first)
+    b.update_many(second)
+
+    restored = KLLSketch.from_dict(json.loads(json.dumps(a.to_dict())))
+    merged = restored.merge(b)
+
+    assert merged.count == 40_000
+    assert merged.min == min(first.min(), second.min())
+    assert abs(merged.quantile(0.5) - np.median(np.concatenate([first, second]))) < 0.5
+    assert abs(merged.rank(2.5) - 0.5) < 0.02
+
+
+def test_population_percentiles_are_persisted_and_shared(tmp_path):
+    """
+    Test that two workers sharing a database see each other's wallets after flushing.
+    """
+    db = Database(str(tmp_path / "population.db"))
+
+    worker_a = RiskPopulation(db, flush_every=1000)
+    worker_b = RiskPopulation(db, flush_every=1000)
+
+    worker_a.observe_many({"risk_score": np.arange(0, 5, 0.01)})
+    worker_b.observe_many({"risk_score": np.arange(5, 10, 0.01)})
+    assert worker_a.percentiles({"risk_score": 5.0})["risk_score"] == 100.0
+
+    worker_a.flush()
+    worker_b.flush()
+
+    # A fresh process starts from the merged population
+    restarted = RiskPopulation(db)
+    assert abs(restarted.percentiles({"risk_score": 5.0})["risk_score"] - 50.0) < 2.0
+    assert abs(restarted.quantiles("risk_score")["p90"] - 9.0) < 0.2
+
+
+def test_assess_reports_percentiles():
+    """
+    Test that RiskAssessor.assess() adds the risk and metric percentiles to the score.
+    """
+    config = {"risk_weights": {"activity": {"High Activity": 3.0}}}
+    assessor = RiskAssessor(config, RiskPopulation())
+
+    quiet = {"wallet": "q", "tokens_held": 1, "transaction_count": 1, "activity_type": "Low Activity"}
+    busy = {"wallet": "b", "tokens_held": 30, "transaction_count": 40, "activity_type": "High Activity"}
+
+    for _ in range(9):
+        assessor.assess(quiet, [])
+    result = assessor.assess(busy, [{"name": "Whale Wallet"}])
+
+    assert result["risk_score"] == assessor.calculate_risk_score(busy, [{"name": "Whale Wallet"}])
+    assert result["risk_percentile"] == 95.0
+    assert result["metric_percentiles"] == {"tokens_held": 95.0, "transaction_count": 95.0}
+
+    # Without a population only the score is reported
+    assert RiskAssessor(config).assess(busy, []) == {"risk_score": RiskAssessor(config).calculate_risk_score(busy, [])}
+
+
+def test_batch_percentiles_match_population():
+    """
+    Test that risk_percentiles_batch() adds the batch to the population and ranks it.
+    """
+    assessor = RiskAssessor({}, RiskPopulation())
+    wallets = [{"wallet": f"w{i}", "tokens_held": i, "transaction_count": i} for i in range(10)]
+    metrics = WalletMetrics.from_analyses(wallets)
+
+    percentiles = assessor.risk_percentiles_batch(metrics, np.arange(10, dtype=np.float64))
+
+    assert percentiles.tolist() == [5.0, 15.0, 25.0, 35.0, 45.0, 55.0, 65.0, 75.0, 85.0, 95.0]
+    assert np.isnan(RiskAssessor({}).risk_percentiles_batch(metrics, np.zeros(10))).all()
+
+
+def test_assess_batch_matches_assess_and_observes_selected_wallets():
+    """
+    Test that assess_batch() scores like assess() and only adds the selected wallets to the population.
+    """
+    population = RiskPopulation()
+    assessor = RiskAssessor({}, population)
+    wallets = [{"wallet": f"w{i}", "tokens_held": i, "transaction_count": i} for i in range(4)]
+    metrics = WalletMetrics.from_analyses(wallets)
+
+    results = assessor.assess_batch(metrics, np.zeros(4, dtype=np.uint64), observe=np.array([True, False, True, False]))
+
+    assert [r["risk_score"] for r in results] == [assessor.calculate_risk_score(w, []) for w in wallets]
+    assert population.quantiles("tokens_held", qs=(0.0, 1.0)) == {"p0": 0.0, "p100": 2.0}
+    assert results[3]["metric_percentiles"]["tokens_held"] == 100.0
@@ -0,0 +1,151 @@
+import asyncio
+import time
+
+import httpx
+
+from app.core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    TokenBucket,
+    UpstreamGuard,
+    parse_retry_after,
+)
+
+
+def _response(status: int, headers=None) -> httpx.Response:
+    """
+    Build a bare httpx response for a dummy request.
+    """
+    return httpx.Response(status, headers=headers, request=httpx.Request("POST", "http://rpc.local"))
+
+
+def _failing_send(statuses):
+    """
+    Build a send() coroutine function that answers with the given status codes in order.
+    """
+    calls = {"count": 0}
+
+    async def send():
+        status = statuses[min(calls["count"], len(statuses) - 1)]
+        calls["count"] += 1
+        response = _response(status, {"Retry-After": "0"} if status == 429 else None)
+        response.raise_for_status()
+        return response
+
+    return send, calls
+
+
+def test_retry_after_429_then_success():
+    """
+    Test UpstreamGuard.call() on throttling.
+
+    A 429 must be retried, lower the limiter rate and not count
+    towards the circuit breaker.
+    """
+    limiter = TokenBucket(rate=100, burst=10)
+    guard = UpstreamGuard("rpc.local", limiter, CircuitBreaker(failure_threshold=1),
+                          max_attempts=3, base_delay=0.001)
+    send, calls = _failing_send([429, 200])
+
+    response = asyncio.run(guard.call(send))
+
+    assert response.status_code == 200
+    assert calls["count"] == 2
+    assert limiter.rate < 100, "Rate should adapt down after HTTP 429"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_fails_fast():
+    """
+    Test that repeated 5xx errors open the circuit and later calls fail fast.
+    """
+    guard = UpstreamGuard("rpc.local", None, CircuitBreaker(failure_threshold=2, reset_timeout=60),
+                          max_attempts=2, base_delay=0.001)
+    send, calls = _failing_send([503])
+
+    try:
+        asyncio.run(guard.call(send))
+        assert False, "Expected HTTPStatusError"
+    except httpx.HTTPStatusError:
+        pass
+
+    try:
+        asyncio.run(guard.call(send))
+        assert False, "Expected CircuitOpenError"
+    except CircuitOpenError:
+        pass
+
+    # Open circuit → no further upstream calls
+    assert calls["count"] == 2
+
+
+def test_cancelled_half_open_trial_is_released():
+    """
+    Test that a half-open trial cancelled mid-flight does not leave the circuit rejecting every call.
+    """
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    guard = UpstreamGuard("rpc.local", None, breaker, max_attempts=1)
+
+    async def hanging_send():
+        await asyncio.sleep(10)
+
+    async def cancel_trial():
+        task = asyncio.create_task(guard.call(hanging_send))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_trial())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    send, calls = _failing_send([200])
+    assert asyncio.run(guard.call(send)).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_client_errors_are_not_retried():
+    """
+    Test that non-retryable 4xx errors are raised immediately.
+    """
+    guard = UpstreamGuard("rpc.local", None, CircuitBreaker(), max_attempts=3, base_delay=0.001)
+    send, calls = _failing_send([400])
+
+    try:
+        asyncio.run(guard.call(send))
+        assert False, "Expected HTTPStatusError"
+    except httpx.HTTPStatusError:
+        pass
+
+    assert calls["count"] == 1
+
+
+def test_token_bucket_limits_rate():
+    """
+    Test that TokenBucket paces requests beyond the burst at the configured rate.
+    """
+    bucket = TokenBucket(rate=200, burst=2)
+
+    async def run():
+        for _ in range(6):
+            await bucket.acquire()
+
+    start = time.monotonic()
+    asyncio.run(run())
+    elapsed = time.monotonic() - start
+
+    # 2 burst tokens, then 4 tokens at 200/s → at least ~20ms
+    assert elapsed >= 0.015
+
+
+def test_parse_retry_after():
+    """
+    Test Retry-After parsing for seconds, dates and garbage.
+    """
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not-a-date") is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
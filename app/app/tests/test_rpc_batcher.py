@@ -0,0 +1,71 @@
+import asyncio
+
+from app.core.endpoint_pool import RPCEndpointPool
+from app.core.rpc_batcher import RPCBatcher
+
+
+class RecordingTransport:
+    """
+    Minimal stand-in for HTTPTransport that answers JSON-RPC batches locally
+    and records every request body it receives.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    async def run_on_loop(self, coro):
+        return await coro
+
+    async def request_json(self, method, url, json=None, params=None, timeout=None):
+        self.requests.append(json)
+        calls = json if isinstance(json, list) else [json]
+
+        # Reply in reverse order to prove responses are matched by id
+        responses = [{"jsonrpc": "2.0", "id": c["id"], "result": c["params"][0]} for c in reversed(calls)]
+        return responses if isinstance(json, list) else responses[0]
+
+
+def test_calls_are_batched_and_demultiplexed():
+    """
+    Test RPCBatcher.call() with many concurrent callers.
+
+    Verifies that concurrent calls are packed into batch requests capped
+    at max_batch_size and that every caller receives its own response.
+    """
+    transport = RecordingTransport()
+    batcher = RPCBatcher(RPCEndpointPool(transport, "http://rpc.local"), max_batch_size=10, window_ms=5)
+
+    async def run():
+        wallets = [f"wallet-{i}" for i in range(25)]
+        responses = await asyncio.gather(*(batcher.call("getSignaturesForAddress", [w]) for w in wallets))
+
+        # Batch send tasks are referenced while in flight and released once done
+        await asyncio.sleep(0)
+        assert not batcher._tasks
+        return wallets, responses
+
+    wallets, responses = asyncio.run(run())
+
+    # Each caller gets the response for its own request
+    assert [r["result"] for r in responses] == wallets
+
+    # 25 calls → 3 HTTP requests (10 + 10 + 5)
+    assert len(transport.requests) == 3
+    assert sorted(len(r) for r in transport.requests) == [5, 10, 10]
+
+    # JSON-RPC ids must be unique across the batches
+    ids = [call["id"] for batch in transport.requests for call in batch]
+    assert len(set(ids)) == len(ids)
+
+
+def test_single_call_is_sent_unbatched():
+    """
+    Test that a lone call is sent as a plain JSON-RPC object, not an array.
+    """
+    transport = RecordingTransport()
+    batcher = RPCBatcher(RPCEndpointPool(transport, "http://rpc.local"), max_batch_size=10, window_ms=1)
+
+    response = asyncio.run(batcher.call("getTokenAccountsByOwner", ["abc"]))
+
+    assert response["result"] == "abc"
+    assert isinstance(transport.requests[0], dict), "Single call should not be wrapped in a batch array"
@@ -0,0 +1,67 @@
+from app.core.rpc_cache import RPCResponseCache
+
+
+def test_cache_hit_miss_and_lru_eviction():
+    """
+    Test RPCResponseCache.get()/put() with an entry-count bound.
+
+    Verifies hit/miss counting and that the least-recently-used
+    entry is evicted first.
+    """
+    cache = RPCResponseCache(max_entries=2, ttl_seconds=60)
+
+    key_a = RPCResponseCache.make_key("getTokenAccountsByOwner", "wallet-a", None)
+    key_b = RPCResponseCache.make_key("getTokenAccountsByOwner", "wallet-b", None)
+    key_c = RPCResponseCache.make_key("getTokenAccountsByOwner", "wallet-c", None)
+
+    assert cache.get(key_a) is None
+
+    cache.put(key_a, {"value": [1]})
+    cache.put(key_b, {"value": [2]})
+
+    # Touch A so that B becomes least recently used
+    assert cache.get(key_a) == {"value": [1]}
+
+    cache.put(key_c, {"value": [3]})
+
+    assert cache.get(key_b) is None, "Least recently used entry should be evicted"
+    assert cache.get(key_c) == {"value": [3]}
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+
+def test_cache_byte_bound_and_slot_age():
+    """
+    Test the byte-size bound and slot-age invalidation.
+    """
+    cache = RPCResponseCache(max_entries=100, max_bytes=30, ttl_seconds=60, max_slot_age=10)
+
+    key = RPCResponseCache.make_key("getSignaturesForAddress", "wallet-a", "confirmed", 20)
+    other = RPCResponseCache.make_key("getSignaturesForAddress", "wallet-b", "confirmed", 20)
+
+    cache.put(key, ["sig-1", "sig-2"], slot=100)
+    cache.put(other, ["sig-3", "sig-4"], slot=100)
+
+    # Both payloads together exceed 30 bytes → oldest evicted
+    assert cache.get(key) is None
+    assert cache.get(other) == ["sig-3", "sig-4"]
+
+    # Chain moved past max_slot_age → entry is stale
+    cache.observe_slot(111)
+    assert cache.get(other) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_commitment_is_part_of_the_key():
+    """
+    Test that the same wallet at different commitment levels is cached separately.
+    """
+    finalized = RPCResponseCache.make_key("getTokenAccountsByOwner", "wallet-a", None)
+    confirmed = RPCResponseCache.make_key("getTokenAccountsByOwner", "wallet-a", "confirmed")
+
+    assert finalized != confirmed
+    assert finalized == RPCResponseCache.make_key("getTokenAccountsByOwner", "wallet-a", "finalized")
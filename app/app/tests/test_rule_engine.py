@@ -0,0 +1,71 @@
+import pytest
+
+# Import the rule compiler from core modules
+from app.core.rule_engine import RuleCompileError, RuleEngine, build_metric_columns, compile_conditions
+
+
+WALLETS = [
+    {"wallet": "a", "tokens_held": 25, "transaction_count": 2, "activity_type": "Low Activity", "is_whale": True},
+    {"wallet": "b", "tokens_held": 4, "transaction_count": 30, "activity_type": "High Activity", "is_whale": False},
+    {"wallet": "c", "tokens_held": 0, "transaction_count": 0, "activity_type": "Dormant Wallet", "is_whale": False}
+]
+
+
+def test_compile_cli_style_conditions():
+    """
+    Test that string conditions as entered in the CLI ("key=>=10") compile
+    and evaluate per wallet over NumPy columns.
+    """
+    predicate = compile_conditions({"tokens_held": ">=10", "transaction_count": "<5"})
+
+    result = predicate(build_metric_columns(WALLETS))
+
+    assert result.tolist() == [True, False, False]
+
+
+def test_compile_boolean_combinations():
+    """
+    Test any / not / membership combinations.
+    """
+    predicate = compile_conditions({
+        "any": [
+            {"activity_type": "High Activity"},
+            {"not": {"tokens_held": {">": 0}}}
+        ],
+        "activity_type": ["High Activity", "Dormant Wallet"]
+    })
+
+    assert predicate(build_metric_columns(WALLETS)).tolist() == [False, True, True]
+
+
+def test_compile_rejects_invalid_conditions():
+    """
+    Test that unknown metrics, bad constants and ordering on categories are rejected.
+    """
+    with pytest.raises(RuleCompileError):
+        compile_conditions({"balance_usd": ">100"})
+
+    with pytest.raises(RuleCompileError):
+        compile_conditions({"tokens_held": ">lots"})
+
+    with pytest.raises(RuleCompileError):
+        compile_conditions({"activity_type": ">High Activity"})
+
+
+def test_rule_engine_match():
+    """
+    Test that RuleEngine evaluates every rule for every wallet and skips broken patterns.
+    """
+    engine = RuleEngine([
+        {"name": "Big Quiet", "description": "Many tokens, few tx.", "conditions": {"tokens_held": ">=10", "transaction_count": "<=5"}},
+        {"name": "Busy", "description": "Very active.", "conditions": {"transaction_count": ">20"}},
+        {"name": "Broken", "description": "Unknown metric.", "conditions": {"nope": "1"}}
+    ])
+
+    assert [rule.name for rule in engine.rules] == ["Big Quiet", "Busy"]
+
+    matches = engine.match(WALLETS)
+
+    assert [p["name"] for p in matches[0]] == ["Big Quiet"]
+    assert [p["name"] for p in matches[1]] == ["Busy"]
+    assert matches[2] == []
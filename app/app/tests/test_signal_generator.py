@@ -1,4 +1,14 @@
 from app.core.signal_generator import SignalGenerator
+from app.core.pattern_detector import PatternDetector
+from app.core.risk_assessor import RiskAssessor
+from app.core.wallet_metrics import WalletMetrics
+
+SAMPLE_WALLETS = [
+    {"wallet": "empty", "tokens_held": 0, "transaction_count": 0, "activity_type": "Dormant Wallet"},
+    {"wallet": "whale", "tokens_held": 25, "transaction_count": 3, "activity_type": "Low Activity", "is_whale": True},
+    {"wallet": "trader", "tokens_held": 1, "transaction_count": 25, "activity_type": "High Activity"},
+    {"wallet": "quiet", "tokens_held": 4, "transaction_count": 2, "activity_type": "Low Activity"}
+]
 
 
 def test_generate_signal():
@@ -39,3 +49,46 @@ def test_generate_signal():
     assert isinstance(signal["signal"], str), "Signal type must be a string"
     assert isinstance(signal["confidence"], float), "Confidence must be a float"
     assert 0.0 <= signal["confidence"] <= 1.0, "Confidence must be between 0.0 and 1.0"
+
+
+def test_batch_signals_and_risk_scores_match_single():
+    """
+    Test that generate_signals_batch() and calculate_risk_scores_batch()
+    agree with the per-wallet methods.
+    """
+    config = {"risk_weights": {"activity": {"Low Activity": 2.0, "High Activity": 4.0}, "pattern": 1.5}}
+    detector = PatternDetector(config)
+    generator = SignalGenerator()
+    assessor = RiskAssessor(config)
+
+    metrics = WalletMetrics.from_analyses(SAMPLE_WALLETS)
+    masks = detector.detect_patterns_batch(metrics)
+
+    signal_types, confidences = generator.generate_signals_batch(metrics, masks)
+    risk_scores = assessor.calculate_risk_scores_batch(metrics, masks)
+
+    for index, wallet in enumerate(SAMPLE_WALLETS):
+        patterns = detector.detect_patterns(wallet)
+        signal = generator.generate_signal(wallet, patterns)
+
+        assert signal_types[index] == signal["signal"]
+        assert confidences[index] == signal["confidence"]
+        assert risk_scores[index] == assessor.calculate_risk_score(wallet, patterns)
+
+
+def test_generate_signals_uses_batched_comments():
+    """
+    Test that a sweep gets the same signals as the per-wallet path, with batched AI comments.
+    """
+    class FakeEngine:
+        def generate_comments(self, items):
+            return [f"comment for {analysis['wallet']}" for analysis, _ in items]
+
+    detector = PatternDetector({"risk_weights": {}, "whale_wallets": {}, "patterns": {}})
+    patterns_list = [detector.detect_patterns(w) for w in SAMPLE_WALLETS]
+
+    signals = SignalGenerator(FakeEngine()).generate_signals(SAMPLE_WALLETS, patterns_list)
+
+    for wallet, patterns, signal in zip(SAMPLE_WALLETS, patterns_list, signals):
+        expected = SignalGenerator().generate_signal(wallet, patterns)
+        assert signal == dict(expected, ai_comment=f"comment for {wallet['wallet']}")
@@ -0,0 +1,171 @@
+import json
+import re
+import threading
+from types import SimpleNamespace
+
+import openai
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import get_pipeline, register_routes
+from app.core.model_trainer import ModelTrainer
+from app.core.signal_pipeline import SignalPipeline
+from app.standin.server import StandinServer
+
+CONFIG = {
+    "coingecko_api": "http://127.0.0.1:9/coingecko",
+    "rpc_url": "http://127.0.0.1:9/rpc",
+    "risk_weights": {},
+    "whale_wallets": {},
+    "patterns": {}
+}
+
+BUSY_WALLET = {"wallet": "busy", "tokens_held": 3, "transaction_count": 42, "activity_type": "High Activity"}
+
+
+def test_pipeline_applies_new_patterns(tmp_path):
+    """
+    Test that a pattern added to the shared pipeline applies to the next evaluation.
+    """
+    pipeline = SignalPipeline(CONFIG, trainer=ModelTrainer(str(tmp_path / "patterns.json")))
+
+    signal, recomputed = pipeline.evaluate(BUSY_WALLET)
+    assert recomputed
+    assert "Busy Bee" not in signal["reason"]
+
+    pipeline.add_pattern("Busy Bee", "Many transactions", {"transaction_count": ">=40"})
+
+    signal, recomputed = pipeline.evaluate(BUSY_WALLET)
+    assert recomputed
+    assert "Busy Bee" in signal["reason"]
+    assert pipeline.stored_signal("busy") == signal
+
+
+def test_pipeline_reloads_patterns_changed_by_another_process(tmp_path):
+    """
+    Test that patterns written by another process (e.g. the CLI train command) are picked up.
+    """
+    storage = str(tmp_path / "patterns.json")
+    pipeline = SignalPipeline(CONFIG, trainer=ModelTrainer(storage))
+    detector = pipeline.detector
+
+    ModelTrainer(storage).add_pattern("Busy Bee", "Many transactions", {"transaction_count": ">=40"})
+
+    assert pipeline.detector is not detector
+    assert [p["name"] for p in pipeline.detector.detect_patterns(BUSY_WALLET)][-1] == "Busy Bee"
+
+
+def test_pipeline_is_shared_across_requests():
+    """
+    Test that every request receives the one pipeline built at startup, from concurrent threads.
+    """
+    app = FastAPI()
+    register_routes(app, CONFIG, None)
+
+    seen = []
+
+    class RecordingPipeline:
+        def signal(self, wallet, on_comment=None):
+            seen.append(id(self))
+            return {"wallet": wallet, "signal": "HOLD"}, True
+
+    shared = RecordingPipeline()
+    app.dependency_overrides[get_pipeline] = lambda: shared
+    client = TestClient(app)
+
+    threads = [threading.Thread(target=client.post, args=("/signal",), kwargs={"json": {"wallet": f"w{i}"}})
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == [id(shared)] * 8
+    assert isinstance(app.state.pipeline, SignalPipeline)
+
+
+def test_train_rejects_invalid_and_duplicate_patterns(tmp_path):
+    """
+    Test that /train answers 422 for conditions the rule engine rejects and 409 for a taken name.
+    """
+    app = FastAPI()
+    register_routes(app, CONFIG, None)
+    pipeline = SignalPipeline(CONFIG, trainer=ModelTrainer(str(tmp_path / "patterns.json")))
+    app.dependency_overrides[get_pipeline] = lambda: pipeline
+    client = TestClient(app)
+
+    pattern = {"name": "Busy Bee", "description": "Many transactions", "conditions": {"transaction_count": ">=40"}}
+    assert client.post("/train", json=pattern).status_code == 200
+    assert client.post("/train", json={**pattern, "name": "busy bee"}).status_code == 409
+
+    invalid = client.post("/train", json={**pattern, "name": "Broken", "conditions": {"transaction_count": ">=lots"}})
+    assert invalid.status_code == 422
+    assert [p["name"] for p in pipeline.trainer.get_patterns()] == ["Busy Bee"]
+
+
+def test_signal_many_batches_ai_comments_per_sweep(tmp_path, monkeypatch):
+    """
+    Test that bulk signals fetch each sweep's AI comments in one request and reuse unchanged wallets.
+    """
+    calls = []
+
+    def create(**kwargs):
+        calls.append(kwargs)
+        ids = re.findall(r"- id (\d+):", kwargs["messages"][-1]["content"])
+        message = SimpleNamespace(content=json.dumps({"comments": [{"id": i, "comment": f"batched {i}"} for i in ids]}))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    class FakeOpenAI:
+        def __init__(self, api_key):
+            self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+    monkeypatch.setattr(openai, "OpenAI", FakeOpenAI)
+    wallets = [f"wallet-{i}" for i in range(6)]
+
+    with StandinServer(anchor_time=1_700_000_000) as server:
+        config = {**CONFIG, "rpc_url": server.rpc_url, "coingecko_api": server.coingecko_api,
+                  "ai_api_key": "test-key", "ai_cache": {"enabled": False}, "ai_comments": {"sweep_size": 4}}
+        app = FastAPI()
+        register_routes(app, config, None)
+        pipeline = app.state.pipeline
+        try:
+            results = sorted(pipeline.signal_many(wallets), key=lambda r: r["index"])
+
+            # 6 wallets → sweeps of 4 and 2, one batched request each
+            assert [r["wallet"] for r in results] == wallets
+            assert all(r["error"] is None and r["recomputed"] for r in results)
+            assert all(r["signal"]["ai_comment"].startswith("batched") for r in results)
+            assert len(calls) == 2
+
+            response = TestClient(app).post("/signal/batch", json={"wallets": wallets[:3]})
+            assert [r["signal"] for r in response.json()["results"]] == [r["signal"] for r in results[:3]]
+            assert not any(r["recomputed"] for r in response.json()["results"])
+            assert len(calls) == 2
+        finally:
+            pipeline.close()
+
+
+def test_signal_many_matches_per_wallet_signals(tmp_path):
+    """
+    Test that the columnar bulk path derives the same signals and scores as the per-wallet stage graph.
+    """
+    storage = str(tmp_path / "patterns.json")
+    ModelTrainer(storage).add_pattern("Busy Bee", "Many transactions", {"transaction_count": ">=20"})
+    wallets = [f"wallet-{i}" for i in range(12)]
+
+    with StandinServer(anchor_time=1_700_000_000) as server:
+        config = {**CONFIG, "rpc_url": server.rpc_url, "coingecko_api": server.coingecko_api,
+                  "risk_weights": {"activity": {"High Activity": 3.0}, "pattern": 2.0}}
+        bulk = SignalPipeline(config, trainer=ModelTrainer(storage))
+        single = SignalPipeline(config, trainer=ModelTrainer(storage))
+        try:
+            results = sorted(bulk.signal_many(wallets), key=lambda r: r["index"])
+            expected = [single.signal(wallet)[0] for wallet in wallets]
+        finally:
+            bulk.close()
+            single.close()
+
+    fields = ("wallet", "signal", "confidence", "reason", "ai_comment", "risk_score")
+    assert [{f: r["signal"][f] for f in fields} for r in results] == [{f: s[f] for f in fields} for s in expected]
+    assert any("Busy Bee" in s["reason"] for s in expected)
+    assert all(r["signal"]["risk_percentile"] is not None for r in results)
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import pytest
+
+from app.core.model_trainer import ModelTrainer
+from app.core.signal_pipeline import SignalPipeline
+from app.core.stage_graph import Stage, StageError, StageGraph, StageGraphError
+
+CONFIG = {
+    "coingecko_api": "http://127.0.0.1:9/coingecko",
+    "rpc_url": "http://127.0.0.1:9/rpc",
+    "risk_weights": {},
+    "wallet_state": {"enabled": False}
+}
+
+BUSY_WALLET = {"wallet": "busy", "tokens_held": 3, "transaction_count": 42, "activity_type": "High Activity"}
+
+
+def test_independent_stages_run_concurrently():
+    """
+    Test that stages sharing a dependency run in parallel and receive its result.
+    """
+    barrier = threading.Barrier(3, timeout=2)
+
+    def output(name):
+        def run(results):
+            barrier.wait()
+            return f"{name}:{results['signal']}"
+        return run
+
+    graph = StageGraph([
+        Stage("signal", lambda r: r["wallet"].upper(), depends=("wallet",)),
+        Stage("json", output("json"), depends=("signal",)),
+        Stage("report", output("report"), depends=("signal",)),
+        Stage("webhook", output("webhook"), depends=("signal",))
+    ])
+
+    run = graph.run({"wallet": "abc"})
+
+    assert run["json"] == "json:ABC"
+    assert run["webhook"] == "webhook:ABC"
+    assert set(run.status.values()) == {"ok"}
+
+
+def test_error_policies_and_timeouts():
+    """
+    Test the fail / continue / fallback policies, per-stage timeouts and skipping of dependents.
+    """
+    def boom(results):
+        raise ValueError("boom")
+
+    graph = StageGraph([
+        Stage("slow", lambda r: time.sleep(1), timeout=0.05, on_error="continue"),
+        Stage("after_slow", lambda r: "never", depends=("slow",)),
+        Stage("broken", boom, on_error="fallback", fallback=0),
+        Stage("after_broken", lambda r: r["broken"] + 1, depends=("broken",))
+    ])
+
+    started = time.monotonic()
+    run = graph.run()
+
+    assert time.monotonic() - started < 0.5
+    assert run.status == {"slow": "timeout", "after_slow": "skipped", "broken": "fallback", "after_broken": "ok"}
+    assert run["after_broken"] == 1
+    assert isinstance(run.errors["slow"], TimeoutError)
+
+    with pytest.raises(StageError) as failure:
+        StageGraph([Stage("broken", boom)]).run()
+    assert failure.value.stage == "broken"
+
+
+def test_queued_stages_do_not_time_out():
+    """
+    Test that concurrent runs on a small shared pool only time stages from when they start executing.
+    """
+    graph = StageGraph([
+        Stage("detect", lambda r: time.sleep(0.05) or r["wallet"], depends=("wallet",), timeout=0.1),
+        Stage("generate", lambda r: r["detect"].upper(), depends=("detect",), timeout=0.1)
+    ], max_workers=2)
+    results, errors = [], []
+
+    def run(wallet):
+        try:
+            results.append(graph.run({"wallet": wallet})["generate"])
+        except StageError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(f"w{i}",)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    graph.close()
+
+    assert errors == []
+    assert sorted(results) == [f"W{i}" for i in range(6)]
+
+
+def test_abandoned_stages_do_not_block_later_runs():
+    """
+    Test that a run whose stages cannot get a worker (pool held by an abandoned stage) still returns.
+    """
+    release = threading.Event()
+    graph = StageGraph([
+        Stage("hang", lambda r: release.wait(5), depends=("wallet",), timeout=0.1, on_error="continue")
+    ], max_workers=1, queue_timeout=0.2)
+
+    try:
+        assert graph.run({"wallet": "a"}).status == {"hang": "timeout"}
+
+        started = time.monotonic()
+        run = graph.run({"wallet": "b"})
+
+        assert time.monotonic() - started < 1.0
+        assert run.status == {"hang": "timeout"}
+        assert "no free stage worker" in str(run.errors["hang"])
+    finally:
+        release.set()
+        graph.close()
+
+
+def test_invalid_graphs_are_rejected():
+    """
+    Test that cycles, bad policies and missing inputs are reported.
+    """
+    with pytest.raises(StageGraphError):
+        StageGraph([Stage("a", len, depends=("b",)), Stage("b", len, depends=("a",))])
+
+    with pytest.raises(StageGraphError):
+        Stage("a", len, on_error="retry")
+
+    with pytest.raises(StageGraphError):
+        StageGraph([Stage("a", len, depends=("wallet",))]).run()
+
+
+def test_pipeline_falls_back_to_unscored_signal(tmp_path):
+    """
+    Test that a failing risk stage still yields a signal, while generation runs alongside it.
+    """
+    pipeline = SignalPipeline(CONFIG, trainer=ModelTrainer(str(tmp_path / "patterns.json")))
+    expected = pipeline.evaluate(BUSY_WALLET)[0]
+
+    def broken_assess(wallet_analysis, patterns):
+        raise RuntimeError("population unavailable")
+
+    pipeline.assessor.assess = broken_assess
+    signal, _ = pipeline.evaluate(BUSY_WALLET)
+
+    assert signal["risk_score"] is None
+    assert signal["signal"] == expected["signal"]
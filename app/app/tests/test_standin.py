@@ -0,0 +1,85 @@
+import httpx
+import pytest
+
+from app.core.data_collector import DataCollector
+from app.core.http_transport import HTTPTransport
+from app.standin.chain import SyntheticChain
+from app.standin.server import FaultInjector, StandinServer
+
+ANCHOR_TIME = 1_700_000_000
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StandinServer(seed=7, anchor_time=ANCHOR_TIME) as server:
+        yield server
+
+
+def test_chain_is_deterministic_per_seed():
+    """
+    Test that the same seed gives the same wallets and prices, and another seed different ones.
+    """
+    first, second, other = SyntheticChain(seed=1, anchor_time=ANCHOR_TIME), \
+        SyntheticChain(seed=1, anchor_time=ANCHOR_TIME), SyntheticChain(seed=2, anchor_time=ANCHOR_TIME)
+    wallets = [f"wallet-{i}" for i in range(50)]
+
+    assert [first.signatures(w) for w in wallets] == [second.signatures(w) for w in wallets]
+    assert [first.wallet(w).token_accounts for w in wallets] == [second.wallet(w).token_accounts for w in wallets]
+    assert first.price("solana") == second.price("solana") != other.price("solana")
+    assert [first.signatures(w) for w in wallets] != [other.signatures(w) for w in wallets]
+
+
+def test_collector_pages_signatures_from_standin(server):
+    """
+    Test that the collector reads balances and pages a full signature history from the stand-in.
+    """
+    address = next(f"wallet-{i}" for i in range(1000) if len(server.chain.wallet(f"wallet-{i}").signatures) > 250)
+    expected = [entry["signature"] for entry in server.chain.wallet(address).signatures]
+
+    transport = HTTPTransport()
+    try:
+        collector = DataCollector(coingecko_api=server.coingecko_api, rpc_url=server.rpc_url, transport=transport)
+
+        paged = [entry["signature"] for entry in collector.iter_signatures(address, page_size=100)]
+        assert paged == expected
+
+        tail = [entry["signature"] for entry in collector.iter_signatures(address, until=expected[5], page_size=100)]
+        assert tail == expected[:5]
+
+        balance = collector.fetch_wallet_balance(address)
+        assert balance["value"] == server.chain.wallet(address).token_accounts
+        assert collector.fetch_token_price("solana") == server.chain.price("solana")
+    finally:
+        transport.close()
+
+
+def test_batches_and_rpc_errors(server):
+    """
+    Test that JSON-RPC batches are answered per call, with errors for unknown methods and invalid limits.
+    """
+    response = httpx.post(server.rpc_url, json=[
+        {"jsonrpc": "2.0", "id": 1, "method": "getSignaturesForAddress", "params": ["wallet-1", {"limit": 2}]},
+        {"jsonrpc": "2.0", "id": 2, "method": "getSignaturesForAddress", "params": ["wallet-1", {"limit": 5000}]},
+        {"jsonrpc": "2.0", "id": 3, "method": "getBlock", "params": []},
+        {"jsonrpc": "2.0", "id": 4, "method": "getHealth"}
+    ])
+    results = {item["id"]: item for item in response.json()}
+
+    assert results[1]["result"] == server.chain.signatures("wallet-1", limit=2)
+    assert results[2]["error"]["code"] == -32602
+    assert results[3]["error"]["code"] == -32601
+    assert results[4]["result"] == "ok"
+    assert httpx.get(f"{server.url}/stats").json()["rpc_calls"]["getSignaturesForAddress"] >= 2
+
+
+def test_throttling_sends_retry_after():
+    """
+    Test that requests over the rate limit are answered with 429 and Retry-After.
+    """
+    faults = FaultInjector(rate_limit_rps=2, retry_after_seconds=3)
+
+    with StandinServer(anchor_time=ANCHOR_TIME, faults=faults) as server:
+        statuses = [httpx.get(f"{server.coingecko_api}/simple/price", params={"ids": "solana"}) for _ in range(4)]
+
+    assert [r.status_code for r in statuses[:2]] == [200, 200]
+    assert statuses[3].status_code == 429 and statuses[3].headers["retry-after"] == "3"
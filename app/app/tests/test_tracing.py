@@ -0,0 +1,90 @@
+import asyncio
+import json
+import time
+
+from app.core.stage_graph import Stage, StageGraph
+from app.core.tracing import FileSpanExporter, InMemorySpanCollector, LatencyHistogram, Tracer, traced
+
+
+def test_histogram_percentiles_within_precision():
+    """
+    Test that HDR-style percentiles stay within 1% of the exact values over a wide range.
+    """
+    histogram = LatencyHistogram(significant_figures=2)
+    values = [i / 10_000 for i in range(1, 10_001)]  # 0.1ms .. 1s
+    for value in values:
+        histogram.record(value)
+
+    for p in (50, 90, 99):
+        exact = values[int(p / 100 * len(values)) - 1]
+        assert abs(histogram.percentile(p) - exact) / exact < 0.01
+
+    assert histogram.count == 10_000
+    assert len(histogram.counts) < 1000
+
+    other = LatencyHistogram(2)
+    other.record(5.0)
+    assert histogram.merge(other).percentile(100) == 5.0
+
+
+def test_spans_nest_across_threads_and_async(monkeypatch):
+    """
+    Test that decorated calls, stage threads and coroutines become child spans of the caller.
+    """
+    collector = InMemorySpanCollector()
+    tracer = Tracer(exporters=[collector])
+    monkeypatch.setattr(Tracer, "_shared", tracer)
+
+    @traced("work.sync", attributes=lambda wallet: {"wallet": wallet})
+    def work(wallet):
+        time.sleep(0.01)
+        return wallet
+
+    @traced("work.async")
+    async def work_async():
+        await asyncio.sleep(0.01)
+
+    graph = StageGraph([Stage("first", lambda r: work(r["wallet"]), depends=("wallet",))])
+
+    with tracer.span("request") as root:
+        graph.run({"wallet": "abc"})
+        asyncio.run(work_async())
+
+    spans = {span.name: span for span in collector.spans()}
+    assert spans["stage.first"].parent_id == root.span_id
+    assert spans["work.sync"].parent_id == spans["stage.first"].span_id
+    assert spans["work.async"].parent_id == root.span_id
+    assert spans["work.sync"].trace_id == root.trace_id
+    assert spans["work.sync"].attributes == {"wallet": "abc"}
+
+    summary = tracer.summary()
+    assert summary["work.sync"]["count"] == 1
+    assert summary["work.sync"]["p50_ms"] >= 10
+    assert summary["request"]["max_ms"] >= summary["work.sync"]["max_ms"]
+
+
+def test_errors_and_file_exporter(tmp_path):
+    """
+    Test that failed spans are counted and exported spans land in the JSON Lines file.
+    """
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(exporters=[FileSpanExporter(str(path))])
+
+    try:
+        with tracer.span("broken", wallet="abc"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    tracer.close()
+
+    assert tracer.summary()["broken"]["errors"] == 1
+    exported = json.loads(path.read_text().strip())
+    assert exported["name"] == "broken"
+    assert exported["error"] == "ValueError: boom"
+    assert exported["attributes"] == {"wallet": "abc"}
+
+    # A disabled tracer records nothing
+    disabled = Tracer(enabled=False)
+    with disabled.span("ignored") as span:
+        assert span is None
+    assert disabled.summary() == {}
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+
+from app.core.data_collector import DataCollector
+from app.core.transaction_history import TransactionHistory
+from app.db.database import Database
+
+
+class HistoryTransport:
+    """
+    Minimal stand-in for HTTPTransport serving getSignaturesForAddress
+    with before/until paging over an in-memory signature list.
+    """
+
+    def __init__(self, count: int):
+        # Newest first: sig-<count-1> ... sig-0
+        self.signatures = [{"signature": f"sig-{i}", "slot": i, "blockTime": 1700000000 + i}
+                           for i in reversed(range(count))]
+        self.pages_served = 0
+
+    def add(self, count: int) -> None:
+        start = len(self.signatures)
+        new = [{"signature": f"sig-{i}", "slot": i, "blockTime": 1700000000 + i}
+               for i in reversed(range(start, start + count))]
+        self.signatures = new + self.signatures
+
+    async def run_on_loop(self, coro):
+        return await coro
+
+    def run_sync(self, coro):
+        return asyncio.run(coro)
+
+    async def request_json(self, method, url, json=None, params=None, timeout=None):
+        wallet, options = json["params"]
+        names = [s["signature"] for s in self.signatures]
+
+        start = names.index(options["before"]) + 1 if "before" in options else 0
+        end = names.index(options["until"]) if "until" in options else len(names)
+
+        self.pages_served += 1
+        page = self.signatures[start:end][:options["limit"]]
+        return {"jsonrpc": "2.0", "id": json["id"], "result": page}
+
+
+def test_incremental_sync_only_fetches_new_signatures(tmp_path):
+    """
+    Test TransactionHistory.sync() with a persisted high-water mark.
+
+    The first sync pages through the initial window; later syncs (even
+    from a fresh instance) only return signatures newer than the cursor.
+    """
+    transport = HistoryTransport(count=25)
+    collector = DataCollector("http://coingecko.local", "http://rpc.local", transport=transport,
+                              config={"rpc_cache": {"enabled": False}})
+    db = Database(str(tmp_path / "history.db"))
+
+    history = TransactionHistory(collector, db=db, page_size=10, initial_pages=5)
+
+    first = history.sync("wallet-a")
+    assert len(first) == 25
+    assert transport.pages_served == 3, "25 signatures at page size 10 → 3 pages"
+    assert history.last_signature("wallet-a") == "sig-24"
+
+    # Nothing new → a single (empty) page
+    assert history.sync("wallet-a") == []
+
+    # New activity → only the delta, also for a fresh instance backed by the same DB
+    transport.add(3)
+    restarted = TransactionHistory(collector, db=db, page_size=10)
+    assert [s["signature"] for s in restarted.sync("wallet-a")] == ["sig-27", "sig-26", "sig-25"]
+
+    recent = restarted.stored("wallet-a", limit=5)
+    assert [s["signature"] for s in recent] == ["sig-27", "sig-26", "sig-25", "sig-24", "sig-23"]
+
+
+def test_iter_signatures_streams_full_history():
+    """
+    Test DataCollector.iter_signatures() paging through the whole history.
+    """
+    transport = HistoryTransport(count=23)
+    collector = DataCollector("http://coingecko.local", "http://rpc.local", transport=transport)
+
+    signatures = [s["signature"] for s in collector.iter_signatures("wallet-a", page_size=10)]
+
+    assert len(signatures) == 23
+    assert signatures[0] == "sig-22" and signatures[-1] == "sig-0"
+
+
+def test_truncated_sync_resumes_until_the_old_mark(tmp_path):
+    """
+    Test that a sync running out of pages leaves a gap that later syncs fill, off the event loop thread.
+    """
+    transport = HistoryTransport(count=10)
+    collector = DataCollector("http://coingecko.local", "http://rpc.local", transport=transport,
+                              config={"rpc_cache": {"enabled": False}})
+    db = Database(str(tmp_path / "history.db"))
+    history = TransactionHistory(collector, db=db, page_size=10, initial_pages=1, max_pages_per_sync=2)
+
+    writers = []
+    save = db.save_wallet_signatures
+    db.save_wallet_signatures = lambda *args, **kwargs: writers.append(threading.current_thread()) or save(*args, **kwargs)
+
+    assert len(history.sync("wallet-a")) == 10
+
+    # 35 new signatures, 2 pages per sync → 20 now, the rest on the following syncs
+    transport.add(35)
+    assert [s["signature"] for s in history.sync("wallet-a")] == [f"sig-{i}" for i in range(44, 24, -1)]
+    assert history.last_signature("wallet-a") == "sig-44"
+
+    assert [s["signature"] for s in history.sync("wallet-a")] == [f"sig-{i}" for i in range(24, 14, -1)]
+    assert [s["signature"] for s in history.sync("wallet-a")] == [f"sig-{i}" for i in range(14, 9, -1)]
+    assert history.last_signature("wallet-a") == "sig-44"
+    assert db.get_wallet_gaps("wallet-a") == []
+
+    restarted = TransactionHistory(collector, db=db, page_size=10)
+    assert [s["signature"] for s in restarted.stored("wallet-a", limit=2000)] == [f"sig-{i}" for i in range(44, -1, -1)]
+    assert writers and threading.current_thread() not in writers
+
+
+class InterleavingTransport(HistoryTransport):
+    """
+    HistoryTransport that yields to the event loop before serving each page.
+    """
+
+    async def request_json(self, method, url, json=None, params=None, timeout=None):
+        await asyncio.sleep(0)
+        return await super().request_json(method, url, json=json, params=params, timeout=timeout)
+
+
+def test_concurrent_syncs_store_each_signature_once():
+    """
+    Test that two overlapping syncs of one wallet do not duplicate signatures or activity counts.
+    """
+    transport = InterleavingTransport(count=5)
+    collector = DataCollector("http://coingecko.local", "http://rpc.local", transport=transport,
+                              config={"rpc_cache": {"enabled": False}, "rpc_batch": {"enabled": False}})
+    history = TransactionHistory.from_config(collector, history_config={"page_size": 10})
+    history.sync("wallet-a")
+    transport.add(3)
+
+    async def sync_twice():
+        return await asyncio.gather(history.sync_async("wallet-a"), history.sync_async("wallet-a"))
+
+    asyncio.run(sync_twice())
+
+    assert [s["signature"] for s in history.stored("wallet-a")] == [f"sig-{i}" for i in range(7, -1, -1)]
+    assert history.last_signature("wallet-a") == "sig-7"
+    assert history.activity_windows("wallet-a", now=1700000010)["tx_1h"] == 8
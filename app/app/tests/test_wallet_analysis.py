@@ -0,0 +1,82 @@
+import json
+
+# Import WalletAnalysis from core modules
+from app.core.wallet_analysis import WalletAnalysis
+
+
+def _token_account(mint, amount, decimals):
+    """
+    Build a jsonParsed token account as returned by getTokenAccountsByOwner.
+    """
+    return {
+        "pubkey": "acct-" + mint,
+        "account": {
+            "data": {
+                "parsed": {
+                    "info": {
+                        "mint": mint,
+                        "owner": "wallet",
+                        "tokenAmount": {"amount": str(amount), "decimals": decimals, "uiAmount": amount / 10 ** decimals}
+                    },
+                    "type": "account"
+                },
+                "program": "spl-token"
+            },
+            "lamports": 2039280
+        }
+    }
+
+
+def test_wallet_analysis_compact_fields():
+    """
+    Test that WalletAnalysis keeps only mint / amount / decimals and
+    signature / blockTime, while staying readable like the old dict.
+    """
+    accounts = [_token_account("mintA", 1500, 6), _token_account("mintB", 7, 0)]
+    transactions = [
+        {"signature": "sig2", "slot": 11, "blockTime": 1700000100, "err": None, "memo": None},
+        {"signature": "sig1", "slot": 10, "blockTime": None, "err": None, "memo": None}
+    ]
+
+    analysis = WalletAnalysis("wallet", accounts, transactions, "Low Activity", "Holder", False)
+
+    assert analysis.get("tokens_held") == 2
+    assert analysis["transaction_count"] == 2
+    assert analysis.get("unknown", "default") == "default"
+    assert analysis["top_tokens"] == [
+        {"mint": "mintA", "amount": 1500, "decimals": 6},
+        {"mint": "mintB", "amount": 7, "decimals": 0}
+    ]
+    assert analysis["recent_transactions"] == [
+        {"signature": "sig2", "blockTime": 1700000100},
+        {"signature": "sig1", "blockTime": None}
+    ]
+    assert analysis["partial"] is False
+
+    # Slotted → no per-instance __dict__
+    assert not hasattr(analysis, "__dict__")
+
+    # Serializes straight to JSON
+    assert json.loads(analysis.to_json()) == analysis.to_dict()
+
+
+def test_wallet_analysis_lazy_raw_payloads():
+    """
+    Test that raw payloads are only loaded when asked for.
+    """
+    calls = []
+
+    def load_accounts():
+        calls.append("accounts")
+        return [_token_account("mintA", 1, 0)]
+
+    analysis = WalletAnalysis("wallet", [_token_account("mintA", 1, 0)], [], "Dormant Wallet", "Active Trader",
+                              False, missing=["transactions"], load_token_accounts=load_accounts)
+
+    assert calls == []
+    assert analysis.raw_token_accounts()[0]["account"]["data"]["parsed"]["info"]["mint"] == "mintA"
+    assert calls == ["accounts"]
+
+    # No loader attached → empty
+    assert analysis.raw_transactions() == []
+    assert analysis["partial"] is True
@@ -1,6 +1,18 @@
+import asyncio
+import time
+from collections.abc import Mapping
+
+import numpy as np
+
 # Import WalletScanner and DataCollector from core modules
 from app.core.wallet_scanner import WalletScanner
 from app.core.data_collector import DataCollector
+from app.core.http_transport import HTTPTransport
+from app.core.pattern_detector import PatternDetector
+from app.core.resilience import CircuitOpenError
+from app.core.risk_assessor import RiskAssessor
+from app.core.signal_generator import SignalGenerator
+from app.core.wallet_metrics import WalletMetrics
 
 
 def test_analyze_wallet():
@@ -26,10 +38,146 @@ def test_analyze_wallet():
     result = scanner.analyze_wallet(wallet_address)
 
     # Basic assertions to verify expected keys exist in result
-    assert isinstance(result, dict), "Result should be a dictionary"
+    assert isinstance(result, Mapping), "Result should be a mapping"
     assert "tokens_held" in result, "'tokens_held' key missing in result"
     assert "activity_type" in result, "'activity_type' key missing in result"
 
     # Optional: You could also add extra validations like expected data types
     assert isinstance(result["tokens_held"], int), "'tokens_held' should be an integer"
     assert isinstance(result["activity_type"], str), "'activity_type' should be a string"
+
+
+class SlowCollector:
+    """
+    Minimal stand-in for DataCollector whose transaction fetch is slower
+    than the scanner deadline.
+    """
+
+    def __init__(self):
+        self.async_collector = self
+        self.transport = HTTPTransport.shared()
+
+    async def fetch_wallet_balance(self, wallet_address):
+        await asyncio.sleep(0.01)
+        return {"value": [{"mint": "a"}, {"mint": "b"}], "empty": False}
+
+    async def fetch_recent_transactions(self, wallet_address, limit=10):
+        await asyncio.sleep(5)
+        return [{"signature": "never"}]
+
+
+def test_analyze_wallet_partial_on_deadline():
+    """
+    Test WalletScanner.analyze_wallet() with a leg that misses the deadline.
+
+    The balance arrives in time and must be used; the slow transaction
+    fetch is dropped and the result flagged as partial, with unknown activity.
+    """
+    scanner = WalletScanner(SlowCollector(), deadline=0.2)
+
+    start = time.monotonic()
+    result = scanner.analyze_wallet("abc")
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 2, "Analysis should return at the deadline, not wait for the slow fetch"
+    assert result["tokens_held"] == 2
+    assert result["transaction_count"] == 0
+    assert result["partial"] is True
+    assert result["missing"] == ["transactions"]
+
+    # Missing transactions are unknown activity, not a dormant wallet
+    assert result["activity_type"] == "Unknown"
+    assert result["behavior_type"] == "Unknown"
+
+
+class FailingCollector(SlowCollector):
+    """
+    Stand-in collector whose balance fetch fails fast (e.g. an open circuit breaker).
+    """
+
+    async def fetch_wallet_balance(self, wallet_address):
+        raise CircuitOpenError("solana_rpc circuit is open")
+
+
+def test_failed_fetches_are_missing_not_empty():
+    """
+    Test that a failed fetch is reported as missing and that nothing claims the wallet is empty.
+    """
+    config = {"risk_weights": {}, "whale_wallets": {}, "patterns": {}}
+    result = WalletScanner(FailingCollector(), deadline=0.2).analyze_wallet("abc")
+
+    assert result["partial"] is True
+    assert result["missing"] == ["balance", "transactions"]
+
+    patterns = PatternDetector(config).detect_patterns(result)
+    signal = SignalGenerator().generate_signal(result, patterns)
+    assert patterns == []
+    assert signal["signal"] == "HOLD"
+    assert RiskAssessor(config).calculate_risk_score(result, patterns) == 1.0
+
+    # The columnar rules agree
+    metrics = WalletMetrics.from_analyses([result])
+    assert PatternDetector(config).detect_patterns_batch(metrics).tolist() == [0]
+    assert SignalGenerator().generate_signals_batch(metrics, np.zeros(1, dtype=np.uint64))[0].tolist() == ["HOLD"]
+
+    # Only the balance failing still makes the analysis partial
+    class BalanceOnly(FailingCollector):
+        async def fetch_recent_transactions(self, wallet_address, limit=10):
+            return []
+
+    result = WalletScanner(BalanceOnly(), deadline=0.2).analyze_wallet("abc")
+    assert result["missing"] == ["balance"] and result["activity_type"] == "Dormant Wallet"
+    assert PatternDetector(config).detect_patterns(result) == []
+
+
+class CountingCollector(SlowCollector):
+    """
+    Stand-in collector that tracks how many wallets are fetched at once
+    and fails for one specific wallet.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def fetch_wallet_balance(self, wallet_address):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return {"value": [], "empty": True}
+
+    async def fetch_recent_transactions(self, wallet_address, limit=10):
+        return []
+
+
+def test_analyze_wallets_bounded_and_indexed():
+    """
+    Test WalletScanner.analyze_wallets() on a lazy iterator of addresses.
+
+    Verifies the concurrency bound, that every input index is reported
+    once, and that a failing wallet yields an error without aborting.
+    """
+    collector = CountingCollector()
+    scanner = WalletScanner(collector, deadline=5)
+
+    # Make one wallet blow up inside the analysis
+    original_build = scanner._build_analysis
+
+    def build(wallet_address, *args):
+        if wallet_address == "wallet-7":
+            raise ValueError("boom")
+        return original_build(wallet_address, *args)
+
+    scanner._build_analysis = build
+
+    addresses = (f"wallet-{i}" for i in range(30))
+    results = list(scanner.analyze_wallets(addresses, concurrency=4))
+
+    assert sorted(r["index"] for r in results) == list(range(30))
+    assert all(r["wallet"] == f"wallet-{r['index']}" for r in results)
+    assert collector.peak <= 4, "No more than 4 wallets should be in flight"
+
+    errors = [r for r in results if r["error"]]
+    assert len(errors) == 1 and errors[0]["wallet"] == "wallet-7"
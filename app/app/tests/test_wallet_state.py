@@ -0,0 +1,157 @@
+from app.core.comment_worker import PENDING_COMMENT
+from app.core.pattern_detector import PatternDetector
+from app.core.risk_assessor import RiskAssessor
+from app.core.risk_population import RiskPopulation
+from app.core.signal_generator import SignalGenerator
+from app.core.wallet_analysis import WalletAnalysis
+from app.core.wallet_state import WalletStateTracker
+from app.db.database import Database
+
+
+class CountingDetector(PatternDetector):
+    """
+    PatternDetector that counts how often patterns are detected.
+    """
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.calls = 0
+
+    def detect_patterns(self, wallet_analysis):
+        self.calls += 1
+        return super().detect_patterns(wallet_analysis)
+
+
+def _analysis(signatures, amount=5):
+    """
+    Build a WalletAnalysis with one token account and the given signatures (newest first).
+    """
+    accounts = [{"account": {"data": {"parsed": {"info": {
+        "mint": "mintA", "tokenAmount": {"amount": str(amount), "decimals": 0}
+    }}}}}]
+    transactions = [{"signature": s, "slot": 100 - i, "blockTime": 1700000000 - i} for i, s in enumerate(signatures)]
+    return WalletAnalysis("wallet", accounts, transactions, "Low Activity", "Holder", False,
+                          activity_windows={"tx_24h": 0})
+
+
+def test_unchanged_wallet_reuses_signal(tmp_path):
+    """
+    Test that a rescan without new signatures or token changes reuses the
+    stored signal, and that the state survives a restart through SQLite.
+    """
+    db = Database(str(tmp_path / "state.db"))
+    detector = CountingDetector({})
+    tracker = WalletStateTracker(detector, SignalGenerator(), RiskAssessor({}), db)
+
+    signal, recomputed = tracker.evaluate(_analysis(["sig-2", "sig-1"]))
+    assert recomputed is True
+    assert detector.calls == 1
+
+    reused, recomputed = tracker.evaluate(_analysis(["sig-2", "sig-1"]))
+    assert recomputed is False
+    assert reused == signal
+    assert detector.calls == 1
+
+    # New tracker on the same database → state is loaded, still nothing to do
+    restarted = WalletStateTracker(detector, SignalGenerator(), RiskAssessor({}), db)
+    _, recomputed = restarted.evaluate(_analysis(["sig-2", "sig-1"]))
+    assert recomputed is False
+    assert detector.calls == 1
+
+    state = db.get_wallet_state("wallet")
+    assert state["last_signature"] == "sig-2"
+    assert state["last_slot"] == 100
+    assert state["signal"]["risk_score"] == signal["risk_score"]
+
+
+def test_deltas_update_state_but_recompute_only_on_signal_inputs(tmp_path):
+    """
+    Test that new signatures and changed token accounts are stored as deltas,
+    while the signal is only re-derived when a field it depends on changed.
+    """
+    db = Database(str(tmp_path / "state.db"))
+    detector = CountingDetector({})
+    tracker = WalletStateTracker(detector, SignalGenerator(), RiskAssessor({}), db)
+
+    tracker.evaluate(_analysis(["sig-1"]))
+
+    # Token amount changed, token count did not → state updated, signal reused
+    _, recomputed = tracker.evaluate(_analysis(["sig-1"], amount=9))
+    assert recomputed is False
+    assert detector.calls == 1
+    assert db.get_wallet_state("wallet")["token_fingerprint"] == _analysis(["sig-1"], amount=9).token_fingerprint()
+
+    # New signature raises the transaction count → recomputed
+    _, recomputed = tracker.evaluate(_analysis(["sig-2", "sig-1"], amount=9))
+    assert recomputed is True
+    assert detector.calls == 2
+    assert db.get_wallet_state("wallet")["last_signature"] == "sig-2"
+
+
+def test_reevaluations_count_wallet_once_in_population():
+    """
+    Test that re-deriving a known wallet's signal does not add it to the risk population again.
+    """
+    tracker = WalletStateTracker(PatternDetector({}), SignalGenerator(), RiskAssessor(
+        {"risk_weights": {"activity": {"High Activity": 3.0}}}, RiskPopulation()))
+
+    signatures = []
+    for i in range(4):
+        signatures.insert(0, f"sig-{i}")
+        _, recomputed = tracker.evaluate(_analysis(signatures))
+        assert recomputed is True
+
+    busy = WalletAnalysis("busy", [], [{"signature": "sig-9", "slot": 1, "blockTime": 1700000000}] * 40,
+                          "High Activity", "Trader", False)
+    signal, _ = tracker.evaluate(busy)
+
+    # Population holds "wallet" once and "busy" once
+    assert signal["risk_percentile"] == 75.0
+
+
+class FixedCommentWorker:
+    """
+    Stand-in for CommentWorker returning a fixed comment (PENDING_COMMENT → never delivered).
+    """
+
+    def __init__(self, comment):
+        self.text = comment
+
+    def comment(self, wallet_analysis, patterns, on_comment=None):
+        return self.text
+
+
+def test_pending_comment_of_stopped_process_is_regenerated(tmp_path):
+    """
+    Test that a signal stored with a pending comment is not reused with "pending" after a restart.
+    """
+    db = Database(str(tmp_path / "state.db"))
+    detector = CountingDetector({})
+    tracker = WalletStateTracker(detector, SignalGenerator(comment_worker=FixedCommentWorker(PENDING_COMMENT)),
+                                 RiskAssessor({}), db)
+
+    signal, _ = tracker.evaluate(_analysis(["sig-1"]))
+    assert signal["ai_comment"] == PENDING_COMMENT
+
+    # Same process → the comment is still on its way, nothing to redo
+    assert tracker.evaluate(_analysis(["sig-1"]))[1] is False
+
+    # The process stopped before the comment arrived → regenerated on the next scan
+    def restart():
+        return WalletStateTracker(detector, SignalGenerator(comment_worker=FixedCommentWorker("Quiet holder.")),
+                                  RiskAssessor({}), db)
+
+    restarted = restart()
+
+    def compute_many(analyses, observe):
+        return [restarted._compute(analysis, None, flag) for analysis, flag in zip(analyses, observe)]
+
+    [(signal, recomputed)] = restarted.evaluate_many([_analysis(["sig-1"])], compute_many)
+    assert recomputed is True and signal["ai_comment"] == "Quiet holder."
+
+    db.save_wallet_state("wallet", dict(db.get_wallet_state("wallet"), signal=dict(signal, ai_comment=PENDING_COMMENT)))
+    restarted = restart()
+    signal, recomputed = restarted.evaluate(_analysis(["sig-1"]))
+    assert recomputed is True and signal["ai_comment"] == "Quiet holder."
+    assert db.get_wallet_state("wallet")["signal"]["ai_comment"] == "Quiet holder."
+    assert restarted.evaluate(_analysis(["sig-1"]))[1] is False